@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.urls import reverse
 from django.utils.html import format_html
 from django.shortcuts import redirect, render
 from django.contrib import messages
@@ -10,14 +11,35 @@ from .models import (
     TemplateElement,
     TemplateAsset,
     AuditLog,
+    AuditLogArchive,
     QRProcessingConfig,
+    CertificateJob,
+    StoredFile,
 )
 
 
 # Configuración global de Media para todos los admins
 class BaseAdmin(admin.ModelAdmin):
     """Base admin con CSS personalizado"""
-    pass
+
+    def enqueue_job(self, request, job_type, payload, description):
+        """Encola un trabajo en segundo plano e informa al usuario cómo seguirlo"""
+        from certificates.services.job_queue import JobQueueService
+
+        job = JobQueueService().enqueue(job_type, payload, user=request.user)
+        status_url = reverse("certificates:processing_status")
+        self.message_user(
+            request,
+            format_html(
+                '⏳ {} encolado como trabajo #{}. Puede seguir su progreso en '
+                '<a href="{}">Estado de Procesamiento</a>.',
+                description,
+                job.pk,
+                status_url,
+            ),
+            messages.INFO,
+        )
+        return job
 
 
 @admin.register(Event)
@@ -58,32 +80,14 @@ class EventAdmin(BaseAdmin):
 
     @admin.action(description="Generar certificados para eventos seleccionados")
     def generate_certificates_action(self, request, queryset):
-        """Genera certificados para todos los participantes de los eventos seleccionados"""
-        from django.contrib import messages
-        from certificates.services.certificate_generator import CertificateGeneratorService
-
-        service = CertificateGeneratorService()
-        total_success = 0
-        total_errors = 0
-
-        for event in queryset:
-            result = service.generate_bulk_certificates(event, user=request.user)
-            total_success += result["success_count"]
-            total_errors += result["error_count"]
-
-        if total_success > 0:
-            self.message_user(
-                request,
-                f"✓ Se generaron {total_success} certificados exitosamente.",
-                messages.SUCCESS,
-            )
-
-        if total_errors > 0:
-            self.message_user(
-                request,
-                f"⚠ Se encontraron {total_errors} errores durante la generación.",
-                messages.WARNING,
-            )
+        """Encola la generación de certificados de los eventos seleccionados"""
+        event_ids = list(queryset.values_list("id", flat=True))
+        self.enqueue_job(
+            request,
+            "GENERATE_CERTIFICATES",
+            {"event_ids": event_ids},
+            f"Generación de certificados para {len(event_ids)} evento(s)",
+        )
 
 
 @admin.register(Participant)
@@ -439,7 +443,7 @@ class CertificateAdmin(BaseAdmin):
 
     def qr_code_preview(self, obj):
         """Muestra preview del código QR"""
-        if obj.qr_code:
+        if obj.pk and obj.ensure_qr_code():
             return format_html(
                 '<img src="{}" width="150" height="150" />',
                 obj.qr_code.url,
@@ -458,7 +462,7 @@ class CertificateAdmin(BaseAdmin):
         elif obj.pdf_file:
             return format_html(
                 '<a href="{}" target="_blank" class="button">📄 Ver PDF</a>',
-                obj.pdf_file.url
+                obj.get_certificate_url()
             )
         return "No disponible"
     
@@ -479,7 +483,7 @@ class CertificateAdmin(BaseAdmin):
             )
         elif obj.pdf_file:
             actions.append(
-                f'<a href="{obj.pdf_file.url}" target="_blank" class="button" '
+                f'<a href="{obj.get_certificate_url()}" target="_blank" class="button" '
                 f'style="font-size: 14px; padding: 5px 10px; background-color: #28a745; color: white;" '
                 f'title="Descargar PDF">⬇️</a>'
             )
@@ -498,66 +502,53 @@ class CertificateAdmin(BaseAdmin):
 
     @admin.action(description="Firmar certificados seleccionados")
     def sign_certificates_action(self, request, queryset):
-        """Firma digitalmente los certificados seleccionados"""
-        from django.contrib import messages
-        from certificates.services.digital_signature import DigitalSignatureService
-
-        service = DigitalSignatureService()
-        result = service.sign_bulk_certificates(queryset, user=request.user)
+        """Encola la firma digital de los certificados seleccionados"""
+        certificate_ids = list(queryset.filter(is_signed=False).values_list("id", flat=True))
 
-        if result["success_count"] > 0:
-            self.message_user(
-                request,
-                f"✓ Se firmaron {result['success_count']} certificados exitosamente.",
-                messages.SUCCESS,
-            )
-
-        if result["error_count"] > 0:
-            self.message_user(
-                request,
-                f"⚠ Se encontraron {result['error_count']} errores durante la firma.",
-                messages.WARNING,
-            )
+        if not certificate_ids:
+            self.message_user(request, "⚠ No hay certificados sin firmar", messages.WARNING)
+            return
 
-            # Mostrar primeros 3 errores
-            for error in result["errors"][:3]:
-                self.message_user(request, error, messages.ERROR)
+        self.enqueue_job(
+            request,
+            "SIGN_CERTIFICATES",
+            {"certificate_ids": certificate_ids},
+            f"Firma de {len(certificate_ids)} certificados",
+        )
 
     @admin.action(description="Descargar PDF de certificados seleccionados")
     def download_pdf_action(self, request, queryset):
         """Descarga los PDFs de los certificados seleccionados como ZIP"""
-        from django.http import HttpResponse
+        from django.http import FileResponse, StreamingHttpResponse
         from django.contrib import messages
-        import zipfile
-        from io import BytesIO
+        from certificates.services.zip_stream import stream_zip
 
-        if queryset.count() == 1:
+        count = queryset.count()
+        if count == 1:
             # Si es solo un certificado, descargar directamente
-            certificate = queryset.first()
-            response = HttpResponse(
-                certificate.pdf_file.read(), content_type="application/pdf"
+            certificate = queryset.select_related("participant").first()
+            return FileResponse(
+                certificate.pdf_file.open("rb"),
+                as_attachment=True,
+                filename=f"certificado_{certificate.participant.dni}.pdf",
+                content_type="application/pdf",
             )
-            response["Content-Disposition"] = (
-                f'attachment; filename="certificado_{certificate.participant.dni}.pdf"'
-            )
-            return response
 
-        # Si son múltiples, crear ZIP
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for certificate in queryset:
+        # Si son múltiples, transmitir el ZIP mientras se genera (PDFs sin
+        # recomprimir, leídos del storage en bloques)
+        def entries():
+            certificates = queryset.select_related("participant").order_by("pk")
+            for certificate in certificates.iterator(chunk_size=500):
                 if certificate.pdf_file:
-                    certificate.pdf_file.seek(0)
                     filename = f"certificado_{certificate.participant.dni}_{certificate.uuid}.pdf"
-                    zip_file.writestr(filename, certificate.pdf_file.read())
+                    yield filename, certificate.pdf_file
 
-        zip_buffer.seek(0)
-        response = HttpResponse(zip_buffer.read(), content_type="application/zip")
+        response = StreamingHttpResponse(stream_zip(entries()), content_type="application/zip")
         response["Content-Disposition"] = 'attachment; filename="certificados.zip"'
 
         self.message_user(
             request,
-            f"✓ Se descargaron {queryset.count()} certificados.",
+            f"✓ Se descargaron {count} certificados.",
             messages.SUCCESS,
         )
 
@@ -565,15 +556,13 @@ class CertificateAdmin(BaseAdmin):
     
     @admin.action(description="🔄 Procesar QR para certificados seleccionados")
     def process_qr_action(self, request, queryset):
-        """Procesa QR para certificados seleccionados"""
-        from django.http import HttpResponse
-        from certificates.services.pdf_processing import PDFProcessingService
-        from certificates.models import QRProcessingConfig
-        
+        """Encola el procesamiento de QR para los certificados seleccionados"""
         # Filtrar solo certificados que pueden procesarse
-        valid_certs = queryset.filter(processing_status='IMPORTED')
+        certificate_ids = list(
+            queryset.filter(processing_status='IMPORTED').values_list('id', flat=True)
+        )
         
-        if not valid_certs.exists():
+        if not certificate_ids:
             self.message_user(
                 request,
                 "⚠ No hay certificados válidos para procesar (deben estar en estado IMPORTED)",
@@ -581,51 +570,22 @@ class CertificateAdmin(BaseAdmin):
             )
             return
         
-        # Obtener configuración
-        config = QRProcessingConfig.get_active_config()
-        
-        # Procesar cada certificado
-        service = PDFProcessingService()
-        success_count = 0
-        error_count = 0
-        errors = []
-        
-        for certificate in valid_certs:
-            result = service.process_qr_for_certificate(certificate, config)
-            
-            if result['success']:
-                success_count += 1
-            else:
-                error_count += 1
-                errors.append(f"{certificate.participant.full_name}: {result['error']}")
-        
-        # Mostrar resultados
-        if success_count > 0:
-            self.message_user(
-                request,
-                f"✓ Se procesaron {success_count} certificados exitosamente",
-                messages.SUCCESS
-            )
-        
-        if error_count > 0:
-            self.message_user(
-                request,
-                f"⚠ Se encontraron {error_count} errores",
-                messages.WARNING
-            )
-            for error in errors[:5]:
-                self.message_user(request, error, messages.ERROR)
+        self.enqueue_job(
+            request,
+            "PROCESS_QR",
+            {"certificate_ids": certificate_ids},
+            f"Procesamiento de QR para {len(certificate_ids)} certificados",
+        )
     
     @admin.action(description="📤 Exportar para firma digital")
     def export_for_signing_action(self, request, queryset):
-        """Exporta certificados para firma digital"""
-        from django.http import HttpResponse
-        from certificates.services.pdf_processing import PDFProcessingService
-        
+        """Encola la exportación para firma; el ZIP se descarga desde el panel de estado"""
         # Filtrar solo certificados que pueden exportarse
-        valid_certs = queryset.filter(processing_status='QR_INSERTED')
+        certificate_ids = list(
+            queryset.filter(processing_status='QR_INSERTED').values_list('id', flat=True)
+        )
         
-        if not valid_certs.exists():
+        if not certificate_ids:
             self.message_user(
                 request,
                 "⚠ No hay certificados válidos para exportar (deben estar en estado QR_INSERTED)",
@@ -633,32 +593,12 @@ class CertificateAdmin(BaseAdmin):
             )
             return
         
-        # Crear ZIP
-        service = PDFProcessingService()
-        try:
-            zip_bytes, zip_filename = service.create_export_zip(
-                certificates=list(valid_certs),
-                include_metadata=True
-            )
-            
-            # Retornar ZIP como descarga
-            response = HttpResponse(zip_bytes, content_type='application/zip')
-            response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
-            
-            self.message_user(
-                request,
-                f"✓ Se exportaron {valid_certs.count()} certificados",
-                messages.SUCCESS
-            )
-            
-            return response
-            
-        except Exception as e:
-            self.message_user(
-                request,
-                f"❌ Error al crear ZIP: {str(e)}",
-                messages.ERROR
-            )
+        self.enqueue_job(
+            request,
+            "EXPORT_FOR_SIGNING",
+            {"certificate_ids": certificate_ids, "include_metadata": True},
+            f"Exportación de {len(certificate_ids)} certificados para firma",
+        )
     
     @admin.action(description="🗑️ Eliminar certificados seleccionados")
     def delete_selected_certificates(self, request, queryset):
@@ -678,8 +618,18 @@ class CertificateAdmin(BaseAdmin):
     def mark_as_external(self, request, queryset):
         """Marca los certificados seleccionados como externos"""
         from django.contrib import messages
+        from certificates.services.certificate_lookup import certificate_lookup
+        from certificates.services.certificate_page_cache import certificate_page_cache
+        from certificates.services.certificate_query_cache import certificate_query_cache
+        from certificates.services.dashboard_counters import dashboard_counters
         
         count = queryset.update(is_external=True)
+        certificate_query_cache.invalidate_many(
+            queryset.values_list('participant__dni', flat=True)
+        )
+        certificate_page_cache.invalidate_many(queryset.values_list('uuid', flat=True))
+        certificate_lookup.sync(queryset.values_list('pk', flat=True))
+        dashboard_counters.invalidate()
         
         self.message_user(
             request,
@@ -691,8 +641,18 @@ class CertificateAdmin(BaseAdmin):
     def mark_as_internal(self, request, queryset):
         """Marca los certificados seleccionados como internos"""
         from django.contrib import messages
+        from certificates.services.certificate_lookup import certificate_lookup
+        from certificates.services.certificate_page_cache import certificate_page_cache
+        from certificates.services.certificate_query_cache import certificate_query_cache
+        from certificates.services.dashboard_counters import dashboard_counters
         
         count = queryset.update(is_external=False, external_url='', external_system='')
+        certificate_query_cache.invalidate_many(
+            queryset.values_list('participant__dni', flat=True)
+        )
+        certificate_page_cache.invalidate_many(queryset.values_list('uuid', flat=True))
+        certificate_lookup.sync(queryset.values_list('pk', flat=True))
+        dashboard_counters.invalidate()
         
         self.message_user(
             request,
@@ -861,8 +821,9 @@ class CertificateTemplateAdmin(BaseAdmin):
             service = CertificateGeneratorService()
             qr_service = QRCodeService()
             
-            # Generar QR code de ejemplo con la URL completa
-            qr_buffer = qr_service.generate_qr(verification_url)
+            # Generar QR code de ejemplo con la URL completa (generate_qr espera
+            # el UUID y le antepondría de nuevo la URL de verificación)
+            qr_buffer = qr_service.render_qr_png(verification_url)
             
             # Generar PDF
             pdf_bytes = service._create_pdf(sample_data, template, qr_buffer)
@@ -1055,6 +1016,8 @@ class AuditLogAdmin(BaseAdmin):
         "timestamp",
     ]
     ordering = ["-timestamp"]
+    # Evita el COUNT(*) sin filtros sobre toda la tabla en cada página
+    show_full_result_count = False
 
     def has_add_permission(self, request):
         """No permitir agregar registros manualmente"""
@@ -1069,6 +1032,251 @@ class AuditLogAdmin(BaseAdmin):
         return False
 
 
+@admin.register(AuditLogArchive)
+class AuditLogArchiveAdmin(BaseAdmin):
+    """Navegador de los archivos mensuales de auditoría (solo lectura)"""
+
+    list_display = [
+        "month_display",
+        "row_count",
+        "first_timestamp",
+        "last_timestamp",
+        "size_display",
+        "download_links",
+    ]
+    readonly_fields = [
+        "month",
+        "file_display",
+        "row_count",
+        "first_timestamp",
+        "last_timestamp",
+        "created_at",
+        "updated_at",
+        "download_links",
+    ]
+    ordering = ["-month"]
+
+    def month_display(self, obj):
+        """Muestra el mes archivado"""
+        return obj.month.strftime("%Y-%m")
+
+    month_display.short_description = "Mes"
+    month_display.admin_order_field = "month"
+
+    def size_display(self, obj):
+        """Muestra el tamaño comprimido del archivo"""
+        from django.template.defaultfilters import filesizeformat
+
+        try:
+            return filesizeformat(obj.file.size)
+        except OSError:
+            return format_html('<span style="color: #dc3545;">✗ Archivo no encontrado</span>')
+
+    size_display.short_description = "Tamaño"
+
+    def file_display(self, obj):
+        """Ruta del archivo (no tiene URL pública: se descarga con los enlaces)"""
+        return obj.file.name
+
+    file_display.short_description = "Archivo"
+
+    def download_links(self, obj):
+        """Enlaces para descargar el archivo comprimido o como JSONL"""
+        url = reverse("admin:certificates_auditlogarchive_download", args=[obj.pk])
+        return format_html(
+            '<a class="button" href="{}">⬇️ .jsonl.gz</a> '
+            '<a class="button" href="{}?format=jsonl">📄 JSONL</a>',
+            url,
+            url,
+        )
+
+    download_links.short_description = "Descargar"
+
+    def get_urls(self):
+        """Agregar URLs personalizadas"""
+        from django.urls import path
+        urls = super().get_urls()
+        custom_urls = [
+            path(
+                '<int:archive_id>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='certificates_auditlogarchive_download',
+            ),
+        ]
+        return custom_urls + urls
+
+    def download_view(self, request, archive_id):
+        """
+        Transmite el archivo en bloques: tal cual (gzip) o, con
+        ?format=jsonl, descomprimido línea a línea sin cargarlo en memoria
+        """
+        import os
+        from django.core.exceptions import PermissionDenied
+        from django.http import FileResponse, Http404, StreamingHttpResponse
+        from django.shortcuts import get_object_or_404
+        from certificates.services.audit_archive import audit_archiver
+
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        archive = get_object_or_404(AuditLogArchive, pk=archive_id)
+        if not archive.file or not os.path.exists(archive.file.path):
+            raise Http404("Archivo de auditoría no encontrado")
+
+        filename = os.path.basename(archive.file.name)
+        if request.GET.get("format") == "jsonl":
+            response = StreamingHttpResponse(
+                audit_archiver.iter_lines(archive),
+                content_type="application/x-ndjson; charset=utf-8",
+            )
+            jsonl_name = filename.removesuffix(".gz")
+            response["Content-Disposition"] = f'attachment; filename="{jsonl_name}"'
+            return response
+
+        return FileResponse(open(archive.file.path, "rb"), as_attachment=True, filename=filename)
+
+    def has_add_permission(self, request):
+        """Los archivos los crea el comando archive_audit_logs"""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Permitir ver pero no editar"""
+        return request.method in ["GET", "HEAD"]
+
+    def has_delete_permission(self, request, obj=None):
+        """No permitir eliminar archivos"""
+        return False
+
+
+@admin.register(StoredFile)
+class StoredFileAdmin(BaseAdmin):
+    """Archivos del almacenamiento por contenido y sus referencias (solo lectura)"""
+
+    list_display = ["name", "size_display", "ref_count", "updated_at"]
+    readonly_fields = ["sha256", "name", "size", "ref_count", "updated_at"]
+    search_fields = ["sha256", "name"]
+    ordering = ["-ref_count", "name"]
+
+    def size_display(self, obj):
+        """Muestra el tamaño del archivo"""
+        from django.template.defaultfilters import filesizeformat
+
+        return filesizeformat(obj.size)
+
+    size_display.short_description = "Tamaño"
+    size_display.admin_order_field = "size"
+
+    def has_add_permission(self, request):
+        """Las filas las recalcula el comando collect_orphan_media"""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Permitir ver pero no editar"""
+        return request.method in ["GET", "HEAD"]
+
+    def has_delete_permission(self, request, obj=None):
+        """No permitir eliminar filas"""
+        return False
+
+
+@admin.register(CertificateJob)
+class CertificateJobAdmin(BaseAdmin):
+    """Administración de trabajos en segundo plano (solo lectura)"""
+
+    list_display = [
+        "id",
+        "job_type",
+        "status_badge",
+        "progress_display",
+        "attempts_display",
+        "created_by",
+        "created_at",
+        "finished_at",
+    ]
+    list_filter = ["job_type", "status", "created_at"]
+    search_fields = ["error_message", "created_by__username"]
+    readonly_fields = [
+        "job_type",
+        "status",
+        "payload",
+        "result",
+        "result_file",
+        "error_message",
+        "progress_current",
+        "progress_total",
+        "attempts",
+        "max_attempts",
+        "created_by",
+        "locked_by",
+        "locked_at",
+        "run_after",
+        "created_at",
+        "started_at",
+        "finished_at",
+    ]
+    ordering = ["-created_at"]
+    actions = ["retry_jobs_action", "cancel_jobs_action"]
+
+    def status_badge(self, obj):
+        """Muestra el estado con color"""
+        colors = {
+            "PENDING": "#6c757d",
+            "RUNNING": "#007bff",
+            "COMPLETED": "#28a745",
+            "FAILED": "#dc3545",
+            "CANCELLED": "#ffc107",
+        }
+        return format_html(
+            '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
+            colors.get(obj.status, "#6c757d"),
+            obj.get_status_display(),
+        )
+
+    status_badge.short_description = "Estado"
+
+    def progress_display(self, obj):
+        """Muestra el progreso del trabajo"""
+        return f"{obj.progress_current}/{obj.progress_total} ({obj.progress_percent}%)"
+
+    progress_display.short_description = "Progreso"
+
+    def attempts_display(self, obj):
+        """Muestra los intentos realizados"""
+        return f"{obj.attempts}/{obj.max_attempts}"
+
+    attempts_display.short_description = "Intentos"
+
+    @admin.action(description="🔁 Reintentar trabajos fallidos o cancelados")
+    def retry_jobs_action(self, request, queryset):
+        """Vuelve a encolar trabajos fallidos o cancelados"""
+        count = queryset.filter(status__in=["FAILED", "CANCELLED"]).update(
+            status="PENDING",
+            attempts=0,
+            run_after=None,
+            error_message="",
+            finished_at=None,
+        )
+        self.message_user(request, f"✓ Se reencolaron {count} trabajos", messages.SUCCESS)
+
+    @admin.action(description="⏹ Cancelar trabajos pendientes")
+    def cancel_jobs_action(self, request, queryset):
+        """Cancela trabajos que aún no han empezado"""
+        from django.utils import timezone
+
+        count = queryset.filter(status="PENDING").update(
+            status="CANCELLED",
+            finished_at=timezone.now(),
+        )
+        self.message_user(request, f"✓ Se cancelaron {count} trabajos", messages.SUCCESS)
+
+    def has_add_permission(self, request):
+        """Los trabajos se crean desde las acciones de certificados"""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Permitir ver pero no editar"""
+        return request.method in ["GET", "HEAD"]
+
 
 @admin.register(QRProcessingConfig)
 class QRProcessingConfigAdmin(BaseAdmin):
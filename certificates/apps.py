@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CertificatesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'certificates'
+
+    def ready(self):
+        # Registrar señales (invalidación de planes de renderizado)
+        from certificates import signals  # noqa: F401
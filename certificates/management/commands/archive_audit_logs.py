@@ -0,0 +1,63 @@
+"""
+Management command to move old AuditLog rows into compressed monthly archives.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from certificates.services.audit_archive import AuditLogArchiver
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve los registros de auditoría más antiguos que la retención '
+        '(AUDIT_LOG_RETENTION_DAYS) a archivos JSONL comprimidos por mes '
+        'bajo AUDIT_LOG_ARCHIVE_ROOT'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Días de registros que se conservan en la tabla (por defecto AUDIT_LOG_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Registros archivados por transacción (por defecto AUDIT_LOG_ARCHIVE_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo mostrar cuántos registros se archivarían por mes',
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if days is None:
+            days = getattr(settings, 'AUDIT_LOG_RETENTION_DAYS', 365)
+        if days < 1:
+            raise CommandError('--days debe ser mayor o igual a 1')
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor o igual a 1')
+
+        archiver = AuditLogArchiver(batch_size=options['batch_size'])
+        before = archiver.cutoff(days)
+        self.stdout.write(f'Archivando registros anteriores a {before:%Y-%m-%d %H:%M %Z}')
+
+        if options['dry_run']:
+            pending = archiver.pending_by_month(before)
+            for month, count in pending.items():
+                self.stdout.write(f'  {month:%Y-%m}: {count} registros')
+            self.stdout.write(self.style.WARNING(
+                f'Modo simulación: se archivarían {sum(pending.values())} registros'
+            ))
+            return
+
+        archived = archiver.archive(before)
+        for month, count in archived.items():
+            self.stdout.write(f'  {month:%Y-%m}: {count} registros → {archiver.relative_path(month)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Registros de auditoría archivados: {sum(archived.values())}'
+        ))
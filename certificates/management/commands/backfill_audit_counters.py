@@ -0,0 +1,116 @@
+"""
+Management command to rebuild AuditLogCounter from AuditLog history.
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils import timezone
+
+from certificates.models import AuditLog, AuditLogArchive
+from certificates.services.audit_counters import audit_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula los contadores de auditoría (AuditLogCounter) por día y hora '
+        'a partir de los registros de AuditLog'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=date.fromisoformat,
+            help='Primer día a recalcular (YYYY-MM-DD); por defecto, el del registro más antiguo',
+        )
+        parser.add_argument(
+            '--until',
+            type=date.fromisoformat,
+            help='Último día a recalcular (YYYY-MM-DD); por defecto, hoy',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Recalcular solo los últimos N días (para ejecución periódica)',
+        )
+        parser.add_argument(
+            '--hours',
+            type=int,
+            help=(
+                'Recalcular solo las últimas N horas (conciliación frecuente de los '
+                'registros creados uno a uno, p. ej. con AUDIT_LOG_MODE=sync)'
+            ),
+        )
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=31,
+            help='Días procesados por transacción (por defecto 31)',
+        )
+
+    def handle(self, *args, **options):
+        if options['hours'] is not None:
+            self._rollup(options['hours'])
+            return
+
+        until = options['until'] or timezone.localdate()
+        if options['days'] is not None:
+            if options['days'] < 1:
+                raise CommandError('--days debe ser mayor o igual a 1')
+            since = until - timedelta(days=options['days'] - 1)
+        else:
+            since = options['since'] or self._first_log_date()
+        if options['chunk_days'] < 1:
+            raise CommandError('--chunk-days debe ser mayor o igual a 1')
+
+        if since is None:
+            self.stdout.write(self.style.WARNING('No hay registros de auditoría'))
+            return
+        if since > until:
+            raise CommandError('--since no puede ser posterior a --until')
+
+        # Los días archivados ya no están en AuditLog: recalcularlos borraría
+        # sus contadores
+        archived_until = self._archived_until()
+        if archived_until and since <= archived_until:
+            since = archived_until + timedelta(days=1)
+            self.stdout.write(self.style.WARNING(
+                f'Los registros hasta el {archived_until} están archivados; '
+                f'se recalcula desde el {since}'
+            ))
+            if since > until:
+                return
+
+        total_rows = 0
+        chunk_start = since
+        while chunk_start <= until:
+            chunk_end = min(chunk_start + timedelta(days=options['chunk_days'] - 1), until)
+            rows = audit_counters.rebuild(chunk_start, chunk_end)
+            total_rows += rows
+            self.stdout.write(f'{chunk_start} → {chunk_end}: {rows} contadores')
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Contadores recalculados del {since} al {until}: {total_rows}'
+        ))
+
+    def _rollup(self, hours):
+        if hours < 1:
+            raise CommandError('--hours debe ser mayor o igual a 1')
+        since = timezone.now() - timedelta(hours=hours)
+        last_archived = AuditLogArchive.objects.aggregate(last=Max('last_timestamp'))['last']
+        if last_archived and since <= last_archived:
+            raise CommandError('El rango incluye registros archivados; use un valor menor de --hours')
+
+        rows = audit_counters.rollup(since)
+        self.stdout.write(self.style.SUCCESS(
+            f'Contadores de las últimas {hours} horas recalculados: {rows}'
+        ))
+
+    def _archived_until(self):
+        last = AuditLogArchive.objects.aggregate(last=Max('last_timestamp'))['last']
+        return timezone.localtime(last).date() if last else None
+
+    def _first_log_date(self):
+        first = AuditLog.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+        return timezone.localtime(first).date() if first else None
@@ -0,0 +1,121 @@
+"""
+Management command to benchmark public lookups: CertificateLookup vs joins.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Window
+
+from certificates.models import Certificate, CertificateLookup
+
+PAGE_SIZE = 10
+
+
+def join_by_dni(dni):
+    """Primera página de la consulta por DNI uniendo certificado, participante y evento"""
+    return list(
+        Certificate.objects.filter(participant__dni=dni)
+        .annotate(total=Window(expression=Count('id')))
+        .order_by('-generated_at', '-id')
+        .values_list(
+            'uuid', 'participant__full_name', 'participant__dni', 'participant__attendee_type',
+            'participant__event__name', 'participant__event__event_date',
+            'is_signed', 'is_external', 'external_url', 'total',
+        )[:PAGE_SIZE]
+    )
+
+
+def lookup_by_dni(dni):
+    """Primera página de la consulta por DNI desde CertificateLookup"""
+    return list(
+        CertificateLookup.objects.filter(dni=dni)
+        .annotate(total=Window(expression=Count('certificate')))
+        .order_by('-generated_at', '-certificate')
+        .values_list(
+            'uuid', 'full_name', 'dni', 'attendee_type', 'event_name', 'event_date',
+            'is_signed', 'is_external', 'external_url', 'total',
+        )[:PAGE_SIZE]
+    )
+
+
+def join_by_uuid(certificate_uuid):
+    """Certificado de la verificación y el preview con select_related"""
+    return Certificate.objects.select_related('participant', 'participant__event').get(
+        uuid=certificate_uuid
+    )
+
+
+def lookup_by_uuid(certificate_uuid):
+    """Fila de la verificación y el preview desde CertificateLookup"""
+    return CertificateLookup.objects.get(uuid=certificate_uuid)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la latencia (p50/p99) de las búsquedas públicas por DNI y por UUID: '
+        'modelo de lectura CertificateLookup frente a la consulta con joins'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--samples',
+            type=int,
+            default=500,
+            help='DNI y UUID distintos a consultar por modo (por defecto 500)',
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=3,
+            help='Veces que se consulta cada muestra (por defecto 3)',
+        )
+
+    def handle(self, *args, **options):
+        samples, rounds = options['samples'], options['rounds']
+        if samples < 1:
+            raise CommandError('--samples debe ser mayor o igual a 1')
+        if rounds < 1:
+            raise CommandError('--rounds debe ser mayor o igual a 1')
+
+        rows = list(CertificateLookup.objects.order_by('?').values_list('dni', 'uuid')[:samples])
+        if not rows:
+            raise CommandError(
+                'No hay filas en CertificateLookup; ejecute rebuild_certificate_lookup'
+            )
+        dnis = list({dni for dni, _ in rows})
+        uuids = [certificate_uuid for _, certificate_uuid in rows]
+
+        benchmarks = [
+            ('DNI (joins)', join_by_dni, dnis),
+            ('DNI (lookup)', lookup_by_dni, dnis),
+            ('UUID (joins)', join_by_uuid, uuids),
+            ('UUID (lookup)', lookup_by_uuid, uuids),
+        ]
+
+        # Una pasada previa para no medir el primer acceso a páginas en disco
+        for _, query, values in benchmarks:
+            for value in values:
+                query(value)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'=== RESULTADOS ({len(dnis)} DNI, {len(uuids)} UUID, {rounds} rondas; ms por consulta) ==='
+        ))
+        self.stdout.write(f'{"consulta":<15} {"p50":>8} {"p99":>8} {"máx":>8}')
+        for label, query, values in benchmarks:
+            timings = []
+            for _ in range(rounds):
+                for value in values:
+                    start_time = time.perf_counter()
+                    query(value)
+                    timings.append((time.perf_counter() - start_time) * 1000)
+            self.stdout.write(self._format_row(label, timings))
+
+    def _format_row(self, label, timings):
+        """Percentiles 50 y 99 de los tiempos medidos"""
+        if len(timings) > 1:
+            cuts = statistics.quantiles(timings, n=100, method='inclusive')
+            p50, p99 = cuts[49], cuts[98]
+        else:
+            p50 = p99 = timings[0]
+        return f'{label:<15} {p50:8.3f} {p99:8.3f} {max(timings):8.3f}'
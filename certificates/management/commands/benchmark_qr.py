@@ -0,0 +1,62 @@
+"""
+Management command to benchmark QR image generation.
+"""
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from certificates.services.qr_service import QRCodeService
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el rendimiento de la generación de imágenes QR: una llamada por '
+        'certificado (render_qr_png) frente a generate_qr_batch'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=500,
+            help='Número de códigos QR a generar por modo (por defecto 500)',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['single', 'batch', 'both'],
+            default='both',
+            help='single: una llamada por QR; batch: generate_qr_batch',
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        if count < 1:
+            raise CommandError('--count debe ser mayor o igual a 1')
+        mode = options['mode']
+
+        service = QRCodeService()
+        urls = [service.get_verification_url(str(uuid.uuid4())) for _ in range(count)]
+        results = {}
+
+        if mode in ('single', 'both'):
+            start_time = time.perf_counter()
+            total_bytes = sum(len(service.render_qr_png(url).getvalue()) for url in urls)
+            results['single'] = (time.perf_counter() - start_time, total_bytes)
+
+        if mode in ('batch', 'both'):
+            start_time = time.perf_counter()
+            total_bytes = sum(
+                len(buffer.getvalue())
+                for buffer in service.generate_qr_batch(urls, size=service.qr_size)
+            )
+            results['batch'] = (time.perf_counter() - start_time, total_bytes)
+
+        self.stdout.write(self.style.SUCCESS(f'=== RESULTADOS ({count} códigos QR) ==='))
+        labels = {'single': 'individual', 'batch': 'lote'}
+        for key, (elapsed, total_bytes) in results.items():
+            self.stdout.write(
+                f'{labels[key]:<10}  {count / elapsed:8.1f} QR/s  '
+                f'{elapsed * 1000 / count:6.2f} ms/QR  {total_bytes / count:7.0f} bytes/QR'
+            )
+        if 'single' in results and 'batch' in results and results['batch'][0] > 0:
+            self.stdout.write(f'aceleración: x{results["single"][0] / results["batch"][0]:.2f}')
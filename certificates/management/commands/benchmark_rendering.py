@@ -0,0 +1,129 @@
+"""
+Management command to benchmark visual template rendering.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from certificates.models import CertificateTemplate
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el costo por certificado del renderizado de plantillas visuales: '
+        'un documento por certificado frente a un documento de N páginas'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--template-id',
+            type=int,
+            default=None,
+            help='ID de la plantilla a medir (por defecto la primera con elementos visuales)',
+        )
+        parser.add_argument(
+            '--sizes',
+            default='1,50,500',
+            help='Tamaños de lote separados por coma (por defecto 1,50,500)',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['single', 'batch', 'both'],
+            default='both',
+            help='single: un documento por certificado; batch: un documento por lote',
+        )
+        parser.add_argument(
+            '--merged-output',
+            default=None,
+            help='Ruta donde guardar el PDF combinado del lote más grande (opcional)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted({int(size) for size in options['sizes'].split(',') if size.strip()})
+        except ValueError:
+            raise CommandError('--sizes debe ser una lista de enteros separados por coma')
+        if not sizes or sizes[0] < 1:
+            raise CommandError('--sizes debe contener valores mayores o iguales a 1')
+
+        template = self._get_template(options['template_id'])
+        mode = options['mode']
+
+        try:
+            from certificates.services.template_renderer import (
+                TemplateRenderingService,
+                get_sample_participant_data,
+            )
+            renderer = TemplateRenderingService()
+        except Exception as e:
+            raise CommandError(f'El renderizado visual no está disponible: {str(e)}')
+
+        self.stdout.write(
+            self.style.WARNING(f'Plantilla: "{template.name}" (ID {template.id})')
+        )
+
+        # Compilar el plan antes de medir para no incluir el primer acceso a BD
+        renderer.get_render_plan(template.id)
+
+        base_data = get_sample_participant_data()
+        results = []
+
+        for size in sizes:
+            participants = [
+                dict(base_data, participant_name=f'Participante {i + 1}', participant_dni=f'{i + 1:08d}')
+                for i in range(size)
+            ]
+            row = {'size': size}
+
+            if mode in ('single', 'both'):
+                start_time = time.perf_counter()
+                for data in participants:
+                    renderer.render_template_to_pdf(template.id, data)
+                row['single'] = time.perf_counter() - start_time
+
+            if mode in ('batch', 'both'):
+                start_time = time.perf_counter()
+                renderer.render_batch_to_pdf(template.id, participants)
+                row['batch'] = time.perf_counter() - start_time
+
+            results.append(row)
+            self.stdout.write(self._format_row(row))
+
+        if options['merged_output']:
+            participants = [
+                dict(base_data, participant_name=f'Participante {i + 1}')
+                for i in range(sizes[-1])
+            ]
+            pdf_bytes = renderer.render_batch_to_pdf(template.id, participants, merge=True)
+            with open(options['merged_output'], 'wb') as f:
+                f.write(pdf_bytes)
+            self.stdout.write(f'PDF combinado guardado en {options["merged_output"]}')
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=== RESULTADOS (ms por certificado) ==='))
+        for row in results:
+            self.stdout.write(self._format_row(row))
+
+    def _get_template(self, template_id):
+        """Obtiene la plantilla indicada o la primera con elementos visuales"""
+        if template_id is not None:
+            try:
+                return CertificateTemplate.objects.get(id=template_id)
+            except CertificateTemplate.DoesNotExist:
+                raise CommandError(f'La plantilla con ID {template_id} no existe')
+
+        template = CertificateTemplate.objects.filter(elements__isnull=False).distinct().first()
+        if template is None:
+            raise CommandError('No hay plantillas con elementos visuales; use --template-id')
+        return template
+
+    def _format_row(self, row):
+        """Formatea una fila de resultados: tiempo por certificado y aceleración"""
+        size = row['size']
+        parts = [f'N={size:<5}']
+        if 'single' in row:
+            parts.append(f'individual: {row["single"] * 1000 / size:8.1f} ms')
+        if 'batch' in row:
+            parts.append(f'lote: {row["batch"] * 1000 / size:8.1f} ms')
+        if 'single' in row and 'batch' in row and row['batch'] > 0:
+            parts.append(f'aceleración: x{row["single"] / row["batch"]:.2f}')
+        return '  '.join(parts)
@@ -0,0 +1,80 @@
+"""
+Management command to find and delete orphaned files under MEDIA_ROOT.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from certificates.services.media_garbage import MediaGarbageCollector
+
+
+def format_size(size):
+    """Tamaño legible (B, KB, MB, GB)"""
+    if size < 1024:
+        return f'{size} B'
+    for unit in ('KB', 'MB', 'GB'):
+        size /= 1024
+        if size < 1024 or unit == 'GB':
+            return f'{size:.1f} {unit}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Busca los archivos de MEDIA_ROOT que ningún registro referencia, recalcula '
+        'las referencias del almacenamiento por contenido y, con --delete, los elimina'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Eliminar los archivos huérfanos (por defecto solo se reportan)',
+        )
+        parser.add_argument(
+            '--min-age-hours',
+            type=float,
+            default=24,
+            help='Conservar los archivos modificados en las últimas N horas (por defecto 24)',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='Mostrar cada archivo huérfano',
+        )
+
+    def handle(self, *args, **options):
+        if options['min_age_hours'] < 0:
+            raise CommandError('--min-age-hours no puede ser negativo')
+
+        collector = MediaGarbageCollector(min_age_seconds=options['min_age_hours'] * 3600)
+        report = collector.collect(delete=options['delete'])
+
+        if options['list']:
+            for name, size in report.orphans:
+                self.stdout.write(f'  {name} ({format_size(size)})')
+
+        self.stdout.write(
+            f'Archivos en MEDIA_ROOT: {report.scanned_files} ({format_size(report.scanned_bytes)})'
+        )
+        self.stdout.write(f'Referenciados: {report.referenced_files}')
+        self.stdout.write(
+            f'Huérfanos: {len(report.orphans)} ({format_size(report.orphan_bytes)}); '
+            f'{report.recent_orphans} recientes conservados'
+        )
+        self.stdout.write(
+            f'Almacenamiento por contenido: {report.stored_files} archivos, '
+            f'{format_size(report.deduplicated_bytes)} ahorrados por deduplicación'
+        )
+        if report.missing_files:
+            self.stdout.write(self.style.WARNING(
+                f'{report.missing_files} archivos referenciados no existen en disco'
+            ))
+
+        if options['delete']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Eliminados {report.deleted_files} archivos: '
+                f'{format_size(report.reclaimed_bytes)} recuperados'
+            ))
+        elif report.orphans:
+            self.stdout.write(self.style.WARNING(
+                f'Espacio recuperable: {format_size(report.orphan_bytes)} '
+                '(ejecute con --delete para eliminarlos)'
+            ))
@@ -0,0 +1,19 @@
+"""
+Management command to reinsert spooled audit log entries.
+"""
+from django.core.management.base import BaseCommand
+
+from certificates.services.audit_writer import audit_writer
+
+
+class Command(BaseCommand):
+    help = (
+        'Reinserta en la base de datos los registros de auditoría guardados en '
+        'el spool (AUDIT_LOG_SPOOL) cuando la base de datos no estaba disponible'
+    )
+
+    def handle(self, *args, **options):
+        inserted = audit_writer.drain_spool()
+        self.stdout.write(self.style.SUCCESS(
+            f'Registros de auditoría reinsertados: {inserted}'
+        ))
@@ -1,6 +1,8 @@
 """
 Management command to generate certificates for an event.
 """
+import time
+
 from django.core.management.base import BaseCommand, CommandError
 from certificates.models import Event
 from certificates.services.certificate_generator import CertificateGeneratorService
@@ -21,10 +23,29 @@ class Command(BaseCommand):
             action='store_true',
             help='Regenerar certificados incluso si ya existen',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Procesos de renderizado en paralelo (por defecto CERTIFICATE_GENERATION_WORKERS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Certificados guardados por transacción (por defecto CERTIFICATE_GENERATION_BATCH_SIZE)',
+        )
 
     def handle(self, *args, **options):
         event_id = options['event_id']
         force = options.get('force', False)
+        workers = options.get('workers')
+        batch_size = options.get('batch_size')
+
+        if workers is not None and workers < 1:
+            raise CommandError('--workers debe ser mayor o igual a 1')
+        if batch_size is not None and batch_size < 1:
+            raise CommandError('--batch-size debe ser mayor o igual a 1')
         
         # Verificar que el evento existe
         try:
@@ -72,7 +93,11 @@ class Command(BaseCommand):
                 Certificate.objects.filter(participant__event=event).delete()
         
         # Generar certificados masivamente
-        result = service.generate_bulk_certificates(event)
+        start_time = time.monotonic()
+        result = service.generate_bulk_certificates(
+            event, workers=workers, batch_size=batch_size
+        )
+        elapsed = time.monotonic() - start_time
         
         # Mostrar resultados
         self.stdout.write('')
@@ -102,3 +127,4 @@ class Command(BaseCommand):
                 f'Proceso completado. Total: {result["success_count"]} éxitos, {result["error_count"]} errores'
             )
         )
+        self.stdout.write(f'Tiempo total: {elapsed:.2f}s')
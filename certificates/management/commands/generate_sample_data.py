@@ -4,7 +4,7 @@ from django.utils import timezone
 from datetime import timedelta
 import random
 
-from certificates.models import Event, Participant, Certificate, CertificateTemplate, AuditLog
+from certificates.models import Event, Participant, Certificate, CertificateTemplate, AuditLog, AuditLogCounter
 from certificates.services.certificate_generator import CertificateGeneratorService
 from certificates.services.qr_service import QRCodeService
 
@@ -88,6 +88,7 @@ class Command(BaseCommand):
         Participant.objects.all().delete()
         Event.objects.all().delete()
         AuditLog.objects.all().delete()
+        AuditLogCounter.objects.all().delete()
         
         self.stdout.write('   ✓ Datos limpiados')
     
@@ -0,0 +1,49 @@
+"""
+Management command to manage monthly PostgreSQL partitions of AuditLog.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from certificates.services.audit_partitions import audit_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Particiona por mes la tabla de auditoría en PostgreSQL (--convert) y '
+        'crea las particiones de los próximos meses'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Convertir la tabla actual en tabla particionada (bloquea la tabla mientras copia)',
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=3,
+            help='Meses futuros con partición creada (por defecto 3)',
+        )
+
+    def handle(self, *args, **options):
+        if not audit_partitions.supported:
+            raise CommandError('El particionado de auditoría solo está disponible en PostgreSQL')
+        if options['months_ahead'] < 0:
+            raise CommandError('--months-ahead no puede ser negativo')
+
+        if not audit_partitions.is_partitioned():
+            if not options['convert']:
+                raise CommandError(
+                    'La tabla de auditoría no está particionada; use --convert para convertirla'
+                )
+            copied = audit_partitions.convert(months_ahead=options['months_ahead'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Tabla de auditoría particionada: {copied} registros copiados'
+            ))
+
+        created = audit_partitions.ensure_partitions(months_ahead=options['months_ahead'])
+        for name in created:
+            self.stdout.write(f'  Partición creada: {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Particiones de auditoría al día ({len(created)} nuevas)'
+        ))
@@ -0,0 +1,40 @@
+"""
+Management command to rebuild the CertificateLookup read model.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from certificates.models import Certificate, CertificateLookup
+from certificates.services.certificate_lookup import CertificateLookupSync
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye el modelo de lectura de las vistas públicas (CertificateLookup) '
+        'a partir de los certificados, participantes y eventos'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Certificados por lote (por defecto CERTIFICATE_LOOKUP_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size is not None and batch_size < 1:
+            raise CommandError('--batch-size debe ser mayor o igual a 1')
+
+        written = CertificateLookupSync(batch_size=batch_size).rebuild()
+
+        certificates = Certificate.objects.count()
+        lookups = CertificateLookup.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            f'{written} filas de consulta escritas ({lookups} filas para {certificates} certificados)'
+        ))
+        if lookups != certificates:
+            self.stdout.write(self.style.WARNING(
+                'El número de filas no coincide: hubo certificados creados o eliminados '
+                'durante la reconstrucción; vuelva a ejecutar el comando'
+            ))
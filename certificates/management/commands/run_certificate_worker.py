@@ -0,0 +1,112 @@
+"""
+Management command to run the background job worker for certificate operations.
+"""
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+
+from certificates.services.job_queue import JobQueueService
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos en segundo plano de certificados (generación, firma, QR, exportación)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesar los trabajos pendientes y terminar cuando la cola esté vacía',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5.0,
+            help='Segundos de espera entre consultas cuando no hay trabajos (por defecto: 5)',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=None,
+            help='Número máximo de trabajos a procesar antes de terminar',
+        )
+        parser.add_argument(
+            '--worker-id',
+            type=str,
+            default=None,
+            help='Identificador del worker (por defecto: host:pid)',
+        )
+
+    def handle(self, *args, **options):
+        once = options.get('once', False)
+        sleep_seconds = options.get('sleep', 5.0)
+        max_jobs = options.get('max_jobs')
+
+        if sleep_seconds < 0:
+            raise CommandError('--sleep no puede ser negativo')
+        if max_jobs is not None and max_jobs < 1:
+            raise CommandError('--max-jobs debe ser mayor o igual a 1')
+
+        queue = JobQueueService(worker_id=options.get('worker_id'))
+        self._stop = False
+        previous_handlers = self._install_signal_handlers()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Worker {queue.worker_id} iniciado')
+        )
+
+        processed = 0
+        try:
+            processed = self._run_loop(queue, once, sleep_seconds, max_jobs)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(f'Worker detenido. Trabajos procesados: {processed}')
+
+    def _run_loop(self, queue, once, sleep_seconds, max_jobs):
+        """Reclama y ejecuta trabajos hasta vaciar la cola o recibir señal de parada"""
+        processed = 0
+        while not self._stop:
+            # Descartar conexiones caídas entre trabajos (no dentro de una transacción)
+            if not connection.in_atomic_block:
+                close_old_connections()
+            job = queue.process_next()
+
+            if job is None:
+                if once:
+                    break
+                time.sleep(sleep_seconds)
+                continue
+
+            processed += 1
+            style = self.style.SUCCESS if job.status == 'COMPLETED' else self.style.WARNING
+            self.stdout.write(
+                style(
+                    f'{job.get_job_type_display()} #{job.pk}: {job.get_status_display()} '
+                    f'({job.result.get("success_count", 0)} éxitos, '
+                    f'{job.result.get("error_count", 0)} errores)'
+                )
+            )
+            if job.error_message:
+                self.stdout.write(self.style.ERROR(f'  - {job.error_message}'))
+
+            if max_jobs is not None and processed >= max_jobs:
+                break
+
+        return processed
+
+    def _install_signal_handlers(self):
+        """Termina el trabajo en curso antes de salir ante SIGTERM/SIGINT"""
+        def request_stop(signum, frame):
+            self._stop = True
+
+        previous_handlers = {}
+        try:
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[signum] = signal.signal(signum, request_stop)
+        except ValueError:
+            # signal solo funciona en el hilo principal
+            pass
+        return previous_handlers
@@ -21,6 +21,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Firmar todos los certificados, incluso los ya firmados',
         )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Firmas simultáneas (por defecto SIGNATURE_CONCURRENCY)',
+        )
 
     def handle(self, *args, **options):
         event_id = options['event_id']
@@ -79,7 +85,7 @@ class Command(BaseCommand):
         self.stdout.write('')
         
         # Firmar certificados
-        service = DigitalSignatureService()
+        service = DigitalSignatureService(concurrency=options.get('concurrency'))
         
         # Mostrar progreso
         self.stdout.write('Iniciando proceso de firma...')
@@ -116,6 +122,15 @@ class Command(BaseCommand):
             )
         )
         
+        self.stdout.write(f'Tiempo total: {result["elapsed_seconds"]:.1f} segundos')
+        if result['aborted']:
+            self.stdout.write(
+                self.style.ERROR(
+                    'La firma se detuvo porque el servicio de firma no responde; '
+                    'vuelva a ejecutar el comando para firmar los pendientes'
+                )
+            )
+        
         # Advertencia sobre servicio de firma
         if result['error_count'] > 0:
             self.stdout.write('')
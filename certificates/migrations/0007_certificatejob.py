@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0006_certificatetemplate_available_variables_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='certificatetemplate',
+            name='canvas_height',
+            field=models.IntegerField(default=595, help_text='Alto en píxeles. A4 Horizontal: 595px, A4 Vertical: 842px', verbose_name='Alto del Canvas'),
+        ),
+        migrations.AlterField(
+            model_name='certificatetemplate',
+            name='canvas_width',
+            field=models.IntegerField(default=842, help_text='Ancho en píxeles. A4 Horizontal: 842px, A4 Vertical: 595px', verbose_name='Ancho del Canvas'),
+        ),
+        migrations.CreateModel(
+            name='CertificateJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_type', models.CharField(choices=[('GENERATE_CERTIFICATES', 'Generación de certificados'), ('SIGN_CERTIFICATES', 'Firma digital'), ('PROCESS_QR', 'Procesamiento de QR'), ('EXPORT_FOR_SIGNING', 'Exportación para firma')], max_length=30, verbose_name='Tipo de trabajo')),
+                ('status', models.CharField(choices=[('PENDING', 'Pendiente'), ('RUNNING', 'En ejecución'), ('COMPLETED', 'Completado'), ('FAILED', 'Fallido'), ('CANCELLED', 'Cancelado')], default='PENDING', max_length=20, verbose_name='Estado')),
+                ('payload', models.JSONField(default=dict, verbose_name='Parámetros')),
+                ('result', models.JSONField(blank=True, default=dict, verbose_name='Resultado')),
+                ('result_file', models.FileField(blank=True, null=True, upload_to='jobs/%Y/%m/', verbose_name='Archivo resultado')),
+                ('error_message', models.TextField(blank=True, verbose_name='Último error')),
+                ('progress_current', models.PositiveIntegerField(default=0, verbose_name='Progreso actual')),
+                ('progress_total', models.PositiveIntegerField(default=0, verbose_name='Progreso total')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='Intentos máximos')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Bloqueado el')),
+                ('run_after', models.DateTimeField(blank=True, help_text='Los reintentos se programan con espera exponencial', null=True, verbose_name='Ejecutar después de')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creado el')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado el')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finalizado el')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Creado por')),
+            ],
+            options={
+                'verbose_name': 'Trabajo en segundo plano',
+                'verbose_name_plural': 'Trabajos en segundo plano',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='certificate_status_b8c22c_idx'), models.Index(fields=['created_at'], name='certificate_created_9c4453_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0008_auditlog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLogCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action_type', models.CharField(choices=[('IMPORT', 'Importación Excel'), ('GENERATE', 'Generación Certificado'), ('SIGN', 'Firma Digital'), ('QUERY', 'Consulta DNI'), ('VERIFY', 'Verificación QR')], max_length=20, verbose_name='Tipo de acción')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('hour', models.PositiveSmallIntegerField(verbose_name='Hora')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Cantidad')),
+            ],
+            options={
+                'verbose_name': 'Contador de Auditoría',
+                'verbose_name_plural': 'Contadores de Auditoría',
+                'ordering': ['-date', '-hour', 'action_type'],
+                'unique_together': {('date', 'hour', 'action_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0009_auditlogcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True, verbose_name='Mes')),
+                ('file', models.FileField(max_length=255, upload_to='', verbose_name='Archivo')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='Registros')),
+                ('first_timestamp', models.DateTimeField(blank=True, null=True, verbose_name='Primer registro')),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True, verbose_name='Último registro')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creado el')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizado el')),
+            ],
+            options={
+                'verbose_name': 'Archivo de Auditoría',
+                'verbose_name_plural': 'Archivos de Auditoría',
+                'ordering': ['-month'],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_certificate_lookup(apps, schema_editor):
+    """Copia los certificados existentes al modelo de lectura"""
+    Certificate = apps.get_model('certificates', 'Certificate')
+    CertificateLookup = apps.get_model('certificates', 'CertificateLookup')
+
+    rows = Certificate.objects.order_by('pk').values_list(
+        'pk', 'uuid', 'participant__dni', 'participant__full_name',
+        'participant__attendee_type', 'participant__event__name',
+        'participant__event__event_date', 'generated_at', 'is_signed', 'signed_at',
+        'is_external', 'external_url', 'processing_status', 'qr_code', 'qr_image',
+        'final_pdf',
+    )
+    batch = []
+    for (pk, uuid, dni, full_name, attendee_type, event_name, event_date, generated_at,
+         is_signed, signed_at, is_external, external_url, processing_status, qr_code,
+         qr_image, final_pdf) in rows.iterator(chunk_size=2000):
+        batch.append(CertificateLookup(
+            certificate_id=pk, uuid=uuid, dni=dni, full_name=full_name,
+            attendee_type=attendee_type, event_name=event_name, event_date=event_date,
+            generated_at=generated_at, is_signed=is_signed, signed_at=signed_at,
+            is_external=is_external, external_url=external_url,
+            processing_status=processing_status, qr_code=qr_code, qr_image=qr_image,
+            has_final_pdf=bool(final_pdf),
+        ))
+        if len(batch) >= 2000:
+            CertificateLookup.objects.bulk_create(batch)
+            batch = []
+    CertificateLookup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0010_auditlogarchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificateLookup',
+            fields=[
+                ('certificate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='lookup', serialize=False, to='certificates.certificate', verbose_name='Certificado')),
+                ('uuid', models.UUIDField(unique=True, verbose_name='UUID')),
+                ('dni', models.CharField(max_length=8, verbose_name='DNI')),
+                ('full_name', models.CharField(max_length=300, verbose_name='Nombres y Apellidos')),
+                ('attendee_type', models.CharField(choices=[('ASISTENTE', 'Asistente'), ('PONENTE', 'Ponente'), ('ORGANIZADOR', 'Organizador')], max_length=20, verbose_name='Tipo de Asistente')),
+                ('event_name', models.CharField(max_length=500, verbose_name='Nombre del evento')),
+                ('event_date', models.DateField(verbose_name='Fecha del evento')),
+                ('generated_at', models.DateTimeField(verbose_name='Generado el')),
+                ('is_signed', models.BooleanField(default=False, verbose_name='Firmado digitalmente')),
+                ('signed_at', models.DateTimeField(blank=True, null=True, verbose_name='Firmado el')),
+                ('is_external', models.BooleanField(default=False, verbose_name='Certificado Externo')),
+                ('external_url', models.URLField(blank=True, max_length=500, verbose_name='URL Externa')),
+                ('processing_status', models.CharField(blank=True, choices=[('IMPORTED', 'Importado (sin QR)'), ('QR_GENERATED', 'QR Generado'), ('QR_INSERTED', 'QR Insertado en PDF'), ('EXPORTED_FOR_SIGNING', 'Exportado para Firma'), ('SIGNED_FINAL', 'Firmado Final'), ('ERROR', 'Error en Procesamiento')], max_length=50, verbose_name='Estado de Procesamiento')),
+                ('qr_code', models.ImageField(blank=True, null=True, upload_to='', verbose_name='Código QR')),
+                ('qr_image', models.FileField(blank=True, null=True, upload_to='', verbose_name='Imagen QR')),
+                ('has_final_pdf', models.BooleanField(default=False, verbose_name='Tiene PDF final')),
+            ],
+            options={
+                'verbose_name': 'Consulta de Certificado',
+                'verbose_name_plural': 'Consultas de Certificados',
+                'indexes': [models.Index(fields=['dni', '-generated_at', '-certificate'], name='certificate_dni_5ee63f_idx')],
+            },
+        ),
+        migrations.RunPython(populate_certificate_lookup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:18
+
+import certificates.storage
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0011_certificatelookup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('name', models.CharField(max_length=255, verbose_name='Archivo')),
+                ('size', models.BigIntegerField(default=0, verbose_name='Tamaño (bytes)')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Referencias')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Actualizado el')),
+            ],
+            options={
+                'verbose_name': 'Archivo Almacenado',
+                'verbose_name_plural': 'Archivos Almacenados',
+                'ordering': ['-ref_count', 'name'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='certificate',
+            name='final_pdf',
+            field=models.FileField(blank=True, help_text='PDF firmado final (para preview público)', null=True, storage=certificates.storage.media_storage, upload_to='certificates/final/%Y/%m/', verbose_name='PDF Final Firmado'),
+        ),
+        migrations.AlterField(
+            model_name='certificate',
+            name='original_pdf',
+            field=models.FileField(blank=True, help_text='PDF original sin QR', null=True, storage=certificates.storage.media_storage, upload_to='certificates/original/%Y/%m/', verbose_name='PDF Original'),
+        ),
+        migrations.AlterField(
+            model_name='certificate',
+            name='pdf_file',
+            field=models.FileField(blank=True, null=True, storage=certificates.storage.media_storage, upload_to='certificates/%Y/%m/', verbose_name='Archivo PDF'),
+        ),
+        migrations.AlterField(
+            model_name='certificate',
+            name='qr_code',
+            field=models.ImageField(blank=True, null=True, storage=certificates.storage.media_storage, upload_to='qr_codes/%Y/%m/', verbose_name='Código QR'),
+        ),
+        migrations.AlterField(
+            model_name='certificate',
+            name='qr_image',
+            field=models.FileField(blank=True, help_text='Imagen del código QR generado', null=True, storage=certificates.storage.media_storage, upload_to='certificates/qr_codes/%Y/%m/', verbose_name='Imagen QR'),
+        ),
+        migrations.AlterField(
+            model_name='certificate',
+            name='qr_pdf',
+            field=models.FileField(blank=True, help_text='PDF con QR insertado (listo para firma)', null=True, storage=certificates.storage.media_storage, upload_to='certificates/with_qr/%Y/%m/', verbose_name='PDF con QR'),
+        ),
+        migrations.AlterField(
+            model_name='certificatelookup',
+            name='qr_code',
+            field=models.ImageField(blank=True, null=True, storage=certificates.storage.media_storage, upload_to='', verbose_name='Código QR'),
+        ),
+        migrations.AlterField(
+            model_name='certificatelookup',
+            name='qr_image',
+            field=models.FileField(blank=True, null=True, storage=certificates.storage.media_storage, upload_to='', verbose_name='Imagen QR'),
+        ),
+        migrations.AlterField(
+            model_name='templateasset',
+            name='file',
+            field=models.ImageField(help_text='Formatos permitidos: PNG, JPG, JPEG, SVG', storage=certificates.storage.media_storage, upload_to='template_assets/%Y/%m/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['png', 'jpg', 'jpeg', 'svg'])], verbose_name='Archivo'),
+        ),
+    ]
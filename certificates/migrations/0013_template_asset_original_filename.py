@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:42
+
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_original_filename(apps, schema_editor):
+    """Los assets subidos antes del almacenamiento por contenido conservan su nombre en la ruta"""
+    TemplateAsset = apps.get_model('certificates', 'TemplateAsset')
+    prefix = f"{getattr(settings, 'CONTENT_ADDRESSED_STORAGE_PREFIX', 'cas')}/"
+    for asset in TemplateAsset.objects.only('id', 'file').iterator():
+        if asset.file.name and not asset.file.name.startswith(prefix):
+            TemplateAsset.objects.filter(pk=asset.pk).update(
+                original_filename=os.path.basename(asset.file.name)
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0012_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='templateasset',
+            name='original_filename',
+            field=models.CharField(blank=True, editable=False, help_text='Nombre con el que se subió el archivo (el almacenamiento lo guarda por su hash)', max_length=255, verbose_name='Nombre de archivo original'),
+        ),
+        migrations.RunPython(populate_original_filename, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:59
+
+import os
+
+import certificates.storage
+from django.conf import settings
+from django.db import migrations, models
+
+
+def move_archives_out_of_media(apps, schema_editor):
+    """Mueve los archivos de MEDIA_ROOT/audit_archive/ a AUDIT_LOG_ARCHIVE_ROOT"""
+    AuditLogArchive = apps.get_model('certificates', 'AuditLogArchive')
+    storage = certificates.storage.audit_archive_storage
+    for archive in AuditLogArchive.objects.filter(file__startswith='audit_archive/'):
+        name = archive.file.name.removeprefix('audit_archive/')
+        source = os.path.join(settings.MEDIA_ROOT, archive.file.name)
+        if os.path.exists(source):
+            target = storage.path(name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(source, target)
+        AuditLogArchive.objects.filter(pk=archive.pk).update(file=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0013_template_asset_original_filename'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlogarchive',
+            name='file',
+            field=models.FileField(max_length=255, storage=certificates.storage.AuditArchiveStorage(), upload_to='', verbose_name='Archivo'),
+        ),
+        migrations.RunPython(move_archives_out_of_media, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator, FileExtensionValidator
+from django.utils import timezone
+from django.urls import reverse
+import os
 import uuid
 
+from certificates.storage import audit_archive_storage, media_storage
+
 
 class TemplateAsset(models.Model):
     """Recursos reutilizables para plantillas (imágenes, logos, firmas, sellos)"""
@@ -26,10 +31,18 @@ class TemplateAsset(models.Model):
     )
     file = models.ImageField(
         upload_to='template_assets/%Y/%m/',
+        storage=media_storage,
         verbose_name="Archivo",
         validators=[FileExtensionValidator(allowed_extensions=['png', 'jpg', 'jpeg', 'svg'])],
         help_text="Formatos permitidos: PNG, JPG, JPEG, SVG"
     )
+    original_filename = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        verbose_name="Nombre de archivo original",
+        help_text="Nombre con el que se subió el archivo (el almacenamiento lo guarda por su hash)"
+    )
     category = models.CharField(
         max_length=100,
         blank=True,
@@ -64,6 +77,12 @@ class TemplateAsset(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_asset_type_display()})"
 
+    def save(self, *args, **kwargs):
+        # Archivo recién subido: conservar su nombre antes de que el storage lo reemplace por el hash
+        if self.file and not self.file._committed:
+            self.original_filename = os.path.basename(self.file.name)
+        super().save(*args, **kwargs)
+
 
 class CertificateTemplate(models.Model):
     """Plantilla para certificados"""
@@ -249,12 +268,14 @@ class Certificate(models.Model):
     )
     pdf_file = models.FileField(
         upload_to='certificates/%Y/%m/',
+        storage=media_storage,
         verbose_name="Archivo PDF",
         blank=True,
         null=True
     )
     qr_code = models.ImageField(
         upload_to='qr_codes/%Y/%m/',
+        storage=media_storage,
         verbose_name="Código QR",
         blank=True,
         null=True
@@ -309,6 +330,7 @@ class Certificate(models.Model):
     # Archivos en diferentes etapas del procesamiento
     original_pdf = models.FileField(
         upload_to='certificates/original/%Y/%m/',
+        storage=media_storage,
         null=True,
         blank=True,
         verbose_name="PDF Original",
@@ -317,6 +339,7 @@ class Certificate(models.Model):
     
     qr_pdf = models.FileField(
         upload_to='certificates/with_qr/%Y/%m/',
+        storage=media_storage,
         null=True,
         blank=True,
         verbose_name="PDF con QR",
@@ -325,6 +348,7 @@ class Certificate(models.Model):
     
     final_pdf = models.FileField(
         upload_to='certificates/final/%Y/%m/',
+        storage=media_storage,
         null=True,
         blank=True,
         verbose_name="PDF Final Firmado",
@@ -333,6 +357,7 @@ class Certificate(models.Model):
     
     qr_image = models.FileField(
         upload_to='certificates/qr_codes/%Y/%m/',
+        storage=media_storage,
         null=True,
         blank=True,
         verbose_name="Imagen QR",
@@ -401,15 +426,49 @@ class Certificate(models.Model):
 
     def __str__(self):
         return f"Certificado {self.uuid} - {self.participant.full_name}"
-    
+
+    # Campos cuyos cambios se cuentan en los contadores del dashboard
+    COUNTED_FIELDS = ('is_signed', 'is_external')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valores cargados: la señal post_save calcula con ellos la variación
+        instance._counted_values = {
+            name: getattr(instance, name)
+            for name in cls.COUNTED_FIELDS
+            if name in field_names
+        }
+        return instance
+
     def get_certificate_url(self):
         """Retorna la URL del certificado (externa o interna)"""
         if self.is_external and self.external_url:
             return self.external_url
         elif self.pdf_file:
-            return self.pdf_file.url
+            # Por la vista de descarga: nginx no sirve los PDF bajo /media/
+            return reverse('certificates:download', kwargs={'uuid': self.uuid})
         return None
     
+    def ensure_qr_code(self):
+        """
+        Retorna la imagen PNG del QR, generándola si aún no existe
+
+        Con QR vectorial (CERTIFICATE_QR_VECTOR) los PDF no necesitan el PNG,
+        por lo que solo se genera y guarda la primera vez que se solicita.
+        """
+        if self.qr_code or self.is_external or not self.verification_url:
+            return self.qr_code
+
+        from django.core.files.base import ContentFile
+        from certificates.services.qr_service import QRCodeService
+
+        qr_buffer = QRCodeService().render_qr_png(self.verification_url)
+        self.qr_code.save(f"qr_{self.uuid}.png", ContentFile(qr_buffer.getvalue()), save=False)
+        Certificate.objects.filter(pk=self.pk).update(qr_code=self.qr_code.name)
+        CertificateLookup.objects.filter(certificate_id=self.pk).update(qr_code=self.qr_code.name)
+        return self.qr_code
+    
     # ============================================================================
     # MÉTODOS PARA PROCESAMIENTO DE PDFs CON QR
     # ============================================================================
@@ -467,6 +526,79 @@ class Certificate(models.Model):
         self.save()
 
 
+class CertificateLookup(models.Model):
+    """
+    Modelo de lectura de las vistas públicas (consulta por DNI, verificación
+    por QR y preview).
+
+    Una fila por certificado con los datos que muestran esas páginas, copiados
+    del certificado, su participante y su evento: cada vista se resuelve con
+    una sola búsqueda indexada por DNI o UUID, sin joins. Las señales y las
+    operaciones masivas la mantienen sincronizada (ver
+    certificates.services.certificate_lookup); el comando
+    rebuild_certificate_lookup la reconstruye completa.
+    """
+    certificate = models.OneToOneField(
+        Certificate,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='lookup',
+        verbose_name="Certificado"
+    )
+    uuid = models.UUIDField(unique=True, verbose_name="UUID")
+    dni = models.CharField(max_length=8, verbose_name="DNI")
+    full_name = models.CharField(max_length=300, verbose_name="Nombres y Apellidos")
+    attendee_type = models.CharField(
+        max_length=20,
+        choices=Participant.ATTENDEE_TYPES,
+        verbose_name="Tipo de Asistente"
+    )
+    event_name = models.CharField(max_length=500, verbose_name="Nombre del evento")
+    event_date = models.DateField(verbose_name="Fecha del evento")
+    generated_at = models.DateTimeField(verbose_name="Generado el")
+    is_signed = models.BooleanField(default=False, verbose_name="Firmado digitalmente")
+    signed_at = models.DateTimeField(null=True, blank=True, verbose_name="Firmado el")
+    is_external = models.BooleanField(default=False, verbose_name="Certificado Externo")
+    external_url = models.URLField(max_length=500, blank=True, verbose_name="URL Externa")
+    processing_status = models.CharField(
+        max_length=50,
+        choices=Certificate.PROCESSING_STATUS_CHOICES,
+        blank=True,
+        verbose_name="Estado de Procesamiento"
+    )
+    # Mismos nombres de archivo que en Certificate (solo para construir URLs)
+    qr_code = models.ImageField(storage=media_storage, blank=True, null=True, verbose_name="Código QR")
+    qr_image = models.FileField(storage=media_storage, blank=True, null=True, verbose_name="Imagen QR")
+    has_final_pdf = models.BooleanField(default=False, verbose_name="Tiene PDF final")
+
+    class Meta:
+        verbose_name = "Consulta de Certificado"
+        verbose_name_plural = "Consultas de Certificados"
+        indexes = [
+            # Consulta por DNI ordenada como los resultados públicos
+            models.Index(fields=['dni', '-generated_at', '-certificate']),
+        ]
+
+    def __str__(self):
+        return f"{self.uuid} - {self.full_name} ({self.dni})"
+
+    @property
+    def participant(self):
+        """Datos del participante y del evento con la forma de Certificate.participant"""
+        from certificates.services.certificate_query_cache import EventResult, ParticipantResult
+
+        return ParticipantResult(
+            full_name=self.full_name,
+            dni=self.dni,
+            attendee_type=self.attendee_type,
+            event=EventResult(name=self.event_name, event_date=self.event_date),
+        )
+
+    def is_ready_for_preview(self):
+        """Verifica si el certificado está listo para preview público"""
+        return self.processing_status == 'SIGNED_FINAL' and self.has_final_pdf
+
+
 
 class AuditLog(models.Model):
     """
@@ -504,7 +636,11 @@ class AuditLog(models.Model):
         blank=True,
         verbose_name="Dirección IP"
     )
-    timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Fecha y hora", db_index=True)
+    # default (no auto_now_add): las entradas escritas en lote por
+    # AuditLogWriter conservan la hora en que ocurrió la acción
+    timestamp = models.DateTimeField(
+        default=timezone.now, editable=False, verbose_name="Fecha y hora", db_index=True
+    )
 
     class Meta:
         verbose_name = "Registro de Auditoría"
@@ -519,6 +655,81 @@ class AuditLog(models.Model):
         return f"{self.get_action_type_display()} - {self.timestamp.strftime('%d/%m/%Y %H:%M:%S')}"
 
 
+class AuditLogCounter(models.Model):
+    """
+    Conteo de registros de auditoría por tipo de acción, día y hora (hora local).
+
+    Se actualiza al insertar cada AuditLog (ver certificates.services.audit_counters)
+    y el dashboard lo consulta en lugar de contar filas de AuditLog. El
+    historial previo se carga con el comando backfill_audit_counters.
+    """
+    action_type = models.CharField(
+        max_length=20,
+        choices=AuditLog.ACTION_TYPES,
+        verbose_name="Tipo de acción"
+    )
+    date = models.DateField(verbose_name="Fecha")
+    hour = models.PositiveSmallIntegerField(verbose_name="Hora")
+    count = models.PositiveIntegerField(default=0, verbose_name="Cantidad")
+
+    class Meta:
+        verbose_name = "Contador de Auditoría"
+        verbose_name_plural = "Contadores de Auditoría"
+        ordering = ['-date', '-hour', 'action_type']
+        unique_together = [['date', 'hour', 'action_type']]
+
+    def __str__(self):
+        return f"{self.action_type} {self.date} {self.hour:02d}h: {self.count}"
+
+
+class AuditLogArchive(models.Model):
+    """
+    Archivo JSONL comprimido (gzip) con los registros de auditoría de un mes
+    (hora local) movidos fuera de AuditLog por el comando archive_audit_logs.
+
+    Cada ejecución agrega un miembro gzip al final del archivo del mes; los
+    contadores de AuditLogCounter se conservan.
+    """
+    month = models.DateField(unique=True, verbose_name="Mes")
+    file = models.FileField(max_length=255, storage=audit_archive_storage, verbose_name="Archivo")
+    row_count = models.PositiveIntegerField(default=0, verbose_name="Registros")
+    first_timestamp = models.DateTimeField(null=True, blank=True, verbose_name="Primer registro")
+    last_timestamp = models.DateTimeField(null=True, blank=True, verbose_name="Último registro")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creado el")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizado el")
+
+    class Meta:
+        verbose_name = "Archivo de Auditoría"
+        verbose_name_plural = "Archivos de Auditoría"
+        ordering = ['-month']
+
+    def __str__(self):
+        return f"Auditoría {self.month.strftime('%Y-%m')} ({self.row_count} registros)"
+
+
+class StoredFile(models.Model):
+    """
+    Archivo del almacenamiento direccionado por contenido (certificates.storage)
+    y número de campos de archivo que lo referencian.
+
+    El comando collect_orphan_media recalcula las referencias a partir de la
+    base de datos y elimina los archivos que ya no tienen ninguna.
+    """
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name="SHA-256")
+    name = models.CharField(max_length=255, verbose_name="Archivo")
+    size = models.BigIntegerField(default=0, verbose_name="Tamaño (bytes)")
+    ref_count = models.PositiveIntegerField(default=0, verbose_name="Referencias")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizado el")
+
+    class Meta:
+        verbose_name = "Archivo Almacenado"
+        verbose_name_plural = "Archivos Almacenados"
+        ordering = ['-ref_count', 'name']
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} referencias)"
+
+
 class TemplateElement(models.Model):
     """
     Elemento individual en una plantilla de certificado.
@@ -868,3 +1079,118 @@ class QRProcessingConfig(models.Model):
                 is_active=True
             )
         return config
+
+
+class CertificateJob(models.Model):
+    """
+    Trabajo en segundo plano para operaciones masivas de certificados.
+
+    Los trabajos se encolan desde el admin y los ejecuta el comando
+    `run_certificate_worker` en procesos separados de gunicorn. La cola
+    vive en la base de datos (SQLite o PostgreSQL), sin broker externo.
+    """
+    JOB_TYPES = [
+        ('GENERATE_CERTIFICATES', 'Generación de certificados'),
+        ('SIGN_CERTIFICATES', 'Firma digital'),
+        ('PROCESS_QR', 'Procesamiento de QR'),
+        ('EXPORT_FOR_SIGNING', 'Exportación para firma'),
+    ]
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pendiente'),
+        ('RUNNING', 'En ejecución'),
+        ('COMPLETED', 'Completado'),
+        ('FAILED', 'Fallido'),
+        ('CANCELLED', 'Cancelado'),
+    ]
+
+    job_type = models.CharField(
+        max_length=30,
+        choices=JOB_TYPES,
+        verbose_name="Tipo de trabajo"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='PENDING',
+        verbose_name="Estado"
+    )
+    payload = models.JSONField(default=dict, verbose_name="Parámetros")
+    result = models.JSONField(default=dict, blank=True, verbose_name="Resultado")
+    result_file = models.FileField(
+        upload_to='jobs/%Y/%m/',
+        null=True,
+        blank=True,
+        verbose_name="Archivo resultado"
+    )
+    error_message = models.TextField(blank=True, verbose_name="Último error")
+
+    progress_current = models.PositiveIntegerField(default=0, verbose_name="Progreso actual")
+    progress_total = models.PositiveIntegerField(default=0, verbose_name="Progreso total")
+
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Intentos")
+    max_attempts = models.PositiveIntegerField(default=3, verbose_name="Intentos máximos")
+
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Creado por"
+    )
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Bloqueado el")
+    run_after = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Ejecutar después de",
+        help_text="Los reintentos se programan con espera exponencial"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creado el")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Iniciado el")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Finalizado el")
+
+    class Meta:
+        verbose_name = "Trabajo en segundo plano"
+        verbose_name_plural = "Trabajos en segundo plano"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),  # Para reclamar trabajos pendientes
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_job_type_display()} #{self.pk} - {self.get_status_display()}"
+
+    @property
+    def progress_percent(self):
+        """Retorna el progreso como porcentaje entero"""
+        if not self.progress_total:
+            return 100 if self.status == 'COMPLETED' else 0
+        return min(100, int(self.progress_current * 100 / self.progress_total))
+
+    @property
+    def is_finished(self):
+        """Indica si el trabajo terminó (con o sin éxito)"""
+        return self.status in ('COMPLETED', 'FAILED', 'CANCELLED')
+
+    def to_status_dict(self):
+        """Retorna el estado serializable para el panel de seguimiento"""
+        return {
+            'id': self.pk,
+            'job_type': self.job_type,
+            'job_type_display': self.get_job_type_display(),
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'progress_current': self.progress_current,
+            'progress_total': self.progress_total,
+            'progress_percent': self.progress_percent,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'result': self.result,
+            'error_message': self.error_message,
+            'has_result_file': bool(self.result_file),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,200 @@
+"""
+Retención de AuditLog: mueve los registros antiguos a archivos JSONL
+comprimidos (gzip), uno por mes en hora local, bajo
+AUDIT_LOG_ARCHIVE_ROOT/<año>/. Esa carpeta está fuera de MEDIA_ROOT: los
+archivos contienen DNIs, nombres e IPs y solo se descargan desde el admin.
+
+El archivado procesa lotes en orden de id: escribe el lote en el archivo
+de su mes (un miembro gzip agregado al final y sincronizado a disco) y solo
+después elimina esas filas, junto con la actualización de AuditLogArchive,
+en una transacción. Si el proceso se interrumpe entre ambos pasos, la
+siguiente ejecución vuelve a escribir el lote: los lectores deben tolerar
+ids repetidos.
+
+Con la tabla particionada (ver audit_partitions), los meses completos se
+exportan igual y luego se descarta su partición en lugar de eliminar filas.
+Los contadores de AuditLogCounter no se modifican.
+"""
+import gzip
+import json
+import logging
+import os
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from certificates.models import AuditLog, AuditLogArchive
+from certificates.services.audit_partitions import add_months, audit_partitions
+from certificates.storage import audit_archive_storage
+
+logger = logging.getLogger("certificates")
+
+
+class AuditLogArchiver:
+    """Mueve registros de auditoría antiguos a archivos mensuales comprimidos"""
+
+    FIELDS = ('id', 'action_type', 'user_id', 'description', 'metadata', 'ip_address', 'timestamp')
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or getattr(settings, 'AUDIT_LOG_ARCHIVE_BATCH_SIZE', 5000)
+
+    @staticmethod
+    def cutoff(days: int) -> datetime:
+        """
+        Inicio (medianoche local) del día que está `days` días atrás
+
+        El corte a día completo evita que un mismo día quede repartido entre
+        el archivo y la tabla (backfill_audit_counters recalcula días enteros).
+        """
+        return timezone.make_aware(datetime.combine(timezone.localdate() - timedelta(days=days), time.min))
+
+    @staticmethod
+    def month_of(timestamp: datetime) -> date:
+        return timezone.localtime(timestamp).date().replace(day=1)
+
+    def relative_path(self, month: date) -> str:
+        return f"{month:%Y}/audit_log_{month:%Y-%m}.jsonl.gz"
+
+    # ------------------------------------------------------------------
+    # Archivado
+    # ------------------------------------------------------------------
+
+    def pending_by_month(self, before: datetime) -> Dict[date, int]:
+        """Registros a archivar por mes (para --dry-run)"""
+        rows = (
+            AuditLog.objects.filter(timestamp__lt=before)
+            .annotate(month=TruncMonth('timestamp'))
+            .values('month')
+            .annotate(count=Count('id'))
+            .order_by('month')
+        )
+        return {row['month'].date(): row['count'] for row in rows}
+
+    def archive(self, before: datetime) -> Dict[date, int]:
+        """
+        Archiva los registros con timestamp anterior a `before`
+
+        Returns:
+            Registros archivados por mes
+        """
+        archived: Dict[date, int] = {}
+
+        if audit_partitions.is_partitioned():
+            for month in audit_partitions.partitions():
+                if audit_partitions.month_start(add_months(month, 1)) > before:
+                    break
+                count = self._export_month(month)
+                audit_partitions.drop_partition(month)
+                if count:
+                    archived[month] = archived.get(month, 0) + count
+
+        queryset = AuditLog.objects.filter(timestamp__lt=before).order_by('id')
+        while True:
+            rows = list(queryset.values(*self.FIELDS)[:self.batch_size])
+            if not rows:
+                break
+            for month, count in self._archive_rows(rows, delete=True).items():
+                archived[month] = archived.get(month, 0) + count
+
+        for month, count in archived.items():
+            logger.info(f"Auditoría archivada {month:%Y-%m}: {count} registros")
+        return archived
+
+    def _export_month(self, month: date) -> int:
+        """Escribe en su archivo todos los registros de un mes, sin eliminarlos"""
+        queryset = AuditLog.objects.filter(
+            timestamp__gte=audit_partitions.month_start(month),
+            timestamp__lt=audit_partitions.month_start(add_months(month, 1)),
+        ).order_by('id')
+
+        exported = 0
+        last_id = 0
+        while True:
+            rows = list(queryset.filter(id__gt=last_id).values(*self.FIELDS)[:self.batch_size])
+            if not rows:
+                break
+            self._archive_rows(rows, delete=False)
+            exported += len(rows)
+            last_id = rows[-1]['id']
+        return exported
+
+    def _archive_rows(self, rows: List[Dict], delete: bool) -> Dict[date, int]:
+        by_month: Dict[date, List[Dict]] = OrderedDict()
+        for row in rows:
+            by_month.setdefault(self.month_of(row['timestamp']), []).append(row)
+
+        for month, month_rows in by_month.items():
+            self._append(month, month_rows)
+
+        with transaction.atomic():
+            for month, month_rows in by_month.items():
+                self._record(month, month_rows)
+            if delete:
+                AuditLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+        return {month: len(month_rows) for month, month_rows in by_month.items()}
+
+    def _append(self, month: date, rows: List[Dict]) -> None:
+        path = audit_archive_storage.path(self.relative_path(month))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = ''.join(self.serialize(row) + '\n' for row in rows).encode('utf-8')
+
+        # Cada lote es un miembro gzip independiente; gzip los lee en secuencia
+        with open(path, 'ab') as handle:
+            handle.write(gzip.compress(payload))
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def _record(self, month: date, rows: List[Dict]) -> None:
+        first = min(row['timestamp'] for row in rows)
+        last = max(row['timestamp'] for row in rows)
+        archive, created = AuditLogArchive.objects.select_for_update().get_or_create(
+            month=month,
+            defaults={
+                'file': self.relative_path(month),
+                'row_count': len(rows),
+                'first_timestamp': first,
+                'last_timestamp': last,
+            },
+        )
+        if not created:
+            AuditLogArchive.objects.filter(pk=archive.pk).update(
+                row_count=F('row_count') + len(rows),
+                first_timestamp=min(archive.first_timestamp or first, first),
+                last_timestamp=max(archive.last_timestamp or last, last),
+                updated_at=timezone.now(),
+            )
+
+    @staticmethod
+    def serialize(row: Dict) -> str:
+        return json.dumps(
+            {**row, 'timestamp': row['timestamp'].isoformat()},
+            ensure_ascii=False,
+            default=str,
+        )
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def iter_lines(archive: AuditLogArchive) -> Iterator[bytes]:
+        """Líneas JSONL (bytes) del archivo, descomprimidas a medida que se leen"""
+        with gzip.open(archive.file.path, 'rb') as handle:
+            for line in handle:
+                yield line
+
+    def iter_records(self, archive: AuditLogArchive) -> Iterator[Dict]:
+        """Registros del archivo como diccionarios"""
+        for line in self.iter_lines(archive):
+            yield json.loads(line)
+
+
+# Instancia compartida por el comando de archivado y el admin
+audit_archiver = AuditLogArchiver()
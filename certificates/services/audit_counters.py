@@ -0,0 +1,202 @@
+"""
+Contadores agregados de AuditLog por tipo de acción, día y hora.
+
+El dashboard consulta AuditLogCounter (unas pocas filas por hora) en lugar
+de contar la tabla AuditLog completa. Los lotes de AuditLogWriter y de la
+generación masiva incrementan los contadores al insertarse; los registros
+creados uno a uno (AUDIT_LOG_MODE=sync, acciones del admin) no escriben en
+la fila de su hora, que todas las peticiones compartirían: los cubre la
+conciliación periódica (rollup, backfill_audit_counters --hours).
+"""
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone
+
+
+class AuditCounterService:
+    """Actualización y consulta de AuditLogCounter (día y hora en hora local)"""
+
+    @staticmethod
+    def bucket(timestamp: datetime) -> Tuple[date, int]:
+        """Retorna el (día, hora) local al que pertenece un instante"""
+        if timezone.is_aware(timestamp):
+            timestamp = timezone.localtime(timestamp)
+        return timestamp.date(), timestamp.hour
+
+    # ------------------------------------------------------------------
+    # Actualización
+    # ------------------------------------------------------------------
+
+    def increment(self, entries: Iterable) -> None:
+        """
+        Suma al contador de su hora cada registro de auditoría recién insertado
+
+        Args:
+            entries: Instancias de AuditLog (con action_type y timestamp)
+        """
+        counts = Counter(
+            (entry.action_type, *self.bucket(entry.timestamp)) for entry in entries
+        )
+        if counts:
+            self._upsert(counts)
+
+    def add(self, counts: Dict[Tuple[str, date, int], int]) -> None:
+        """
+        Suma cantidades ya agrupadas, sin registros de AuditLog asociados
+
+        Args:
+            counts: Cantidad por (tipo de acción, día, hora)
+        """
+        counts = Counter({key: amount for key, amount in counts.items() if amount})
+        if counts:
+            self._upsert(counts)
+
+    @staticmethod
+    def _upsert(counts: Counter) -> None:
+        """
+        Crea o incrementa los contadores en una sola sentencia
+
+        INSERT ... ON CONFLICT DO UPDATE (PostgreSQL y SQLite) evita la
+        carrera entre UPDATE e INSERT cuando varios procesos crean la fila
+        de una hora nueva.
+        """
+        from certificates.models import AuditLogCounter
+
+        qn = connection.ops.quote_name
+        table = qn(AuditLogCounter._meta.db_table)
+        placeholders = ", ".join(["(%s, %s, %s, %s)"] * len(counts))
+        params = []
+        for (action_type, day, hour), amount in counts.items():
+            params.extend([action_type, day, hour, amount])
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({qn('action_type')}, {qn('date')}, {qn('hour')}, {qn('count')}) "
+                f"VALUES {placeholders} "
+                f"ON CONFLICT ({qn('date')}, {qn('hour')}, {qn('action_type')}) "
+                f"DO UPDATE SET {qn('count')} = {table}.{qn('count')} + excluded.{qn('count')}",
+                params,
+            )
+
+    def rebuild(self, start_date: date, end_date: date) -> int:
+        """
+        Recalcula desde AuditLog los contadores de un rango de días (inclusive)
+
+        Reemplaza los contadores existentes del rango, por lo que solo debe
+        usarse sobre días cuyos registros de AuditLog siguen en la tabla.
+
+        Returns:
+            Número de filas de contador escritas
+        """
+        from certificates.models import AuditLogCounter
+
+        start = timezone.make_aware(datetime.combine(start_date, time.min))
+        end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+        existing = AuditLogCounter.objects.filter(date__gte=start_date, date__lte=end_date)
+        return self._replace(existing, start, end)
+
+    def rollup(self, since: datetime) -> int:
+        """
+        Recalcula desde AuditLog los contadores desde la hora de `since` hasta ahora
+
+        Concilia los registros creados uno a uno, que no incrementan los
+        contadores al insertarse. Pensado para ejecutarse cada pocos minutos
+        sobre las últimas horas (backfill_audit_counters --hours): un
+        incremento de AuditLogWriter concurrente con el recálculo puede
+        perderse, y la ejecución siguiente lo vuelve a contar.
+
+        Returns:
+            Número de filas de contador escritas
+        """
+        from certificates.models import AuditLogCounter
+
+        since = timezone.localtime(since) if timezone.is_aware(since) else timezone.make_aware(since)
+        start = since.replace(minute=0, second=0, microsecond=0)
+        day, hour = self.bucket(start)
+        existing = AuditLogCounter.objects.filter(Q(date__gt=day) | Q(date=day, hour__gte=hour))
+        return self._replace(existing, start, None)
+
+    @staticmethod
+    def _replace(existing, start: datetime, end: Optional[datetime]) -> int:
+        """Reemplaza los contadores `existing` por los conteos de AuditLog en [start, end)"""
+        from certificates.models import AuditLog, AuditLogCounter
+
+        logs = AuditLog.objects.filter(timestamp__gte=start)
+        if end is not None:
+            logs = logs.filter(timestamp__lt=end)
+        rows = (
+            logs
+            .order_by()
+            .annotate(day=TruncDate("timestamp"), hour_of_day=ExtractHour("timestamp"))
+            .values("action_type", "day", "hour_of_day")
+            .annotate(total=Count("id"))
+        )
+        counters = [
+            AuditLogCounter(
+                action_type=row["action_type"],
+                date=row["day"],
+                hour=row["hour_of_day"],
+                count=row["total"],
+            )
+            for row in rows
+        ]
+
+        with transaction.atomic():
+            existing.delete()
+            AuditLogCounter.objects.bulk_create(counters)
+        return len(counters)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def _queryset(self, action_type: Optional[str] = None, since: Optional[datetime] = None):
+        """Contadores filtrados; `since` se redondea al inicio de su hora"""
+        from certificates.models import AuditLogCounter
+
+        queryset = AuditLogCounter.objects.order_by()
+        if action_type:
+            queryset = queryset.filter(action_type=action_type)
+        if since is not None:
+            day, hour = self.bucket(since)
+            queryset = queryset.filter(Q(date__gt=day) | Q(date=day, hour__gte=hour))
+        return queryset
+
+    def total(self, action_type: Optional[str] = None, since: Optional[datetime] = None) -> int:
+        """Total de registros (de un tipo de acción, desde un instante)"""
+        return self._queryset(action_type, since).aggregate(total=Sum("count"))["total"] or 0
+
+    def totals_by_action(self, since: Optional[datetime] = None) -> Dict[str, int]:
+        """Total de registros por tipo de acción"""
+        return {
+            row["action_type"]: row["total"]
+            for row in self._queryset(since=since)
+            .values("action_type")
+            .annotate(total=Sum("count"))
+        }
+
+    def by_day(self, action_type: str, start_date: date, end_date: Optional[date] = None) -> Dict[date, int]:
+        """Registros de un tipo de acción por día (solo días con actividad)"""
+        queryset = self._queryset(action_type).filter(date__gte=start_date)
+        if end_date is not None:
+            queryset = queryset.filter(date__lte=end_date)
+        return {
+            row["date"]: row["total"]
+            for row in queryset.values("date").annotate(total=Sum("count")).order_by("date")
+        }
+
+    def by_hour(self, since: Optional[datetime] = None) -> Dict[int, int]:
+        """Registros de todas las acciones por hora del día (solo horas con actividad)"""
+        return {
+            row["hour"]: row["total"]
+            for row in self._queryset(since=since).values("hour").annotate(total=Sum("count"))
+        }
+
+
+# Instancia compartida por señales, servicios y vistas del dashboard
+audit_counters = AuditCounterService()
@@ -0,0 +1,200 @@
+"""
+Particionado mensual (por rango de timestamp) de la tabla de AuditLog en
+PostgreSQL.
+
+Es opcional: con SQLite, o mientras la tabla no se convierta con
+`partition_audit_log --convert`, AuditLog sigue siendo una tabla normal y el
+archivado elimina filas por lotes. Con la tabla particionada, los meses
+archivados completos se descartan con DETACH + DROP de su partición, sin
+DELETE masivo ni VACUUM posterior.
+
+Las particiones se llaman `<tabla>_pYYYYMM` y cubren un mes en hora local;
+`<tabla>_default` recibe cualquier fila fuera de las particiones creadas.
+"""
+import logging
+from datetime import date, datetime
+from typing import List, Optional
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from certificates.models import AuditLog
+
+logger = logging.getLogger("certificates")
+
+
+def add_months(month: date, months: int) -> date:
+    """Primer día del mes `months` meses después (o antes) de `month`"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class AuditLogPartitioner:
+    """Crea, convierte y descarta particiones mensuales de AuditLog"""
+
+    def __init__(self):
+        self.table = AuditLog._meta.db_table
+
+    @property
+    def supported(self) -> bool:
+        return connection.vendor == 'postgresql'
+
+    def is_partitioned(self) -> bool:
+        """True si la tabla de AuditLog ya está particionada"""
+        if not self.supported:
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT 1 FROM pg_partitioned_table pt
+                JOIN pg_class c ON c.oid = pt.partrelid
+                WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+                """,
+                [self.table],
+            )
+            return cursor.fetchone() is not None
+
+    def partition_name(self, month: date) -> str:
+        return f"{self.table}_p{month:%Y%m}"
+
+    def partitions(self) -> List[date]:
+        """Meses con partición propia, en orden"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname FROM pg_inherits i
+                JOIN pg_class child ON child.oid = i.inhrelid
+                JOIN pg_class parent ON parent.oid = i.inhparent
+                WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)
+                """,
+                [self.table],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+
+        prefix = f"{self.table}_p"
+        months = []
+        for name in names:
+            suffix = name[len(prefix):]
+            if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+                months.append(date(int(suffix[:4]), int(suffix[4:]), 1))
+        return sorted(months)
+
+    @staticmethod
+    def month_start(month: date) -> datetime:
+        """Inicio del mes en hora local (límite de la partición)"""
+        return timezone.make_aware(datetime(month.year, month.month, 1))
+
+    def _bound(self, month: date) -> str:
+        # Literal generado a partir de una fecha: DDL no admite parámetros
+        return f"'{self.month_start(month).isoformat()}'"
+
+    def ensure_partitions(self, months_ahead: int = 3, since: Optional[date] = None) -> List[str]:
+        """
+        Crea las particiones que falten desde `since` (por defecto el mes
+        actual) hasta `months_ahead` meses adelante
+
+        Returns:
+            Nombres de las particiones creadas
+        """
+        current = timezone.localdate().replace(day=1)
+        month = (since or current).replace(day=1)
+        last = add_months(current, months_ahead)
+        existing = set(self.partitions())
+
+        created = []
+        with connection.cursor() as cursor:
+            while month <= last:
+                if month not in existing:
+                    name = self.partition_name(month)
+                    cursor.execute(
+                        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{self.table}" '
+                        f'FOR VALUES FROM ({self._bound(month)}) TO ({self._bound(add_months(month, 1))})'
+                    )
+                    created.append(name)
+                month = add_months(month, 1)
+        for name in created:
+            logger.info(f"Partición de auditoría creada: {name}")
+        return created
+
+    def convert(self, months_ahead: int = 3) -> int:
+        """
+        Convierte la tabla de AuditLog en una tabla particionada por mes
+
+        Copia todas las filas en una transacción (bloquea la tabla mientras
+        dura): conviene ejecutarlo en una ventana de mantenimiento.
+
+        Returns:
+            Número de filas copiadas
+        """
+        if not self.supported:
+            raise RuntimeError("El particionado solo está disponible en PostgreSQL")
+        if self.is_partitioned():
+            return 0
+
+        old = f"{self.table}_unpartitioned"
+        sequence = f"{self.table}_partitioned_id_seq"
+        user_table = AuditLog._meta.get_field('user').related_model._meta.db_table
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE "{self.table}" IN ACCESS EXCLUSIVE MODE')
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s",
+                [self.table],
+            )
+            indexes = [
+                (name, definition) for name, definition in cursor.fetchall()
+                if not name.endswith('_pkey')
+            ]
+            for name, _ in indexes:
+                cursor.execute(f'DROP INDEX "{name}"')
+            cursor.execute(f'ALTER TABLE "{self.table}" RENAME TO "{old}"')
+
+            # La clave primaria de una tabla particionada debe incluir timestamp
+            cursor.execute(
+                f'CREATE TABLE "{self.table}" (LIKE "{old}" INCLUDING DEFAULTS) '
+                f'PARTITION BY RANGE ("timestamp")'
+            )
+            cursor.execute(f'ALTER TABLE "{self.table}" ADD PRIMARY KEY ("id", "timestamp")')
+            cursor.execute(
+                f'ALTER TABLE "{self.table}" ADD CONSTRAINT "{self.table}_user_id_fk" '
+                f'FOREIGN KEY ("user_id") REFERENCES "{user_table}" ("id") '
+                f'DEFERRABLE INITIALLY DEFERRED'
+            )
+            cursor.execute(f'CREATE SEQUENCE "{sequence}"')
+            cursor.execute(
+                f'ALTER TABLE "{self.table}" ALTER COLUMN "id" '
+                f"SET DEFAULT nextval('\"{sequence}\"')"
+            )
+            cursor.execute(f'ALTER SEQUENCE "{sequence}" OWNED BY "{self.table}"."id"')
+            cursor.execute(
+                f'CREATE TABLE "{self.table}_default" PARTITION OF "{self.table}" DEFAULT'
+            )
+
+            cursor.execute(f'SELECT MIN("timestamp"), MAX("id") FROM "{old}"')
+            first_timestamp, max_id = cursor.fetchone()
+            since = timezone.localtime(first_timestamp).date() if first_timestamp else None
+            self.ensure_partitions(months_ahead=months_ahead, since=since)
+
+            cursor.execute(f'INSERT INTO "{self.table}" SELECT * FROM "{old}"')
+            copied = cursor.rowcount
+            if max_id:
+                cursor.execute("SELECT setval(%s, %s)", [f'"{sequence}"', max_id])
+
+            for _, definition in indexes:
+                cursor.execute(definition)
+            cursor.execute(f'DROP TABLE "{old}"')
+
+        logger.info(f"Tabla {self.table} particionada: {copied} filas copiadas")
+        return copied
+
+    def drop_partition(self, month: date) -> None:
+        """Separa y elimina la partición de un mes (ya archivado)"""
+        name = self.partition_name(month)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}"')
+            cursor.execute(f'DROP TABLE "{name}"')
+        logger.info(f"Partición de auditoría eliminada: {name}")
+
+
+# Instancia compartida por los comandos de archivado y particionado
+audit_partitions = AuditLogPartitioner()
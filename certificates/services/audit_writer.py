@@ -0,0 +1,426 @@
+"""
+Escritura de registros de auditoría (AuditLog) desde las vistas públicas.
+
+En modo "sync" cada registro se inserta dentro de la petición, como antes.
+En modo "async" los registros se acumulan en un buffer acotado del proceso
+y un hilo en segundo plano los inserta con bulk_create al alcanzar un
+tamaño o un intervalo. Si la base de datos falla o responde lento, los
+lotes se guardan en un spool (archivo local de solo anexado o la cache
+compartida) y se reinsertan más tarde.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from certificates.services.audit_counters import audit_counters
+
+logger = logging.getLogger("certificates")
+
+
+class AuditLogWriter:
+    """
+    Sumidero de registros de auditoría con modo síncrono o en lotes.
+
+    El hilo de escritura se inicia con el primer registro de cada proceso
+    (después del fork de los workers de Gunicorn) y los registros pendientes
+    se escriben al terminar el proceso (atexit y hook worker_exit).
+    """
+
+    SPOOL_CACHE_PREFIX = "audit_spool"
+    # Segundos que se escribe directamente al spool tras un fallo o una escritura lenta
+    DEGRADED_SECONDS = 30
+    # Intervalo mínimo entre intentos de reinsertar el spool
+    DRAIN_INTERVAL = 60
+    # Segundos que se espera un lote del spool en cache antes de darlo por perdido
+    SPOOL_GAP_SECONDS = 300
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        flush_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        buffer_size: Optional[int] = None,
+        slow_flush_seconds: Optional[float] = None,
+        spool: Optional[str] = None,
+        spool_path: Optional[str] = None,
+    ):
+        self._overrides = {
+            "AUDIT_LOG_MODE": mode,
+            "AUDIT_LOG_FLUSH_SIZE": flush_size,
+            "AUDIT_LOG_FLUSH_INTERVAL": flush_interval,
+            "AUDIT_LOG_BUFFER_SIZE": buffer_size,
+            "AUDIT_LOG_SLOW_FLUSH_SECONDS": slow_flush_seconds,
+            "AUDIT_LOG_SPOOL": spool,
+            "AUDIT_LOG_SPOOL_PATH": spool_path,
+        }
+        self._buffer: List = []
+        self._lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._atexit_registered = False
+        self._degraded_until = 0.0
+        self._next_drain = 0.0
+
+    def _setting(self, name: str, default):
+        override = self._overrides[name]
+        if override is not None:
+            return override
+        return getattr(settings, name, default)
+
+    @property
+    def mode(self) -> str:
+        return self._setting("AUDIT_LOG_MODE", "sync")
+
+    @property
+    def flush_size(self) -> int:
+        return self._setting("AUDIT_LOG_FLUSH_SIZE", 100)
+
+    @property
+    def flush_interval(self) -> float:
+        return self._setting("AUDIT_LOG_FLUSH_INTERVAL", 2.0)
+
+    @property
+    def buffer_size(self) -> int:
+        return self._setting("AUDIT_LOG_BUFFER_SIZE", 5000)
+
+    @property
+    def slow_flush_seconds(self) -> float:
+        return self._setting("AUDIT_LOG_SLOW_FLUSH_SECONDS", 1.0)
+
+    @property
+    def spool_backend(self) -> str:
+        return self._setting("AUDIT_LOG_SPOOL", "file")
+
+    @property
+    def spool_path(self) -> str:
+        return str(self._setting(
+            "AUDIT_LOG_SPOOL_PATH", os.path.join(settings.BASE_DIR, "logs", "audit_spool.jsonl")
+        ))
+
+    @property
+    def pending(self) -> int:
+        """Registros en el buffer aún no escritos"""
+        with self._lock:
+            return len(self._buffer)
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    def record(self, **fields) -> None:
+        """
+        Registra una acción (mismos argumentos que AuditLog.objects.create)
+
+        En modo async la hora se fija aquí, no al escribir el lote.
+        """
+        from certificates.models import AuditLog
+
+        if self.mode != "async":
+            AuditLog.objects.create(**fields)
+            return
+
+        fields.setdefault("timestamp", timezone.now())
+        entry = AuditLog(**fields)
+        self._ensure_thread()
+
+        with self._lock:
+            overflow = len(self._buffer) >= self.buffer_size
+            if not overflow:
+                self._buffer.append(entry)
+                pending = len(self._buffer)
+
+        if overflow:
+            # Buffer lleno: la base de datos no da abasto
+            self._spool([entry])
+            self._wakeup.set()
+        elif pending >= self.flush_size:
+            self._wakeup.set()
+
+    def _ensure_thread(self) -> None:
+        """Inicia el hilo de escritura en este proceso si no está activo"""
+        pid = os.getpid()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == pid:
+            return
+
+        with self._lock:
+            if self._pid != pid:
+                # Proceso hijo (fork): el buffer heredado lo escribe el padre
+                self._buffer = []
+                self._pid = pid
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="audit-log-writer", daemon=True
+                )
+                self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.shutdown)
+                self._atexit_registered = True
+
+    def _run(self) -> None:
+        try:
+            while not self._stopping.is_set():
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                try:
+                    close_old_connections()
+                    self.flush()
+                    if not self._is_degraded() and time.monotonic() >= self._next_drain:
+                        self._next_drain = time.monotonic() + self.DRAIN_INTERVAL
+                        self.drain_spool()
+                except Exception as e:
+                    logger.error(
+                        f"Error en el hilo de escritura de auditoría: {str(e)}", exc_info=True
+                    )
+        finally:
+            connection.close()
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """
+        Escribe el contenido del buffer
+
+        Returns:
+            Número de registros insertados en la base de datos (los enviados
+            al spool no se cuentan)
+        """
+        from certificates.models import AuditLog
+
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+
+        if self._is_degraded():
+            self._spool(batch)
+            return 0
+
+        started = time.monotonic()
+        try:
+            with transaction.atomic():
+                AuditLog.objects.bulk_create(batch, batch_size=self.flush_size)
+                audit_counters.increment(batch)
+        except DatabaseError as e:
+            logger.warning(
+                f"No se pudieron escribir {len(batch)} registros de auditoría, "
+                f"se guardan en el spool: {str(e)}"
+            )
+            self._degraded_until = time.monotonic() + self.DEGRADED_SECONDS
+            self._spool(batch)
+            return 0
+
+        elapsed = time.monotonic() - started
+        if elapsed > self.slow_flush_seconds:
+            logger.warning(
+                f"Escritura de auditoría lenta ({elapsed:.2f}s para {len(batch)} registros); "
+                f"los próximos lotes irán al spool durante {self.DEGRADED_SECONDS}s"
+            )
+            self._degraded_until = time.monotonic() + self.DEGRADED_SECONDS
+        return len(batch)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Detiene el hilo y escribe los registros pendientes"""
+        self._stopping.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"No se pudieron escribir los registros de auditoría pendientes: {str(e)}")
+
+    def _is_degraded(self) -> bool:
+        return time.monotonic() < self._degraded_until
+
+    # ------------------------------------------------------------------
+    # Spool
+    # ------------------------------------------------------------------
+
+    def _spool(self, entries) -> None:
+        backend = self.spool_backend
+        if backend == "none":
+            logger.error(f"Se descartaron {len(entries)} registros de auditoría (spool deshabilitado)")
+            return
+
+        rows = [self._serialize(entry) for entry in entries]
+        try:
+            if backend == "cache":
+                self._spool_to_cache(rows)
+            else:
+                self._spool_to_file(rows)
+        except Exception as e:
+            logger.error(f"No se pudo guardar el spool de auditoría ({backend}): {str(e)}")
+
+    @staticmethod
+    def _serialize(entry) -> Dict:
+        return {
+            "action_type": entry.action_type,
+            "user_id": entry.user_id,
+            "description": entry.description,
+            "metadata": entry.metadata,
+            "ip_address": entry.ip_address,
+            "timestamp": entry.timestamp.isoformat(),
+        }
+
+    def _spool_to_file(self, rows: List[Dict]) -> None:
+        path = self.spool_path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = "".join(json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in rows)
+        with self._spool_lock:
+            # Una sola escritura en modo append: las líneas no se mezclan entre procesos
+            with open(path, "a", encoding="utf-8") as spool_file:
+                spool_file.write(data)
+
+    def _spool_key(self, name) -> str:
+        return f"{self.SPOOL_CACHE_PREFIX}:{name}"
+
+    def _spool_to_cache(self, rows: List[Dict]) -> None:
+        seq_key = self._spool_key("seq")
+        cache.add(seq_key, 0, None)
+        seq = cache.incr(seq_key)
+        cache.set(self._spool_key(f"batch:{seq}"), rows, None)
+
+    def drain_spool(self) -> int:
+        """
+        Reinserta en la base de datos los registros guardados en el spool
+
+        Returns:
+            Número de registros reinsertados
+        """
+        try:
+            if self.spool_backend == "cache":
+                return self._drain_cache()
+            if self.spool_backend == "file":
+                return self._drain_file()
+        except DatabaseError as e:
+            logger.warning(f"No se pudo reinsertar el spool de auditoría: {str(e)}")
+        return 0
+
+    def _drain_file(self) -> int:
+        path = self.spool_path
+        if not os.path.exists(path):
+            return 0
+
+        # Renombrar es atómico: solo un proceso toma el archivo
+        draining = f"{path}.{os.getpid()}.draining"
+        try:
+            os.replace(path, draining)
+        except FileNotFoundError:
+            return 0
+
+        rows = []
+        with open(draining, encoding="utf-8") as spool_file:
+            for line in spool_file:
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    logger.warning("Línea inválida en el spool de auditoría, se omite")
+
+        try:
+            inserted = self._insert_rows(rows)
+        except DatabaseError:
+            self._spool_to_file(rows)
+            os.remove(draining)
+            raise
+        os.remove(draining)
+        return inserted
+
+    def _drain_cache(self) -> int:
+        lock_key = self._spool_key("lock")
+        if not cache.add(lock_key, os.getpid(), 300):
+            return 0
+        try:
+            last = cache.get(self._spool_key("seq")) or 0
+            drained = cache.get(self._spool_key("drained")) or 0
+            if last <= drained:
+                return 0
+
+            seqs = range(drained + 1, last + 1)
+            batches = cache.get_many([self._spool_key(f"batch:{seq}") for seq in seqs])
+            # Solo lotes consecutivos: un número reservado puede no tener aún su
+            # lote. Si no aparece tras SPOOL_GAP_SECONDS (el proceso murió entre
+            # incr y set, o la cache lo expulsó) se omite para no bloquear el resto.
+            rows, consumed, position = [], [], drained
+            for seq in seqs:
+                key = self._spool_key(f"batch:{seq}")
+                gap_key = self._spool_key(f"gap:{seq}")
+                if key in batches:
+                    rows.extend(batches[key])
+                elif not self._gap_expired(gap_key):
+                    break
+                else:
+                    logger.error(
+                        f"Lote {seq} del spool de auditoría perdido: no apareció en "
+                        f"{self.SPOOL_GAP_SECONDS} segundos, se omite"
+                    )
+                consumed.extend([key, gap_key])
+                position = seq
+
+            inserted = self._insert_rows(rows)
+            cache.set(self._spool_key("drained"), position, None)
+            cache.delete_many(consumed)
+            return inserted
+        finally:
+            cache.delete(lock_key)
+
+    def _gap_expired(self, gap_key: str) -> bool:
+        """Registra la primera vez que falta un lote y si ya pasó el plazo de espera"""
+        now = time.time()
+        if cache.add(gap_key, now, None):
+            return False
+        first_seen = cache.get(gap_key, now)
+        return now - first_seen >= self.SPOOL_GAP_SECONDS
+
+    def _insert_rows(self, rows: List[Dict]) -> int:
+        from django.contrib.auth.models import User
+        from certificates.models import AuditLog
+
+        if not rows:
+            return 0
+        # Usuarios eliminados mientras el registro estaba en el spool
+        user_ids = {row["user_id"] for row in rows if row.get("user_id")}
+        existing_users = set(
+            User.objects.filter(pk__in=user_ids).values_list("pk", flat=True)
+        ) if user_ids else set()
+
+        entries = [
+            AuditLog(
+                action_type=row["action_type"],
+                user_id=row["user_id"] if row.get("user_id") in existing_users else None,
+                description=row["description"],
+                metadata=row["metadata"],
+                ip_address=row["ip_address"],
+                timestamp=parse_datetime(row["timestamp"]),
+            )
+            for row in rows
+        ]
+        with transaction.atomic():
+            AuditLog.objects.bulk_create(entries, batch_size=self.flush_size)
+            audit_counters.increment(entries)
+        logger.info(f"Registros de auditoría reinsertados desde el spool: {len(rows)}")
+        return len(rows)
+
+
+# Instancia compartida por las vistas públicas
+audit_writer = AuditLogWriter()
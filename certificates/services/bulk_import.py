@@ -0,0 +1,268 @@
+"""Importación masiva de participantes con operaciones por conjuntos"""
+from typing import Dict, Iterable, List
+import logging
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.db import transaction
+
+from certificates.services.certificate_lookup import certificate_lookup
+from certificates.services.certificate_page_cache import certificate_page_cache
+from certificates.services.certificate_query_cache import certificate_query_cache
+from certificates.services.dashboard_counters import dashboard_counters
+
+logger = logging.getLogger('certificates')
+
+
+class ImportMetrics:
+    """
+    Mide filas procesadas, filas por segundo y memoria pico de una importación.
+
+    La memoria pico solo se mide con IMPORT_TRACK_MEMORY=True: tracemalloc
+    es global al proceso y ralentiza toda asignación de memoria, también la
+    de otros hilos del worker, así que se activa solo para medir. Uso:
+
+        with ImportMetrics() as metrics:
+            for row in rows:
+                ...
+                metrics.rows += 1
+        result['metrics'] = metrics.as_dict()
+    """
+
+    def __init__(self, track_memory: bool = None):
+        if track_memory is None:
+            track_memory = getattr(settings, 'IMPORT_TRACK_MEMORY', False)
+        self.track_memory = track_memory
+        self.rows = 0
+        self.elapsed = 0.0
+        self.peak_memory = None
+        self._start = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.track_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self._started_tracing = True
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.elapsed = time.perf_counter() - self._start
+        if self.track_memory:
+            _, self.peak_memory = tracemalloc.get_traced_memory()
+            if self._started_tracing:
+                tracemalloc.stop()
+        return False
+
+    def as_dict(self) -> Dict:
+        """Retorna las métricas serializables en JSON"""
+        return {
+            'rows_processed': self.rows,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows / self.elapsed, 1) if self.elapsed else None,
+            'peak_memory_mb': (
+                round(self.peak_memory / (1024 * 1024), 2)
+                if self.peak_memory is not None else None
+            ),
+        }
+
+
+class ParticipantBulkImporter:
+    """
+    Crea o actualiza participantes (y sus eventos) por lotes.
+
+    En lugar de get_or_create/update_or_create por fila, resuelve los eventos
+    distintos en una consulta, inserta los faltantes con bulk_create, carga los
+    participantes existentes en un diccionario y aplica bulk_create/bulk_update
+    por bloques dentro de una única transacción.
+    """
+
+    DEFAULT_CHUNK_SIZE = 1000
+    # Valores por lista IN; dos listas por consulta quedan bajo el límite de 999
+    # parámetros de SQLite antiguo
+    LOOKUP_CHUNK_SIZE = 400
+
+    def __init__(self, chunk_size: int = None, event_description: str = ''):
+        self.chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+        self.event_description = event_description
+        self.events = {}
+        self.participants = {}
+        self.events_created = 0
+        self.participants_created = 0
+        self.participants_updated = 0
+        self.participants_unchanged = 0
+
+    def import_rows(self, rows: Iterable[Dict]) -> Dict:
+        """
+        Importa filas ya validadas
+
+        Args:
+            rows: Iterable de diccionarios con dni, full_name, attendee_type,
+                event_name, event_date y row_number
+
+        Returns:
+            Diccionario con resultados: {
+                'success_count': int,
+                'error_count': int,
+                'errors': list,
+                'events_created': int,
+                'participants_created': int,
+                'participants_updated': int,
+                'participants_unchanged': int
+            }
+        """
+        rows = list(rows)
+
+        with transaction.atomic():
+            self.events = self._resolve_events(rows)
+            self.participants = self._upsert_participants(rows, self.events)
+
+        logger.info(
+            f"Importación masiva: {len(rows)} filas, {self.events_created} eventos creados, "
+            f"{self.participants_created} participantes creados, "
+            f"{self.participants_updated} actualizados"
+        )
+
+        return {
+            'success_count': len(rows),
+            'error_count': 0,
+            'errors': [],
+            'events_created': self.events_created,
+            'participants_created': self.participants_created,
+            'participants_updated': self.participants_updated,
+            'participants_unchanged': self.participants_unchanged,
+        }
+
+    def _resolve_events(self, rows: List[Dict]) -> Dict:
+        """
+        Obtiene o crea los eventos distintos referenciados por las filas
+
+        Returns:
+            Diccionario (nombre, fecha) -> Event
+        """
+        from certificates.models import Event
+
+        keys = {(row['event_name'], row['event_date']) for row in rows}
+        events = {}
+
+        key_list = sorted(keys, key=lambda key: (key[0], key[1]))
+        for start in range(0, len(key_list), self.LOOKUP_CHUNK_SIZE):
+            chunk = key_list[start:start + self.LOOKUP_CHUNK_SIZE]
+            names = {name for name, _ in chunk}
+            dates = {event_date for _, event_date in chunk}
+            # Se ordena por id para quedarse con el más antiguo si hay duplicados
+            for event in Event.objects.filter(name__in=names, event_date__in=dates).order_by('id'):
+                key = (event.name, event.event_date)
+                if key in keys and key not in events:
+                    events[key] = event
+
+        missing = [
+            Event(name=name, event_date=event_date, description=self.event_description)
+            for name, event_date in key_list
+            if (name, event_date) not in events
+        ]
+        if missing:
+            Event.objects.bulk_create(missing, batch_size=self.chunk_size)
+            # bulk_create no emite señales
+            dashboard_counters.invalidate()
+            for event in missing:
+                events[(event.name, event.event_date)] = event
+                logger.info(f"Evento creado: {event.name} - {event.event_date}")
+            self.events_created = len(missing)
+
+        return events
+
+    def participant_for(self, row: Dict):
+        """Retorna el participante importado correspondiente a una fila"""
+        event = self.events[(row['event_name'], row['event_date'])]
+        return self.participants[(row['dni'], event.id)]
+
+    def _upsert_participants(self, rows: List[Dict], events: Dict) -> Dict:
+        """
+        Inserta participantes nuevos y actualiza los que cambiaron
+
+        Returns:
+            Diccionario (dni, event_id) -> Participant con todos los importados
+        """
+        from certificates.models import Certificate, Participant
+
+        # Si una misma (dni, evento) se repite en el archivo gana la última fila,
+        # igual que con update_or_create secuencial
+        events_by_id = {event.id: event for event in events.values()}
+        desired = {}
+        for row in rows:
+            event = events[(row['event_name'], row['event_date'])]
+            desired[(row['dni'], event.id)] = row
+
+        existing = self._load_existing_participants(
+            set(events_by_id),
+            {dni for dni, _ in desired},
+        )
+
+        to_create = []
+        to_update = []
+        for (dni, event_id), row in desired.items():
+            participant = existing.get((dni, event_id))
+            if participant is None:
+                to_create.append(Participant(
+                    dni=dni,
+                    event=events_by_id[event_id],
+                    full_name=row['full_name'],
+                    attendee_type=row['attendee_type'],
+                ))
+            elif (participant.full_name != row['full_name']
+                  or participant.attendee_type != row['attendee_type']):
+                participant.full_name = row['full_name']
+                participant.attendee_type = row['attendee_type']
+                to_update.append(participant)
+
+        if to_create:
+            Participant.objects.bulk_create(to_create, batch_size=self.chunk_size)
+            dashboard_counters.invalidate()
+        if to_update:
+            Participant.objects.bulk_update(
+                to_update, ['full_name', 'attendee_type'], batch_size=self.chunk_size
+            )
+            # bulk_update no emite señales; los datos cambiados pueden estar
+            # en la consulta pública cacheada
+            certificate_query_cache.invalidate_many(participant.dni for participant in to_update)
+            certificate_page_cache.invalidate_many(
+                Certificate.objects.filter(participant__in=to_update).values_list('uuid', flat=True)
+            )
+            certificate_lookup.sync_participants(participant.pk for participant in to_update)
+
+        self.participants_created = len(to_create)
+        self.participants_updated = len(to_update)
+        self.participants_unchanged = len(desired) - len(to_create) - len(to_update)
+
+        participants = {key: existing[key] for key in desired if key in existing}
+        for participant in to_create:
+            participants[(participant.dni, participant.event_id)] = participant
+        return participants
+
+    def _load_existing_participants(self, event_ids, dnis) -> Dict:
+        """
+        Carga los participantes existentes de los eventos importados
+
+        Returns:
+            Diccionario (dni, event_id) -> Participant
+        """
+        from certificates.models import Participant
+
+        existing = {}
+        event_ids = sorted(event_ids)
+        dnis = sorted(dnis)
+        for event_start in range(0, len(event_ids), self.LOOKUP_CHUNK_SIZE):
+            event_chunk = event_ids[event_start:event_start + self.LOOKUP_CHUNK_SIZE]
+            for dni_start in range(0, len(dnis), self.LOOKUP_CHUNK_SIZE):
+                dni_chunk = dnis[dni_start:dni_start + self.LOOKUP_CHUNK_SIZE]
+                queryset = Participant.objects.filter(
+                    event_id__in=event_chunk, dni__in=dni_chunk
+                ).only('id', 'dni', 'event_id', 'full_name', 'attendee_type')
+                for participant in queryset:
+                    existing[(participant.dni, participant.event_id)] = participant
+        return existing
@@ -1,16 +1,62 @@
 """Servicio para generar certificados en PDF"""
 from django.template import Template, Context
 from django.core.files.base import ContentFile
+from certificates.services.audit_counters import audit_counters
+from certificates.services.certificate_lookup import certificate_lookup
+from certificates.services.certificate_query_cache import certificate_query_cache
+from certificates.services.certificate_uuid_filter import certificate_uuid_filter
+from certificates.services.dashboard_counters import dashboard_counters
 from certificates.services.qr_service import QRCodeService
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
+from certificates.services.simple_certificate_pdf import SimpleCertificatePDFRenderer
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.db import transaction
 from io import BytesIO
 import logging
+import uuid as uuid_lib
 
 logger = logging.getLogger("certificates")
 
 
+def _render_simple_certificate(payload: dict) -> dict:
+    """
+    Renderiza el PDF y el QR de un certificado simple dentro de un proceso worker.
+
+    No accede a la base de datos: recibe todos los datos ya resueltos por el
+    proceso padre y devuelve los bytes generados (o el error ocurrido).
+
+    Args:
+        payload: Diccionario con participant_id, certificate_uuid,
+            verification_url, qr_vector y context_data
+
+    Returns:
+        Diccionario con participant_id, pdf_bytes, qr_bytes (None si el QR es
+        vectorial) y error
+    """
+    result = {
+        "participant_id": payload["participant_id"],
+        "pdf_bytes": None,
+        "qr_bytes": None,
+        "error": None,
+    }
+    try:
+        qr_service = QRCodeService()
+        generator = CertificateGeneratorService(qr_service=qr_service)
+        if payload.get("qr_vector"):
+            result["pdf_bytes"] = generator._create_simple_pdf(
+                payload["context_data"], None, qr_data=payload["verification_url"]
+            )
+        else:
+            qr_buffer = qr_service.render_qr_png(payload["verification_url"])
+            result["pdf_bytes"] = generator._create_simple_pdf(
+                payload["context_data"], None, qr_buffer
+            )
+            result["qr_bytes"] = qr_buffer.getvalue()
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
 class CertificateGeneratorService:
     """Genera certificados en PDF con código QR"""
 
@@ -22,6 +68,8 @@ class CertificateGeneratorService:
             qr_service: Instancia de QRCodeService (opcional, se crea si no se provee)
         """
         self.qr_service = qr_service or QRCodeService()
+        # Renderer de plantillas visuales, creado una sola vez por servicio
+        self._visual_renderer = None
 
     def _render_template(self, template_html: str, context_data: dict) -> str:
         """
@@ -67,7 +115,7 @@ class CertificateGeneratorService:
         return default_template
 
     def _create_pdf(
-        self, context_data: dict, template_obj, qr_buffer: BytesIO = None
+        self, context_data: dict, template_obj, qr_buffer: BytesIO = None, qr_data: str = None
     ) -> bytes:
         """
         Crea un PDF usando la plantilla visual o fallback al método simple
@@ -76,6 +124,7 @@ class CertificateGeneratorService:
             context_data: Datos del participante
             template_obj: Objeto CertificateTemplate
             qr_buffer: Buffer con imagen QR (opcional)
+            qr_data: Contenido del QR a dibujar como vector (opcional)
 
         Returns:
             Bytes del PDF generado
@@ -83,33 +132,57 @@ class CertificateGeneratorService:
         # Verificar si la plantilla tiene elementos visuales
         if hasattr(template_obj, 'elements') and template_obj.elements.exists():
             # Usar el nuevo sistema de renderizado visual
-            return self._create_visual_pdf(context_data, template_obj, qr_buffer)
+            return self._create_visual_pdf(context_data, template_obj, qr_buffer, qr_data)
         else:
             # Usar el método simple original para compatibilidad
-            return self._create_simple_pdf(context_data, template_obj, qr_buffer)
+            return self._create_simple_pdf(context_data, template_obj, qr_buffer, qr_data)
 
     def _create_visual_pdf(
-        self, context_data: dict, template_obj, qr_buffer: BytesIO = None
+        self, context_data: dict, template_obj, qr_buffer: BytesIO = None, qr_data: str = None
     ) -> bytes:
         """
         Crea un PDF usando el sistema de plantillas visuales
 
+        Los elementos QR de la plantilla se dibujan como SVG; qr_buffer y
+        qr_data solo se usan si hay que recurrir al PDF simple.
+
         Args:
             context_data: Datos del participante
             template_obj: Objeto CertificateTemplate
             qr_buffer: Buffer con imagen QR (opcional)
+            qr_data: Contenido del QR a dibujar como vector (opcional)
 
         Returns:
             Bytes del PDF generado
         """
-        try:
-            from certificates.services.template_renderer import TemplateRenderingService
-        except ImportError:
-            logger.warning("WeasyPrint not available, falling back to simple PDF generation")
-            return self._create_simple_pdf(context_data, template_obj, qr_buffer)
+        if self._visual_renderer is None:
+            try:
+                from certificates.services.template_renderer import TemplateRenderingService
+            except ImportError:
+                logger.warning("WeasyPrint not available, falling back to simple PDF generation")
+                return self._create_simple_pdf(context_data, template_obj, qr_buffer, qr_data)
         
         # Mapear datos del contexto al formato esperado por el renderer
-        participant_data = {
+        participant_data = self._visual_participant_data(context_data)
+        
+        try:
+            # Usar el servicio de renderizado visual (el plan de la plantilla
+            # se compila una vez y se reutiliza entre certificados)
+            if self._visual_renderer is None:
+                self._visual_renderer = TemplateRenderingService()
+            pdf_bytes = self._visual_renderer.render_template_to_pdf(
+                template_obj.id, participant_data
+            )
+            
+            logger.info(f"PDF visual generado: {len(pdf_bytes)} bytes")
+            return pdf_bytes
+        except ImportError:
+            logger.warning("WeasyPrint dependencies not available, falling back to simple PDF")
+            return self._create_simple_pdf(context_data, template_obj, qr_buffer, qr_data)
+
+    def _visual_participant_data(self, context_data: dict) -> dict:
+        """Mapea los datos del contexto al formato de variables del renderer visual"""
+        return {
             'participant_name': context_data.get('full_name', ''),
             'participant_dni': context_data.get('dni', ''),
             'event_name': context_data.get('event_name', ''),
@@ -118,126 +191,30 @@ class CertificateGeneratorService:
             'certificate_uuid': context_data.get('certificate_uuid', ''),
             'verification_url': context_data.get('verification_url', ''),
         }
-        
-        try:
-            # Usar el servicio de renderizado visual
-            renderer = TemplateRenderingService()
-            pdf_bytes = renderer.render_template_to_pdf(template_obj.id, participant_data)
-            
-            logger.info(f"PDF visual generado: {len(pdf_bytes)} bytes")
-            return pdf_bytes
-        except ImportError:
-            logger.warning("WeasyPrint dependencies not available, falling back to simple PDF")
-            return self._create_simple_pdf(context_data, template_obj, qr_buffer)
 
     def _create_simple_pdf(
-        self, context_data: dict, template_obj, qr_buffer: BytesIO = None
+        self, context_data: dict, template_obj, qr_buffer: BytesIO = None, qr_data: str = None
     ) -> bytes:
         """
         Crea un PDF simple con los datos del certificado (método original)
 
+        Los textos fijos se compilan una vez por proceso; por certificado solo
+        se dibujan los datos del participante y el QR
+        (ver SimpleCertificatePDFRenderer).
+
         Args:
             context_data: Datos del participante
             template_obj: Objeto CertificateTemplate
             qr_buffer: Buffer con imagen QR (opcional)
+            qr_data: Contenido del QR a dibujar como vector (opcional, se usa
+                si no hay qr_buffer)
 
         Returns:
             Bytes del PDF generado
         """
-        pdf_buffer = BytesIO()
-
-        # Crear PDF en orientación horizontal (landscape)
-        page_width, page_height = landscape(A4)
-        c = canvas.Canvas(pdf_buffer, pagesize=landscape(A4))
-
-        # Título
-        c.setFont("Helvetica-Bold", 32)
-        c.drawCentredString(page_width / 2, page_height - 100, "CERTIFICADO")
-
-        # Subtítulo
-        c.setFont("Helvetica", 16)
-        c.drawCentredString(
-            page_width / 2, page_height - 140, "Se otorga el presente certificado a:"
-        )
-
-        # Nombre del participante
-        c.setFont("Helvetica-Bold", 24)
-        c.drawCentredString(
-            page_width / 2, page_height - 200, context_data.get("full_name", "")
-        )
-
-        # DNI
-        c.setFont("Helvetica", 14)
-        c.drawCentredString(
-            page_width / 2,
-            page_height - 240,
-            f"DNI: {context_data.get('dni', '')}",
-        )
-
-        # Texto del evento
-        c.setFont("Helvetica", 14)
-        c.drawCentredString(
-            page_width / 2, page_height - 280, "Por su participación como"
-        )
-
-        # Tipo de asistente
-        c.setFont("Helvetica-Bold", 16)
-        attendee_type_display = {
-            "ASISTENTE": "Asistente",
-            "PONENTE": "Ponente",
-            "ORGANIZADOR": "Organizador",
-        }.get(context_data.get("attendee_type", ""), "Asistente")
-
-        c.drawCentredString(page_width / 2, page_height - 310, attendee_type_display)
-
-        # Nombre del evento
-        c.setFont("Helvetica", 14)
-        c.drawCentredString(page_width / 2, page_height - 340, "en el evento:")
-
-        c.setFont("Helvetica-Bold", 18)
-        c.drawCentredString(
-            page_width / 2, page_height - 370, context_data.get("event_name", "")
-        )
-
-        # Fecha del evento
-        c.setFont("Helvetica", 12)
-        c.drawCentredString(
-            page_width / 2,
-            page_height - 400,
-            f"Realizado el {context_data.get('event_date', '')}",
-        )
-
-        # Código QR (si existe)
-        if qr_buffer:
-            qr_buffer.seek(0)
-            qr_image = ImageReader(qr_buffer)
-            qr_size = 100
-            c.drawImage(
-                qr_image,
-                page_width - qr_size - 50,
-                50,
-                width=qr_size,
-                height=qr_size,
-            )
-
-            # Texto debajo del QR
-            c.setFont("Helvetica", 8)
-            c.drawCentredString(
-                page_width - qr_size / 2 - 50, 35, "Escanea para verificar"
-            )
-
-        # Pie de página
-        c.setFont("Helvetica", 10)
-        c.drawCentredString(
-            page_width / 2, 50, "Dirección Regional de Trabajo y Promoción del Empleo"
+        pdf_bytes = SimpleCertificatePDFRenderer(self.qr_service).render(
+            context_data, qr_buffer, qr_data
         )
-        c.drawCentredString(page_width / 2, 35, "Puno - Perú")
-
-        c.showPage()
-        c.save()
-
-        pdf_buffer.seek(0)
-        pdf_bytes = pdf_buffer.read()
 
         logger.info(f"PDF simple generado: {len(pdf_bytes)} bytes")
 
@@ -255,7 +232,6 @@ class CertificateGeneratorService:
             Instancia de Certificate creada
         """
         from certificates.models import Certificate, AuditLog
-        import uuid as uuid_lib
 
         # Verificar si ya existe un certificado para este participante
         existing_cert = Certificate.objects.filter(participant=participant).first()
@@ -268,8 +244,9 @@ class CertificateGeneratorService:
         # Generar UUID para el certificado
         cert_uuid = uuid_lib.uuid4()
 
-        # Generar código QR
-        qr_buffer = self.qr_service.generate_qr(str(cert_uuid))
+        # Generar código QR (con QR vectorial, el PNG se genera bajo demanda)
+        qr_vector = self._uses_vector_qr()
+        qr_buffer = None if qr_vector else self.qr_service.generate_qr(str(cert_uuid))
 
         # Obtener plantilla
         template_obj = self._get_template(participant)
@@ -286,7 +263,10 @@ class CertificateGeneratorService:
         }
 
         # Generar PDF
-        pdf_bytes = self._create_pdf(context_data, template_obj, qr_buffer)
+        pdf_bytes = self._create_pdf(
+            context_data, template_obj, qr_buffer,
+            qr_data=context_data["verification_url"] if qr_vector else None,
+        )
 
         # Crear instancia de Certificate
         certificate = Certificate(
@@ -299,9 +279,10 @@ class CertificateGeneratorService:
         pdf_filename = f"certificado_{participant.dni}_{cert_uuid}.pdf"
         certificate.pdf_file.save(pdf_filename, ContentFile(pdf_bytes), save=False)
 
-        qr_buffer.seek(0)
-        qr_filename = f"qr_{cert_uuid}.png"
-        certificate.qr_code.save(qr_filename, ContentFile(qr_buffer.read()), save=False)
+        if qr_buffer is not None:
+            qr_buffer.seek(0)
+            qr_filename = f"qr_{cert_uuid}.png"
+            certificate.qr_code.save(qr_filename, ContentFile(qr_buffer.read()), save=False)
 
         certificate.save()
 
@@ -323,13 +304,28 @@ class CertificateGeneratorService:
 
         return certificate
 
-    def generate_bulk_certificates(self, event, user=None):
+    def generate_bulk_certificates(
+        self, event, user=None, workers=None, batch_size=None, progress_callback=None
+    ):
         """
         Genera certificados para todos los participantes de un evento
 
+        El renderizado (PDF + QR) de las plantillas simples se reparte en un pool
+        de procesos sin acceso a la base de datos; el proceso padre persiste los
+        resultados en transacciones por lotes. Las plantillas visuales se
+        renderizan en el proceso actual, varias páginas por documento de
+        WeasyPrint (TEMPLATE_RENDER_BATCH_PAGES); el modo de un solo worker
+        también se renderiza en el proceso actual.
+
         Args:
             event: Instancia de Event
             user: Usuario que genera los certificados (opcional)
+            workers: Número de procesos de renderizado (por defecto
+                settings.CERTIFICATE_GENERATION_WORKERS)
+            batch_size: Certificados persistidos por transacción (por defecto
+                settings.CERTIFICATE_GENERATION_BATCH_SIZE)
+            progress_callback: Función opcional (procesados, total) llamada tras
+                cada lote guardado
 
         Returns:
             Diccionario con resultados: {
@@ -339,9 +335,18 @@ class CertificateGeneratorService:
                 'errors': list
             }
         """
-        participants = event.participants.all()
+        from certificates.models import Certificate
+
+        if workers is None:
+            workers = getattr(settings, "CERTIFICATE_GENERATION_WORKERS", 1)
+        if batch_size is None:
+            batch_size = getattr(settings, "CERTIFICATE_GENERATION_BATCH_SIZE", 100)
+        workers = max(1, int(workers))
+        batch_size = max(1, int(batch_size))
 
-        if not participants.exists():
+        participants = list(event.participants.select_related("event", "event__template"))
+
+        if not participants:
             logger.warning(f"No hay participantes en el evento {event.name}")
             return {
                 "success_count": 0,
@@ -355,16 +360,67 @@ class CertificateGeneratorService:
         certificates = []
         errors = []
 
+        # Los certificados existentes se reportan como éxito, igual que generate_certificate
+        existing = {
+            cert.participant_id: cert
+            for cert in Certificate.objects.filter(participant__in=participants)
+        }
+        total = len(participants)
+        pending = []
         for participant in participants:
-            try:
-                certificate = self.generate_certificate(participant, user=user)
-                certificates.append(certificate)
+            if participant.id in existing:
+                certificates.append(existing[participant.id])
                 success_count += 1
+            else:
+                pending.append(participant)
+
+        if pending:
+            try:
+                template_obj = self._get_template(pending[0])
             except Exception as e:
-                error_count += 1
-                error_msg = f"Error al generar certificado para {participant.full_name} ({participant.dni}): {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+                for participant in pending:
+                    error_count += 1
+                    errors.append(self._bulk_error_message(participant, e))
+                pending = []
+
+        if pending:
+            payloads = [self._build_render_payload(participant) for participant in pending]
+            participants_by_id = {participant.id: participant for participant in pending}
+
+            is_visual = self._is_visual_template(template_obj)
+            use_pool = workers > 1 and len(payloads) > 1 and not is_visual
+
+            if use_pool:
+                logger.info(
+                    f"Generación masiva para {event.name}: {len(payloads)} certificados con {workers} workers"
+                )
+                chunksize = max(1, min(batch_size, len(payloads) // (workers * 4) or 1))
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    rendered = executor.map(_render_simple_certificate, payloads, chunksize=chunksize)
+                    batch_result = self._persist_rendered_in_batches(
+                        rendered, payloads, participants_by_id, batch_size, user,
+                        progress_callback=progress_callback, offset=success_count, total=total,
+                    )
+            elif is_visual:
+                # Varias páginas por documento de WeasyPrint
+                rendered = self._render_visual_batches(payloads, template_obj)
+                batch_result = self._persist_rendered_in_batches(
+                    rendered, payloads, participants_by_id, batch_size, user,
+                    progress_callback=progress_callback, offset=success_count, total=total,
+                )
+            else:
+                rendered = (
+                    self._render_in_process(payload, template_obj) for payload in payloads
+                )
+                batch_result = self._persist_rendered_in_batches(
+                    rendered, payloads, participants_by_id, batch_size, user,
+                    progress_callback=progress_callback, offset=success_count, total=total,
+                )
+
+            certificates.extend(batch_result["certificates"])
+            success_count += len(batch_result["certificates"])
+            error_count += len(batch_result["errors"])
+            errors.extend(batch_result["errors"])
 
         logger.info(
             f"Generación masiva completada para evento {event.name}: {success_count} éxitos, {error_count} errores"
@@ -376,3 +432,263 @@ class CertificateGeneratorService:
             "certificates": certificates,
             "errors": errors,
         }
+
+    def _uses_vector_qr(self) -> bool:
+        """Indica si el QR se dibuja como vector (el PNG se genera bajo demanda)"""
+        return getattr(settings, "CERTIFICATE_QR_VECTOR", True)
+
+    def _is_visual_template(self, template_obj) -> bool:
+        """Indica si la plantilla usa el editor visual (requiere acceso a BD al renderizar)"""
+        return hasattr(template_obj, "elements") and template_obj.elements.exists()
+
+    def _build_render_payload(self, participant) -> dict:
+        """
+        Prepara los datos de renderizado de un participante para generación masiva
+
+        Args:
+            participant: Instancia de Participant (con event cargado)
+
+        Returns:
+            Diccionario serializable para enviar a un proceso worker
+        """
+        cert_uuid = str(uuid_lib.uuid4())
+        verification_url = self.qr_service.get_verification_url(cert_uuid)
+        return {
+            "participant_id": participant.id,
+            "certificate_uuid": cert_uuid,
+            "verification_url": verification_url,
+            "qr_vector": self._uses_vector_qr(),
+            "context_data": {
+                "full_name": participant.full_name,
+                "dni": participant.dni,
+                "event_name": participant.event.name,
+                "event_date": participant.event.event_date.strftime("%d/%m/%Y"),
+                "attendee_type": participant.attendee_type,
+                "certificate_uuid": cert_uuid,
+                "verification_url": verification_url,
+            },
+        }
+
+    def _render_in_process(self, payload: dict, template_obj) -> dict:
+        """Renderiza un certificado en el proceso actual (mismo formato que los workers)"""
+        result = {
+            "participant_id": payload["participant_id"],
+            "pdf_bytes": None,
+            "qr_bytes": None,
+            "error": None,
+        }
+        try:
+            if payload.get("qr_vector"):
+                result["pdf_bytes"] = self._create_pdf(
+                    payload["context_data"], template_obj, qr_data=payload["verification_url"]
+                )
+            else:
+                qr_buffer = self.qr_service.generate_qr(payload["certificate_uuid"])
+                result["pdf_bytes"] = self._create_pdf(payload["context_data"], template_obj, qr_buffer)
+                qr_buffer.seek(0)
+                result["qr_bytes"] = qr_buffer.read()
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+    def _render_visual_batches(self, payloads, template_obj, pages_per_document=None):
+        """
+        Renderiza plantillas visuales por lotes: cada lote es un solo documento
+        de WeasyPrint con una página por participante, dividido luego en un
+        PDF por certificado.
+
+        Si un lote falla, sus certificados se renderizan uno a uno para
+        aislar los errores.
+
+        Yields:
+            Resultados de renderizado en el orden de payloads
+        """
+        if pages_per_document is None:
+            pages_per_document = getattr(settings, "TEMPLATE_RENDER_BATCH_PAGES", 50)
+        pages_per_document = max(1, int(pages_per_document))
+
+        for start in range(0, len(payloads), pages_per_document):
+            chunk = payloads[start:start + pages_per_document]
+            try:
+                if self._visual_renderer is None:
+                    from certificates.services.template_renderer import TemplateRenderingService
+
+                    self._visual_renderer = TemplateRenderingService()
+
+                qr_buffers = [
+                    None if payload.get("qr_vector")
+                    else self.qr_service.generate_qr(payload["certificate_uuid"])
+                    for payload in chunk
+                ]
+                pdfs = self._visual_renderer.render_batch_to_pdf(
+                    template_obj.id,
+                    [self._visual_participant_data(payload["context_data"]) for payload in chunk],
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Renderizado por lotes fallido ({len(chunk)} certificados), "
+                    f"renderizando individualmente: {str(e)}"
+                )
+                for payload in chunk:
+                    yield self._render_in_process(payload, template_obj)
+                continue
+
+            for payload, pdf_bytes, qr_buffer in zip(chunk, pdfs, qr_buffers):
+                yield {
+                    "participant_id": payload["participant_id"],
+                    "pdf_bytes": pdf_bytes,
+                    "qr_bytes": qr_buffer.getvalue() if qr_buffer is not None else None,
+                    "error": None,
+                }
+
+    def _persist_rendered_in_batches(
+        self, rendered, payloads, participants_by_id, batch_size, user,
+        progress_callback=None, offset=0, total=None,
+    ):
+        """
+        Persiste los certificados renderizados en transacciones por lotes
+
+        Args:
+            rendered: Iterable de resultados de renderizado (en el orden de payloads)
+            payloads: Lista de payloads enviados a renderizar
+            participants_by_id: Diccionario participant_id -> Participant
+            batch_size: Número de certificados por transacción
+            user: Usuario que genera los certificados
+            progress_callback: Función opcional (procesados, total)
+            offset: Participantes ya procesados antes de este lote
+            total: Total de participantes del evento
+
+        Returns:
+            Diccionario con 'certificates' y 'errors'
+        """
+        certificates = []
+        errors = []
+        batch = []
+        processed = 0
+
+        for payload, result in zip(payloads, rendered):
+            processed += 1
+            participant = participants_by_id[payload["participant_id"]]
+            if result["error"]:
+                errors.append(self._bulk_error_message(participant, result["error"]))
+                continue
+            batch.append((participant, payload, result))
+            if len(batch) >= batch_size:
+                self._persist_batch(batch, user, certificates, errors)
+                batch = []
+                if progress_callback:
+                    progress_callback(offset + processed, total)
+
+        if batch:
+            self._persist_batch(batch, user, certificates, errors)
+        if progress_callback:
+            progress_callback(offset + processed, total)
+
+        return {"certificates": certificates, "errors": errors}
+
+    def _persist_batch(self, batch, user, certificates, errors):
+        """
+        Guarda un lote de certificados y sus registros de auditoría en una transacción
+
+        Si la inserción masiva falla (p. ej. un certificado creado en paralelo),
+        el lote se reintenta uno a uno para aislar los errores. Las tareas
+        posteriores al commit no forman parte de ese reintento: las filas ya
+        están guardadas.
+        """
+        from certificates.models import Certificate, AuditLog
+
+        instances = []
+        for participant, payload, result in batch:
+            instances.append(self._build_certificate_instance(participant, payload, result))
+
+        try:
+            with transaction.atomic():
+                Certificate.objects.bulk_create(instances)
+                logs = AuditLog.objects.bulk_create(
+                    [self._build_generate_log(cert, user) for cert in instances]
+                )
+                audit_counters.increment(logs)
+        except Exception as e:
+            logger.warning(f"Fallo la inserción masiva del lote, reintentando individualmente: {str(e)}")
+            self._persist_individually(instances, user, certificates, errors)
+            return
+
+        certificates.extend(instances)
+        self._after_bulk_create(instances)
+
+    def _after_bulk_create(self, instances):
+        """
+        Tareas que las señales harían por cada certificado (bulk_create no las
+        emite). Cada una se protege por separado: un fallo de la cache o de
+        CertificateLookup se registra sin afectar a los certificados guardados.
+        """
+        tasks = (
+            ("invalidar la cache de consultas", lambda: certificate_query_cache.invalidate_many(
+                cert.participant.dni for cert in instances
+            )),
+            ("actualizar el filtro de UUID", lambda: certificate_uuid_filter.add_many(
+                cert.uuid for cert in instances
+            )),
+            ("sincronizar CertificateLookup", lambda: certificate_lookup.sync_instances(instances)),
+            ("invalidar los contadores del dashboard", dashboard_counters.invalidate),
+        )
+        for description, task in tasks:
+            try:
+                task()
+            except Exception as e:
+                logger.error(f"No se pudo {description} tras guardar {len(instances)} certificados: {str(e)}")
+
+    def _persist_individually(self, instances, user, certificates, errors):
+        """Guarda los certificados uno a uno (con señales) y reporta los que fallan"""
+        for certificate in instances:
+            certificate.pk = None
+            try:
+                with transaction.atomic():
+                    certificate.save()
+                    self._build_generate_log(certificate, user).save()
+                certificates.append(certificate)
+            except Exception as e:
+                errors.append(self._bulk_error_message(certificate.participant, e))
+
+    def _build_certificate_instance(self, participant, payload, result):
+        """Crea la instancia de Certificate (sin guardar) con sus archivos almacenados"""
+        from certificates.models import Certificate
+
+        cert_uuid = payload["certificate_uuid"]
+        certificate = Certificate(
+            uuid=cert_uuid,
+            participant=participant,
+            verification_url=payload["verification_url"],
+        )
+
+        pdf_filename = f"certificado_{participant.dni}_{cert_uuid}.pdf"
+        certificate.pdf_file.save(pdf_filename, ContentFile(result["pdf_bytes"]), save=False)
+
+        # Con QR vectorial el PNG se genera bajo demanda (Certificate.ensure_qr_code)
+        if result["qr_bytes"]:
+            qr_filename = f"qr_{cert_uuid}.png"
+            certificate.qr_code.save(qr_filename, ContentFile(result["qr_bytes"]), save=False)
+
+        return certificate
+
+    def _build_generate_log(self, certificate, user):
+        """Construye (sin guardar) el registro de auditoría de generación"""
+        from certificates.models import AuditLog
+
+        participant = certificate.participant
+        return AuditLog(
+            action_type="GENERATE",
+            user=user,
+            description=f"Certificado generado para {participant.full_name} ({participant.dni})",
+            metadata={
+                "certificate_uuid": str(certificate.uuid),
+                "participant_dni": participant.dni,
+                "event_name": participant.event.name,
+            },
+        )
+
+    def _bulk_error_message(self, participant, error) -> str:
+        """Formatea y registra el error de generación de un participante"""
+        error_msg = f"Error al generar certificado para {participant.full_name} ({participant.dni}): {str(error)}"
+        logger.error(error_msg)
+        return error_msg
@@ -0,0 +1,246 @@
+"""
+Sincronización del modelo de lectura CertificateLookup.
+
+Las vistas públicas leen una fila por certificado con los datos del
+participante y del evento ya copiados, en lugar de unir tres tablas en cada
+consulta. Las señales de Certificate, Participant y Event actualizan las
+filas afectadas; las operaciones masivas (bulk_create, bulk_update,
+queryset.update) no emiten señales y llaman explícitamente a este servicio.
+El comando rebuild_certificate_lookup reconstruye la tabla completa.
+"""
+import logging
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger("certificates")
+
+
+# Campos de CertificateLookup y su origen en Certificate; has_final_pdf se
+# calcula a partir de final_pdf
+SOURCE_FIELDS = {
+    "uuid": "uuid",
+    "dni": "participant__dni",
+    "full_name": "participant__full_name",
+    "attendee_type": "participant__attendee_type",
+    "event_name": "participant__event__name",
+    "event_date": "participant__event__event_date",
+    "generated_at": "generated_at",
+    "is_signed": "is_signed",
+    "signed_at": "signed_at",
+    "is_external": "is_external",
+    "external_url": "external_url",
+    "processing_status": "processing_status",
+    "qr_code": "qr_code",
+    "qr_image": "qr_image",
+}
+UPDATE_FIELDS = list(SOURCE_FIELDS) + ["has_final_pdf"]
+
+
+class CertificateLookupSync:
+    """Mantiene CertificateLookup al día con Certificate, Participant y Event"""
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self._batch_size = batch_size
+
+    @property
+    def batch_size(self) -> int:
+        if self._batch_size is not None:
+            return self._batch_size
+        return getattr(settings, "CERTIFICATE_LOOKUP_BATCH_SIZE", 1000)
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def get(self, certificate_uuid):
+        """
+        Fila del certificado con ese UUID
+
+        Si el certificado existe pero su fila aún no se creó (p. ej. antes de
+        la primera reconstrucción), se sincroniza en ese momento.
+
+        Returns:
+            CertificateLookup o None si el certificado no existe
+        """
+        from certificates.models import Certificate, CertificateLookup
+
+        try:
+            return CertificateLookup.objects.get(uuid=certificate_uuid)
+        except CertificateLookup.DoesNotExist:
+            pass
+
+        certificate_id = (
+            Certificate.objects.filter(uuid=certificate_uuid)
+            .order_by()
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if certificate_id is None:
+            return None
+        logger.info(f"Fila de consulta pública faltante, sincronizando: {certificate_uuid}")
+        self.sync([certificate_id])
+        return CertificateLookup.objects.filter(certificate_id=certificate_id).first()
+
+    # ------------------------------------------------------------------
+    # Sincronización
+    # ------------------------------------------------------------------
+
+    def sync(self, certificate_ids: Iterable[int]) -> int:
+        """
+        Vuelve a copiar desde la base de datos las filas de esos certificados
+
+        Una consulta (con joins) y un INSERT ... ON CONFLICT por lote.
+
+        Returns:
+            Número de filas escritas
+        """
+        from certificates.models import Certificate
+
+        ids = sorted({certificate_id for certificate_id in certificate_ids if certificate_id})
+        written = 0
+        for start in range(0, len(ids), self.batch_size):
+            rows = (
+                Certificate.objects.filter(pk__in=ids[start:start + self.batch_size])
+                .order_by()
+                .values_list("pk", "final_pdf", *SOURCE_FIELDS.values())
+            )
+            written += self._upsert([self._from_row(row) for row in rows])
+        return written
+
+    def sync_instances(self, certificates: Iterable) -> int:
+        """
+        Copia las filas desde certificados ya cargados en memoria
+
+        Para las operaciones masivas que acaban de guardar los certificados
+        con su participante y evento: no vuelve a consultarlos. Los que no
+        tienen cargadas esas relaciones se sincronizan con sync().
+
+        Returns:
+            Número de filas escritas
+        """
+        from certificates.models import Certificate, Participant
+
+        loaded, pending = [], []
+        for certificate in certificates:
+            if (
+                Certificate.participant.is_cached(certificate)
+                and Participant.event.is_cached(certificate.participant)
+            ):
+                loaded.append(self._from_instance(certificate))
+            else:
+                pending.append(certificate.pk)
+
+        written = 0
+        for start in range(0, len(loaded), self.batch_size):
+            written += self._upsert(loaded[start:start + self.batch_size])
+        return written + self.sync(pending)
+
+    def sync_participants(self, participant_ids: Iterable[int]) -> int:
+        """Sincroniza los certificados de esos participantes"""
+        from certificates.models import Certificate
+
+        participant_ids = {participant_id for participant_id in participant_ids if participant_id}
+        if not participant_ids:
+            return 0
+        return self.sync(
+            Certificate.objects.filter(participant_id__in=participant_ids)
+            .order_by()
+            .values_list("pk", flat=True)
+        )
+
+    def sync_events(self, event_ids: Iterable[int]) -> int:
+        """Sincroniza los certificados de los participantes de esos eventos"""
+        from certificates.models import Certificate
+
+        event_ids = {event_id for event_id in event_ids if event_id}
+        if not event_ids:
+            return 0
+        return self.sync(
+            Certificate.objects.filter(participant__event_id__in=event_ids)
+            .order_by()
+            .values_list("pk", flat=True)
+        )
+
+    def rebuild(self) -> int:
+        """
+        Reconstruye la tabla completa por lotes de certificados
+
+        Las filas de certificados eliminados se borran en cascada, por lo que
+        basta con volver a copiar todos los certificados existentes.
+
+        Returns:
+            Número de filas escritas
+        """
+        from certificates.models import Certificate
+
+        written = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Certificate.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:self.batch_size]
+            )
+            if not ids:
+                return written
+            written += self.sync(ids)
+            last_id = ids[-1]
+
+    # ------------------------------------------------------------------
+    # Construcción de filas
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _from_row(row: tuple):
+        from certificates.models import CertificateLookup
+
+        certificate_id, final_pdf, *values = row
+        fields = dict(zip(SOURCE_FIELDS, values))
+        return CertificateLookup(
+            certificate_id=certificate_id,
+            has_final_pdf=bool(final_pdf),
+            **fields,
+        )
+
+    @staticmethod
+    def _from_instance(certificate):
+        from certificates.models import CertificateLookup
+
+        participant = certificate.participant
+        return CertificateLookup(
+            certificate_id=certificate.pk,
+            uuid=certificate.uuid,
+            dni=participant.dni,
+            full_name=participant.full_name,
+            attendee_type=participant.attendee_type,
+            event_name=participant.event.name,
+            event_date=participant.event.event_date,
+            generated_at=certificate.generated_at,
+            is_signed=certificate.is_signed,
+            signed_at=certificate.signed_at,
+            is_external=certificate.is_external,
+            external_url=certificate.external_url,
+            processing_status=certificate.processing_status,
+            qr_code=certificate.qr_code.name or None,
+            qr_image=certificate.qr_image.name or None,
+            has_final_pdf=bool(certificate.final_pdf),
+        )
+
+    @staticmethod
+    def _upsert(lookups: List) -> int:
+        from certificates.models import CertificateLookup
+
+        if not lookups:
+            return 0
+        CertificateLookup.objects.bulk_create(
+            lookups,
+            update_conflicts=True,
+            unique_fields=["certificate"],
+            update_fields=UPDATE_FIELDS,
+        )
+        return len(lookups)
+
+
+# Instancia compartida por las vistas públicas, las señales y los servicios masivos
+certificate_lookup = CertificateLookupSync()
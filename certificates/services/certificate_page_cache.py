@@ -0,0 +1,213 @@
+"""
+Cache de página completa de las vistas públicas por certificado
+(verificación por QR y preview).
+
+El HTML renderizado se guarda bajo una clave con el UUID y una versión del
+certificado: firmar, importar la versión final o modificar los datos que
+muestra la página cambian la versión (como en certificate_query_cache), de
+modo que la copia anterior deja de usarse en todos los procesos.
+
+Cada respuesta lleva un ETag del contenido y Cache-Control público: por
+defecto `max-age=0, must-revalidate`, con lo que nginx o el navegador
+revalidan en cada escaneo (304 sin cuerpo) y la vista registra siempre la
+auditoría. Con PUBLIC_PAGE_CACHE_MAX_AGE > 0 nginx puede servir la página
+desde su cache durante esos segundos, sin auditar esos accesos.
+
+Solo se cachean respuestas 200 a usuarios anónimos (la barra de navegación
+cambia con la sesión).
+"""
+from collections import namedtuple
+import hashlib
+import logging
+import uuid as uuid_lib
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+logger = logging.getLogger("certificates")
+
+
+CachedPage = namedtuple("CachedPage", "content content_type etag metadata")
+
+
+class CertificatePageCache:
+    """Páginas públicas renderizadas por certificado, con versión e invalidación"""
+
+    KEY_PREFIX = "certificate_page"
+
+    def __init__(
+        self,
+        timeout: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        max_age: Optional[int] = None,
+    ):
+        self._timeout = timeout
+        self._enabled = enabled
+        self._max_age = max_age
+
+    @property
+    def timeout(self) -> int:
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, "PUBLIC_PAGE_CACHE_TIMEOUT", 3600)
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is not None:
+            return self._enabled
+        return getattr(settings, "PUBLIC_PAGE_CACHE_ENABLED", True)
+
+    @property
+    def max_age(self) -> int:
+        if self._max_age is not None:
+            return self._max_age
+        return getattr(settings, "PUBLIC_PAGE_CACHE_MAX_AGE", 0)
+
+    def is_cacheable(self, request) -> bool:
+        """Solo peticiones GET/HEAD anónimas usan la cache"""
+        return (
+            self.enabled
+            and request.method in ("GET", "HEAD")
+            and not request.user.is_authenticated
+        )
+
+    # ------------------------------------------------------------------
+    # Claves
+    # ------------------------------------------------------------------
+
+    def _version_key(self, certificate_uuid) -> str:
+        return f"{self.KEY_PREFIX}:version:{certificate_uuid}"
+
+    def _page_key(self, page: str, certificate_uuid, version: str) -> str:
+        return f"{self.KEY_PREFIX}:{page}:{certificate_uuid}:{version}"
+
+    # ------------------------------------------------------------------
+    # Lectura y escritura
+    # ------------------------------------------------------------------
+
+    def get(self, page: str, certificate_uuid) -> Optional[CachedPage]:
+        """
+        Página cacheada de la versión actual del certificado
+
+        Args:
+            page: Nombre de la vista ("verify", "preview")
+            certificate_uuid: UUID del certificado
+
+        Returns:
+            CachedPage o None si no está en cache
+        """
+        version = self._cache_get(self._version_key(certificate_uuid))
+        if version is None:
+            return None
+        entry = self._cache_get(self._page_key(page, certificate_uuid, version))
+        return CachedPage(*entry) if entry is not None else None
+
+    def store(self, page: str, certificate_uuid, response, metadata: Dict) -> Optional[CachedPage]:
+        """
+        Guarda una respuesta 200 ya renderizada
+
+        Args:
+            page: Nombre de la vista
+            certificate_uuid: UUID del certificado
+            response: Respuesta de la vista (TemplateResponse se renderiza aquí)
+            metadata: Datos de auditoría que se registran en cada acceso cacheado
+
+        Returns:
+            CachedPage guardada, o None si la respuesta no se puede cachear
+        """
+        if response.status_code != 200 or getattr(response, "streaming", False):
+            return None
+        if hasattr(response, "render") and not response.is_rendered:
+            response.render()
+
+        content = response.content
+        entry = CachedPage(
+            content=content,
+            content_type=response["Content-Type"],
+            etag=f'"{hashlib.md5(content).hexdigest()}"',
+            metadata=metadata,
+        )
+        version = self._get_version(certificate_uuid)
+        self._cache_set(self._page_key(page, certificate_uuid, version), tuple(entry))
+        return entry
+
+    def respond(self, request, entry: CachedPage) -> HttpResponse:
+        """Respuesta a partir de la página cacheada (304 si el ETag coincide)"""
+        not_modified = get_conditional_response(request, etag=entry.etag)
+        if not_modified is not None:
+            return self.patch_headers(not_modified, entry.etag)
+        response = HttpResponse(entry.content, content_type=entry.content_type)
+        return self.patch_headers(response, entry.etag)
+
+    def patch_headers(self, response: HttpResponse, etag: str) -> HttpResponse:
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=self.max_age, must_revalidate=True)
+        return response
+
+    # ------------------------------------------------------------------
+    # Invalidación
+    # ------------------------------------------------------------------
+
+    def _get_version(self, certificate_uuid) -> str:
+        key = self._version_key(certificate_uuid)
+        version = self._cache_get(key)
+        if version is None:
+            version = uuid_lib.uuid4().hex
+            # add(): si otro proceso la creó primero, usar la suya
+            try:
+                if not cache.add(key, version, self.timeout):
+                    version = cache.get(key) or version
+            except Exception as e:
+                logger.warning(f"Cache de páginas públicas no disponible: {str(e)}")
+        return version
+
+    def invalidate(self, certificate_uuid) -> None:
+        """Descarta las páginas cacheadas de un certificado"""
+        self.invalidate_many([certificate_uuid])
+
+    def invalidate_many(self, uuids: Iterable) -> None:
+        """
+        Descarta las páginas cacheadas de varios certificados
+
+        Se invalida de inmediato y otra vez al confirmar la transacción: una
+        petición concurrente podría haber cacheado los datos previos al commit.
+        """
+        uuids = {str(certificate_uuid) for certificate_uuid in uuids if certificate_uuid}
+        if not uuids or not self.enabled:
+            return
+        self._bump_versions(uuids)
+        transaction.on_commit(lambda: self._bump_versions(uuids))
+
+    def _bump_versions(self, uuids) -> None:
+        try:
+            cache.set_many(
+                {self._version_key(certificate_uuid): uuid_lib.uuid4().hex for certificate_uuid in uuids},
+                self.timeout,
+            )
+        except Exception as e:
+            logger.warning(f"No se pudo invalidar la cache de páginas públicas: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Acceso tolerante a fallos de la cache
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, key: str):
+        try:
+            return cache.get(key)
+        except Exception as e:
+            logger.warning(f"Cache de páginas públicas no disponible: {str(e)}")
+            return None
+
+    def _cache_set(self, key: str, value) -> None:
+        try:
+            cache.set(key, value, self.timeout)
+        except Exception as e:
+            logger.warning(f"Cache de páginas públicas no disponible: {str(e)}")
+
+
+# Instancia compartida por las vistas públicas y las señales
+certificate_page_cache = CertificatePageCache()
@@ -0,0 +1,292 @@
+"""
+Cache de resultados de la consulta pública de certificados por DNI.
+
+Cada página de resultados se guarda como tuplas compactas (sin instancias de
+modelos) bajo una clave versionada por DNI: invalidar un DNI solo cambia su
+versión, por lo que las páginas anteriores dejan de consultarse en todos los
+procesos y expiran solas. Las páginas se leen del modelo de lectura
+CertificateLookup, sin joins.
+"""
+from collections import namedtuple
+import logging
+import uuid as uuid_lib
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Window
+from django.urls import reverse
+
+logger = logging.getLogger("certificates")
+
+
+EventResult = namedtuple("EventResult", "name event_date")
+ParticipantResult = namedtuple("ParticipantResult", "full_name dni attendee_type event")
+CertificateResult = namedtuple(
+    "CertificateResult",
+    "uuid participant is_signed is_external external_url download_url verify_url",
+)
+
+# Columnas de la consulta; las tuplas cacheadas agregan las URLs de descarga
+# y verificación al final
+ROW_FIELDS = (
+    "uuid",
+    "full_name",
+    "dni",
+    "attendee_type",
+    "event_name",
+    "event_date",
+    "is_signed",
+    "is_external",
+    "external_url",
+)
+
+
+class CertificateQueryCache:
+    """
+    Resultados paginados de la consulta por DNI, con cache e invalidación.
+
+    En caso de fallo (miss) la página se obtiene con LIMIT/OFFSET en la base
+    de datos; el total de certificados del DNI se calcula en la misma
+    consulta con una función de ventana.
+    """
+
+    KEY_PREFIX = "certificate_query"
+    PAGE_SIZE = 10
+
+    def __init__(self, timeout: Optional[int] = None, enabled: Optional[bool] = None):
+        self._timeout = timeout
+        self._enabled = enabled
+
+    @property
+    def timeout(self) -> int:
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, "PUBLIC_QUERY_CACHE_TIMEOUT", 3600)
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is not None:
+            return self._enabled
+        return getattr(settings, "PUBLIC_QUERY_CACHE_ENABLED", True)
+
+    # ------------------------------------------------------------------
+    # Claves
+    # ------------------------------------------------------------------
+
+    def _version_key(self, dni: str) -> str:
+        return f"{self.KEY_PREFIX}:version:{dni}"
+
+    def _page_key(self, dni: str, version: str, page_number: int) -> str:
+        return f"{self.KEY_PREFIX}:page:{dni}:{version}:{page_number}"
+
+    def _counter_key(self, name: str) -> str:
+        return f"{self.KEY_PREFIX}:{name}"
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def get_page(self, dni: str, page_number=1) -> Tuple[List[CertificateResult], int, int, int]:
+        """
+        Retorna una página de certificados del DNI (más recientes primero)
+
+        Args:
+            dni: DNI consultado
+            page_number: Número de página solicitado (valores inválidos se
+                tratan como 1; páginas fuera de rango, como la última)
+
+        Returns:
+            Tupla (certificados, total, número de página, número de páginas)
+        """
+        try:
+            page_number = max(1, int(page_number))
+        except (TypeError, ValueError):
+            page_number = 1
+
+        if not self.enabled:
+            rows, total, page_number = self._fetch_page(dni, page_number)
+            return self._to_results(rows), total, page_number, self._num_pages(total)
+
+        version = self._get_version(dni)
+        page_key = self._page_key(dni, version, page_number)
+        entry = self._cache_get(page_key)
+
+        if entry is not None:
+            self._count("hits")
+            rows, total, page_number = entry
+        else:
+            self._count("misses")
+            rows, total, resolved_page = self._fetch_page(dni, page_number)
+            entry = (rows, total, resolved_page)
+            self._cache_set(page_key, entry)
+            if resolved_page != page_number:
+                self._cache_set(self._page_key(dni, version, resolved_page), entry)
+            page_number = resolved_page
+
+        return self._to_results(rows), total, page_number, self._num_pages(total)
+
+    def _fetch_page(self, dni: str, page_number: int) -> Tuple[List[tuple], int, int]:
+        """Obtiene la página con LIMIT/OFFSET y el total en una sola consulta"""
+        from certificates.models import CertificateLookup
+
+        queryset = (
+            CertificateLookup.objects.filter(dni=dni)
+            .annotate(total=Window(expression=Count("certificate")))
+            .order_by("-generated_at", "-certificate")
+            .values_list(*ROW_FIELDS, "total")
+        )
+
+        offset = (page_number - 1) * self.PAGE_SIZE
+        rows = list(queryset[offset:offset + self.PAGE_SIZE])
+        if rows:
+            return [self._compact_row(row[:-1]) for row in rows], rows[0][-1], page_number
+
+        if page_number == 1:
+            return [], 0, 1
+
+        # Página fuera de rango: mostrar la última
+        total = CertificateLookup.objects.filter(dni=dni).count()
+        if total == 0:
+            return [], 0, 1
+        return self._fetch_page(dni, self._num_pages(total))
+
+    def _num_pages(self, total: int) -> int:
+        return max(1, -(-total // self.PAGE_SIZE))
+
+    @staticmethod
+    def _compact_row(row: tuple) -> tuple:
+        """Agrega las URLs públicas a la fila (se calculan una sola vez)"""
+        cert_uuid = row[0]
+        return row + (
+            reverse("certificates:download", kwargs={"uuid": cert_uuid}),
+            reverse("certificates:verify", kwargs={"uuid": cert_uuid}),
+        )
+
+    @staticmethod
+    def _to_results(rows: Iterable[tuple]) -> List[CertificateResult]:
+        """Convierte las tuplas cacheadas en objetos de solo lectura para la plantilla"""
+        results = []
+        for (
+            cert_uuid, full_name, dni, attendee_type, event_name, event_date,
+            is_signed, is_external, external_url, download_url, verify_url,
+        ) in rows:
+            results.append(CertificateResult(
+                uuid=cert_uuid,
+                participant=ParticipantResult(
+                    full_name=full_name,
+                    dni=dni,
+                    attendee_type=attendee_type,
+                    event=EventResult(name=event_name, event_date=event_date),
+                ),
+                is_signed=is_signed,
+                is_external=is_external,
+                external_url=external_url,
+                download_url=download_url,
+                verify_url=verify_url,
+            ))
+        return results
+
+    # ------------------------------------------------------------------
+    # Invalidación
+    # ------------------------------------------------------------------
+
+    def _get_version(self, dni: str) -> str:
+        version = self._cache_get(self._version_key(dni))
+        if version is None:
+            version = uuid_lib.uuid4().hex
+            # add(): si otro proceso la creó primero, usar la suya
+            try:
+                if not cache.add(self._version_key(dni), version, self.timeout):
+                    version = cache.get(self._version_key(dni)) or version
+            except Exception as e:
+                logger.warning(f"Cache de consultas no disponible: {str(e)}")
+        return version
+
+    def invalidate(self, dni: str) -> None:
+        """Descarta los resultados cacheados de un DNI"""
+        self.invalidate_many([dni])
+
+    def invalidate_many(self, dnis: Iterable[str]) -> None:
+        """
+        Descarta los resultados cacheados de varios DNI
+
+        Se invalida de inmediato y otra vez al confirmar la transacción: una
+        consulta concurrente podría haber cacheado los datos previos al commit.
+        """
+        dnis = {dni for dni in dnis if dni}
+        if not dnis or not self.enabled:
+            return
+        self._bump_versions(dnis)
+        transaction.on_commit(lambda: self._bump_versions(dnis))
+
+    def _bump_versions(self, dnis) -> None:
+        try:
+            cache.set_many(
+                {self._version_key(dni): uuid_lib.uuid4().hex for dni in dnis}, self.timeout
+            )
+        except Exception as e:
+            logger.warning(f"No se pudo invalidar la cache de consultas: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def _count(self, name: str) -> None:
+        key = self._counter_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 0, None)
+            try:
+                cache.incr(key)
+            except Exception:
+                pass
+        except Exception as e:
+            logger.debug(f"No se pudo actualizar el contador {name}: {str(e)}")
+
+    def stats(self) -> dict:
+        """
+        Contadores de aciertos y fallos de la cache (compartidos entre procesos)
+
+        Returns:
+            Diccionario con hits, misses y hit_rate (porcentaje)
+        """
+        try:
+            values = cache.get_many([self._counter_key("hits"), self._counter_key("misses")])
+        except Exception:
+            values = {}
+        hits = values.get(self._counter_key("hits"), 0)
+        misses = values.get(self._counter_key("misses"), 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits * 100 / total, 1) if total else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        """Reinicia los contadores de aciertos y fallos"""
+        cache.delete_many([self._counter_key("hits"), self._counter_key("misses")])
+
+    # ------------------------------------------------------------------
+    # Acceso tolerante a fallos de la cache
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, key: str):
+        try:
+            return cache.get(key)
+        except Exception as e:
+            logger.warning(f"Cache de consultas no disponible: {str(e)}")
+            return None
+
+    def _cache_set(self, key: str, value) -> None:
+        try:
+            cache.set(key, value, self.timeout)
+        except Exception as e:
+            logger.warning(f"Cache de consultas no disponible: {str(e)}")
+
+
+# Instancia compartida por las vistas y las señales
+certificate_query_cache = CertificateQueryCache()
@@ -0,0 +1,286 @@
+"""
+Filtro de pertenencia (Bloom) de los UUID de certificados en memoria.
+
+La verificación por QR consulta el filtro antes de la base de datos: si el
+UUID no está en el filtro, el certificado no existe y se responde 404 sin
+consultar la base de datos ni escribir un AuditLog. Un Bloom filter no tiene
+falsos negativos; sus falsos positivos (CERTIFICATE_UUID_FILTER_ERROR_RATE)
+solo hacen que la vista consulte la base de datos como antes.
+
+Cada proceso carga el filtro al iniciar (hook post_worker_init de Gunicorn)
+o con la primera consulta. Los certificados nuevos se agregan en el proceso
+que los crea y, al confirmarse la transacción, publican un token de cambios
+nuevo en la cache compartida; ante una respuesta negativa, los demás
+procesos comparan ese token y, si cambió o no está en la cache (expulsado),
+cargan los certificados generados desde la última carga (con un margen para
+transacciones confirmadas tarde). El filtro se reconstruye completo cada
+CERTIFICATE_UUID_FILTER_REBUILD_SECONDS o al superar su capacidad; los
+certificados eliminados permanecen hasta entonces.
+
+El token requiere una cache compartida entre procesos (Redis): con
+LocMemCache cada worker solo ve sus propios cambios y los certificados
+creados en otro worker se responden 404 hasta la siguiente reconstrucción.
+
+Los intentos con UUID inexistente se suman en memoria y se escriben cada
+cierto tiempo en AuditLogCounter (acción VERIFY), en lugar de un AuditLog
+por intento.
+"""
+import atexit
+import hashlib
+import logging
+import math
+import threading
+import time
+import uuid as uuid_lib
+from collections import Counter
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from certificates.services.audit_counters import audit_counters
+
+logger = logging.getLogger("certificates")
+
+
+class BloomFilter:
+    """Bloom filter de tamaño fijo sobre valores de 128 bits (UUID)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: uuid_lib.UUID):
+        # Doble hash (Kirsch-Mitzenmacher) a partir de un digest de 128 bits
+        digest = hashlib.blake2b(value.bytes, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, value: uuid_lib.UUID) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: uuid_lib.UUID) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class CertificateUUIDFilter:
+    """UUID de certificados existentes, para descartar verificaciones inexistentes sin la BD"""
+
+    CHANGES_KEY = "certificate_uuid_filter:changes"
+    # Los certificados generados en este margen antes de la última carga se vuelven a leer
+    REFRESH_MARGIN = timedelta(minutes=10)
+    LOAD_CHUNK_SIZE = 10000
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self._enabled = enabled
+        self._filter: Optional[BloomFilter] = None
+        self._changes = None
+        self._loaded_at = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+        self._misses: Counter = Counter()
+        self._misses_lock = threading.Lock()
+        self._misses_flushed_at = time.monotonic()
+        self._atexit_registered = False
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is not None:
+            return self._enabled
+        return getattr(settings, "CERTIFICATE_UUID_FILTER_ENABLED", True)
+
+    @property
+    def error_rate(self) -> float:
+        return getattr(settings, "CERTIFICATE_UUID_FILTER_ERROR_RATE", 0.001)
+
+    @property
+    def rebuild_seconds(self) -> int:
+        return getattr(settings, "CERTIFICATE_UUID_FILTER_REBUILD_SECONDS", 3600)
+
+    @property
+    def miss_flush_seconds(self) -> float:
+        return getattr(settings, "CERTIFICATE_UUID_FILTER_MISS_FLUSH_SECONDS", 60.0)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def might_exist(self, certificate_uuid) -> bool:
+        """
+        False solo si el certificado con ese UUID seguro no existe
+
+        Con el filtro desactivado o sin poder cargarlo, siempre retorna True.
+        """
+        if not self.enabled:
+            return True
+        try:
+            value = certificate_uuid if isinstance(certificate_uuid, uuid_lib.UUID) else uuid_lib.UUID(str(certificate_uuid))
+        except ValueError:
+            return False
+
+        try:
+            if self._filter is None:
+                self.load()
+            if value in self._filter:
+                return True
+            # Antes de descartar, incorporar los certificados creados en otros procesos
+            if self._refresh_if_changed():
+                return value in self._filter
+            return False
+        except Exception as e:
+            logger.warning(f"Filtro de UUID de certificados no disponible: {str(e)}")
+            return True
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+
+    def load(self) -> int:
+        """
+        Construye el filtro con todos los UUID de certificados
+
+        Returns:
+            Número de UUID cargados
+        """
+        from certificates.models import Certificate
+
+        with self._lock:
+            changes = self._get_changes()
+            loaded_at = timezone.now()
+            total = Certificate.objects.count()
+            bloom = BloomFilter(max(total * 2, 10000), self.error_rate)
+            for value in Certificate.objects.values_list('uuid', flat=True).iterator(chunk_size=self.LOAD_CHUNK_SIZE):
+                bloom.add(value)
+            self._filter = bloom
+            self._changes = changes
+            self._loaded_at = loaded_at
+            self._built_at = time.monotonic()
+
+        logger.info(f"Filtro de UUID de certificados cargado: {bloom.count} certificados")
+        return bloom.count
+
+    def _refresh_if_changed(self) -> bool:
+        """Carga los certificados nuevos si el contador cambió; True si se actualizó"""
+        from certificates.models import Certificate
+
+        if time.monotonic() - self._built_at > self.rebuild_seconds:
+            self.load()
+            return True
+
+        changes = self._get_changes()
+        # Sin token (cache caída) no se puede saber si hubo cambios: se recarga
+        if changes is not None and changes == self._changes:
+            return False
+
+        with self._lock:
+            loaded_at = timezone.now()
+            new_uuids = Certificate.objects.filter(
+                generated_at__gte=self._loaded_at - self.REFRESH_MARGIN
+            ).values_list('uuid', flat=True)
+            for value in new_uuids:
+                self._filter.add(value)
+            self._changes = changes
+            self._loaded_at = loaded_at
+            over_capacity = self._filter.count > self._filter.capacity
+
+        if over_capacity:
+            self.load()
+        return True
+
+    def _get_changes(self):
+        """Token de cambios actual; si la cache lo perdió, publica uno nuevo"""
+        try:
+            changes = cache.get(self.CHANGES_KEY)
+            if changes is None:
+                # Un token nuevo (no un contador reiniciado) obliga a todos a recargar
+                cache.add(self.CHANGES_KEY, uuid_lib.uuid4().hex, None)
+                changes = cache.get(self.CHANGES_KEY)
+            return changes
+        except Exception as e:
+            logger.warning(f"Cache no disponible para el filtro de UUID: {str(e)}")
+            return None
+
+    def _publish_change(self) -> None:
+        try:
+            cache.set(self.CHANGES_KEY, uuid_lib.uuid4().hex, None)
+        except Exception as e:
+            logger.warning(f"No se pudo publicar el token del filtro de UUID: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Altas
+    # ------------------------------------------------------------------
+
+    def add_many(self, uuids: Iterable) -> None:
+        """
+        Registra certificados recién creados
+
+        Se agregan al filtro de este proceso y, al confirmarse la
+        transacción, se publica un token de cambios nuevo para que los demás
+        procesos los carguen (antes del commit no verían las filas).
+        """
+        if not self.enabled:
+            return
+        uuids = [value for value in uuids if value]
+        if not uuids:
+            return
+        with self._lock:
+            if self._filter is not None:
+                for value in uuids:
+                    self._filter.add(value if isinstance(value, uuid_lib.UUID) else uuid_lib.UUID(str(value)))
+        transaction.on_commit(self._publish_change)
+
+    # ------------------------------------------------------------------
+    # Intentos con UUID inexistente
+    # ------------------------------------------------------------------
+
+    def record_miss(self) -> None:
+        """Suma un intento de verificación inexistente (se escribe por lotes)"""
+        day, hour = audit_counters.bucket(timezone.now())
+        with self._misses_lock:
+            self._misses[('VERIFY', day, hour)] += 1
+            due = time.monotonic() - self._misses_flushed_at >= self.miss_flush_seconds
+            if not self._atexit_registered:
+                atexit.register(self.flush_misses)
+                self._atexit_registered = True
+        if due:
+            self.flush_misses()
+
+    def pending_misses(self) -> int:
+        with self._misses_lock:
+            return sum(self._misses.values())
+
+    def flush_misses(self) -> int:
+        """
+        Escribe en AuditLogCounter los intentos acumulados
+
+        Returns:
+            Número de intentos escritos
+        """
+        with self._misses_lock:
+            counts, self._misses = self._misses, Counter()
+            self._misses_flushed_at = time.monotonic()
+        if not counts:
+            return 0
+        try:
+            audit_counters.add(counts)
+        except Exception as e:
+            logger.warning(f"No se pudieron escribir los intentos de verificación inexistentes: {str(e)}")
+            with self._misses_lock:
+                self._misses.update(counts)
+            return 0
+        return sum(counts.values())
+
+
+# Instancia compartida por la vista de verificación, las señales y Gunicorn
+certificate_uuid_filter = CertificateUUIDFilter()
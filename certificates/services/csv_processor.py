@@ -187,6 +187,10 @@ class CSVProcessorService:
         """
         Procesa un archivo CSV completo y crea participantes
         
+        Las filas válidas se importan por conjuntos (ParticipantBulkImporter)
+        en una sola transacción. Si la importación masiva falla, se reintenta
+        fila por fila para reportar el error de cada fila.
+        
         Args:
             file: Archivo CSV a procesar
             user: Usuario que realiza la importación (opcional)
@@ -194,7 +198,8 @@ class CSVProcessorService:
         Returns:
             Diccionario con resultados
         """
-        from certificates.models import Event, Participant, AuditLog
+        from certificates.models import AuditLog
+        from certificates.services.bulk_import import ParticipantBulkImporter
         
         # Validar archivo primero
         is_valid, messages, validated_rows = self.validate_file(file)
@@ -211,47 +216,19 @@ class CSVProcessorService:
         error_count = 0
         errors = []
         
+        rows = [
+            dict(row_result['data'], row_number=row_result['row_number'])
+            for row_result in validated_rows
+            if row_result['valid']
+        ]
+        
         try:
-            # Procesar cada fila validada
-            for row_result in validated_rows:
-                if not row_result['valid']:
-                    continue
-                
-                try:
-                    data = row_result['data']
-                    
-                    # Crear o obtener el evento
-                    event, created = Event.objects.get_or_create(
-                        name=data['event_name'],
-                        event_date=data['event_date'],
-                        defaults={'description': ''}
-                    )
-                    
-                    if created:
-                        logger.info(f"Evento creado: {event.name} - {event.event_date}")
-                    
-                    # Crear o actualizar el participante
-                    participant, created = Participant.objects.update_or_create(
-                        dni=data['dni'],
-                        event=event,
-                        defaults={
-                            'full_name': data['full_name'],
-                            'attendee_type': data['attendee_type']
-                        }
-                    )
-                    
-                    if created:
-                        logger.info(f"Participante creado: {participant.full_name} ({participant.dni})")
-                    else:
-                        logger.info(f"Participante actualizado: {participant.full_name} ({participant.dni})")
-                    
-                    success_count += 1
-                    
-                except Exception as e:
-                    error_count += 1
-                    error_msg = f"Fila {row_result['row_number']}: Error al procesar - {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
+            try:
+                result = ParticipantBulkImporter().import_rows(rows)
+                success_count = result['success_count']
+            except Exception as e:
+                logger.warning(f"Importación masiva CSV fallida, procesando fila por fila: {str(e)}")
+                success_count, error_count, errors = self._process_rows_individually(rows)
             
             # Registrar en auditoría
             AuditLog.objects.create(
@@ -279,3 +256,40 @@ class CSVProcessorService:
             'error_count': error_count,
             'errors': errors
         }
+    
+    def _process_rows_individually(self, rows: List[Dict]) -> Tuple[int, int, List[str]]:
+        """
+        Importa las filas una por una (ruta de respaldo de la importación masiva)
+        
+        Returns:
+            Tuple con (éxitos, errores, lista_de_errores)
+        """
+        from certificates.models import Event, Participant
+        
+        success_count = 0
+        error_count = 0
+        errors = []
+        
+        for data in rows:
+            try:
+                event, _ = Event.objects.get_or_create(
+                    name=data['event_name'],
+                    event_date=data['event_date'],
+                    defaults={'description': ''}
+                )
+                Participant.objects.update_or_create(
+                    dni=data['dni'],
+                    event=event,
+                    defaults={
+                        'full_name': data['full_name'],
+                        'attendee_type': data['attendee_type']
+                    }
+                )
+                success_count += 1
+            except Exception as e:
+                error_count += 1
+                error_msg = f"Fila {data['row_number']}: Error al procesar - {str(e)}"
+                errors.append(error_msg)
+                logger.error(error_msg)
+        
+        return success_count, error_count, errors
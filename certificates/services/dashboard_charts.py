@@ -0,0 +1,200 @@
+"""
+Datos de los gráficos del dashboard (API /admin/certificates/dashboard/charts/).
+
+Cada gráfico se calcula con una sola consulta agrupada (meses o días sin
+datos se completan en Python) y el JSON se cachea por tipo de gráfico con
+stale-while-revalidate.
+"""
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from certificates.models import Certificate, Event, Participant
+from certificates.services.audit_counters import audit_counters
+from certificates.services.stale_cache import StaleWhileRevalidateCache
+
+
+ATTENDEE_TYPE_LABELS = {
+    'ASISTENTE': 'Asistentes',
+    'PONENTE': 'Ponentes',
+    'ORGANIZADOR': 'Organizadores',
+}
+
+ATTENDEE_TYPE_COLORS = [
+    'rgba(255, 99, 132, 0.8)',
+    'rgba(54, 162, 235, 0.8)',
+    'rgba(255, 205, 86, 0.8)',
+    'rgba(75, 192, 192, 0.8)',
+]
+
+
+class DashboardChartService:
+    """Construye y cachea los datos (formato Chart.js) de cada gráfico"""
+
+    CACHE_PREFIX = 'dashboard_chart'
+    CHART_TYPES = (
+        'certificates_by_month',
+        'events_by_month',
+        'verifications_by_day',
+        'attendee_types',
+        'signature_status',
+    )
+
+    def __init__(self, background: bool = True):
+        self.cache = StaleWhileRevalidateCache(
+            self.CACHE_PREFIX,
+            fresh_ttl=getattr(settings, 'DASHBOARD_CHART_CACHE_TTL', 60),
+            stale_ttl=getattr(settings, 'DASHBOARD_CHART_STALE_TTL', 600),
+            background=background,
+        )
+
+    def get_chart(self, chart_type: str) -> Optional[Dict]:
+        """
+        Retorna los datos del gráfico (cacheados) o None si el tipo no existe
+        """
+        if chart_type not in self.CHART_TYPES:
+            return None
+        return self.cache.get_or_compute(chart_type, getattr(self, chart_type))
+
+    def clear_cache(self):
+        """Descarta los datos cacheados de todos los gráficos"""
+        self.cache.delete(*self.CHART_TYPES)
+
+    # ------------------------------------------------------------------
+    # Gráficos
+    # ------------------------------------------------------------------
+
+    def certificates_by_month(self) -> Dict:
+        """Certificados generados por mes (últimos 12 meses)"""
+        months = self._last_months()
+        counts = self._count_by_month(Certificate.objects, 'generated_at', months[0])
+
+        return {
+            'labels': [month.strftime('%b %Y') for month in months],
+            'datasets': [{
+                'label': 'Certificados Generados',
+                'data': [counts.get((month.year, month.month), 0) for month in months],
+                'backgroundColor': 'rgba(54, 162, 235, 0.2)',
+                'borderColor': 'rgba(54, 162, 235, 1)',
+                'borderWidth': 2,
+                'fill': True
+            }]
+        }
+
+    def events_by_month(self) -> Dict:
+        """Eventos creados por mes (últimos 12 meses)"""
+        months = self._last_months()
+        counts = self._count_by_month(Event.objects, 'created_at', months[0])
+
+        return {
+            'labels': [month.strftime('%b %Y') for month in months],
+            'datasets': [{
+                'label': 'Eventos Creados',
+                'data': [counts.get((month.year, month.month), 0) for month in months],
+                'backgroundColor': 'rgba(255, 99, 132, 0.2)',
+                'borderColor': 'rgba(255, 99, 132, 1)',
+                'borderWidth': 2,
+                'fill': True
+            }]
+        }
+
+    def verifications_by_day(self) -> Dict:
+        """Verificaciones de certificados por día (últimos 30 días)"""
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=30)
+        verifications = audit_counters.by_day('VERIFY', start_date, end_date)
+
+        days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+        return {
+            'labels': [day.strftime('%d/%m') for day in days],
+            'datasets': [{
+                'label': 'Verificaciones',
+                'data': [verifications.get(day, 0) for day in days],
+                'backgroundColor': 'rgba(75, 192, 192, 0.2)',
+                'borderColor': 'rgba(75, 192, 192, 1)',
+                'borderWidth': 2,
+                'fill': True
+            }]
+        }
+
+    def attendee_types(self) -> Dict:
+        """Distribución por tipo de asistente"""
+        stats = Participant.objects.values('attendee_type').annotate(
+            count=Count('id')
+        ).order_by('-count')
+
+        labels = []
+        data = []
+        for stat in stats:
+            labels.append(ATTENDEE_TYPE_LABELS.get(stat['attendee_type'], stat['attendee_type']))
+            data.append(stat['count'])
+
+        return {
+            'labels': labels,
+            'datasets': [{
+                'data': data,
+                'backgroundColor': ATTENDEE_TYPE_COLORS[:len(data)],
+                'borderWidth': 2
+            }]
+        }
+
+    def signature_status(self) -> Dict:
+        """Estado de firma de certificados"""
+        counts = Certificate.objects.aggregate(
+            signed=Count('id', filter=Q(is_signed=True)),
+            unsigned=Count('id', filter=Q(is_signed=False)),
+        )
+
+        return {
+            'labels': ['Firmados Digitalmente', 'Sin Firma'],
+            'datasets': [{
+                'data': [counts['signed'], counts['unsigned']],
+                'backgroundColor': [
+                    'rgba(40, 167, 69, 0.8)',
+                    'rgba(220, 53, 69, 0.8)'
+                ],
+                'borderWidth': 2
+            }]
+        }
+
+    # ------------------------------------------------------------------
+    # Utilidades
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _last_months() -> List:
+        """Inicio (hora local) de cada mes desde hace un año hasta el mes actual"""
+        now = timezone.localtime()
+        month = (now - timedelta(days=365)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        months = []
+        while (month.year, month.month) <= (now.year, now.month):
+            months.append(month)
+            month = timezone.make_aware(
+                (month.replace(tzinfo=None) + timedelta(days=32)).replace(day=1)
+            )
+        return months
+
+    @staticmethod
+    def _count_by_month(manager, field: str, since) -> Dict:
+        """Conteo agrupado por mes (una consulta) indexado por (año, mes)"""
+        rows = (
+            manager.filter(**{f'{field}__gte': since})
+            .annotate(month=TruncMonth(field))
+            .values('month')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        return {
+            (row['month'].year, row['month'].month): row['count']
+            for row in rows
+            if row['month']
+        }
+
+
+# Instancia compartida por las vistas del dashboard
+dashboard_charts = DashboardChartService()
@@ -0,0 +1,155 @@
+"""
+Contadores baratos del dashboard (totales de certificados, eventos y
+participantes) mantenidos de forma incremental en la cache.
+
+Las señales de Certificate, Event y Participant aplican la variación de
+cada cambio con cache.incr/decr al confirmarse la transacción, así el
+dashboard refleja los totales sin esperar a que venza el cálculo pesado.
+Las operaciones masivas (bulk_create, bulk_update, queryset.update) no
+emiten señales: llaman a `invalidate()` y los contadores se recalculan con
+tres consultas agregadas en la siguiente lectura. DASHBOARD_COUNTERS_TIMEOUT limita
+cuánto puede durar cualquier desviación que se escape a ambos mecanismos.
+"""
+import logging
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from certificates.models import Certificate, Event, Participant
+
+logger = logging.getLogger("certificates")
+
+
+class DashboardCounterService:
+    """Totales del dashboard actualizados por variación en lugar de recalculados"""
+
+    CACHE_PREFIX = 'dashboard_counter'
+    NAMES = (
+        'certificates_total',
+        'certificates_signed',
+        'certificates_unsigned',
+        'certificates_internal',
+        'certificates_external',
+        'events',
+        'participants',
+    )
+
+    def __init__(self, timeout: Optional[int] = None):
+        self.timeout = (
+            timeout if timeout is not None
+            else getattr(settings, 'DASHBOARD_COUNTERS_TIMEOUT', 3600)
+        )
+
+    def _key(self, name: str) -> str:
+        return f"{self.CACHE_PREFIX}:{name}"
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def get(self) -> Dict[str, int]:
+        """
+        Retorna todos los contadores; si falta alguno se recalculan desde la
+        base de datos y se vuelven a sembrar
+        """
+        keys = {self._key(name): name for name in self.NAMES}
+        try:
+            cached = cache.get_many(list(keys))
+        except Exception as e:
+            logger.warning(f"Cache no disponible (contadores del dashboard): {str(e)}")
+            return self.compute()
+
+        if len(cached) == len(keys):
+            return {keys[key]: value for key, value in cached.items()}
+        return self.rebuild()
+
+    def compute(self) -> Dict[str, int]:
+        """Calcula los contadores con consultas agregadas (tres consultas)"""
+        certificates = Certificate.objects.aggregate(
+            total=Count('id'),
+            signed=Count('id', filter=Q(is_signed=True)),
+            unsigned=Count('id', filter=Q(is_signed=False)),
+            internal=Count('id', filter=Q(is_external=False)),
+            external=Count('id', filter=Q(is_external=True)),
+        )
+        return {
+            'certificates_total': certificates['total'] or 0,
+            'certificates_signed': certificates['signed'] or 0,
+            'certificates_unsigned': certificates['unsigned'] or 0,
+            'certificates_internal': certificates['internal'] or 0,
+            'certificates_external': certificates['external'] or 0,
+            'events': Event.objects.count(),
+            'participants': Participant.objects.count(),
+        }
+
+    def rebuild(self) -> Dict[str, int]:
+        """Recalcula los contadores y los guarda en la cache"""
+        counters = self.compute()
+        try:
+            cache.set_many(
+                {self._key(name): value for name, value in counters.items()},
+                self.timeout,
+            )
+        except Exception as e:
+            logger.warning(f"No se pudieron guardar los contadores del dashboard: {str(e)}")
+        return counters
+
+    def invalidate(self) -> None:
+        """
+        Descarta los contadores (tras operaciones masivas sin señales)
+
+        Se descartan de inmediato y otra vez al confirmarse la transacción,
+        para que una lectura concurrente no los vuelva a sembrar con los
+        datos anteriores al cambio.
+        """
+        self._delete()
+        transaction.on_commit(self._delete)
+
+    def _delete(self) -> None:
+        try:
+            cache.delete_many([self._key(name) for name in self.NAMES])
+        except Exception as e:
+            logger.warning(f"No se pudieron descartar los contadores del dashboard: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Variaciones
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def certificate_deltas(is_signed: bool, is_external: bool, sign: int = 1) -> Dict[str, int]:
+        """Variación de los contadores al agregar (sign=1) o quitar (-1) un certificado"""
+        return {
+            'certificates_total': sign,
+            'certificates_signed' if is_signed else 'certificates_unsigned': sign,
+            'certificates_external' if is_external else 'certificates_internal': sign,
+        }
+
+    def apply(self, deltas: Dict[str, int]) -> None:
+        """
+        Aplica las variaciones al confirmarse la transacción en curso
+
+        Un contador ausente no se crea: la siguiente lectura lo recalcula
+        completo, incluida esta variación.
+        """
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if deltas:
+            transaction.on_commit(lambda: self._apply_now(deltas))
+
+    def _apply_now(self, deltas: Dict[str, int]) -> None:
+        for name, delta in deltas.items():
+            try:
+                cache.incr(self._key(name), delta)
+            except ValueError:
+                # Contador ausente (vencido o invalidado)
+                pass
+            except Exception as e:
+                logger.warning(f"No se pudo actualizar el contador {name}: {str(e)}")
+                self._delete()
+                return
+
+
+# Instancia compartida por señales, servicios y el dashboard
+dashboard_counters = DashboardCounterService()
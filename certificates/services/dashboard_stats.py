@@ -4,12 +4,16 @@ Servicio para calcular estadísticas del dashboard de administración.
 import logging
 import time
 from datetime import timedelta
+from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Count, Q, Avg
-from django.db.models.functions import TruncMonth, TruncDate
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
 
-from certificates.models import Certificate, AuditLog, CertificateTemplate, Event, Participant
+from certificates.models import AuditLogCounter, Certificate, CertificateTemplate, Event, Participant
+from certificates.services.audit_counters import audit_counters
+from certificates.services.dashboard_counters import dashboard_counters
+from certificates.services.stale_cache import StaleWhileRevalidateCache
 
 logger = logging.getLogger(__name__)
 
@@ -18,43 +22,83 @@ class DashboardStatsService:
     """Servicio para calcular estadísticas del dashboard"""
     
     CACHE_KEY = 'dashboard_stats'
-    CACHE_TTL = 300  # 5 minutos
+    CACHE_TTL = 300  # 5 minutos (vigencia; luego se sirve vencido y se recalcula)
     
+    def __init__(self, background: bool = True):
+        # Parte pesada (gráficos por mes/día, plantillas): stale-while-revalidate
+        # con recálculo anticipado; un solo proceso recalcula a la vez
+        self.cache = StaleWhileRevalidateCache(
+            self.CACHE_KEY,
+            fresh_ttl=self.CACHE_TTL,
+            stale_ttl=getattr(settings, 'DASHBOARD_STATS_STALE_TTL', 3600),
+            background=background,
+            miss_wait=getattr(settings, 'DASHBOARD_STATS_MISS_WAIT', 10),
+        )
+
     def get_dashboard_stats(self) -> dict:
         """
         Obtiene todas las estadísticas del dashboard.
-        Usa caché para optimizar rendimiento.
+        
+        La parte pesada se sirve desde caché (aunque esté vencida, mientras
+        otro proceso la recalcula) y los totales se toman de los contadores
+        que las señales mantienen al día.
         
         Returns:
             dict: Diccionario con todas las estadísticas
         """
-        start_time = time.time()
-        
         try:
-            # Intentar obtener del caché
-            cached_stats = cache.get(self.CACHE_KEY)
-            if cached_stats:
-                logger.info("Dashboard stats loaded from cache")
-                return cached_stats
-            
-            # Calcular estadísticas
-            logger.info("Calculating dashboard stats...")
-            stats = self._calculate_all_stats()
-            
-            # Guardar en caché
-            cache.set(self.CACHE_KEY, stats, self.CACHE_TTL)
-            cache.set(f'{self.CACHE_KEY}_timestamp', timezone.now(), self.CACHE_TTL)
-            
-            elapsed = time.time() - start_time
-            logger.info(f"Dashboard stats calculated in {elapsed:.2f}s")
-            
-            return stats
+            stats = self.cache.get_or_compute('', self._compute_cached_stats)
+            return self._with_counters(stats, dashboard_counters.get())
             
         except Exception as e:
             logger.error(f"Error calculating dashboard stats: {e}", exc_info=True)
             # Retornar estadísticas vacías en caso de error
             return self._get_empty_stats()
     
+    def _compute_cached_stats(self) -> dict:
+        """Calcula las estadísticas que se guardan en caché"""
+        start_time = time.time()
+        logger.info("Calculating dashboard stats...")
+        stats = self._calculate_all_stats()
+        
+        cache.set(
+            f'{self.CACHE_KEY}_timestamp',
+            timezone.now(),
+            self.cache.fresh_ttl + self.cache.stale_ttl,
+        )
+        
+        elapsed = time.time() - start_time
+        logger.info(f"Dashboard stats calculated in {elapsed:.2f}s")
+        return stats
+    
+    @staticmethod
+    def _with_counters(stats: dict, counters: dict) -> dict:
+        """Reemplaza los totales de las estadísticas cacheadas por los contadores"""
+        certificates_total = counters['certificates_total']
+        events_count = counters['events']
+        
+        avg_certs = 0
+        if events_count > 0:
+            avg_certs = certificates_total / events_count
+        
+        return {
+            **stats,
+            'certificates': {
+                **stats['certificates'],
+                'total': certificates_total,
+                'signed': counters['certificates_signed'],
+                'unsigned': counters['certificates_unsigned'],
+                'internal': counters['certificates_internal'],
+                'external': counters['certificates_external'],
+            },
+            'quick_stats': {
+                **stats['quick_stats'],
+                'events_count': events_count,
+                'participants_count': counters['participants'],
+                'avg_certificates_per_event': round(avg_certs, 1),
+            },
+        }
+    
     def _calculate_all_stats(self) -> dict:
         """Calcula todas las estadísticas del dashboard"""
         return {
@@ -94,27 +138,23 @@ class DashboardStatsService:
 
     def _calculate_query_stats(self) -> dict:
         """
-        Calcula estadísticas de consultas.
+        Calcula estadísticas de consultas (desde AuditLogCounter).
         
         Returns:
             dict: Estadísticas de consultas
         """
-        # Total de consultas
-        total_queries = AuditLog.objects.filter(action_type='QUERY').count()
-        
-        # Consultas de hoy
-        today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_queries = AuditLog.objects.filter(
-            action_type='QUERY',
-            timestamp__gte=today_start
-        ).count()
+        today = timezone.localdate()
+        query_counts = AuditLogCounter.objects.filter(action_type='QUERY').aggregate(
+            total=Sum('count'),
+            today=Sum('count', filter=Q(date=today)),
+        )
         
         # Consultas por día (últimos 7 días)
         by_day = self._get_queries_by_day(days=7)
         
         return {
-            'total': total_queries,
-            'today': today_queries,
+            'total': query_counts['total'] or 0,
+            'today': query_counts['today'] or 0,
             'by_day': by_day,
         }
     
@@ -219,28 +259,18 @@ class DashboardStatsService:
         Returns:
             list: Lista de diccionarios con fecha y conteo
         """
-        days_ago = timezone.now() - timedelta(days=days)
-        
-        queries_by_day = AuditLog.objects.filter(
-            action_type='QUERY',
-            timestamp__gte=days_ago
-        ).annotate(
-            date=TruncDate('timestamp')
-        ).values('date').annotate(
-            count=Count('id')
-        ).order_by('date')
+        start_date = timezone.localdate() - timedelta(days=days)
+        queries_by_day = audit_counters.by_day('QUERY', start_date)
         
         # Formatear resultados
-        result = []
-        for item in queries_by_day:
-            if item['date']:
-                result.append({
-                    'date': item['date'].strftime('%Y-%m-%d'),
-                    'date_label': item['date'].strftime('%d/%m'),
-                    'count': item['count']
-                })
-        
-        return result
+        return [
+            {
+                'date': day.strftime('%Y-%m-%d'),
+                'date_label': day.strftime('%d/%m'),
+                'count': count
+            }
+            for day, count in queries_by_day.items()
+        ]
     
     def _get_empty_stats(self) -> dict:
         """
@@ -276,7 +306,8 @@ class DashboardStatsService:
         }
     
     def clear_cache(self):
-        """Limpia el caché de estadísticas"""
-        cache.delete(self.CACHE_KEY)
+        """Limpia el caché de estadísticas y los contadores (se recalculan al leer)"""
+        self.cache.delete('')
         cache.delete(f'{self.CACHE_KEY}_timestamp')
+        dashboard_counters.invalidate()
         logger.info("Dashboard stats cache cleared")
@@ -1,26 +1,169 @@
 """Servicio para firma digital de certificados"""
+import random
+import threading
 import requests
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from django.conf import settings
 from django.core.files.base import ContentFile
+from requests.adapters import HTTPAdapter
 import logging
 
 logger = logging.getLogger("certificates.signature")
 
 
+class SignatureServiceUnavailable(Exception):
+    """El circuito está abierto: el servicio de firma no responde"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker para el servicio de firma
+
+    Tras `failure_threshold` fallos consecutivos de comunicación (timeouts,
+    errores de conexión o respuestas 5xx) el circuito se abre y las
+    peticiones se rechazan sin llamar al servicio. Pasados `reset_timeout`
+    segundos se permite una petición de prueba: si tiene éxito el circuito
+    se cierra, si falla vuelve a abrirse. Es seguro entre hilos.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """Indica si se puede llamar al servicio (una sola prueba en half-open)"""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logger.error(
+                        f"Circuito de firma abierto tras {self._failures} fallos consecutivos"
+                    )
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release_probe(self) -> None:
+        """Libera la prueba en half-open sin cambiar el estado (error ajeno al servicio)"""
+        with self._lock:
+            self._probing = False
+
+
 class DigitalSignatureService:
     """Servicio para firmar certificados digitalmente usando servicio externo"""
 
     MAX_RETRIES = 3
-    RETRY_DELAY = 2  # segundos
+    RETRY_DELAY = 2  # segundos (base del backoff exponencial)
+    MAX_RETRY_DELAY = 30  # segundos
+
+    def __init__(self, concurrency=None):
+        """
+        Inicializa el servicio con configuración desde settings
 
-    def __init__(self):
-        """Inicializa el servicio con configuración desde settings"""
+        Args:
+            concurrency: Firmas simultáneas en sign_bulk_certificates (por
+                defecto settings.SIGNATURE_CONCURRENCY)
+        """
         self.signature_service_url = getattr(
             settings, "SIGNATURE_SERVICE_URL", "http://localhost:8080/api/sign"
         )
         self.signature_api_key = getattr(settings, "SIGNATURE_API_KEY", "")
-        self.timeout = 30  # segundos
+        self.timeout = getattr(settings, "SIGNATURE_TIMEOUT", 30)  # segundos
+        self.max_retries = max(1, getattr(settings, "SIGNATURE_MAX_RETRIES", self.MAX_RETRIES))
+        self.retry_delay = getattr(settings, "SIGNATURE_RETRY_DELAY", self.RETRY_DELAY)
+        self.max_retry_delay = getattr(settings, "SIGNATURE_RETRY_MAX_DELAY", self.MAX_RETRY_DELAY)
+        if concurrency is None:
+            concurrency = getattr(settings, "SIGNATURE_CONCURRENCY", 4)
+        self.concurrency = max(1, int(concurrency))
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=getattr(settings, "SIGNATURE_CIRCUIT_FAILURE_THRESHOLD", 5),
+            reset_timeout=getattr(settings, "SIGNATURE_CIRCUIT_RESET_TIMEOUT", 60),
+        )
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Sesión HTTP compartida con keep-alive
+
+        El pool admite tantas conexiones como firmas simultáneas; los
+        reintentos los gestiona sign_certificate, no urllib3.
+        """
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.concurrency, max_retries=0
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def close(self) -> None:
+        """Cierra las conexiones abiertas de la sesión"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Espera antes del reintento `attempt` (1 = primer reintento)
+
+        Backoff exponencial con jitter: la mitad del tope es fija y la otra
+        mitad aleatoria, para que los hilos que fallan a la vez no
+        reintenten sincronizados.
+        """
+        cap = min(self.max_retry_delay, self.retry_delay * 2 ** (attempt - 1))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Timeouts, errores de conexión, 429 y 5xx se reintentan; otros 4xx no"""
+        if isinstance(error, requests.exceptions.HTTPError):
+            response = error.response
+            return response is None or response.status_code == 429 or response.status_code >= 500
+        return isinstance(
+            error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+        )
 
     def _send_to_signature_service(self, pdf_file) -> bytes:
         """
@@ -47,8 +190,8 @@ class DigitalSignatureService:
 
         logger.debug(f"Enviando PDF al servicio de firma: {self.signature_service_url}")
 
-        # Enviar petición POST
-        response = requests.post(
+        # Enviar petición POST (conexión reutilizada del pool)
+        response = self.session.post(
             self.signature_service_url,
             files=files,
             headers=headers,
@@ -76,6 +219,7 @@ class DigitalSignatureService:
             Certificate actualizado con PDF firmado
 
         Raises:
+            SignatureServiceUnavailable: Si el circuito está abierto
             Exception: Si falla después de todos los reintentos
         """
         # Validar que el certificado no esté ya firmado
@@ -85,12 +229,44 @@ class DigitalSignatureService:
             )
             return certificate
 
+        signed_pdf_bytes = self._request_signature(certificate)
+
+        # Actualizar certificado con PDF firmado
+        self._update_certificate_status(certificate, signed_pdf_bytes)
+
+        logger.info(f"Certificado {certificate.uuid} firmado exitosamente")
+
+        return certificate
+
+    def _request_signature(self, certificate) -> bytes:
+        """
+        Obtiene el PDF firmado del servicio, con reintentos y circuit breaker
+
+        No accede a la base de datos: sign_bulk_certificates lo ejecuta en
+        hilos y guarda los resultados en el hilo que la llamó.
+
+        Args:
+            certificate: Instancia de Certificate
+
+        Returns:
+            Bytes del PDF firmado
+
+        Raises:
+            SignatureServiceUnavailable: Si el circuito está abierto
+            Exception: Si falla después de todos los reintentos o con un
+                error que no se reintenta (4xx)
+        """
         last_error = None
 
-        for attempt in range(1, self.MAX_RETRIES + 1):
+        for attempt in range(1, self.max_retries + 1):
+            if not self.circuit_breaker.allow_request():
+                raise SignatureServiceUnavailable(
+                    f"Servicio de firma no disponible: certificado {certificate.uuid} no enviado"
+                )
+
             try:
                 logger.info(
-                    f"Intento {attempt}/{self.MAX_RETRIES} de firmar certificado {certificate.uuid}"
+                    f"Intento {attempt}/{self.max_retries} de firmar certificado {certificate.uuid}"
                 )
 
                 # Enviar al servicio de firma
@@ -98,13 +274,6 @@ class DigitalSignatureService:
                     certificate.pdf_file
                 )
 
-                # Actualizar certificado con PDF firmado
-                self._update_certificate_status(certificate, signed_pdf_bytes)
-
-                logger.info(f"Certificado {certificate.uuid} firmado exitosamente")
-
-                return certificate
-
             except (
                 requests.exceptions.Timeout,
                 requests.exceptions.ConnectionError,
@@ -115,13 +284,33 @@ class DigitalSignatureService:
                     f"Intento {attempt} falló para certificado {certificate.uuid}: {str(e)}"
                 )
 
+                if not self._is_retryable(e):
+                    # El servicio respondió (4xx): está disponible aunque rechace este PDF
+                    self.circuit_breaker.record_success()
+                    error_msg = f"Falló la firma del certificado {certificate.uuid}: {str(e)}"
+                    logger.error(error_msg)
+                    raise Exception(error_msg)
+
+                self.circuit_breaker.record_failure()
+
                 # Si no es el último intento, esperar antes de reintentar
-                if attempt < self.MAX_RETRIES:
-                    logger.debug(f"Esperando {self.RETRY_DELAY} segundos antes de reintentar")
-                    time.sleep(self.RETRY_DELAY)
+                if attempt < self.max_retries:
+                    delay = self._backoff_delay(attempt)
+                    logger.debug(f"Esperando {delay:.2f} segundos antes de reintentar")
+                    time.sleep(delay)
+                continue
+
+            except Exception:
+                # Error antes de hablar con el servicio (p. ej. al leer el PDF):
+                # no cuenta como fallo, pero no debe dejar la prueba tomada
+                self.circuit_breaker.release_probe()
+                raise
+
+            self.circuit_breaker.record_success()
+            return signed_pdf_bytes
 
         # Si llegamos aquí, todos los intentos fallaron
-        error_msg = f"Falló la firma del certificado {certificate.uuid} después de {self.MAX_RETRIES} intentos: {str(last_error)}"
+        error_msg = f"Falló la firma del certificado {certificate.uuid} después de {self.max_retries} intentos: {str(last_error)}"
         logger.error(error_msg)
         raise Exception(error_msg)
 
@@ -158,24 +347,36 @@ class DigitalSignatureService:
 
         logger.info(f"Estado del certificado {certificate.uuid} actualizado: firmado=True")
 
-    def sign_bulk_certificates(self, certificates, user=None):
+    def sign_bulk_certificates(self, certificates, user=None, progress_callback=None, concurrency=None):
         """
         Firma múltiples certificados
 
+        Hasta `concurrency` certificados se envían a la vez (hilos que solo
+        hacen la petición HTTP, con una sesión keep-alive compartida). Cada
+        resultado se guarda en cuanto llega, en el hilo que llamó al método.
+        Si el circuit breaker se abre, no se envían más certificados: los
+        pendientes quedan sin firmar para un nuevo intento.
+
         Args:
             certificates: QuerySet o lista de Certificate
             user: Usuario que realiza la firma (opcional)
+            progress_callback: Función opcional (procesados, total) llamada
+                tras cada certificado
+            concurrency: Firmas simultáneas (por defecto self.concurrency)
 
         Returns:
             Diccionario con resultados: {
                 'success_count': int,
                 'error_count': int,
-                'errors': list
+                'errors': list,
+                'aborted': bool,
+                'elapsed_seconds': float
             }
         """
         success_count = 0
         error_count = 0
         errors = []
+        aborted = False
 
         # Filtrar solo certificados no firmados
         unsigned_certs = [cert for cert in certificates if not cert.is_signed]
@@ -186,26 +387,77 @@ class DigitalSignatureService:
                 "success_count": 0,
                 "error_count": 0,
                 "errors": ["No hay certificados sin firmar"],
+                "aborted": False,
+                "elapsed_seconds": 0,
             }
 
-        logger.info(f"Iniciando firma masiva de {len(unsigned_certs)} certificados")
+        concurrency = self.concurrency if concurrency is None else max(1, int(concurrency))
+        total = len(unsigned_certs)
+        started = time.monotonic()
+        logger.info(
+            f"Iniciando firma masiva de {total} certificados ({concurrency} simultáneos)"
+        )
 
-        for certificate in unsigned_certs:
-            try:
-                self.sign_certificate(certificate)
-                success_count += 1
-            except Exception as e:
-                error_count += 1
-                error_msg = f"Error al firmar certificado {certificate.uuid}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+        pending = iter(unsigned_certs)
+        in_flight = {}
+        processed = 0
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+                def submit_next():
+                    certificate = next(pending, None)
+                    if certificate is not None:
+                        in_flight[executor.submit(self._request_signature, certificate)] = certificate
+
+                for _ in range(concurrency):
+                    submit_next()
+
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        certificate = in_flight.pop(future)
+                        try:
+                            self._update_certificate_status(certificate, future.result())
+                            success_count += 1
+                        except SignatureServiceUnavailable as e:
+                            aborted = True
+                            error_count += 1
+                            errors.append(str(e))
+                        except Exception as e:
+                            error_count += 1
+                            error_msg = f"Error al firmar certificado {certificate.uuid}: {str(e)}"
+                            errors.append(error_msg)
+                            logger.error(error_msg)
+                        processed += 1
+                        if progress_callback:
+                            progress_callback(processed, total)
+
+                        if self.circuit_breaker.state == CircuitBreaker.OPEN:
+                            aborted = True
+                        if not aborted:
+                            submit_next()
+        finally:
+            self.close()
+
+        skipped = total - processed
+        if skipped:
+            error_count += skipped
+            errors.append(
+                f"Firma masiva detenida: el servicio de firma no responde; "
+                f"{skipped} certificados quedaron sin firmar"
+            )
 
+        elapsed = time.monotonic() - started
         logger.info(
-            f"Firma masiva completada: {success_count} éxitos, {error_count} errores"
+            f"Firma masiva completada en {elapsed:.1f}s: {success_count} éxitos, {error_count} errores"
+            + (" (detenida por circuit breaker)" if aborted else "")
         )
 
         return {
             "success_count": success_count,
             "error_count": error_count,
             "errors": errors,
+            "aborted": aborted,
+            "elapsed_seconds": round(elapsed, 3),
         }
@@ -1,10 +1,12 @@
 """Servicio para procesar archivos Excel de participantes"""
-import openpyxl
 from typing import Dict, List, Tuple
 from datetime import datetime
 import re
 import logging
 
+from certificates.services.bulk_import import ImportMetrics, ParticipantBulkImporter
+from certificates.services.excel_reader import ExcelStreamReader
+
 logger = logging.getLogger('certificates')
 
 
@@ -19,6 +21,9 @@ class ExcelProcessorService:
         'Nombre del Evento'
     ]
     
+    # Filas válidas importadas por transacción
+    CHUNK_SIZE = 1000
+    
     def validate_file(self, file) -> Tuple[bool, List[str]]:
         """
         Valida que el archivo Excel tenga las columnas requeridas
@@ -32,37 +37,26 @@ class ExcelProcessorService:
         errors = []
         
         try:
-            workbook = openpyxl.load_workbook(file, read_only=True)
-            sheet = workbook.active
-            
-            # Obtener la primera fila (encabezados)
-            headers = []
-            for cell in sheet[1]:
-                if cell.value:
-                    headers.append(str(cell.value).strip())
-            
-            # Verificar que todas las columnas requeridas estén presentes
-            missing_columns = []
-            for required_col in self.REQUIRED_COLUMNS:
-                if required_col not in headers:
-                    missing_columns.append(required_col)
-            
-            if missing_columns:
-                errors.append(f"Columnas faltantes: {', '.join(missing_columns)}")
-            
-            workbook.close()
-            
+            with ExcelStreamReader(file) as reader:
+                errors.extend(self._check_headers(reader))
         except Exception as e:
             errors.append(f"Error al leer el archivo: {str(e)}")
         
         return (len(errors) == 0, errors)
     
+    def _check_headers(self, reader: ExcelStreamReader) -> List[str]:
+        """Retorna los errores de encabezado del archivo (columnas faltantes)"""
+        missing_columns = reader.missing_columns(self.REQUIRED_COLUMNS)
+        if missing_columns:
+            return [f"Columnas faltantes: {', '.join(missing_columns)}"]
+        return []
+    
     def _parse_row(self, row, headers: List[str]) -> Dict:
         """
         Extrae datos de una fila Excel
         
         Args:
-            row: Fila del Excel
+            row: Fila del Excel (celdas o valores)
             headers: Lista de encabezados
             
         Returns:
@@ -71,9 +65,10 @@ class ExcelProcessorService:
         row_data = {}
         
         for idx, cell in enumerate(row):
-            if idx < len(headers):
+            # Las columnas sin encabezado se ignoran
+            if idx < len(headers) and headers[idx] is not None:
                 header = headers[idx]
-                value = cell.value
+                value = getattr(cell, 'value', cell)
                 
                 # Limpiar espacios en blanco
                 if isinstance(value, str):
@@ -150,18 +145,7 @@ class ExcelProcessorService:
         from certificates.models import Event, Participant
         
         # Parsear fecha
-        fecha = row_data['Fecha del Evento']
-        if isinstance(fecha, str):
-            # Intentar parsear diferentes formatos
-            date_formats = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y']
-            for fmt in date_formats:
-                try:
-                    fecha = datetime.strptime(fecha, fmt).date()
-                    break
-                except ValueError:
-                    continue
-        elif isinstance(fecha, datetime):
-            fecha = fecha.date()
+        fecha = self._parse_event_date(row_data['Fecha del Evento'])
         
         # Crear o obtener el evento
         event, created = Event.objects.get_or_create(
@@ -199,12 +183,70 @@ class ExcelProcessorService:
             logger.info(f"Participante actualizado: {participant.full_name} ({participant.dni})")
         
         return participant
-
+    
+    def _parse_event_date(self, fecha):
+        """Convierte la fecha del evento (texto o datetime) a date"""
+        if isinstance(fecha, str):
+            # Intentar parsear diferentes formatos
+            date_formats = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y']
+            for fmt in date_formats:
+                try:
+                    return datetime.strptime(fecha, fmt).date()
+                except ValueError:
+                    continue
+        elif isinstance(fecha, datetime):
+            return fecha.date()
+        return fecha
+    
+    def _build_import_row(self, row_data: Dict, row_idx: int) -> Dict:
+        """Normaliza una fila válida al formato de ParticipantBulkImporter"""
+        dni_clean = ''.join(filter(str.isdigit, str(row_data['DNI']).strip()))
+        return {
+            'row_number': row_idx,
+            'dni': dni_clean.zfill(8),
+            'full_name': str(row_data['Nombres y Apellidos']).strip(),
+            'attendee_type': str(row_data['Tipo de Asistente']).strip().upper(),
+            'event_name': str(row_data['Nombre del Evento']).strip(),
+            'event_date': self._parse_event_date(row_data['Fecha del Evento']),
+            'row_data': row_data,
+        }
+    
+    def _import_chunk(self, chunk: List[Dict]) -> Tuple[int, int, List[str]]:
+        """
+        Importa un bloque de filas válidas por conjuntos
+        
+        Si la importación masiva del bloque falla, se procesa fila por fila
+        para reportar el error de cada una.
+        
+        Returns:
+            Tuple con (éxitos, errores, lista_de_errores)
+        """
+        try:
+            result = ParticipantBulkImporter().import_rows(chunk)
+            return result['success_count'], 0, []
+        except Exception as e:
+            logger.warning(f"Importación masiva de bloque fallida, procesando fila por fila: {str(e)}")
+        
+        success_count = 0
+        errors = []
+        for row in chunk:
+            try:
+                self._create_or_update_participant(row['row_data'])
+                success_count += 1
+            except Exception as e:
+                error_msg = f"Fila {row['row_number']}: Error al procesar - {str(e)}"
+                errors.append(error_msg)
+                logger.error(error_msg)
+        return success_count, len(errors), errors
     
     def process_excel(self, file, user=None) -> Dict:
         """
         Procesa un archivo Excel completo y crea participantes
         
+        El archivo se lee una sola vez en modo streaming (read_only); la
+        validación de encabezados y filas ocurre en el mismo recorrido y las
+        filas válidas se importan por bloques de CHUNK_SIZE.
+        
         Args:
             file: Archivo Excel a procesar
             user: Usuario que realiza la importación (opcional)
@@ -213,67 +255,70 @@ class ExcelProcessorService:
             Diccionario con resultados: {
                 'success_count': int,
                 'error_count': int,
-                'errors': list
+                'errors': list,
+                'metrics': dict
             }
         """
         from certificates.models import AuditLog
         
-        # Validar archivo
-        is_valid, errors = self.validate_file(file)
-        if not is_valid:
-            logger.error(f"Archivo inválido: {errors}")
-            return {
-                'success_count': 0,
-                'error_count': 1,
-                'errors': errors
-            }
-        
-        # Resetear el puntero del archivo
-        file.seek(0)
-        
         success_count = 0
         error_count = 0
         errors = []
+        # Fuera del try: un error a mitad de archivo devuelve las métricas parciales
+        metrics = ImportMetrics()
         
         try:
-            workbook = openpyxl.load_workbook(file)
-            sheet = workbook.active
-            
-            # Obtener encabezados
-            headers = []
-            for cell in sheet[1]:
-                if cell.value:
-                    headers.append(str(cell.value).strip())
-            
-            # Procesar cada fila (empezando desde la fila 2)
-            for row_idx, row in enumerate(sheet.iter_rows(min_row=2), start=2):
-                # Verificar si la fila está vacía
-                if all(cell.value is None or str(cell.value).strip() == '' for cell in row):
-                    continue
+            with metrics, ExcelStreamReader(file) as reader:
+                header_errors = self._check_headers(reader)
+                if header_errors:
+                    logger.error(f"Archivo inválido: {header_errors}")
+                    return {
+                        'success_count': 0,
+                        'error_count': 1,
+                        'errors': header_errors,
+                        'metrics': metrics.as_dict(),
+                    }
                 
-                try:
-                    # Parsear fila
-                    row_data = self._parse_row(row, headers)
-                    
-                    # Validar fila
-                    is_valid, error_msg = self._validate_row(row_data)
-                    if not is_valid:
+                headers = reader.headers
+                chunk = []
+                
+                # Procesar cada fila (empezando desde la fila 2)
+                for row_idx, values in reader.iter_values():
+                    metrics.rows += 1
+                    try:
+                        # Parsear fila
+                        row_data = self._parse_row(values, headers)
+                        
+                        # Validar fila
+                        is_valid, error_msg = self._validate_row(row_data)
+                        if not is_valid:
+                            error_count += 1
+                            errors.append(f"Fila {row_idx}: {error_msg}")
+                            logger.warning(f"Fila {row_idx} inválida: {error_msg}")
+                            continue
+                        
+                        chunk.append(self._build_import_row(row_data, row_idx))
+                        
+                    except Exception as e:
                         error_count += 1
-                        errors.append(f"Fila {row_idx}: {error_msg}")
-                        logger.warning(f"Fila {row_idx} inválida: {error_msg}")
-                        continue
-                    
-                    # Crear o actualizar participante
-                    self._create_or_update_participant(row_data)
-                    success_count += 1
+                        error_msg = f"Fila {row_idx}: Error al procesar - {str(e)}"
+                        errors.append(error_msg)
+                        logger.error(error_msg)
                     
-                except Exception as e:
-                    error_count += 1
-                    error_msg = f"Fila {row_idx}: Error al procesar - {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
+                    if len(chunk) >= self.CHUNK_SIZE:
+                        chunk_success, chunk_errors, chunk_messages = self._import_chunk(chunk)
+                        success_count += chunk_success
+                        error_count += chunk_errors
+                        errors.extend(chunk_messages)
+                        chunk = []
+                
+                if chunk:
+                    chunk_success, chunk_errors, chunk_messages = self._import_chunk(chunk)
+                    success_count += chunk_success
+                    error_count += chunk_errors
+                    errors.extend(chunk_messages)
             
-            workbook.close()
+            metrics_data = metrics.as_dict()
             
             # Registrar en auditoría
             AuditLog.objects.create(
@@ -283,20 +328,35 @@ class ExcelProcessorService:
                 metadata={
                     'success_count': success_count,
                     'error_count': error_count,
-                    'total_rows': success_count + error_count
+                    'total_rows': success_count + error_count,
+                    'metrics': metrics_data,
                 }
             )
             
-            logger.info(f"Importación completada: {success_count} éxitos, {error_count} errores")
+            memory_note = (
+                f", pico {metrics_data['peak_memory_mb']} MB"
+                if metrics_data['peak_memory_mb'] is not None else ""
+            )
+            logger.info(
+                f"Importación completada: {success_count} éxitos, {error_count} errores "
+                f"({metrics_data['rows_per_second']} filas/s{memory_note})"
+            )
             
         except Exception as e:
             error_msg = f"Error al procesar archivo: {str(e)}"
             logger.error(error_msg)
             errors.append(error_msg)
             error_count += 1
+            return {
+                'success_count': success_count,
+                'error_count': error_count,
+                'errors': errors,
+                'metrics': metrics.as_dict(),
+            }
         
         return {
             'success_count': success_count,
             'error_count': error_count,
-            'errors': errors
+            'errors': errors,
+            'metrics': metrics_data,
         }
@@ -0,0 +1,80 @@
+"""Lectura en streaming de archivos Excel para importaciones masivas"""
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+import openpyxl
+
+logger = logging.getLogger('certificates')
+
+
+class ExcelStreamReader:
+    """
+    Lee la hoja activa de un Excel fila por fila sin cargarla completa.
+
+    Usa `read_only=True` y generadores `values_only`, de modo que el mismo
+    recorrido sirve para validar y procesar y la memoria no crece con el
+    número de filas. Debe usarse como context manager para cerrar el archivo.
+    """
+
+    def __init__(self, file):
+        """
+        Args:
+            file: Ruta o archivo Excel (en memoria o subido)
+        """
+        if hasattr(file, 'seek'):
+            file.seek(0)
+        self.workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        self.sheet = self.workbook.active
+        self._rows = self.sheet.iter_rows(values_only=True)
+        first_row = next(self._rows, None) or ()
+        # Se conservan las posiciones (None para celdas vacías) para mapear columnas
+        self.headers: List[Optional[str]] = [
+            str(value).strip() if value is not None and str(value).strip() else None
+            for value in first_row
+        ]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        """Cierra el workbook (libera el archivo en modo read_only)"""
+        self.workbook.close()
+
+    def missing_columns(self, required_columns: List[str]) -> List[str]:
+        """Retorna las columnas requeridas que no están en el encabezado"""
+        return [column for column in required_columns if column not in self.headers]
+
+    def iter_values(self) -> Iterator[Tuple[int, tuple]]:
+        """
+        Itera las filas de datos como tuplas de valores
+
+        Yields:
+            Tuple (número_de_fila, valores) omitiendo filas vacías
+        """
+        for row_number, values in enumerate(self._rows, start=2):
+            if all(value is None or str(value).strip() == '' for value in values):
+                continue
+            yield row_number, values
+
+    def iter_dicts(self) -> Iterator[Tuple[int, Dict]]:
+        """
+        Itera las filas de datos como diccionarios encabezado -> valor
+
+        Los textos se devuelven sin espacios al inicio ni al final.
+
+        Yields:
+            Tuple (número_de_fila, datos) omitiendo filas vacías
+        """
+        for row_number, values in self.iter_values():
+            row_data = {}
+            for header, value in zip(self.headers, values):
+                if header is None:
+                    continue
+                if isinstance(value, str):
+                    value = value.strip()
+                row_data[header] = value
+            yield row_number, row_data
@@ -1,9 +1,16 @@
 """Servicio para importar certificados externos desde Excel"""
-import openpyxl
 import qrcode
 from datetime import datetime
 from django.db import transaction
 from certificates.models import Event, Participant, Certificate
+from certificates.services.bulk_import import ImportMetrics, ParticipantBulkImporter
+from certificates.services.certificate_lookup import certificate_lookup
+from certificates.services.certificate_page_cache import certificate_page_cache
+from certificates.services.certificate_query_cache import certificate_query_cache
+from certificates.services.certificate_uuid_filter import certificate_uuid_filter
+from certificates.services.dashboard_counters import dashboard_counters
+from certificates.services.excel_reader import ExcelStreamReader
+from certificates.services.qr_service import QRCodeService
 import logging
 
 logger = logging.getLogger("certificates")
@@ -25,6 +32,9 @@ class ExternalCertificateImporter:
         'Sistema Externo',  # Opcional: nombre del sistema origen
     ]
     
+    # Filas válidas importadas por transacción
+    CHUNK_SIZE = 500
+    
     def __init__(self):
         self.errors = []
         self.success_count = 0
@@ -34,6 +44,10 @@ class ExternalCertificateImporter:
         """
         Importa certificados externos desde un archivo Excel
         
+        El archivo se recorre una sola vez en modo streaming (read_only) y las
+        filas válidas se importan por bloques de CHUNK_SIZE, cada uno en su
+        propia transacción.
+        
         Args:
             file: Archivo Excel (puede ser ruta o archivo en memoria)
             
@@ -42,30 +56,29 @@ class ExternalCertificateImporter:
         """
         try:
             # Aceptar tanto rutas como archivos en memoria
-            workbook = openpyxl.load_workbook(file, data_only=True)
-            sheet = workbook.active
-            
-            # Validar columnas
-            if not self._validate_columns(sheet):
-                return {
-                    'success': False,
-                    'error': 'El archivo no tiene las columnas requeridas',
-                    'required_columns': self.REQUIRED_COLUMNS,
-                    'success_count': 0,
-                    'updated_count': 0,
-                    'error_count': 0,
-                    'errors': []
-                }
-            
-            # Procesar filas
-            self._process_rows(sheet)
+            with ImportMetrics() as metrics, ExcelStreamReader(file) as reader:
+                # Validar columnas
+                if not self._validate_columns(reader.headers):
+                    return {
+                        'success': False,
+                        'error': 'El archivo no tiene las columnas requeridas',
+                        'required_columns': self.REQUIRED_COLUMNS,
+                        'success_count': 0,
+                        'updated_count': 0,
+                        'error_count': 0,
+                        'errors': []
+                    }
+                
+                # Procesar filas
+                self._process_rows(reader, metrics)
             
             return {
                 'success': True,
                 'success_count': self.success_count,
                 'updated_count': self.updated_count,
                 'error_count': len(self.errors),
-                'errors': self.errors
+                'errors': self.errors,
+                'metrics': metrics.as_dict(),
             }
             
         except Exception as e:
@@ -79,10 +92,8 @@ class ExternalCertificateImporter:
                 'errors': []
             }
     
-    def _validate_columns(self, sheet):
-        """Valida que el Excel tenga las columnas requeridas"""
-        header_row = [cell.value for cell in sheet[1]]
-        
+    def _validate_columns(self, header_row):
+        """Valida que el encabezado tenga las columnas requeridas"""
         for required_col in self.REQUIRED_COLUMNS:
             if required_col not in header_row:
                 logger.error(f"Columna requerida no encontrada: {required_col}")
@@ -90,9 +101,9 @@ class ExternalCertificateImporter:
         
         return True
     
-    def _process_rows(self, sheet):
-        """Procesa todas las filas del Excel"""
-        header_row = [cell.value for cell in sheet[1]]
+    def _process_rows(self, reader, metrics):
+        """Procesa todas las filas del Excel por bloques"""
+        header_row = reader.headers
         
         # Mapear índices de columnas
         col_indices = {col: header_row.index(col) for col in self.REQUIRED_COLUMNS}
@@ -102,14 +113,159 @@ class ExternalCertificateImporter:
             if optional_col in header_row:
                 col_indices[optional_col] = header_row.index(optional_col)
         
-        # Procesar cada fila (empezando desde la fila 2)
-        for row_num, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+        chunk = []
+        for row_num, row in reader.iter_values():
+            metrics.rows += 1
             try:
-                self._process_row(row, col_indices, row_num)
+                chunk.append(self._parse_row(row, col_indices, row_num))
             except Exception as e:
                 error_msg = f"Fila {row_num}: {str(e)}"
                 self.errors.append(error_msg)
                 logger.error(error_msg)
+            
+            if len(chunk) >= self.CHUNK_SIZE:
+                self._import_chunk(chunk, col_indices)
+                chunk = []
+        
+        if chunk:
+            self._import_chunk(chunk, col_indices)
+    
+    def _parse_row(self, row, col_indices, row_num):
+        """
+        Extrae, valida y normaliza los datos de una fila
+        
+        Returns:
+            Diccionario con los datos normalizados de la fila
+            
+        Raises:
+            ValueError: Si la fila tiene datos inválidos
+        """
+        dni_raw = str(row[col_indices['DNI']]).strip()
+        full_name = str(row[col_indices['Nombres y Apellidos']]).strip()
+        event_date_value = row[col_indices['Fecha del Evento']]
+        attendee_type = str(row[col_indices['Tipo de Asistente']]).strip().upper()
+        event_name = str(row[col_indices['Nombre del Evento']]).strip()
+        certificate_url = str(row[col_indices['URL del Certificado']]).strip()
+        
+        # Sistema externo (opcional)
+        external_system = ''
+        if 'Sistema Externo' in col_indices:
+            external_system = str(row[col_indices['Sistema Externo']] or '').strip()
+        
+        # Validar datos
+        self._validate_row_data(dni_raw, full_name, event_date_value, attendee_type, 
+                               event_name, certificate_url, row_num)
+        
+        return {
+            'row_number': row_num,
+            'raw': row,
+            'dni': self._normalize_dni(dni_raw),
+            'full_name': full_name,
+            'attendee_type': attendee_type,
+            'event_name': event_name,
+            'event_date': self._parse_date(event_date_value, row_num),
+            'certificate_url': certificate_url,
+            'external_system': external_system or 'Sistema Externo',
+        }
+    
+    def _import_chunk(self, chunk, col_indices):
+        """
+        Importa un bloque de filas válidas por conjuntos
+        
+        Eventos y participantes se resuelven con ParticipantBulkImporter y los
+        certificados se crean/actualizan con bulk_create/bulk_update. Si el
+        bloque falla se procesa fila por fila para aislar los errores.
+        """
+        success_before = self.success_count
+        updated_before = self.updated_count
+        
+        try:
+            with transaction.atomic():
+                importer = ParticipantBulkImporter(
+                    event_description='Evento importado desde sistema externo'
+                )
+                importer.import_rows(chunk)
+                self._upsert_certificates(chunk, importer)
+            return
+        except Exception as e:
+            self.success_count = success_before
+            self.updated_count = updated_before
+            logger.warning(f"Importación masiva de bloque fallida, procesando fila por fila: {str(e)}")
+        
+        for row in chunk:
+            try:
+                self._process_row(row['raw'], col_indices, row['row_number'])
+            except Exception as e:
+                error_msg = f"Fila {row['row_number']}: {str(e)}"
+                self.errors.append(error_msg)
+                logger.error(error_msg)
+    
+    def _upsert_certificates(self, chunk, importer):
+        """Crea o actualiza los certificados externos de un bloque de filas"""
+        # Si un participante se repite en el bloque gana la última fila; la
+        # primera aparición cuenta como creación y las siguientes como actualización
+        rows_by_participant = {}
+        occurrences = {}
+        for row in chunk:
+            participant = importer.participant_for(row)
+            rows_by_participant[participant.id] = (participant, row)
+            occurrences[participant.id] = occurrences.get(participant.id, 0) + 1
+        
+        existing = {
+            certificate.participant_id: certificate
+            for certificate in Certificate.objects.filter(participant_id__in=list(rows_by_participant))
+        }
+        
+        qr_service = QRCodeService()
+        to_create = []
+        to_update = []
+        
+        for participant_id, (participant, row) in rows_by_participant.items():
+            certificate = existing.get(participant_id)
+            if certificate is None:
+                certificate = Certificate(
+                    participant=participant,
+                    is_external=True,
+                    external_url=row['certificate_url'],
+                    external_system=row['external_system'],
+                    verification_url=row['certificate_url'],  # Usar la URL externa como verificación
+                    is_signed=False  # Los certificados externos no están firmados por nuestro sistema
+                )
+                to_create.append(certificate)
+                self.success_count += 1
+                self.updated_count += occurrences[participant_id] - 1
+            else:
+                certificate.is_external = True
+                certificate.external_url = row['certificate_url']
+                certificate.external_system = row['external_system']
+                to_update.append(certificate)
+                self.updated_count += occurrences[participant_id]
+            
+            # Para certificados externos, el QR apunta directamente a la URL externa
+            qr_buffer = qr_service.render_qr_png(row['certificate_url'])
+            certificate.qr_code.save(f"qr_{certificate.uuid}.png", qr_buffer, save=False)
+        
+        if to_create:
+            Certificate.objects.bulk_create(to_create, batch_size=self.CHUNK_SIZE)
+            certificate_uuid_filter.add_many(certificate.uuid for certificate in to_create)
+        if to_update:
+            Certificate.objects.bulk_update(
+                to_update,
+                ['is_external', 'external_url', 'external_system', 'qr_code'],
+                batch_size=self.CHUNK_SIZE,
+            )
+        # bulk_create/bulk_update no emiten señales
+        certificate_query_cache.invalidate_many(
+            participant.dni for participant, row in rows_by_participant.values()
+        )
+        certificate_page_cache.invalidate_many(certificate.uuid for certificate in to_update)
+        certificate_lookup.sync_instances(to_create + to_update)
+        dashboard_counters.invalidate()
+        
+        logger.info(
+            f"Bloque de certificados externos importado: {len(to_create)} creados, "
+            f"{len(to_update)} actualizados"
+        )
     
     @transaction.atomic
     def _process_row(self, row, col_indices, row_num):
@@ -0,0 +1,233 @@
+"""
+Entrega de archivos protegidos (PDF de certificados).
+
+La vista busca el certificado y registra la auditoría; `file_delivery.serve`
+arma la respuesta según PROTECTED_FILE_DELIVERY:
+
+- "nginx": devuelve solo cabeceras con X-Accel-Redirect hacia una location
+  interna (PROTECTED_FILE_INTERNAL_PREFIX, alias de MEDIA_ROOT) y nginx envía
+  el archivo, con Range y validación condicional propios.
+- "sendfile": igual, con X-Sendfile y la ruta absoluta (Apache/lighttpd).
+- "django" (por defecto): Django transmite el archivo en bloques, con
+  soporte de un rango de bytes (206/416).
+
+En todos los modos se responde 304 a If-None-Match/If-Modified-Since sin
+abrir el archivo. El ETag usa el formato de nginx ("mtime-tamaño" en
+hexadecimal), de modo que un cliente puede revalidar igual contra cualquiera
+de los modos. Si el storage no es local, se usa siempre el modo "django".
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+logger = logging.getLogger("certificates")
+
+# Tamaño de bloque al transmitir un rango desde Django
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+@dataclass
+class FileMetadata:
+    """Datos del archivo necesarios para las cabeceras y la validación"""
+    name: str
+    size: int
+    modified: datetime
+    path: Optional[str]
+
+    @property
+    def timestamp(self) -> int:
+        return int(self.modified.timestamp())
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.timestamp:x}-{self.size:x}"'
+
+
+class ProtectedFileDelivery:
+    """Arma respuestas de descarga delegadas al servidor web o transmitidas por Django"""
+
+    BACKENDS = ('django', 'nginx', 'sendfile')
+
+    def __init__(self, backend: Optional[str] = None, internal_prefix: Optional[str] = None):
+        self._backend = backend
+        self._internal_prefix = internal_prefix
+
+    @property
+    def backend(self) -> str:
+        backend = self._backend or getattr(settings, 'PROTECTED_FILE_DELIVERY', 'django')
+        if backend not in self.BACKENDS:
+            logger.warning(f"PROTECTED_FILE_DELIVERY desconocido: {backend}; se usa 'django'")
+            return 'django'
+        return backend
+
+    @property
+    def internal_prefix(self) -> str:
+        prefix = self._internal_prefix or getattr(settings, 'PROTECTED_FILE_INTERNAL_PREFIX', '/protected/')
+        return prefix if prefix.endswith('/') else f"{prefix}/"
+
+    @staticmethod
+    def metadata(field_file: FieldFile) -> FileMetadata:
+        """
+        Tamaño, fecha de modificación y ruta local del archivo
+
+        Raises:
+            Http404: Si el archivo no existe en el storage
+        """
+        storage = field_file.storage
+        name = field_file.name
+        try:
+            size = storage.size(name)
+            modified = storage.get_modified_time(name)
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"Archivo protegido no disponible {name}: {str(e)}")
+            raise Http404("El archivo del certificado no está disponible")
+        try:
+            path = storage.path(name)
+        except NotImplementedError:
+            path = None
+        return FileMetadata(name=name, size=size, modified=modified, path=path)
+
+    def serve(
+        self,
+        request,
+        field_file: FieldFile,
+        filename: Optional[str] = None,
+        as_attachment: bool = True,
+        content_type: str = 'application/pdf',
+    ) -> HttpResponse:
+        """
+        Respuesta que entrega `field_file` al cliente
+
+        Args:
+            request: Petición (para las cabeceras condicionales y Range)
+            field_file: Archivo a entregar (p. ej. certificate.pdf_file)
+            filename: Nombre sugerido al cliente
+            as_attachment: Descargar (True) o mostrar en el navegador (False)
+            content_type: Tipo MIME del archivo
+
+        Raises:
+            Http404: Si el archivo no existe en el storage
+        """
+        meta = self.metadata(field_file)
+
+        not_modified = get_conditional_response(
+            request, etag=meta.etag, last_modified=meta.timestamp
+        )
+        if not_modified is not None:
+            return self._finish(not_modified, meta, filename, as_attachment)
+
+        backend = self.backend
+        if backend != 'django' and meta.path is None:
+            backend = 'django'
+
+        if backend == 'nginx':
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = self.internal_prefix + quote(meta.name)
+        elif backend == 'sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = meta.path
+        else:
+            response = self._stream(request, field_file, meta, content_type)
+
+        return self._finish(response, meta, filename, as_attachment)
+
+    # ------------------------------------------------------------------
+    # Transmisión desde Django
+    # ------------------------------------------------------------------
+
+    def _stream(self, request, field_file: FieldFile, meta: FileMetadata, content_type: str) -> HttpResponse:
+        byte_range = self.parse_range(request, meta)
+        if byte_range is None:
+            return FileResponse(field_file.open('rb'), content_type=content_type)
+
+        if byte_range[0] >= meta.size:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{meta.size}'
+            return response
+
+        start, end = byte_range
+        handle = field_file.open('rb')
+        handle.seek(start)
+        response = StreamingHttpResponse(
+            self._iter_range(handle, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{meta.size}'
+        return response
+
+    @staticmethod
+    def parse_range(request, meta: FileMetadata) -> Optional[Tuple[int, int]]:
+        """
+        Rango (inicio, fin inclusive) pedido con la cabecera Range
+
+        Devuelve None (respuesta completa) si no hay Range, si pide varios
+        rangos o si If-Range no coincide con la versión actual. Un rango que
+        empieza después del final se devuelve tal cual (respuesta 416).
+        """
+        header = request.META.get('HTTP_RANGE', '').strip()
+        match = _RANGE_RE.match(header)
+        if not match or match.group(1) == match.group(2) == '':
+            return None
+
+        if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+        if if_range and if_range != meta.etag and parse_http_date_safe(if_range) != meta.timestamp:
+            return None
+
+        first, last = match.groups()
+        if first == '':
+            # Sufijo: los últimos N bytes
+            length = min(int(last), meta.size)
+            if length == 0:
+                return (meta.size, meta.size)
+            return (meta.size - length, meta.size - 1)
+
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = min(int(last), meta.size - 1) if last else meta.size - 1
+        return (start, end)
+
+    @staticmethod
+    def _iter_range(handle: BinaryIO, length: int) -> Iterator[bytes]:
+        try:
+            while length > 0:
+                chunk = handle.read(min(CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                yield chunk
+        finally:
+            handle.close()
+
+    # ------------------------------------------------------------------
+    # Cabeceras comunes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _finish(response: HttpResponse, meta: FileMetadata, filename: Optional[str], as_attachment: bool) -> HttpResponse:
+        response['ETag'] = meta.etag
+        response['Last-Modified'] = http_date(meta.timestamp)
+        response['Accept-Ranges'] = 'bytes'
+        disposition = content_disposition_header(as_attachment, filename or meta.name.rsplit('/', 1)[-1])
+        if disposition:
+            response['Content-Disposition'] = disposition
+        # El navegador conserva la copia y la revalida (304) en cada acceso
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+# Instancia compartida por las vistas públicas de descarga y preview
+file_delivery = ProtectedFileDelivery()
@@ -0,0 +1,373 @@
+"""
+Cola de trabajos en segundo plano respaldada por la base de datos.
+
+Las operaciones masivas (generación, firma, procesamiento de QR y exportación)
+se encolan como `CertificateJob` y las ejecuta el comando
+`run_certificate_worker`, fuera de los workers de gunicorn. La reclamación de
+trabajos usa un UPDATE condicional, por lo que funciona igual con SQLite y
+PostgreSQL y permite varios workers en paralelo sin broker externo.
+"""
+import logging
+import os
+import socket
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import F, Q
+from django.utils import timezone
+
+from certificates.models import CertificateJob
+
+logger = logging.getLogger("certificates")
+
+
+# Registro de manejadores: job_type -> función(job, queue_service) -> dict
+JOB_HANDLERS = {}
+
+
+def register_job_handler(job_type):
+    """
+    Decorador para registrar el manejador de un tipo de trabajo
+
+    Args:
+        job_type: Valor de CertificateJob.JOB_TYPES
+    """
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+class JobQueueService:
+    """Encola, reclama y ejecuta trabajos en segundo plano"""
+
+    # Intervalo mínimo (segundos) entre escrituras de progreso
+    PROGRESS_INTERVAL = 1.0
+    # Máximo de errores individuales guardados en el resultado
+    MAX_STORED_ERRORS = 50
+
+    def __init__(self, worker_id=None):
+        """
+        Inicializa el servicio
+
+        Args:
+            worker_id: Identificador del worker (por defecto host:pid)
+        """
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.max_attempts = getattr(settings, "CERTIFICATE_JOB_MAX_ATTEMPTS", 3)
+        self.retry_delay = getattr(settings, "CERTIFICATE_JOB_RETRY_DELAY", 30)
+        self.lock_timeout = getattr(settings, "CERTIFICATE_JOB_LOCK_TIMEOUT", 1800)
+        self._last_progress_write = 0.0
+
+    def enqueue(self, job_type, payload, user=None, max_attempts=None):
+        """
+        Encola un nuevo trabajo
+
+        Args:
+            job_type: Tipo de trabajo (CertificateJob.JOB_TYPES)
+            payload: Parámetros serializables en JSON
+            user: Usuario que solicita el trabajo (opcional)
+            max_attempts: Intentos máximos (por defecto CERTIFICATE_JOB_MAX_ATTEMPTS)
+
+        Returns:
+            Instancia de CertificateJob creada
+
+        Raises:
+            ValueError: Si el tipo de trabajo no tiene manejador registrado
+        """
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Tipo de trabajo no soportado: {job_type}")
+
+        job = CertificateJob.objects.create(
+            job_type=job_type,
+            payload=payload,
+            created_by=user if user is not None and getattr(user, "pk", None) else None,
+            max_attempts=max_attempts or self.max_attempts,
+        )
+        logger.info(f"Trabajo encolado: {job}")
+        return job
+
+    def release_stale_jobs(self):
+        """
+        Libera trabajos cuyo worker dejó de reportar progreso
+
+        Un trabajo RUNNING sin actividad por más de CERTIFICATE_JOB_LOCK_TIMEOUT
+        segundos vuelve a PENDING si le quedan intentos, o pasa a FAILED.
+
+        Returns:
+            Número de trabajos liberados
+        """
+        limit = timezone.now() - timedelta(seconds=self.lock_timeout)
+        stale = CertificateJob.objects.filter(status="RUNNING", locked_at__lt=limit)
+
+        retried = stale.filter(attempts__lt=F("max_attempts")).update(
+            status="PENDING",
+            locked_by="",
+            locked_at=None,
+            error_message="Worker sin respuesta; trabajo reencolado",
+        )
+        failed = stale.update(
+            status="FAILED",
+            locked_by="",
+            finished_at=timezone.now(),
+            error_message="Worker sin respuesta; se agotaron los intentos",
+        )
+
+        if retried or failed:
+            logger.warning(f"Trabajos bloqueados liberados: {retried} reencolados, {failed} fallidos")
+        return retried + failed
+
+    def claim_next_job(self):
+        """
+        Reclama el siguiente trabajo pendiente para este worker
+
+        Returns:
+            CertificateJob reclamado o None si la cola está vacía
+        """
+        now = timezone.now()
+        candidates = list(
+            CertificateJob.objects.filter(status="PENDING")
+            .filter(Q(run_after__isnull=True) | Q(run_after__lte=now))
+            .order_by("created_at", "id")
+            .values_list("id", flat=True)[:10]
+        )
+
+        for job_id in candidates:
+            # Solo un worker puede cambiar el estado de PENDING a RUNNING
+            claimed = CertificateJob.objects.filter(id=job_id, status="PENDING").update(
+                status="RUNNING",
+                locked_by=self.worker_id,
+                locked_at=now,
+                started_at=now,
+                attempts=F("attempts") + 1,
+            )
+            if claimed:
+                return CertificateJob.objects.get(id=job_id)
+
+        return None
+
+    def update_progress(self, job, current, total=None, force=False):
+        """
+        Actualiza el progreso de un trabajo (y renueva su bloqueo)
+
+        Las escrituras se limitan a una por PROGRESS_INTERVAL salvo que
+        force sea True o se haya alcanzado el total.
+
+        Args:
+            job: Instancia de CertificateJob
+            current: Elementos procesados
+            total: Total de elementos (opcional)
+            force: Escribir aunque no haya pasado el intervalo
+        """
+        job.progress_current = current
+        if total is not None:
+            job.progress_total = total
+
+        now = time.monotonic()
+        finished = job.progress_total and current >= job.progress_total
+        if not force and not finished and now - self._last_progress_write < self.PROGRESS_INTERVAL:
+            return
+
+        self._last_progress_write = now
+        CertificateJob.objects.filter(id=job.id).update(
+            progress_current=job.progress_current,
+            progress_total=job.progress_total,
+            locked_at=timezone.now(),
+        )
+
+    def run_job(self, job):
+        """
+        Ejecuta un trabajo reclamado y registra su resultado
+
+        Si el manejador lanza una excepción y quedan intentos, el trabajo se
+        reprograma con espera exponencial; si no, queda FAILED.
+
+        Args:
+            job: Instancia de CertificateJob en estado RUNNING
+
+        Returns:
+            La instancia de CertificateJob actualizada
+        """
+        handler = JOB_HANDLERS.get(job.job_type)
+        start_time = time.monotonic()
+        logger.info(f"Ejecutando {job} (intento {job.attempts}/{job.max_attempts})")
+
+        try:
+            if handler is None:
+                raise ValueError(f"Tipo de trabajo no soportado: {job.job_type}")
+            result = handler(job, self) or {}
+        except Exception as e:
+            logger.error(f"Error en {job}: {str(e)}", exc_info=True)
+            job.error_message = str(e)
+            job.locked_by = ""
+            job.locked_at = None
+            if job.attempts < job.max_attempts:
+                delay = self.retry_delay * (2 ** max(0, job.attempts - 1))
+                job.status = "PENDING"
+                job.run_after = timezone.now() + timedelta(seconds=delay)
+            else:
+                job.status = "FAILED"
+                job.finished_at = timezone.now()
+            job.save(update_fields=[
+                "status", "error_message", "locked_by", "locked_at", "run_after", "finished_at",
+            ])
+            return job
+
+        result["elapsed_seconds"] = round(time.monotonic() - start_time, 2)
+        job.result = result
+        job.status = "COMPLETED"
+        job.error_message = ""
+        job.locked_by = ""
+        job.finished_at = timezone.now()
+        if job.progress_total:
+            job.progress_current = job.progress_total
+        job.save(update_fields=[
+            "result", "result_file", "status", "error_message", "locked_by",
+            "finished_at", "progress_current", "progress_total",
+        ])
+        logger.info(f"Trabajo completado: {job} en {result['elapsed_seconds']}s")
+        return job
+
+    def process_next(self):
+        """
+        Reclama y ejecuta el siguiente trabajo disponible
+
+        Returns:
+            CertificateJob procesado o None si no había trabajos
+        """
+        self.release_stale_jobs()
+        job = self.claim_next_job()
+        if job is None:
+            return None
+        return self.run_job(job)
+
+    def _build_result(self, result):
+        """Normaliza un resultado de servicio al formato guardado en el trabajo"""
+        errors = list(result.get("errors", []))
+        return {
+            "success_count": result.get("success_count", 0),
+            "error_count": result.get("error_count", 0),
+            "errors": errors[:self.MAX_STORED_ERRORS],
+        }
+
+
+# ============================================================================
+# MANEJADORES DE TRABAJOS
+# ============================================================================
+
+
+@register_job_handler("GENERATE_CERTIFICATES")
+def handle_generate_certificates(job, queue):
+    """Genera certificados para los eventos indicados en payload['event_ids']"""
+    from certificates.models import Event, Participant
+    from certificates.services.certificate_generator import CertificateGeneratorService
+
+    events = list(Event.objects.filter(id__in=job.payload.get("event_ids", [])))
+    total = Participant.objects.filter(event__in=events).count()
+    queue.update_progress(job, 0, total, force=True)
+
+    service = CertificateGeneratorService()
+    combined = {"success_count": 0, "error_count": 0, "errors": []}
+    done = 0
+
+    for event in events:
+        offset = done
+        result = service.generate_bulk_certificates(
+            event,
+            user=job.created_by,
+            workers=job.payload.get("workers"),
+            progress_callback=lambda current, _total: queue.update_progress(job, offset + current),
+        )
+        combined["success_count"] += result["success_count"]
+        combined["error_count"] += result["error_count"]
+        combined["errors"].extend(result["errors"])
+        done += event.participants.count()
+        queue.update_progress(job, done)
+
+    return queue._build_result(combined)
+
+
+@register_job_handler("SIGN_CERTIFICATES")
+def handle_sign_certificates(job, queue):
+    """Firma los certificados indicados en payload['certificate_ids']"""
+    from certificates.models import Certificate
+    from certificates.services.digital_signature import DigitalSignatureService
+
+    certificates = list(
+        Certificate.objects.filter(id__in=job.payload.get("certificate_ids", []))
+        .select_related("participant", "participant__event")
+    )
+    queue.update_progress(job, 0, len(certificates), force=True)
+
+    result = DigitalSignatureService().sign_bulk_certificates(
+        certificates,
+        user=job.created_by,
+        progress_callback=lambda current, total: queue.update_progress(job, current, total),
+    )
+    return queue._build_result(result)
+
+
+@register_job_handler("PROCESS_QR")
+def handle_process_qr(job, queue):
+    """Inserta el QR en los certificados indicados en payload['certificate_ids']"""
+    from certificates.models import Certificate, QRProcessingConfig
+    from certificates.services.pdf_processing import PDFProcessingService
+
+    certificates = list(
+        Certificate.objects.filter(
+            id__in=job.payload.get("certificate_ids", []),
+            processing_status="IMPORTED",
+        ).select_related("participant")
+    )
+    queue.update_progress(job, 0, len(certificates), force=True)
+
+    config = QRProcessingConfig.get_active_config()
+    result = PDFProcessingService().process_qr_batch(
+        certificates, config, progress_callback=lambda processed: queue.update_progress(job, processed)
+    )
+
+    return {
+        **queue._build_result(result),
+        "elapsed_seconds": result["elapsed_seconds"],
+        "seconds_per_certificate": result["seconds_per_certificate"],
+    }
+
+
+@register_job_handler("EXPORT_FOR_SIGNING")
+def handle_export_for_signing(job, queue):
+    """Genera el ZIP de exportación para firma y lo guarda como archivo del trabajo"""
+    from certificates.models import Certificate
+    from certificates.services.pdf_processing import PDFProcessingService
+
+    certificates = list(
+        Certificate.objects.filter(
+            id__in=job.payload.get("certificate_ids", []),
+            processing_status="QR_INSERTED",
+        ).select_related("participant", "participant__event")
+    )
+    if not certificates:
+        raise ValueError("No hay certificados válidos para exportar (deben estar en estado QR_INSERTED)")
+
+    queue.update_progress(job, 0, len(certificates), force=True)
+
+    zip_stream, zip_filename = PDFProcessingService().stream_export_zip(
+        certificates=certificates,
+        include_metadata=job.payload.get("include_metadata", True),
+    )
+    # El ZIP pasa por un archivo temporal en disco, no por memoria
+    with tempfile.TemporaryFile() as zip_file:
+        for chunk in zip_stream:
+            zip_file.write(chunk)
+        size_bytes = zip_file.tell()
+        job.result_file.save(zip_filename, File(zip_file, name=zip_filename), save=False)
+
+    return {
+        "success_count": len(certificates),
+        "error_count": 0,
+        "errors": [],
+        "filename": zip_filename,
+        "size_bytes": size_bytes,
+    }
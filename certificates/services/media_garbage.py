@@ -0,0 +1,192 @@
+"""
+Recolección de archivos huérfanos bajo MEDIA_ROOT.
+
+Un archivo es huérfano si ningún campo de archivo (FileField/ImageField) de
+ningún modelo lo referencia: PDFs de certificados regenerados o reimportados,
+QR reemplazados, temporales de escrituras interrumpidas, etc. Los archivos
+modificados hace menos de `min_age` se conservan siempre, porque pueden
+pertenecer a una operación en curso que aún no guardó su fila.
+
+La misma pasada recalcula StoredFile: una fila por archivo del almacenamiento
+direccionado por contenido (certificates.storage) con el número de campos que
+lo referencian.
+"""
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from certificates.storage import content_addressed_storage
+
+logger = logging.getLogger("certificates")
+
+
+# Modelos cuyos campos de archivo copian nombres de otro modelo (no son
+# referencias propias)
+COPY_MODELS = ("certificates.certificatelookup",)
+
+
+@dataclass
+class MediaCollectionReport:
+    """Resultado de una pasada de collect()"""
+
+    scanned_files: int = 0
+    scanned_bytes: int = 0
+    referenced_files: int = 0
+    missing_files: int = 0
+    orphans: List[Tuple[str, int]] = field(default_factory=list)
+    recent_orphans: int = 0
+    deleted_files: int = 0
+    reclaimed_bytes: int = 0
+    stored_files: int = 0
+    deduplicated_bytes: int = 0
+
+    @property
+    def orphan_bytes(self) -> int:
+        return sum(size for _, size in self.orphans)
+
+
+class MediaGarbageCollector:
+    """Busca (y opcionalmente elimina) archivos sin referencias bajo MEDIA_ROOT"""
+
+    def __init__(self, root=None, min_age_seconds: float = 24 * 3600):
+        self.root = str(root or settings.MEDIA_ROOT)
+        self.min_age_seconds = min_age_seconds
+
+    # ------------------------------------------------------------------
+    # Referencias
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def file_fields():
+        """(modelo, nombre del campo) de todos los FileField de los modelos instalados"""
+        for model in apps.get_models():
+            if model._meta.label_lower in COPY_MODELS:
+                continue
+            for model_field in model._meta.concrete_fields:
+                if isinstance(model_field, models.FileField):
+                    yield model, model_field.name
+
+    def referenced_names(self) -> Counter:
+        """Número de referencias por nombre de archivo"""
+        references = Counter()
+        for model, field_name in self.file_fields():
+            names = (
+                model._default_manager.exclude(**{field_name: ""})
+                .exclude(**{f"{field_name}__isnull": True})
+                .order_by()
+                .values_list(field_name, flat=True)
+            )
+            references.update(names.iterator(chunk_size=5000))
+        return references
+
+    # ------------------------------------------------------------------
+    # Archivos en disco
+    # ------------------------------------------------------------------
+
+    def scan(self):
+        """(nombre relativo, tamaño, mtime) de cada archivo bajo la raíz"""
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                name = os.path.relpath(path, self.root).replace(os.sep, "/")
+                yield name, stat.st_size, stat.st_mtime
+
+    # ------------------------------------------------------------------
+    # Recolección
+    # ------------------------------------------------------------------
+
+    def collect(self, delete: bool = False) -> MediaCollectionReport:
+        """
+        Recorre MEDIA_ROOT, recalcula StoredFile y reporta los huérfanos
+
+        Args:
+            delete: Si es True, elimina los archivos huérfanos
+
+        Returns:
+            MediaCollectionReport con los totales de la pasada
+        """
+        report = MediaCollectionReport()
+        references = self.referenced_names()
+        cutoff = time.time() - self.min_age_seconds
+        stored: Dict[str, Tuple[str, int]] = {}
+
+        on_disk = set()
+        for name, size, mtime in self.scan():
+            on_disk.add(name)
+            report.scanned_files += 1
+            report.scanned_bytes += size
+            if name in references:
+                report.referenced_files += 1
+                if content_addressed_storage.is_content_addressed(name):
+                    stored[name] = (self._digest_of(name), size)
+                continue
+            if mtime > cutoff:
+                report.recent_orphans += 1
+                continue
+            report.orphans.append((name, size))
+
+        report.missing_files = sum(1 for name in references if name not in on_disk)
+
+        if delete:
+            for name, size in report.orphans:
+                path = os.path.join(self.root, name)
+                try:
+                    # Un archivo deduplicado pudo volver a usarse durante la pasada
+                    if os.stat(path).st_mtime > cutoff:
+                        continue
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.warning(f"No se pudo eliminar el archivo huérfano {name}: {str(e)}")
+                    continue
+                report.deleted_files += 1
+                report.reclaimed_bytes += size
+            logger.info(
+                f"Archivos huérfanos eliminados: {report.deleted_files} "
+                f"({report.reclaimed_bytes} bytes)"
+            )
+
+        report.stored_files = len(stored)
+        report.deduplicated_bytes = sum(
+            (references[name] - 1) * size for name, (_, size) in stored.items()
+        )
+        self._update_stored_files(stored, references)
+        return report
+
+    @staticmethod
+    def _digest_of(name: str) -> str:
+        return os.path.splitext(os.path.basename(name))[0]
+
+    @staticmethod
+    def _update_stored_files(stored: Dict[str, Tuple[str, int]], references: Counter) -> None:
+        """Reemplaza el índice StoredFile por los archivos referenciados encontrados"""
+        from certificates.models import StoredFile
+
+        refreshed_at = timezone.now()
+        rows = [
+            StoredFile(sha256=digest, name=name, size=size, ref_count=references[name])
+            for name, (digest, size) in stored.items()
+        ]
+        with transaction.atomic():
+            StoredFile.objects.bulk_create(
+                rows,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=["sha256"],
+                update_fields=["name", "size", "ref_count", "updated_at"],
+            )
+            # Las filas no actualizadas en esta pasada ya no tienen referencias
+            StoredFile.objects.filter(updated_at__lt=refreshed_at).delete()
@@ -0,0 +1,224 @@
+"""
+Actualización incremental de PDFs para estampar un XObject (p. ej. el QR).
+
+En lugar de volver a serializar el documento con PdfWriter, se agrega al
+final del archivo original una sección de actualización (ISO 32000-1,
+7.5.6) con:
+
+- el XObject a estampar y dos flujos de contenido compartidos ("q" antes
+  del contenido original y el dibujo del XObject después),
+- una nueva versión de cada página estampada, con /Contents y /Resources
+  actualizados (los demás objetos no se tocan),
+- una tabla de referencias cruzadas (o un flujo XRef si el original los usa)
+  con /Prev apuntando a la anterior.
+
+El costo depende del tamaño del estampado y del número de páginas
+estampadas, no del contenido del documento: PdfReader solo lee las tablas
+de referencias y los diccionarios de las páginas. Los bytes originales
+quedan intactos (firmas previas incluidas).
+"""
+import re
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import (
+    ArrayObject, DecodedStreamObject, DictionaryObject, IndirectObject, NameObject, NumberObject,
+    PdfObject, StreamObject,
+)
+
+# Bytes del final del archivo donde buscar startxref
+STARTXREF_WINDOW = 1024
+
+_STARTXREF_RE = re.compile(rb'startxref\s+(\d+)')
+_OBJECT_HEADER_RE = re.compile(rb'\s*\d+\s+\d+\s+obj')
+
+
+def _find_startxref(data: bytes) -> Optional[int]:
+    match = None
+    for match in _STARTXREF_RE.finditer(data[-STARTXREF_WINDOW:]):
+        pass
+    return int(match.group(1)) if match else None
+
+
+def _unique_name(existing: DictionaryObject, base: str) -> NameObject:
+    name = base
+    suffix = 1
+    while name in existing:
+        name = f"{base}{suffix}"
+        suffix += 1
+    return NameObject(name)
+
+
+def _serialize(number: int, generation: int, obj: PdfObject) -> bytes:
+    buffer = BytesIO()
+    buffer.write(f"{number} {generation} obj\n".encode('ascii'))
+    obj.write_to_stream(buffer, None)
+    buffer.write(b"\nendobj\n")
+    return buffer.getvalue()
+
+
+def _subsections(entries: List[Tuple[int, int, int]]) -> List[List[Tuple[int, int, int]]]:
+    """Agrupa entradas (número, generación, posición) en rangos consecutivos"""
+    groups: List[List[Tuple[int, int, int]]] = []
+    for entry in sorted(entries):
+        if groups and groups[-1][-1][0] + 1 == entry[0]:
+            groups[-1].append(entry)
+        else:
+            groups.append([entry])
+    return groups
+
+
+def build_stamp_update(
+    data: bytes,
+    xobject: StreamObject,
+    x: float,
+    y: float,
+    size: float,
+    first_page_only: bool = False,
+    name: str = '/QRCode',
+) -> Optional[bytes]:
+    """
+    Genera la sección de actualización incremental que estampa `xobject`
+
+    El XObject se dibuja escalado a un cuadrado de lado `size` con la esquina
+    inferior izquierda en (x, y), igual que la superposición completa.
+
+    Args:
+        data: Bytes del PDF original
+        xobject: Form (o Image) XObject a estampar, escalado a 1×1
+        x: Posición X
+        y: Posición Y
+        size: Lado en puntos
+        first_page_only: Estampar solo la primera página
+        name: Nombre base del XObject en los recursos de la página
+
+    Returns:
+        Bytes a agregar al final de `data`, o None si el documento no admite
+        la actualización incremental (cifrado o referencias cruzadas
+        dañadas); en ese caso se debe reescribir el documento completo.
+    """
+    startxref = _find_startxref(data)
+    if startxref is None or startxref >= len(data):
+        return None
+    tail = data[startxref:startxref + 32]
+    if tail.startswith(b'xref'):
+        xref_stream = False
+    elif _OBJECT_HEADER_RE.match(tail):
+        xref_stream = True
+    else:
+        return None
+
+    reader = PdfReader(BytesIO(data), strict=False)
+    if reader.is_encrypted:
+        return None
+    pages = reader.pages[:1] if first_page_only else reader.pages
+    if any(page.indirect_reference is None for page in pages):
+        return None
+
+    trailer = reader.trailer
+    next_number = max(
+        [int(trailer.get('/Size', 0))]
+        + [number + 1 for generation in reader.xref.values() for number in generation]
+        + [number + 1 for number in reader.xref_objStm]
+    )
+
+    def allocate() -> IndirectObject:
+        nonlocal next_number
+        reference = IndirectObject(next_number, 0, None)
+        next_number += 1
+        return reference
+
+    objects: List[Tuple[IndirectObject, PdfObject]] = []
+
+    xobject_ref = allocate()
+    objects.append((xobject_ref, xobject))
+
+    # "q"/"Q" aíslan el estado gráfico que deje el contenido original
+    save_state = DecodedStreamObject()
+    save_state.set_data(b"q\n")
+    save_state_ref = allocate()
+    objects.append((save_state_ref, save_state))
+
+    stamps = {}
+    for page in pages:
+        resources = DictionaryObject(dict.items(page.get('/Resources') or DictionaryObject()))
+        xobjects = DictionaryObject(dict.items(resources.get('/XObject') or DictionaryObject()))
+        xobject_name = _unique_name(xobjects, name)
+        xobjects[xobject_name] = xobject_ref
+        resources[NameObject('/XObject')] = xobjects
+
+        # Un flujo de dibujo por nombre del XObject (normalmente uno solo)
+        if xobject_name not in stamps:
+            stamp = DecodedStreamObject()
+            stamp.set_data(f"\nQ q {size} 0 0 {size} {x} {y} cm {xobject_name} Do Q\n".encode('ascii'))
+            stamps[xobject_name] = allocate()
+            objects.append((stamps[xobject_name], stamp))
+
+        contents = dict.get(page, '/Contents')
+        if isinstance(contents, IndirectObject) and isinstance(contents.get_object(), ArrayObject):
+            contents = contents.get_object()
+        if contents is None:
+            contents = []
+        elif not isinstance(contents, ArrayObject):
+            contents = [contents]
+
+        updated = DictionaryObject(dict.items(page))
+        updated[NameObject('/Contents')] = ArrayObject(
+            [save_state_ref, *contents, stamps[xobject_name]]
+        )
+        updated[NameObject('/Resources')] = resources
+        objects.append((page.indirect_reference, updated))
+
+    # Serializar los objetos después del final original
+    update = BytesIO()
+    if not data.endswith((b'\n', b'\r')):
+        update.write(b'\n')
+    base = len(data)
+    entries = []
+    for reference, obj in objects:
+        entries.append((reference.idnum, reference.generation, base + update.tell()))
+        update.write(_serialize(reference.idnum, reference.generation, obj))
+
+    new_trailer = DictionaryObject({
+        NameObject('/Root'): dict.__getitem__(trailer, '/Root'),
+        NameObject('/Prev'): NumberObject(startxref),
+    })
+    for key in ('/Info', '/ID'):
+        if key in trailer:
+            new_trailer[NameObject(key)] = dict.__getitem__(trailer, key)
+
+    xref_position = base + update.tell()
+    if xref_stream:
+        xref_ref = allocate()
+        entries.append((xref_ref.idnum, 0, xref_position))
+        index = []
+        rows = []
+        for group in _subsections(entries):
+            index += [NumberObject(group[0][0]), NumberObject(len(group))]
+            for _, generation, position in group:
+                rows.append(b'\x01' + position.to_bytes(4, 'big') + generation.to_bytes(2, 'big'))
+        stream = DecodedStreamObject()
+        stream.update(new_trailer)
+        stream.update({
+            NameObject('/Type'): NameObject('/XRef'),
+            NameObject('/Size'): NumberObject(next_number),
+            NameObject('/W'): ArrayObject([NumberObject(1), NumberObject(4), NumberObject(2)]),
+            NameObject('/Index'): ArrayObject(index),
+        })
+        stream.set_data(b''.join(rows))
+        update.write(_serialize(xref_ref.idnum, 0, stream))
+    else:
+        # La entrada 0 libre encabeza la tabla, como en una tabla completa
+        update.write(b'xref\n0 1\n0000000000 65535 f\r\n')
+        for group in _subsections(entries):
+            update.write(f"{group[0][0]} {len(group)}\n".encode('ascii'))
+            for _, generation, position in group:
+                update.write(f"{position:010d} {generation:05d} n\r\n".encode('ascii'))
+        new_trailer[NameObject('/Size')] = NumberObject(next_number)
+        update.write(b'trailer\n')
+        new_trailer.write_to_stream(update, None)
+        update.write(b'\n')
+
+    update.write(f"startxref\n{xref_position}\n%%EOF\n".encode('ascii'))
+    return update.getvalue()
@@ -4,34 +4,205 @@ Servicio para procesamiento de archivos PDF.
 Este servicio maneja:
 - Importación masiva de PDFs
 - Extracción de nombres de participantes
-- Inserción de códigos QR en PDFs
+- Inserción de códigos QR en PDFs (también por lotes en un pool de procesos)
 - Validación de calidad de PDFs
 - Creación de archivos ZIP para exportación
 """
+import logging
 import os
 import re
-import zipfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
-from typing import List, Dict, Optional, Tuple
+from itertools import islice
+from typing import Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
 
+from django.conf import settings
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import UploadedFile
 from django.utils import timezone
 from django.db import transaction
 
-from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2 import PageObject, PdfReader, PdfWriter
+from PyPDF2.generic import (
+    ArrayObject, DecodedStreamObject, DictionaryObject, FloatObject, NameObject, NumberObject,
+)
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from PIL import Image
 
 from certificates.models import Certificate, Participant, Event, QRProcessingConfig
+from certificates.services.certificate_lookup import certificate_lookup
+from certificates.services.certificate_page_cache import certificate_page_cache
+from certificates.services.certificate_query_cache import certificate_query_cache
+from certificates.services.dashboard_counters import dashboard_counters
+from certificates.services.pdf_incremental import build_stamp_update
 from certificates.services.qr_service import QRCodeService
+from certificates.services.zip_stream import stream_zip
+from certificates.storage import has_same_content
+
+logger = logging.getLogger("certificates")
+
+# Nombre del Form XObject del QR en la página de superposición
+QR_XOBJECT = NameObject('/QRCode')
+
+# Páginas de superposición por (x, y, tamaño), una caché por proceso
+_qr_overlays: Dict[Tuple[float, float, float], PageObject] = {}
+
+# QRCodeService del proceso worker (conserva sus cachés entre certificados)
+_worker_qr_service: Optional[QRCodeService] = None
+
+
+def _qr_overlay_page(x: float, y: float, size: float) -> PageObject:
+    """
+    Página de superposición que dibuja el Form XObject QR_XOBJECT en la
+    posición y el tamaño indicados
+
+    Se construye una vez por (x, y, tamaño); para cada certificado solo se
+    reemplaza el XObject (ver _qr_form_xobject).
+    """
+    key = (x, y, size)
+    overlay = _qr_overlays.get(key)
+    if overlay is None:
+        overlay = PageObject.create_blank_page(width=letter[0], height=letter[1])
+        content = DecodedStreamObject()
+        content.set_data(f"q {size} 0 0 {size} {x} {y} cm {QR_XOBJECT} Do Q".encode('ascii'))
+        overlay[NameObject('/Contents')] = content
+        overlay[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/XObject'): DictionaryObject(),
+        })
+        _qr_overlays[key] = overlay
+    return overlay
+
+
+def _qr_form_xobject(qr_service: QRCodeService, matrix: List[List[bool]]) -> DecodedStreamObject:
+    """Form XObject vectorial del QR escalado a un cuadrado de lado 1"""
+    modules = len(matrix)
+    scale = FloatObject(f"{1 / modules:.8f}")
+    form = DecodedStreamObject()
+    form.update({
+        NameObject('/Type'): NameObject('/XObject'),
+        NameObject('/Subtype'): NameObject('/Form'),
+        NameObject('/BBox'): ArrayObject([
+            NumberObject(0), NumberObject(0), NumberObject(modules), NumberObject(modules),
+        ]),
+        NameObject('/Matrix'): ArrayObject([
+            scale, NumberObject(0), NumberObject(0), scale, NumberObject(0), NumberObject(0),
+        ]),
+    })
+    form.set_data(qr_service.render_qr_pdf_operators(matrix))
+    return form
+
+
+def _stamp_pdf(
+    data: bytes,
+    form: DecodedStreamObject,
+    x: float,
+    y: float,
+    size: float,
+    incremental: bool = True,
+    first_page_only: bool = False
+) -> bytes:
+    """
+    Estampa el Form XObject del QR en un PDF
+
+    Con `incremental` se agrega una actualización incremental al final del
+    original (ver pdf_incremental); si el documento no la admite, o sin
+    `incremental`, se combina la página de superposición y se reescribe el
+    documento completo.
+    """
+    if incremental:
+        update = build_stamp_update(
+            data, form, x, y, size, first_page_only=first_page_only, name=QR_XOBJECT
+        )
+        if update is not None:
+            return data + update
+
+    overlay = _qr_overlay_page(x, y, size)
+    overlay['/Resources']['/XObject'][QR_XOBJECT] = form
+
+    reader = PdfReader(BytesIO(data))
+    writer = PdfWriter()
+    for index, page in enumerate(reader.pages):
+        if index == 0 or not first_page_only:
+            page.merge_page(overlay)
+        writer.add_page(page)
+
+    output_buffer = BytesIO()
+    writer.write(output_buffer)
+    return output_buffer.getvalue()
+
+
+def _stamp_qr_certificate(payload: dict) -> dict:
+    """
+    Genera la imagen QR e inserta el QR en el PDF original de un certificado
+
+    Se ejecuta en procesos worker (o en el proceso actual con un solo
+    worker): no accede a la base de datos ni al storage de Django; lee el
+    PDF original desde su ruta y devuelve los bytes generados.
+
+    Args:
+        payload: Diccionario con certificate_id, original_path, qr_data,
+            qr_settings (error_correction, box_size, border), x, y, size,
+            validate, incremental y first_page_only
+
+    Returns:
+        Diccionario con certificate_id, qr_bytes, pdf_bytes y error
+    """
+    global _worker_qr_service
+
+    result = {
+        'certificate_id': payload['certificate_id'],
+        'qr_bytes': None,
+        'pdf_bytes': None,
+        'error': None,
+    }
+    try:
+        if _worker_qr_service is None:
+            _worker_qr_service = QRCodeService()
+        qr_service = _worker_qr_service
+        qr_settings = payload['qr_settings']
+
+        qr_buffer = next(qr_service.generate_qr_batch([payload['qr_data']], **qr_settings))
+        if payload['validate']:
+            try:
+                Image.open(qr_buffer).verify()
+            except Exception:
+                result['error'] = "El QR generado no es legible"
+                return result
+        result['qr_bytes'] = qr_buffer.getvalue()
+
+        matrix = qr_service.build_matrix(
+            payload['qr_data'], qr_settings['error_correction'], qr_settings['border']
+        )
+        with open(payload['original_path'], 'rb') as original:
+            data = original.read()
+        result['pdf_bytes'] = _stamp_pdf(
+            data,
+            _qr_form_xobject(qr_service, matrix),
+            payload['x'], payload['y'], payload['size'],
+            incremental=payload['incremental'],
+            first_page_only=payload['first_page_only'],
+        )
+    except Exception as e:
+        result['error'] = str(e)
+    return result
 
 
 class PDFProcessingService:
     """Servicio para procesamiento de archivos PDF"""
     
+    # Certificados por UPDATE al marcar exportaciones e importar PDFs finales
+    EXPORT_BATCH_SIZE = 500
+    FINAL_IMPORT_FIELDS = [
+        'final_pdf', 'processing_status', 'final_imported_at', 'is_signed', 'signed_at',
+    ]
+    QR_FIELDS = [
+        'qr_image', 'qr_pdf', 'processing_status', 'processing_errors', 'processed_at',
+        'qr_position_x', 'qr_position_y', 'qr_size',
+    ]
+    
     def __init__(self):
         self.qr_service = QRCodeService()
     
@@ -179,24 +350,52 @@ class PDFProcessingService:
     def insert_qr_into_pdf(
         self,
         pdf_path: str,
-        qr_image_path: str,
+        qr_image_path: Optional[str],
         x: int,
         y: int,
-        size: int
+        size: int,
+        qr_data: Optional[str] = None,
+        incremental: Optional[bool] = None,
+        first_page_only: Optional[bool] = None
     ) -> bytes:
         """
         Inserta un código QR en un PDF existente.
         
+        Con qr_data el QR se dibuja como vector y, en modo incremental, se
+        agrega al final del PDF original sin reescribirlo (ver
+        pdf_incremental). La imagen (qr_image_path) siempre reescribe el
+        documento completo.
+        
         Args:
             pdf_path: Ruta del PDF original
-            qr_image_path: Ruta de la imagen QR
+            qr_image_path: Ruta de la imagen QR (se ignora si hay qr_data)
             x: Posición X del QR
             y: Posición Y del QR
             size: Tamaño del QR
+            qr_data: Contenido del QR a dibujar como vector (opcional)
+            incremental: Agregar el QR como actualización incremental (por
+                defecto settings.QR_PDF_INCREMENTAL_UPDATE)
+            first_page_only: Estampar solo la primera página (por defecto
+                settings.QR_PDF_FIRST_PAGE_ONLY)
             
         Returns:
             Bytes del nuevo PDF con QR insertado
         """
+        default_incremental, default_first_page_only = self._stamp_options()
+        if incremental is None:
+            incremental = default_incremental
+        if first_page_only is None:
+            first_page_only = default_first_page_only
+        
+        if qr_data:
+            with open(pdf_path, 'rb') as original:
+                data = original.read()
+            form = _qr_form_xobject(self.qr_service, self.qr_service.build_matrix(qr_data))
+            return _stamp_pdf(
+                data, form, x, y, size,
+                incremental=incremental, first_page_only=first_page_only
+            )
+        
         # Leer el PDF original
         reader = PdfReader(pdf_path)
         writer = PdfWriter()
@@ -220,9 +419,10 @@ class PDFProcessingService:
         qr_reader = PdfReader(qr_pdf_buffer)
         qr_page = qr_reader.pages[0]
         
-        # Superponer el QR en cada página del PDF original
-        for page in reader.pages:
-            page.merge_page(qr_page)
+        # Superponer el QR en cada página del PDF original (o solo la primera)
+        for index, page in enumerate(reader.pages):
+            if index == 0 or not first_page_only:
+                page.merge_page(qr_page)
             writer.add_page(page)
         
         # Escribir el resultado
@@ -235,7 +435,8 @@ class PDFProcessingService:
     def process_qr_for_certificate(
         self,
         certificate: Certificate,
-        config: Optional[QRProcessingConfig] = None
+        config: Optional[QRProcessingConfig] = None,
+        qr_buffer: Optional[BytesIO] = None
     ) -> Dict:
         """
         Procesa el QR para un certificado específico.
@@ -243,6 +444,8 @@ class PDFProcessingService:
         Args:
             certificate: Certificado a procesar
             config: Configuración de QR (opcional, usa la activa por defecto)
+            qr_buffer: Imagen PNG del QR ya generada (opcional, ver
+                process_qr_batch)
             
         Returns:
             Dict con resultado del procesamiento
@@ -262,16 +465,12 @@ class PDFProcessingService:
                 result['error'] = "El certificado no está en estado válido para procesar QR"
                 return result
             
-            # Generar URL de preview
-            preview_url = config.get_qr_preview_url(certificate.uuid)
-            
-            # Generar código QR
-            qr_buffer = self.qr_service.generate_qr(
-                preview_url,
-                error_correction=config.qr_error_correction,
-                box_size=config.qr_box_size,
-                border=config.qr_border
-            )
+            # Generar código QR con la URL de preview
+            if qr_buffer is None:
+                preview_url = config.get_qr_preview_url(certificate.uuid)
+                qr_buffer = next(self.qr_service.generate_qr_batch(
+                    [preview_url], **self._qr_image_settings(config)
+                ))
             
             # Guardar imagen QR
             qr_filename = f"qr_{certificate.uuid}.png"
@@ -286,13 +485,25 @@ class PDFProcessingService:
                     result['error'] = "El QR generado no es legible"
                     return result
             
-            # Insertar QR en el PDF
-            pdf_with_qr = self.insert_qr_into_pdf(
-                certificate.original_pdf.path,
-                certificate.qr_image.path,
+            # Insertar QR en el PDF (vectorial, mismo contenido y nivel de
+            # corrección que la imagen)
+            qr_settings = self._qr_image_settings(config)
+            matrix = self.qr_service.build_matrix(
+                config.get_qr_preview_url(certificate.uuid),
+                qr_settings['error_correction'],
+                qr_settings['border']
+            )
+            incremental, first_page_only = self._stamp_options()
+            with certificate.original_pdf.open('rb') as original:
+                data = original.read()
+            pdf_with_qr = _stamp_pdf(
+                data,
+                _qr_form_xobject(self.qr_service, matrix),
                 config.default_qr_x,
                 config.default_qr_y,
-                config.default_qr_size
+                config.default_qr_size,
+                incremental=incremental,
+                first_page_only=first_page_only
             )
             
             # Guardar PDF con QR
@@ -318,51 +529,248 @@ class PDFProcessingService:
         
         return result
     
+    def process_qr_batch(
+        self,
+        certificates,
+        config: Optional[QRProcessingConfig] = None,
+        progress_callback=None,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> Dict:
+        """
+        Procesa el QR de varios certificados.
+        
+        La página de superposición se construye una vez por posición y
+        tamaño; para cada certificado solo cambia el QR (un Form XObject
+        vectorial). La generación del QR y la combinación con el PDF original
+        se reparten en un pool de procesos sin acceso a la base de datos; el
+        proceso actual guarda los archivos y actualiza los certificados con
+        un bulk_update por lote.
+        
+        Args:
+            certificates: Queryset o lista de certificados (con participant
+                en select_related para los mensajes de error)
+            config: Configuración de QR (opcional, usa la activa por defecto)
+            progress_callback: Función opcional (procesados) llamada tras
+                cada certificado
+            workers: Procesos en paralelo (por defecto
+                settings.QR_PROCESSING_WORKERS)
+            batch_size: Certificados por bulk_update (por defecto
+                settings.QR_PROCESSING_BATCH_SIZE)
+            
+        Returns:
+            Dict con success_count, error_count, errors, elapsed_seconds y
+            seconds_per_certificate
+        """
+        if not config:
+            config = QRProcessingConfig.get_active_config()
+        if workers is None:
+            workers = getattr(settings, 'QR_PROCESSING_WORKERS', 1)
+        if batch_size is None:
+            batch_size = getattr(settings, 'QR_PROCESSING_BATCH_SIZE', 100)
+        workers = max(1, int(workers))
+        batch_size = max(1, int(batch_size))
+        
+        started = time.monotonic()
+        certificates = list(certificates)
+        result = {'success_count': 0, 'error_count': 0, 'errors': []}
+        processed = 0
+        
+        pending = []
+        for certificate in certificates:
+            if certificate.can_process_qr():
+                pending.append(certificate)
+                continue
+            result['error_count'] += 1
+            result['errors'].append(
+                f"{certificate.participant.full_name}: "
+                "El certificado no está en estado válido para procesar QR"
+            )
+            processed += 1
+            if progress_callback:
+                progress_callback(processed)
+        
+        qr_settings = self._qr_image_settings(config)
+        incremental, first_page_only = self._stamp_options()
+        payloads = [
+            {
+                'certificate_id': certificate.id,
+                'original_path': certificate.original_pdf.path,
+                'qr_data': config.get_qr_preview_url(certificate.uuid),
+                'qr_settings': qr_settings,
+                'x': config.default_qr_x,
+                'y': config.default_qr_y,
+                'size': config.default_qr_size,
+                'validate': config.enable_qr_validation,
+                'incremental': incremental,
+                'first_page_only': first_page_only,
+            }
+            for certificate in pending
+        ]
+        by_id = {certificate.id: certificate for certificate in pending}
+        
+        def persist(rendered):
+            nonlocal processed
+            rendered = iter(rendered)
+            while True:
+                batch = list(islice(rendered, batch_size))
+                if not batch:
+                    break
+                self._persist_qr_batch(batch, by_id, config, result)
+                for _ in batch:
+                    processed += 1
+                    if progress_callback:
+                        progress_callback(processed)
+        
+        if workers > 1 and len(payloads) > 1:
+            chunksize = max(1, min(batch_size, len(payloads) // (workers * 4) or 1))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                persist(executor.map(_stamp_qr_certificate, payloads, chunksize=chunksize))
+        else:
+            persist(_stamp_qr_certificate(payload) for payload in payloads)
+        
+        elapsed = time.monotonic() - started
+        result['elapsed_seconds'] = round(elapsed, 3)
+        result['seconds_per_certificate'] = (
+            round(elapsed / len(certificates), 4) if certificates else 0
+        )
+        logger.info(
+            f"QR procesado para {len(certificates)} certificados con {workers} workers "
+            f"en {elapsed:.2f}s ({result['seconds_per_certificate']}s por certificado): "
+            f"{result['success_count']} éxitos, {result['error_count']} errores"
+        )
+        return result
+    
+    def _persist_qr_batch(
+        self,
+        outcomes: List[dict],
+        certificates_by_id: Dict[int, Certificate],
+        config: QRProcessingConfig,
+        result: Dict
+    ) -> None:
+        """Guarda los archivos generados y actualiza el lote con bulk_update"""
+        processed_at = timezone.now()
+        updated = []
+        for outcome in outcomes:
+            certificate = certificates_by_id[outcome['certificate_id']]
+            error = outcome['error']
+            if not error:
+                try:
+                    certificate.qr_image.save(
+                        f"qr_{certificate.uuid}.png",
+                        ContentFile(outcome['qr_bytes']),
+                        save=False
+                    )
+                    certificate.qr_pdf.save(
+                        f"cert_qr_{certificate.uuid}.pdf",
+                        ContentFile(outcome['pdf_bytes']),
+                        save=False
+                    )
+                except Exception as e:
+                    error = str(e)
+            
+            if error:
+                certificate.processing_status = 'ERROR'
+                certificate.processing_errors = error
+                result['error_count'] += 1
+                result['errors'].append(f"{certificate.participant.full_name}: {error}")
+            else:
+                certificate.processing_status = 'QR_INSERTED'
+                certificate.processed_at = processed_at
+                certificate.qr_position_x = config.default_qr_x
+                certificate.qr_position_y = config.default_qr_y
+                certificate.qr_size = config.default_qr_size
+                result['success_count'] += 1
+            updated.append(certificate)
+        
+        # Estos campos no forman parte de la consulta pública cacheada ni de
+        # los contadores del dashboard; sí del preview (imagen QR y estado)
+        Certificate.objects.bulk_update(updated, self.QR_FIELDS)
+        certificate_page_cache.invalidate_many(certificate.uuid for certificate in updated)
+        certificate_lookup.sync_instances(updated)
+    
+    def _stamp_options(self) -> Tuple[bool, bool]:
+        """(incremental, first_page_only) para estampar el QR según settings"""
+        return (
+            getattr(settings, 'QR_PDF_INCREMENTAL_UPDATE', True),
+            getattr(settings, 'QR_PDF_FIRST_PAGE_ONLY', False),
+        )
+    
+    def _qr_image_settings(self, config: QRProcessingConfig) -> Dict:
+        """
+        Parámetros de imagen del QR según la configuración.
+        
+        'size' se omite: es el tamaño de inserción en el PDF (en puntos), no
+        el de la imagen, cuya resolución depende de box_size.
+        """
+        qr_settings = config.get_qr_settings()
+        qr_settings.pop('size', None)
+        return qr_settings
+    
     # ============================================================================
     # EXPORTACIÓN
     # ============================================================================
     
-    def create_export_zip(
+    def stream_export_zip(
         self,
         certificates: List[Certificate],
         include_metadata: bool = True
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[Iterator[bytes], str]:
         """
-        Crea un archivo ZIP con certificados para exportar.
+        Crea en streaming un archivo ZIP con certificados para exportar.
+        
+        Los PDFs se leen del storage en bloques y se guardan sin comprimir
+        (ver zip_stream): la memoria usada no depende de cuántos se exporten.
+        Los certificados escritos se marcan como exportados con un UPDATE
+        por cada EXPORT_BATCH_SIZE certificados.
         
         Args:
-            certificates: Lista de certificados a exportar
+            certificates: Lista de certificados a exportar (con participant y
+                participant__event en select_related para los metadatos)
             include_metadata: Si debe incluir archivo CSV con metadatos
             
         Returns:
-            Tuple de (bytes del ZIP, nombre del archivo)
+            Tuple de (bloques de bytes del ZIP, nombre del archivo)
         """
-        zip_buffer = BytesIO()
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         zip_filename = f"certificados_export_{timestamp}.zip"
         
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        def entries():
             # Agregar PDFs
+            written = []
             for cert in certificates:
                 if cert.qr_pdf:
                     # Nombre del archivo incluye UUID para facilitar reimportación
-                    pdf_filename = f"{cert.uuid}_{cert.participant.dni}.pdf"
+                    yield f"{cert.uuid}_{cert.participant.dni}.pdf", cert.qr_pdf
                     
-                    cert.qr_pdf.seek(0)
-                    zip_file.writestr(pdf_filename, cert.qr_pdf.read())
-                    
-                    # Actualizar estado
-                    cert.processing_status = 'EXPORTED_FOR_SIGNING'
-                    cert.exported_at = timezone.now()
-                    cert.save()
+                    written.append(cert)
+                    if len(written) >= self.EXPORT_BATCH_SIZE:
+                        self._mark_exported(written)
+                        written = []
+            self._mark_exported(written)
             
             # Agregar archivo de metadatos CSV
             if include_metadata:
-                csv_content = self._generate_metadata_csv(certificates)
-                zip_file.writestr('metadata.csv', csv_content)
+                yield 'metadata.csv', self._generate_metadata_csv(certificates)
         
-        zip_buffer.seek(0)
-        return zip_buffer.getvalue(), zip_filename
+        return stream_zip(entries()), zip_filename
+    
+    def _mark_exported(self, certificates: List[Certificate]) -> None:
+        """Marca los certificados como exportados con un solo UPDATE"""
+        if not certificates:
+            return
+        exported_at = timezone.now()
+        # Estado y fecha de exportación no forman parte de la consulta pública
+        # cacheada ni de los contadores del dashboard; el estado sí está
+        # copiado en CertificateLookup
+        Certificate.objects.filter(id__in=[cert.id for cert in certificates]).update(
+            processing_status='EXPORTED_FOR_SIGNING',
+            exported_at=exported_at,
+        )
+        for cert in certificates:
+            cert.processing_status = 'EXPORTED_FOR_SIGNING'
+            cert.exported_at = exported_at
+        certificate_lookup.sync_instances(certificates)
     
     # ============================================================================
     # IMPORTACIÓN DE CERTIFICADOS FINALES
@@ -375,6 +783,10 @@ class PDFProcessingService:
         """
         Importa certificados firmados finales.
         
+        Los certificados se cargan con una sola consulta por UUID y los
+        cambios de estado se guardan con bulk_update (solo los campos
+        modificados).
+        
         Args:
             pdf_files: Lista de archivos PDF firmados
             
@@ -389,22 +801,31 @@ class PDFProcessingService:
             'error_count': 0
         }
         
+        # Extraer UUID del nombre de cada archivo
+        files_by_uuid = []
         for pdf_file in pdf_files:
+            uuid_str = self._extract_uuid_from_filename(pdf_file.name)
+            if not uuid_str:
+                results['errors'].append(
+                    f"No se pudo extraer UUID de: {pdf_file.name}"
+                )
+                results['error_count'] += 1
+                continue
+            files_by_uuid.append((uuid_str.lower(), pdf_file))
+        
+        # Buscar certificados (una consulta)
+        certificates = {
+            str(certificate.uuid): certificate
+            for certificate in Certificate.objects.filter(
+                uuid__in={uuid_str for uuid_str, _ in files_by_uuid}
+            ).select_related('participant', 'participant__event')
+        }
+        
+        imported = []
+        for uuid_str, pdf_file in files_by_uuid:
             try:
-                # Extraer UUID del nombre del archivo
-                uuid_str = self._extract_uuid_from_filename(pdf_file.name)
-                
-                if not uuid_str:
-                    results['errors'].append(
-                        f"No se pudo extraer UUID de: {pdf_file.name}"
-                    )
-                    results['error_count'] += 1
-                    continue
-                
-                # Buscar certificado
-                try:
-                    certificate = Certificate.objects.get(uuid=uuid_str)
-                except Certificate.DoesNotExist:
+                certificate = certificates.get(uuid_str)
+                if certificate is None:
                     results['errors'].append(
                         f"Certificado no encontrado para UUID: {uuid_str}"
                     )
@@ -423,15 +844,17 @@ class PDFProcessingService:
                 final_pdf_filename = f"cert_final_{certificate.uuid}.pdf"
                 certificate.final_pdf.save(
                     final_pdf_filename,
-                    pdf_file
+                    pdf_file,
+                    save=False
                 )
                 
                 # Actualizar estado
+                now = timezone.now()
                 certificate.processing_status = 'SIGNED_FINAL'
-                certificate.final_imported_at = timezone.now()
+                certificate.final_imported_at = now
                 certificate.is_signed = True
-                certificate.signed_at = timezone.now()
-                certificate.save()
+                certificate.signed_at = now
+                imported.append(certificate)
                 
                 results['success'].append(certificate)
                 results['success_count'] += 1
@@ -442,6 +865,19 @@ class PDFProcessingService:
                 )
                 results['error_count'] += 1
         
+        if imported:
+            Certificate.objects.bulk_update(
+                imported, self.FINAL_IMPORT_FIELDS, batch_size=self.EXPORT_BATCH_SIZE
+            )
+            # bulk_update no emite señales; is_signed aparece en la consulta
+            # pública y en los contadores del dashboard
+            certificate_query_cache.invalidate_many(
+                certificate.participant.dni for certificate in imported
+            )
+            certificate_page_cache.invalidate_many(certificate.uuid for certificate in imported)
+            certificate_lookup.sync_instances(imported)
+            dashboard_counters.invalidate()
+        
         return results
     
     # ============================================================================
@@ -534,7 +970,11 @@ class PDFProcessingService:
             }
         )
         
-        # Guardar PDF original
+        # Reimportación del mismo archivo: ya está guardado, no se reescribe
+        if not created and has_same_content(certificate.original_pdf, pdf_file):
+            return certificate
+        
+        # Guardar PDF original (el storage deduplica por contenido)
         original_pdf_filename = f"cert_original_{certificate.uuid}.pdf"
         certificate.original_pdf.save(
             original_pdf_filename,
@@ -1,19 +1,39 @@
 """Servicio para generar códigos QR de verificación"""
 import qrcode
+from qrcode.exceptions import DataOverflowError
+from collections import OrderedDict
 from io import BytesIO
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from django.conf import settings
+from PIL import Image
 import logging
 
 logger = logging.getLogger("certificates")
 
 
+# Niveles de corrección de errores (QRProcessingConfig.QR_ERROR_CORRECTION_CHOICES)
+ERROR_CORRECTION_LEVELS = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+
 class QRCodeService:
     """Genera códigos QR para verificación de certificados"""
 
+    # Matrices memorizadas por servicio (p. ej. la misma URL dibujada como
+    # vector y luego solicitada como PNG)
+    MATRIX_CACHE_SIZE = 256
+
     def __init__(self):
         self.qr_size = 300  # Tamaño del QR en píxeles
         self.box_size = 10
         self.border = 4
+        # Versión QR mínima por (nivel de corrección, longitud del contenido)
+        self._versions: Dict[Tuple[int, int], int] = {}
+        self._matrices: "OrderedDict[tuple, List[List[bool]]]" = OrderedDict()
 
     def get_verification_url(self, certificate_uuid: str) -> str:
         """
@@ -41,16 +61,26 @@ class QRCodeService:
         # Obtener URL de verificación
         verification_url = self.get_verification_url(certificate_uuid)
 
-        # Crear código QR
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=self.box_size,
-            border=self.border,
-        )
+        buffer = self.render_qr_png(verification_url)
 
-        qr.add_data(verification_url)
-        qr.make(fit=True)
+        logger.info(f"Código QR generado para certificado {certificate_uuid}")
+
+        return buffer
+
+    def render_qr_png(self, data: str) -> BytesIO:
+        """
+        Genera la imagen PNG de un código QR para un contenido ya resuelto.
+
+        No accede a settings ni a la base de datos, por lo que puede usarse
+        desde procesos worker de generación masiva.
+
+        Args:
+            data: Contenido a codificar (normalmente la URL de verificación)
+
+        Returns:
+            BytesIO con la imagen PNG del código QR
+        """
+        qr = self._make_qr(data)
 
         # Generar imagen
         img = qr.make_image(fill_color="black", back_color="white")
@@ -63,6 +93,226 @@ class QRCodeService:
         img.save(buffer, format="PNG")
         buffer.seek(0)
 
-        logger.info(f"Código QR generado para certificado {certificate_uuid}")
+        return buffer
+
+    def generate_qr_batch(
+        self,
+        urls: Iterable[str],
+        error_correction: Union[str, int] = "L",
+        box_size: Optional[int] = None,
+        border: Optional[int] = None,
+        size: Optional[int] = None,
+    ) -> Iterator[BytesIO]:
+        """
+        Genera las imágenes PNG de varios códigos QR
+
+        Acepta los parámetros de QRProcessingConfig.get_qr_settings(). Reutiliza
+        un solo objeto QRCode y calcula la versión QR una vez por longitud de
+        contenido (las URLs de un mismo lote suelen tener la misma longitud).
+        La imagen se construye directamente desde la matriz de módulos.
+
+        Args:
+            urls: Contenidos a codificar (p. ej. URLs de un queryset completo)
+            error_correction: Nivel de corrección ('L', 'M', 'Q', 'H' o
+                constante de qrcode)
+            box_size: Píxeles por módulo (por defecto self.box_size)
+            border: Módulos de margen (por defecto self.border)
+            size: Lado final de la imagen en píxeles (opcional; por defecto
+                módulos × box_size, sin redimensionar)
+
+        Yields:
+            BytesIO con la imagen PNG de cada código QR, en el mismo orden
+        """
+        if isinstance(error_correction, str):
+            error_correction = ERROR_CORRECTION_LEVELS[error_correction.upper()]
+        box_size = box_size or self.box_size
+        border = self.border if border is None else border
+
+        qr = qrcode.QRCode(error_correction=error_correction, box_size=box_size, border=border)
+
+        for url in urls:
+            yield self._matrix_to_png(
+                self._get_matrix(qr, url, error_correction, border), box_size, size
+            )
+
+    def _get_matrix(
+        self, qr: qrcode.QRCode, data: str, error_correction: int, border: int
+    ) -> List[List[bool]]:
+        """Retorna la matriz memorizada del contenido o la compila con `qr`"""
+        key = (data, error_correction, border)
+        matrix = self._matrices.get(key)
+        if matrix is not None:
+            self._matrices.move_to_end(key)
+            return matrix
+
+        qr.clear()
+        qr.add_data(data)
+        self._make_with_cached_version(qr, (error_correction, len(data)))
+        matrix = qr.get_matrix()
 
+        self._matrices[key] = matrix
+        if len(self._matrices) > self.MATRIX_CACHE_SIZE:
+            self._matrices.popitem(last=False)
+        return matrix
+
+    def _make_with_cached_version(self, qr: qrcode.QRCode, key: Tuple[int, int]) -> None:
+        """Compila el QR usando la versión ya calculada para contenidos de igual longitud"""
+        version = self._versions.get(key)
+        if version is not None:
+            qr.version = version
+            try:
+                qr.make(fit=False)
+                return
+            except DataOverflowError:
+                # Mismo largo pero segmentación distinta: recalcular la versión
+                pass
+
+        qr.version = None
+        qr.make(fit=True)
+        self._versions[key] = qr.version
+
+    @staticmethod
+    def _matrix_to_png(matrix: List[List[bool]], box_size: int, size: Optional[int]) -> BytesIO:
+        """Rasteriza la matriz de módulos (1 bit) y la codifica como PNG"""
+        modules = len(matrix)
+        img = Image.new("1", (modules, modules))
+        img.putdata([0 if dark else 255 for row in matrix for dark in row])
+        img = img.resize((modules * box_size, modules * box_size), Image.NEAREST)
+        if size:
+            img = img.resize((size, size), Image.NEAREST)
+
+        buffer = BytesIO()
+        img.save(buffer, format="PNG")
+        buffer.seek(0)
         return buffer
+
+    def _make_qr(self, data: str) -> qrcode.QRCode:
+        """Construye el código QR (sin rasterizar) para un contenido"""
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=self.box_size,
+            border=self.border,
+        )
+
+        qr.add_data(data)
+        qr.make(fit=True)
+
+        return qr
+
+    def build_matrix(
+        self,
+        data: str,
+        error_correction: Union[str, int] = "L",
+        border: Optional[int] = None,
+    ) -> List[List[bool]]:
+        """
+        Retorna la matriz de módulos del QR, incluido el margen
+
+        Args:
+            data: Contenido a codificar
+            error_correction: Nivel de corrección ('L', 'M', 'Q', 'H' o
+                constante de qrcode)
+            border: Módulos de margen (por defecto self.border)
+
+        Returns:
+            Filas de módulos (True = módulo oscuro)
+        """
+        if isinstance(error_correction, str):
+            error_correction = ERROR_CORRECTION_LEVELS[error_correction.upper()]
+        border = self.border if border is None else border
+        qr = qrcode.QRCode(error_correction=error_correction, border=border)
+        return self._get_matrix(qr, data, error_correction, border)
+
+    @staticmethod
+    def _dark_runs(matrix: List[List[bool]]) -> Iterator[Tuple[int, int, int]]:
+        """
+        Agrupa los módulos oscuros contiguos de cada fila
+
+        Yields:
+            Tuplas (fila, columna inicial, longitud)
+        """
+        for row_index, row in enumerate(matrix):
+            start = None
+            for col_index, dark in enumerate(row + [False]):
+                if dark and start is None:
+                    start = col_index
+                elif not dark and start is not None:
+                    yield row_index, start, col_index - start
+                    start = None
+
+    def draw_qr(self, pdf_canvas, data: str, x: float, y: float, size: float) -> None:
+        """
+        Dibuja el QR como rectángulos vectoriales en un canvas de ReportLab
+
+        Evita generar, codificar y volver a decodificar un PNG por
+        certificado; el resultado es nítido a cualquier escala.
+
+        Args:
+            pdf_canvas: Canvas de ReportLab
+            data: Contenido a codificar
+            x: Posición X de la esquina inferior izquierda
+            y: Posición Y de la esquina inferior izquierda
+            size: Lado del QR en puntos (incluye el margen)
+        """
+        matrix = self.build_matrix(data)
+        module = size / len(matrix)
+
+        path = pdf_canvas.beginPath()
+        for row, col, length in self._dark_runs(matrix):
+            path.rect(x + col * module, y + size - (row + 1) * module, length * module, module)
+
+        pdf_canvas.saveState()
+        # Fondo blanco, igual que la imagen PNG
+        pdf_canvas.setFillColorRGB(1, 1, 1)
+        pdf_canvas.rect(x, y, size, size, stroke=0, fill=1)
+        pdf_canvas.setFillColorRGB(0, 0, 0)
+        pdf_canvas.drawPath(path, stroke=0, fill=1)
+        pdf_canvas.restoreState()
+
+    def render_qr_pdf_operators(self, matrix: List[List[bool]]) -> bytes:
+        """
+        Genera los operadores de contenido PDF que dibujan la matriz
+
+        Las coordenadas están en módulos con el origen abajo a la izquierda
+        (el llamador escala el resultado, p. ej. con la /Matrix de un Form
+        XObject). Incluye el fondo blanco, igual que draw_qr.
+
+        Args:
+            matrix: Matriz de módulos (ver build_matrix)
+
+        Returns:
+            Operadores de contenido en bytes
+        """
+        modules = len(matrix)
+        rects = " ".join(
+            f"{col} {modules - row - 1} {length} 1 re"
+            for row, col, length in self._dark_runs(matrix)
+        )
+        return f"1 g 0 0 {modules} {modules} re f 0 g {rects} f".encode("ascii")
+
+    def render_qr_svg(self, data: str) -> str:
+        """
+        Genera el QR como SVG en línea (para elementos QR de WeasyPrint)
+
+        El SVG ocupa el 100% de su contenedor; las coordenadas están en
+        módulos.
+
+        Args:
+            data: Contenido a codificar
+
+        Returns:
+            Marcado SVG
+        """
+        matrix = self.build_matrix(data)
+        modules = len(matrix)
+        path = "".join(
+            f"M{col} {row}h{length}v1h-{length}z"
+            for row, col, length in self._dark_runs(matrix)
+        )
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {modules} {modules}" '
+            f'width="100%" height="100%" shape-rendering="crispEdges">'
+            f'<rect width="{modules}" height="{modules}" fill="#fff"/>'
+            f'<path d="{path}" fill="#000"/></svg>'
+        )
@@ -0,0 +1,167 @@
+"""
+Cache de "planes de renderizado" compilados para plantillas visuales.
+
+Un plan contiene todo lo que no depende del participante (elementos
+resueltos, estilos CSS, data URLs de assets y CSS base), de modo que cada
+certificado solo necesita sustituir variables.
+"""
+from collections import OrderedDict
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class RenderPlanCache:
+    """
+    LRU en proceso con respaldo opcional en la cache compartida (Redis).
+
+    Las entradas se identifican por (template_id, updated_at): cualquier
+    cambio en la plantilla, sus elementos o sus assets actualiza `updated_at`
+    (ver certificates.signals), por lo que las versiones anteriores dejan de
+    consultarse en todos los procesos sin necesidad de coordinarlos.
+    """
+
+    SHARED_KEY_PREFIX = 'render_plan'
+
+    def __init__(self, max_size: Optional[int] = None, use_shared_cache: Optional[bool] = None):
+        if max_size is None:
+            max_size = getattr(settings, 'TEMPLATE_RENDER_PLAN_CACHE_SIZE', 32)
+        if use_shared_cache is None:
+            use_shared_cache = getattr(settings, 'TEMPLATE_RENDER_PLAN_SHARED_CACHE', False)
+        self.max_size = max_size
+        self.use_shared_cache = use_shared_cache
+        self._plans: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_version(template_id: int) -> str:
+        """
+        Retorna la versión actual de la plantilla (su `updated_at`).
+
+        Raises:
+            CertificateTemplate.DoesNotExist: Si la plantilla no existe
+        """
+        from certificates.models import CertificateTemplate
+
+        updated_at = (
+            CertificateTemplate.objects.filter(pk=template_id)
+            .values_list('updated_at', flat=True)
+            .first()
+        )
+        if updated_at is None:
+            raise CertificateTemplate.DoesNotExist(
+                f"CertificateTemplate {template_id} no existe"
+            )
+        return updated_at.isoformat()
+
+    def _shared_key(self, template_id: int, version: str) -> str:
+        return f"{self.SHARED_KEY_PREFIX}:{template_id}:{version}"
+
+    def get(self, template_id: int, version: str) -> Optional[Dict[str, Any]]:
+        """Busca un plan en la LRU local y luego en la cache compartida"""
+        key = (template_id, version)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                return plan
+
+        if self.use_shared_cache:
+            try:
+                plan = cache.get(self._shared_key(template_id, version))
+            except Exception as e:
+                logger.warning(f"Render plan shared cache unavailable: {str(e)}")
+                plan = None
+            if plan is not None:
+                self._store_local(key, plan)
+                return plan
+
+        return None
+
+    def set(self, template_id: int, version: str, plan: Dict[str, Any]) -> None:
+        """Guarda un plan en la LRU local y, si aplica, en la cache compartida"""
+        self._store_local((template_id, version), plan)
+
+        if self.use_shared_cache:
+            timeout = getattr(settings, 'TEMPLATE_RENDER_PLAN_CACHE_TIMEOUT', 3600)
+            try:
+                cache.set(self._shared_key(template_id, version), plan, timeout)
+            except Exception as e:
+                logger.warning(f"Render plan shared cache unavailable: {str(e)}")
+
+    def _store_local(self, key: tuple, plan: Dict[str, Any]) -> None:
+        with self._lock:
+            # Una plantilla solo necesita su versión más reciente
+            for stale_key in [k for k in self._plans if k[0] == key[0] and k != key]:
+                del self._plans[stale_key]
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_size:
+                self._plans.popitem(last=False)
+
+    def get_or_build(
+        self,
+        template_id: int,
+        builder: Callable[[int], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Retorna el plan vigente de la plantilla, compilándolo si no existe.
+
+        Args:
+            template_id: ID de la plantilla
+            builder: Función que compila el plan a partir del ID
+
+        Returns:
+            Plan de renderizado (estructura de solo lectura)
+        """
+        version = self.get_version(template_id)
+        plan = self.get(template_id, version)
+        if plan is not None:
+            return plan
+
+        plan = builder(template_id)
+        self.set(template_id, version, plan)
+        logger.debug(f"Render plan compiled for template {template_id} ({version})")
+        return plan
+
+    def invalidate(self, template_id: int) -> None:
+        """Elimina de la LRU local todas las versiones de una plantilla"""
+        with self._lock:
+            for key in [k for k in self._plans if k[0] == template_id]:
+                del self._plans[key]
+
+    def clear(self) -> None:
+        """Vacía la LRU local"""
+        with self._lock:
+            self._plans.clear()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+
+def touch_templates(template_ids: Iterable[int]) -> None:
+    """
+    Marca plantillas como modificadas para invalidar sus planes.
+
+    Actualiza `updated_at` (cambia la versión en todos los procesos) y
+    descarta los planes locales.
+    """
+    from certificates.models import CertificateTemplate
+
+    template_ids = {template_id for template_id in template_ids if template_id}
+    if not template_ids:
+        return
+
+    CertificateTemplate.objects.filter(pk__in=template_ids).update(updated_at=timezone.now())
+    for template_id in template_ids:
+        render_plan_cache.invalidate(template_id)
+
+
+# Instancia compartida por todos los TemplateRenderingService del proceso
+render_plan_cache = RenderPlanCache()
@@ -0,0 +1,225 @@
+"""Renderizado rápido del certificado simple (ReportLab, sin plantilla visual)"""
+from io import BytesIO
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+import logging
+
+from PIL import Image
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from certificates.services.qr_service import QRCodeService
+
+logger = logging.getLogger("certificates")
+
+
+PAGE_SIZE = landscape(A4)
+PAGE_WIDTH, PAGE_HEIGHT = PAGE_SIZE
+
+# Textos fijos del certificado: (fuente, tamaño, y, texto)
+STATIC_LINES = (
+    ("Helvetica-Bold", 32, PAGE_HEIGHT - 100, "CERTIFICADO"),
+    ("Helvetica", 16, PAGE_HEIGHT - 140, "Se otorga el presente certificado a:"),
+    ("Helvetica", 14, PAGE_HEIGHT - 280, "Por su participación como"),
+    ("Helvetica", 14, PAGE_HEIGHT - 340, "en el evento:"),
+    ("Helvetica", 10, 50, "Dirección Regional de Trabajo y Promoción del Empleo"),
+    ("Helvetica", 10, 35, "Puno - Perú"),
+)
+
+ATTENDEE_TYPE_DISPLAY = {
+    "ASISTENTE": "Asistente",
+    "PONENTE": "Ponente",
+    "ORGANIZADOR": "Organizador",
+}
+
+QR_SIZE = 100
+QR_MARGIN = 50
+
+# Fuentes en el orden en que se registran en el documento: ReportLab asigna
+# los nombres internos (/F1, /F2) por orden de registro, y la capa estática
+# compilada los referencia directamente.
+FONTS = ("Helvetica", "Helvetica-Bold")
+
+# QR de un certificado: imagen PNG (BytesIO) o contenido a dibujar como vector
+QRSource = Union[BytesIO, str, None]
+
+
+class SimpleCertificatePDFRenderer:
+    """
+    Genera el PDF del certificado simple dibujando solo lo que cambia.
+
+    Los textos fijos (título, subtítulo, conectores y pie de página) se
+    compilan una vez por proceso como operadores PDF y se copian en cada
+    página; por certificado solo se dibujan nombre, DNI, tipo de asistente,
+    evento, fecha y QR. El resultado visual es el mismo que el del método
+    original de CertificateGeneratorService.
+
+    El QR puede recibirse como imagen PNG o como su contenido; en el
+    segundo caso se dibuja con rectángulos vectoriales (sin PNG intermedio).
+    """
+
+    _static_layer: Optional[str] = None
+
+    def __init__(self, qr_service: Optional[QRCodeService] = None):
+        self.qr_service = qr_service or QRCodeService()
+
+    @classmethod
+    def static_layer(cls) -> str:
+        """Operadores PDF de la capa estática (compilados una vez por proceso)"""
+        if cls._static_layer is None:
+            scratch = cls._new_canvas(BytesIO())
+            text = scratch.beginText()
+            for font_name, font_size, y, label in STATIC_LINES:
+                text.setFont(font_name, font_size)
+                text.setTextOrigin(
+                    PAGE_WIDTH / 2 - stringWidth(label, font_name, font_size) / 2, y
+                )
+                text.textOut(label)
+            cls._static_layer = text.getCode()
+        return cls._static_layer
+
+    @staticmethod
+    def _new_canvas(output) -> canvas.Canvas:
+        """Crea un canvas con las fuentes registradas en orden fijo"""
+        c = canvas.Canvas(output, pagesize=PAGE_SIZE)
+        for font_name in FONTS:
+            c.setFont(font_name, 12)
+        return c
+
+    def render(
+        self,
+        context_data: Dict,
+        qr_buffer: Optional[BytesIO] = None,
+        qr_data: Optional[str] = None,
+    ) -> bytes:
+        """
+        Genera el PDF de un certificado
+
+        Args:
+            context_data: Datos del participante (full_name, dni, event_name,
+                event_date, attendee_type)
+            qr_buffer: Buffer con imagen PNG del QR (opcional)
+            qr_data: Contenido del QR a dibujar como vector (opcional, se
+                usa si no hay qr_buffer)
+
+        Returns:
+            Bytes del PDF generado
+        """
+        pdf_buffer = BytesIO()
+        c = self._new_canvas(pdf_buffer)
+        self.draw_page(c, context_data, qr_buffer or qr_data)
+        c.showPage()
+        c.save()
+        return pdf_buffer.getvalue()
+
+    def iter_render(self, items: Iterable[Tuple[Dict, QRSource]]) -> Iterator[bytes]:
+        """
+        Genera los PDFs de varios certificados uno a uno (sin acumularlos)
+
+        Args:
+            items: Pares (context_data, qr), donde qr es un buffer PNG, el
+                contenido del QR o None
+
+        Yields:
+            Bytes del PDF de cada certificado, en el mismo orden
+        """
+        for context_data, qr in items:
+            pdf_buffer = BytesIO()
+            c = self._new_canvas(pdf_buffer)
+            self.draw_page(c, context_data, qr)
+            c.showPage()
+            c.save()
+            yield pdf_buffer.getvalue()
+
+    def render_many(self, items: Iterable[Tuple[Dict, QRSource]], output) -> int:
+        """
+        Escribe un único PDF con un certificado por página (para impresión)
+
+        La capa estática se define una sola vez como Form XObject y se
+        reutiliza en cada página.
+
+        Args:
+            items: Pares (context_data, qr), como en iter_render
+            output: Ruta o archivo binario de destino
+
+        Returns:
+            Número de páginas escritas
+        """
+        c = self._new_canvas(output)
+        c.beginForm("static_layer")
+        c.addLiteral(self.static_layer())
+        c.endForm()
+
+        pages = 0
+        for context_data, qr in items:
+            c.doForm("static_layer")
+            self._draw_variable_fields(c, context_data, qr)
+            c.showPage()
+            pages += 1
+
+        c.save()
+        logger.info(f"PDF combinado de certificados simples generado: {pages} páginas")
+        return pages
+
+    def draw_page(self, c: canvas.Canvas, context_data: Dict, qr: QRSource = None):
+        """Dibuja un certificado completo en la página actual del canvas"""
+        c.addLiteral(self.static_layer())
+        self._draw_variable_fields(c, context_data, qr)
+
+    def _draw_variable_fields(self, c: canvas.Canvas, context_data: Dict, qr: QRSource):
+        """Dibuja los datos del participante y el QR"""
+        center_x = PAGE_WIDTH / 2
+
+        # Nombre del participante
+        c.setFont("Helvetica-Bold", 24)
+        c.drawCentredString(center_x, PAGE_HEIGHT - 200, context_data.get("full_name", ""))
+
+        # DNI
+        c.setFont("Helvetica", 14)
+        c.drawCentredString(center_x, PAGE_HEIGHT - 240, f"DNI: {context_data.get('dni', '')}")
+
+        # Tipo de asistente
+        c.setFont("Helvetica-Bold", 16)
+        attendee_type_display = ATTENDEE_TYPE_DISPLAY.get(
+            context_data.get("attendee_type", ""), "Asistente"
+        )
+        c.drawCentredString(center_x, PAGE_HEIGHT - 310, attendee_type_display)
+
+        # Nombre del evento
+        c.setFont("Helvetica-Bold", 18)
+        c.drawCentredString(center_x, PAGE_HEIGHT - 370, context_data.get("event_name", ""))
+
+        # Fecha del evento
+        c.setFont("Helvetica", 12)
+        c.drawCentredString(
+            center_x, PAGE_HEIGHT - 400, f"Realizado el {context_data.get('event_date', '')}"
+        )
+
+        # Código QR (si existe)
+        if qr:
+            qr_x = PAGE_WIDTH - QR_SIZE - QR_MARGIN
+            if isinstance(qr, str):
+                self.qr_service.draw_qr(c, qr, qr_x, QR_MARGIN, QR_SIZE)
+            else:
+                c.drawImage(
+                    self._qr_image(qr), qr_x, QR_MARGIN, width=QR_SIZE, height=QR_SIZE
+                )
+
+            # Texto debajo del QR
+            c.setFont("Helvetica", 8)
+            c.drawCentredString(PAGE_WIDTH - QR_SIZE / 2 - QR_MARGIN, 35, "Escanea para verificar")
+
+    def _qr_image(self, qr_buffer: BytesIO) -> ImageReader:
+        """
+        Prepara la imagen del QR para embeberla
+
+        Los PNG de QRCodeService son de 1 bit; ReportLab los expande a RGB
+        antes de comprimirlos. En escala de grises los píxeles son los mismos
+        (negro/blanco) con un tercio de los datos.
+        """
+        qr_buffer.seek(0)
+        image = Image.open(qr_buffer)
+        if image.mode == "1":
+            image = image.convert("L")
+        return ImageReader(image)
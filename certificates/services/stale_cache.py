@@ -0,0 +1,156 @@
+"""
+Cache con vigencia corta y periodo de gracia (stale-while-revalidate).
+
+Cada entrada se considera vigente durante `fresh_ttl` segundos. Después,
+y hasta `fresh_ttl + stale_ttl`, se sigue sirviendo el valor anterior
+mientras un solo proceso lo recalcula en segundo plano; solo si la entrada
+no existe el cálculo se hace dentro de la petición.
+
+Para que una entrada costosa no venza en todos los procesos a la vez, el
+recálculo puede adelantarse de forma probabilística (XFetch): cada lectura
+decide recalcular antes de `fresh_until` con una probabilidad que crece a
+medida que se acerca el vencimiento y con lo que tardó el último cálculo.
+Si la entrada no existe, un solo proceso la calcula y los demás esperan
+hasta `miss_wait` segundos a que aparezca.
+"""
+import logging
+import math
+import random
+import threading
+import time
+from typing import Any, Callable
+
+from django.core.cache import cache
+from django.db import connection
+
+logger = logging.getLogger("certificates")
+
+
+class StaleWhileRevalidateCache:
+    """Valores calculados bajo demanda y refrescados sin bloquear a los lectores"""
+
+    # Tiempo máximo que un proceso retiene el permiso de recalcular una clave
+    LOCK_TIMEOUT = 60
+    # Intervalo de sondeo mientras otro proceso calcula una entrada ausente
+    MISS_POLL_INTERVAL = 0.05
+
+    def __init__(
+        self,
+        prefix: str,
+        fresh_ttl: int,
+        stale_ttl: int,
+        background: bool = True,
+        beta: float = 1.0,
+        miss_wait: float = 0,
+    ):
+        self.prefix = prefix
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.background = background
+        # 0 desactiva el recálculo anticipado; valores mayores lo adelantan más
+        self.beta = beta
+        self.miss_wait = miss_wait
+
+    def _key(self, key: str) -> str:
+        # Clave vacía: la entrada se guarda directamente bajo el prefijo
+        return f"{self.prefix}:{key}" if key else self.prefix
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self._key(key)}:lock"
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Retorna el valor cacheado de `key` o lo calcula con `compute`
+
+        Un valor vencido (o elegido por XFetch para refrescarse antes) se
+        retorna igual y se programa su recálculo (un solo proceso a la vez,
+        coordinado con cache.add).
+        """
+        try:
+            entry = cache.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Cache no disponible ({self.prefix}): {str(e)}")
+            return compute()
+
+        if entry is None:
+            return self._compute_missing(key, compute)
+
+        if self._should_refresh(entry) and self._acquire(key):
+            if not self.background:
+                try:
+                    return self._timed_store(key, compute)
+                finally:
+                    cache.delete(self._lock_key(key))
+            threading.Thread(target=self._revalidate, args=(key, compute), daemon=True).start()
+        return entry["value"]
+
+    def _should_refresh(self, entry: dict) -> bool:
+        """
+        Vencida, o adelantada por XFetch:
+        now - delta * beta * ln(rand) >= fresh_until
+        """
+        now = time.time()
+        if entry["fresh_until"] <= now:
+            return True
+        delta = entry.get("delta", 0)
+        if not self.beta or not delta:
+            return False
+        # 1 - random() está en (0, 1]: evita ln(0)
+        return now - delta * self.beta * math.log(1.0 - random.random()) >= entry["fresh_until"]
+
+    def _compute_missing(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Calcula una entrada ausente con un solo proceso a la vez
+
+        Los demás esperan hasta miss_wait segundos a que aparezca en la cache;
+        si no aparece (o la espera está desactivada) la calculan ellos mismos.
+        """
+        if self._acquire(key):
+            try:
+                return self._timed_store(key, compute)
+            finally:
+                cache.delete(self._lock_key(key))
+
+        deadline = time.monotonic() + self.miss_wait
+        while time.monotonic() < deadline:
+            time.sleep(self.MISS_POLL_INTERVAL)
+            try:
+                entry = cache.get(self._key(key))
+            except Exception:
+                break
+            if entry is not None:
+                return entry["value"]
+        return self._timed_store(key, compute)
+
+    def _timed_store(self, key: str, compute: Callable[[], Any]) -> Any:
+        started = time.monotonic()
+        value = compute()
+        return self._store(key, value, delta=time.monotonic() - started)
+
+    def _store(self, key: str, value: Any, delta: float = 0) -> Any:
+        entry = {"value": value, "fresh_until": time.time() + self.fresh_ttl, "delta": delta}
+        try:
+            cache.set(self._key(key), entry, self.fresh_ttl + self.stale_ttl)
+        except Exception as e:
+            logger.warning(f"No se pudo guardar en cache ({self.prefix}): {str(e)}")
+        return value
+
+    def _acquire(self, key: str) -> bool:
+        try:
+            return cache.add(self._lock_key(key), 1, self.LOCK_TIMEOUT)
+        except Exception:
+            return False
+
+    def _revalidate(self, key: str, compute: Callable[[], Any]) -> None:
+        try:
+            self._timed_store(key, compute)
+        except Exception as e:
+            logger.error(f"Error recalculando {self.prefix}:{key}: {str(e)}", exc_info=True)
+        finally:
+            cache.delete(self._lock_key(key))
+            # Hilo propio: Django no cierra su conexión a la base de datos
+            connection.close()
+
+    def delete(self, *keys: str) -> None:
+        """Descarta las entradas indicadas"""
+        cache.delete_many([self._key(key) for key in keys])
@@ -9,9 +9,11 @@ from typing import Dict, List, Any, Optional
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.db import transaction
+from django.utils.text import slugify
 import logging
 
 from ..models import CertificateTemplate, TemplateElement, TemplateAsset
+from ..storage import content_addressed_storage
 
 logger = logging.getLogger(__name__)
 
@@ -251,8 +253,9 @@ class TemplateExportService:
     
     def _serialize_asset(self, asset: TemplateAsset) -> Dict[str, Any]:
         """Serializa un asset para exportación"""
-        # Generar nombre de archivo único
-        original_name = os.path.basename(asset.file.name)
+        # Generar nombre de archivo único (el archivo se guarda por su hash:
+        # se exporta con el nombre con el que se subió)
+        original_name = asset.original_filename or self._fallback_asset_filename(asset)
         filename = f"{asset.id}_{original_name}"
         
         return {
@@ -265,6 +268,14 @@ class TemplateExportService:
             'is_public': asset.is_public,
         }
     
+    @staticmethod
+    def _fallback_asset_filename(asset: TemplateAsset) -> str:
+        """Nombre legible para assets sin nombre original registrado"""
+        if not content_addressed_storage.is_content_addressed(asset.file.name):
+            return os.path.basename(asset.file.name)
+        extension = os.path.splitext(asset.file.name)[1]
+        return f"{slugify(asset.name) or 'asset'}{extension}"
+    
     def _generate_readme(
         self,
         template: CertificateTemplate,
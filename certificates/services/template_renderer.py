@@ -3,7 +3,7 @@ Servicio para renderizar plantillas visuales a PDF.
 """
 import os
 import tempfile
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from django.template.loader import render_to_string
 from django.conf import settings
 import base64
@@ -12,6 +12,8 @@ import logging
 
 from ..models import CertificateTemplate, TemplateElement, TemplateAsset
 from .latex_validator import LaTeXValidator
+from .qr_service import QRCodeService
+from .render_plan_cache import render_plan_cache
 
 # Try to import WeasyPrint, but handle gracefully if not available
 try:
@@ -45,6 +47,7 @@ class TemplateRenderingService:
     
     def __init__(self):
         self.latex_validator = LaTeXValidator()
+        self.qr_service = QRCodeService()
         self.font_config = FontConfiguration() if WEASYPRINT_AVAILABLE else None
     
     def render_template_to_pdf(
@@ -65,18 +68,14 @@ class TemplateRenderingService:
             Bytes del PDF generado
         """
         try:
-            # Cargar plantilla y elementos
-            template = CertificateTemplate.objects.get(id=template_id)
-            elements = TemplateElement.objects.filter(
-                template=template,
-                is_visible=True
-            ).order_by('z_index')
+            # Plan compilado (plantilla, elementos, estilos, assets y CSS base)
+            plan = self.get_render_plan(template_id)
             
             # Construir HTML
-            html_content = self._build_html(template, elements, participant_data)
+            html_content = self._render_plan_html(plan, participant_data)
             
             # Generar PDF
-            pdf_bytes = self._generate_pdf(html_content, template)
+            pdf_bytes = self._write_pdf(html_content, plan['base_css'])
             
             # Guardar si se especifica ruta
             if output_path:
@@ -90,29 +89,117 @@ class TemplateRenderingService:
             logger.error(f"Error rendering template {template_id}: {str(e)}")
             raise
     
-    def _build_html(
-        self, 
-        template: CertificateTemplate, 
-        elements: List[TemplateElement], 
-        data: Dict[str, Any]
-    ) -> str:
+    def render_batch_to_pdf(
+        self,
+        template_id: int,
+        participants_data: List[Dict[str, Any]],
+        merge: bool = False
+    ) -> Union[List[bytes], bytes]:
         """
-        Construye el HTML con elementos posicionados absolutamente.
+        Renderiza varios participantes como páginas de un solo documento.
+        
+        El HTML y el CSS se procesan y maquetan una sola vez para todo el
+        lote, evitando el costo fijo de WeasyPrint por documento.
+        
+        Args:
+            template_id: ID de la plantilla a renderizar
+            participants_data: Datos de cada participante (una página cada uno)
+            merge: Si es True retorna un único PDF con todas las páginas
+                (listo para imprimir); si no, un PDF por participante
+            
+        Returns:
+            Lista de bytes (un PDF por participante, en el mismo orden) o
+            bytes del PDF combinado si merge=True
+        """
+        if not participants_data:
+            return b'' if merge else []
+        
+        try:
+            plan = self.get_render_plan(template_id)
+            html_content = self._render_plan_batch_html(plan, participants_data)
+            document = self._layout_document(
+                html_content, self._get_batch_css(plan['base_css'])
+            )
+            
+            if merge:
+                pdf_bytes = document.write_pdf(optimize_images=True)
+                logger.info(
+                    f"Template {template_id} rendered as merged PDF "
+                    f"({len(participants_data)} pages)"
+                )
+                return pdf_bytes
+            
+            if len(document.pages) != len(participants_data):
+                # Un elemento desbordó su página: el reparto por página no es
+                # confiable, se renderiza cada participante por separado
+                logger.warning(
+                    f"Batch layout for template {template_id} produced "
+                    f"{len(document.pages)} pages for {len(participants_data)} "
+                    f"participants, rendering individually"
+                )
+                return [
+                    self._write_pdf(self._render_plan_html(plan, data), plan['base_css'])
+                    for data in participants_data
+                ]
+            
+            pdfs = [document.copy([page]).write_pdf(optimize_images=True) for page in document.pages]
+            logger.info(
+                f"Template {template_id} batch rendered: {len(pdfs)} certificates"
+            )
+            return pdfs
+            
+        except Exception as e:
+            logger.error(f"Error batch rendering template {template_id}: {str(e)}")
+            raise
+    
+    def get_render_plan(self, template_id: int) -> Dict[str, Any]:
+        """
+        Obtiene el plan de renderizado de la plantilla desde la cache.
+        
+        El plan se compila una sola vez por versión de la plantilla
+        (template_id + updated_at) y se comparte entre certificados.
+        
+        Args:
+            template_id: ID de la plantilla
+            
+        Returns:
+            Plan de renderizado (no debe modificarse)
+        """
+        return render_plan_cache.get_or_build(template_id, self._load_render_plan)
+    
+    def _load_render_plan(self, template_id: int) -> Dict[str, Any]:
+        """Carga la plantilla y sus elementos visibles y compila el plan"""
+        template = CertificateTemplate.objects.select_related(
+            'background_asset'
+        ).get(id=template_id)
+        elements = TemplateElement.objects.filter(
+            template=template,
+            is_visible=True
+        ).select_related('asset').order_by('z_index')
+        
+        return self._compile_render_plan(template, elements)
+    
+    def _compile_render_plan(
+        self,
+        template: CertificateTemplate,
+        elements: List[TemplateElement]
+    ) -> Dict[str, Any]:
+        """
+        Resuelve todo lo que no depende del participante.
         
         Args:
             template: Plantilla base
-            elements: Lista de elementos a renderizar
-            data: Datos para reemplazar variables
+            elements: Elementos a renderizar (ordenados por z_index)
             
         Returns:
-            HTML completo listo para PDF
+            Diccionario serializable con la plantilla, los elementos
+            compilados, la imagen de fondo y el CSS base
         """
-        # Procesar elementos
-        processed_elements = []
+        compiled_elements = []
         for element in elements:
-            processed_element = self._process_element(element, data)
-            if processed_element:
-                processed_elements.append(processed_element)
+            compiled_element = self._compile_element(element)
+            if compiled_element:
+                compiled_elements.append(compiled_element)
         
         # Obtener imagen de fondo si existe
         background_url = None
@@ -123,26 +210,107 @@ class TemplateRenderingService:
         
         # Configuración de renderizado
         render_config = template.render_config or {}
-        page_config = render_config.get('page', {})
         
-        canvas_width = template.canvas_width
-        canvas_height = template.canvas_height
+        return {
+            'template': {
+                'id': template.id,
+                'name': template.name,
+                'render_config': render_config,
+            },
+            'elements': compiled_elements,
+            'background_url': background_url,
+            'canvas_width': template.canvas_width,
+            'canvas_height': template.canvas_height,
+            'page_config': render_config.get('page', {}),
+            'base_css': self._get_base_css(template),
+        }
+    
+    def _render_plan_html(self, plan: Dict[str, Any], data: Dict[str, Any]) -> str:
+        """
+        Construye el HTML de un participante a partir de un plan compilado.
+        
+        Args:
+            plan: Plan de renderizado
+            data: Datos para reemplazar variables
+            
+        Returns:
+            HTML completo listo para PDF
+        """
+        processed_elements = [
+            self._apply_participant_data(element, data)
+            for element in plan['elements']
+        ]
         
         # Contexto para el template
         context = {
-            'template': template,
+            'template': plan['template'],
             'elements': processed_elements,
-            'background_url': background_url,
-            'canvas_width': canvas_width,
-            'canvas_height': canvas_height,
-            'page_config': page_config,
+            'background_url': plan['background_url'],
+            'canvas_width': plan['canvas_width'],
+            'canvas_height': plan['canvas_height'],
+            'page_config': plan['page_config'],
             'participant_data': data
         }
         
         # Renderizar template HTML
-        html_content = render_to_string('certificates/pdf_template.html', context)
+        return render_to_string('certificates/pdf_template.html', context)
+    
+    def _render_plan_batch_html(
+        self,
+        plan: Dict[str, Any],
+        participants_data: List[Dict[str, Any]]
+    ) -> str:
+        """
+        Construye un HTML con una página por participante.
+        
+        Args:
+            plan: Plan de renderizado
+            participants_data: Datos de cada participante
+            
+        Returns:
+            HTML del lote listo para PDF
+        """
+        pages = [
+            {
+                'elements': [
+                    self._apply_participant_data(element, data)
+                    for element in plan['elements']
+                ],
+                'participant_data': data,
+            }
+            for data in participants_data
+        ]
+        
+        context = {
+            'template': plan['template'],
+            'pages': pages,
+            'background_url': plan['background_url'],
+            'canvas_width': plan['canvas_width'],
+            'canvas_height': plan['canvas_height'],
+            'page_config': plan['page_config'],
+        }
+        
+        return render_to_string('certificates/pdf_batch_template.html', context)
+    
+    def _build_html(
+        self, 
+        template: CertificateTemplate, 
+        elements: List[TemplateElement], 
+        data: Dict[str, Any]
+    ) -> str:
+        """
+        Construye el HTML con elementos posicionados absolutamente.
         
-        return html_content
+        Args:
+            template: Plantilla base
+            elements: Lista de elementos a renderizar
+            data: Datos para reemplazar variables
+            
+        Returns:
+            HTML completo listo para PDF
+        """
+        plan = self._compile_render_plan(template, elements)
+        return self._render_plan_html(plan, data)
     
     def _process_element(
         self, 
@@ -159,8 +327,24 @@ class TemplateRenderingService:
         Returns:
             Diccionario con datos del elemento procesado
         """
+        compiled = self._compile_element(element)
+        if compiled is None:
+            return None
+        return self._apply_participant_data(compiled, data)
+    
+    def _compile_element(self, element: TemplateElement) -> Optional[Dict[str, Any]]:
+        """
+        Resuelve la parte de un elemento que no depende del participante
+        (estilos, assets y contenido LaTeX).
+        
+        Args:
+            element: Elemento a compilar
+            
+        Returns:
+            Diccionario con datos del elemento compilado
+        """
         try:
-            processed = {
+            compiled = {
                 'id': element.id,
                 'type': element.element_type,
                 'name': element.name,
@@ -179,30 +363,24 @@ class TemplateRenderingService:
             
             # Procesar según tipo de elemento
             if element.element_type in ['TEXT', 'VARIABLE']:
-                processed['processed_content'] = self._process_text_content(
-                    element.content, data
-                )
-                processed['css_styles'] = self._build_text_styles(element.style_config)
+                compiled['css_styles'] = self._build_text_styles(element.style_config)
                 
             elif element.element_type == 'LATEX':
-                processed['processed_content'] = self._process_latex_content(
+                compiled['processed_content'] = self._process_latex_content(
                     element.content
                 )
-                processed['css_styles'] = self._build_latex_styles(element.style_config)
+                compiled['css_styles'] = self._build_latex_styles(element.style_config)
                 
             elif element.element_type == 'IMAGE':
                 if element.asset:
-                    processed['asset_url'] = self._get_asset_data_url(element.asset)
-                processed['css_styles'] = self._build_image_styles(element.style_config)
+                    compiled['asset_url'] = self._get_asset_data_url(element.asset)
+                compiled['css_styles'] = self._build_image_styles(element.style_config)
                 
             elif element.element_type == 'QR':
-                # Generar QR code
-                qr_data = self._generate_qr_data(data)
-                processed['qr_data'] = qr_data
-                processed['css_styles'] = self._build_qr_styles(element.style_config)
+                compiled['css_styles'] = self._build_qr_styles(element.style_config)
             
             # Estilos de posicionamiento comunes
-            processed['css_styles'].update({
+            compiled['css_styles'].update({
                 'position': 'absolute',
                 'left': f'{element.position_x}px',
                 'top': f'{element.position_y}px',
@@ -212,12 +390,36 @@ class TemplateRenderingService:
                 'transform': f'rotate({element.rotation}deg)' if element.rotation else 'none'
             })
             
-            return processed
+            return compiled
             
         except Exception as e:
             logger.error(f"Error processing element {element.id}: {str(e)}")
             return None
     
+    def _apply_participant_data(
+        self,
+        compiled: Dict[str, Any],
+        data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Completa un elemento compilado con los datos del participante.
+        
+        El elemento compilado se comparte entre certificados, por lo que se
+        retorna una copia.
+        """
+        processed = dict(compiled)
+        
+        if compiled['type'] in ['TEXT', 'VARIABLE']:
+            processed['processed_content'] = self._process_text_content(
+                compiled['content'], data
+            )
+        elif compiled['type'] == 'QR':
+            processed['qr_data'] = self._generate_qr_data(data)
+            # SVG en línea: WeasyPrint lo dibuja como vector, sin PNG intermedio
+            processed['qr_svg'] = self.qr_service.render_qr_svg(processed['qr_data'])
+        
+        return processed
+    
     def _process_text_content(self, content: str, data: Dict[str, Any]) -> str:
         """
         Procesa contenido de texto reemplazando variables.
@@ -433,40 +635,70 @@ class TemplateRenderingService:
         Returns:
             Bytes del PDF generado
         """
-        if not WEASYPRINT_AVAILABLE:
-            raise ImportError(
-                "WeasyPrint is not available. Please install it with: "
-                "pip install weasyprint"
-            )
+        return self._write_pdf(html_content, self._get_base_css(template))
+    
+    def _write_pdf(self, html_content: str, base_css: str) -> bytes:
+        """
+        Genera PDF desde HTML y el CSS base ya construido.
         
-        try:
-            # Configuración de renderizado
-            render_config = template.render_config or {}
-            pdf_config = render_config.get('pdf', {})
-            
-            # CSS base para PDF
-            base_css = self._get_base_css(template)
-            
-            # Crear objeto HTML
-            html_doc = HTML(string=html_content, base_url=settings.MEDIA_URL)
-            
-            # Crear CSS
-            css_doc = CSS(string=base_css, font_config=self.font_config)
+        Args:
+            html_content: HTML a convertir
+            base_css: CSS base de la plantilla
             
-            # Generar PDF
-            pdf_bytes = html_doc.write_pdf(
-                stylesheets=[css_doc],
-                font_config=self.font_config,
-                optimize_images=True,
-                presentational_hints=True
+        Returns:
+            Bytes del PDF generado
+        """
+        try:
+            return self._layout_document(html_content, base_css).write_pdf(
+                optimize_images=True
             )
-            
-            return pdf_bytes
-            
         except Exception as e:
             logger.error(f"Error generating PDF: {str(e)}")
             raise
     
+    def _layout_document(self, html_content: str, css: str):
+        """
+        Parsea el HTML y el CSS y maqueta el documento con WeasyPrint.
+        
+        Args:
+            html_content: HTML a convertir
+            css: Hoja de estilos adicional
+            
+        Returns:
+            Documento de WeasyPrint con sus páginas maquetadas
+        """
+        if not WEASYPRINT_AVAILABLE:
+            raise ImportError(
+                "WeasyPrint is not available. Please install it with: "
+                "pip install weasyprint"
+            )
+        
+        # Crear objeto HTML
+        html_doc = HTML(string=html_content, base_url=settings.MEDIA_URL)
+        
+        # Crear CSS
+        css_doc = CSS(string=css, font_config=self.font_config)
+        
+        return html_doc.render(
+            stylesheets=[css_doc],
+            font_config=self.font_config,
+            presentational_hints=True
+        )
+    
+    def _get_batch_css(self, base_css: str) -> str:
+        """
+        CSS para documentos de varias páginas.
+        
+        El CSS base fija el alto del body a una página; en un lote cada
+        certificado ocupa su propia sección (.certificate-page).
+        """
+        return base_css + """
+        body {
+            height: auto;
+            overflow: visible;
+        }
+        """
+    
     def _get_base_css(self, template: CertificateTemplate) -> str:
         """
         Genera CSS base para el PDF con soporte para A4 vertical y horizontal.
@@ -660,8 +892,8 @@ class TemplateRenderingService:
             # Por ahora, retornar placeholder
             
             # Crear imagen placeholder
-            template = CertificateTemplate.objects.get(id=template_id)
-            aspect_ratio = template.canvas_height / template.canvas_width
+            plan = self.get_render_plan(template_id)
+            aspect_ratio = plan['canvas_height'] / plan['canvas_width']
             height = int(width * aspect_ratio)
             
             # Crear imagen simple
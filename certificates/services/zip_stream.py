@@ -0,0 +1,133 @@
+"""
+Generación de archivos ZIP en streaming.
+
+`stream_zip` produce el ZIP como una secuencia de bloques de bytes para
+StreamingHttpResponse (o para escribirlo a un archivo) sin armarlo en
+memoria: cada archivo se lee del storage en bloques de `chunk_size`, se
+escribe sin comprimir (ZIP_STORED: volver a comprimir PDFs casi no reduce
+su tamaño y consume CPU) y el buffer intermedio se vacía después de cada
+bloque. La memoria usada no depende de la cantidad de archivos, salvo las
+entradas del directorio central que zipfile conserva hasta el final
+(unos cientos de bytes por archivo).
+"""
+import io
+import logging
+import zipfile
+from typing import Iterable, Iterator, Tuple, Union
+
+from django.core.files import File
+from django.utils import timezone
+
+logger = logging.getLogger("certificates")
+
+# Tamaño de bloque de lectura del storage y de cada bloque emitido
+CHUNK_SIZE = 64 * 1024
+
+ZipSource = Union[bytes, str, File]
+
+
+class _StreamBuffer(io.RawIOBase):
+    """
+    Destino de zipfile que solo acumula lo escrito hasta el siguiente drain()
+
+    No admite seek: zipfile escribe entonces cada entrada con un descriptor
+    de datos (CRC y tamaños después del contenido) en lugar de volver atrás.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _drain(buffer: _StreamBuffer) -> Iterator[bytes]:
+    data = buffer.drain()
+    if data:
+        yield data
+
+
+def _iter_source(source: ZipSource, chunk_size: int) -> Iterator[bytes]:
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    if isinstance(source, bytes):
+        yield source
+        return
+
+    source.open('rb')
+    try:
+        yield from source.chunks(chunk_size)
+    finally:
+        source.close()
+
+
+def _source_size(source: ZipSource) -> int:
+    if isinstance(source, (bytes, str)):
+        return len(source.encode('utf-8') if isinstance(source, str) else source)
+    try:
+        return source.size or 0
+    except OSError:
+        return 0
+
+
+def stream_zip(
+    entries: Iterable[Tuple[str, ZipSource]],
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Genera un ZIP (sin compresión) con los archivos indicados, bloque a bloque
+
+    Args:
+        entries: Pares (nombre dentro del ZIP, contenido). El contenido puede
+            ser bytes/str o un File de Django (p. ej. un FieldFile), que se
+            abre y se lee en bloques. Se consume de forma perezosa.
+        chunk_size: Tamaño de los bloques leídos del storage
+
+    Un archivo que no se puede abrir (o cuyo primer bloque falla) se omite
+    y se registra: la respuesta ya empezó a enviarse y no puede convertirse
+    en un error. Si la lectura falla después del primer bloque, su cabecera
+    ya se envió: el error se registra y se propaga, y la descarga queda
+    interrumpida con un ZIP truncado.
+    """
+    buffer = _StreamBuffer()
+    date_time = timezone.localtime().timetuple()[:6]
+
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for name, source in entries:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = zipfile.ZIP_STORED
+            info.file_size = _source_size(source)
+            try:
+                chunks = _iter_source(source, chunk_size)
+                first = next(chunks, b'')
+            except Exception as e:
+                logger.warning(f"No se pudo leer {name} para el ZIP: {str(e)}")
+                continue
+
+            with archive.open(info, 'w') as destination:
+                destination.write(first)
+                yield from _drain(buffer)
+                try:
+                    for chunk in chunks:
+                        destination.write(chunk)
+                        yield from _drain(buffer)
+                except Exception as e:
+                    logger.error(f"Lectura de {name} interrumpida, el ZIP queda incompleto: {str(e)}")
+                    raise
+            yield from _drain(buffer)
+
+    yield from _drain(buffer)
@@ -0,0 +1,187 @@
+"""Señales de la app certificates"""
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from certificates.models import (
+    AuditLog,
+    Certificate,
+    CertificateTemplate,
+    Event,
+    Participant,
+    TemplateAsset,
+    TemplateElement,
+)
+from certificates.services.certificate_lookup import certificate_lookup
+from certificates.services.certificate_page_cache import certificate_page_cache
+from certificates.services.certificate_query_cache import certificate_query_cache
+from certificates.services.certificate_uuid_filter import certificate_uuid_filter
+from certificates.services.dashboard_counters import dashboard_counters
+from certificates.services.render_plan_cache import render_plan_cache, touch_templates
+
+
+@receiver([post_save, post_delete], sender=CertificateTemplate)
+def invalidate_template_render_plan(sender, instance, **kwargs):
+    """Descarta el plan de renderizado local al guardar o eliminar una plantilla"""
+    render_plan_cache.invalidate(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=TemplateElement)
+def invalidate_element_render_plan(sender, instance, **kwargs):
+    """Un elemento modificado cambia el plan de su plantilla"""
+    touch_templates([instance.template_id])
+
+
+def _templates_using_asset(asset):
+    """IDs de plantillas que usan el asset como fondo o en algún elemento"""
+    return set(
+        CertificateTemplate.objects.filter(
+            Q(background_asset=asset) | Q(elements__asset=asset)
+        ).values_list('pk', flat=True)
+    )
+
+
+@receiver(post_save, sender=TemplateAsset)
+def invalidate_asset_render_plans(sender, instance, created, **kwargs):
+    """Un asset modificado cambia los data URLs embebidos en los planes"""
+    if not created:
+        touch_templates(_templates_using_asset(instance))
+
+
+@receiver(pre_delete, sender=TemplateAsset)
+def invalidate_deleted_asset_render_plans(sender, instance, **kwargs):
+    """
+    Se resuelve antes de eliminar: luego las referencias ya quedan en NULL
+    sin disparar señales de los elementos.
+    """
+    touch_templates(_templates_using_asset(instance))
+
+
+@receiver([post_save, post_delete], sender=Certificate)
+def invalidate_certificate_query(sender, instance, **kwargs):
+    """Descarta la consulta pública cacheada del DNI del certificado"""
+    if Certificate.participant.is_cached(instance):
+        dni = instance.participant.dni
+    else:
+        dni = (
+            Participant.objects.filter(pk=instance.participant_id)
+            .values_list('dni', flat=True)
+            .first()
+        )
+    certificate_query_cache.invalidate(dni)
+
+
+@receiver([post_save, post_delete], sender=Participant)
+def invalidate_participant_query(sender, instance, **kwargs):
+    """Nombre y tipo de asistente forman parte de los resultados cacheados"""
+    certificate_query_cache.invalidate(instance.dni)
+
+
+@receiver(post_save, sender=Event)
+def invalidate_event_queries(sender, instance, created, **kwargs):
+    """Nombre y fecha del evento forman parte de los resultados cacheados"""
+    if not created:
+        certificate_query_cache.invalidate_many(
+            Participant.objects.filter(event=instance, certificate__isnull=False)
+            .values_list('dni', flat=True)
+        )
+
+
+@receiver([post_save, post_delete], sender=Certificate)
+def invalidate_certificate_pages(sender, instance, **kwargs):
+    """Firma, importación final o cambios del certificado cambian su página pública"""
+    certificate_page_cache.invalidate(instance.uuid)
+
+
+@receiver(post_save, sender=Certificate)
+def add_certificate_to_uuid_filter(sender, instance, created, **kwargs):
+    """Un certificado nuevo debe encontrarse en la verificación por QR"""
+    if created:
+        certificate_uuid_filter.add_many([instance.uuid])
+
+
+@receiver(post_save, sender=Participant)
+def invalidate_participant_pages(sender, instance, created, **kwargs):
+    """Nombre, DNI y tipo de asistente aparecen en la verificación y el preview"""
+    if not created:
+        certificate_page_cache.invalidate_many(
+            Certificate.objects.filter(participant=instance).values_list('uuid', flat=True)
+        )
+
+
+@receiver(post_save, sender=Event)
+def invalidate_event_pages(sender, instance, created, **kwargs):
+    """Nombre y fecha del evento aparecen en la verificación y el preview"""
+    if not created:
+        certificate_page_cache.invalidate_many(
+            Certificate.objects.filter(participant__event=instance).values_list('uuid', flat=True)
+        )
+
+
+@receiver(post_save, sender=Certificate)
+def sync_certificate_lookup(sender, instance, raw=False, **kwargs):
+    """Copia al modelo de lectura los datos públicos del certificado"""
+    if not raw:
+        certificate_lookup.sync([instance.pk])
+
+
+@receiver(post_save, sender=Participant)
+def sync_participant_lookup(sender, instance, created, raw=False, **kwargs):
+    """Nombre, DNI y tipo de asistente están copiados en CertificateLookup"""
+    if not created and not raw:
+        certificate_lookup.sync_participants([instance.pk])
+
+
+@receiver(post_save, sender=Event)
+def sync_event_lookup(sender, instance, created, raw=False, **kwargs):
+    """Nombre y fecha del evento están copiados en CertificateLookup"""
+    if not created and not raw:
+        certificate_lookup.sync_events([instance.pk])
+
+
+@receiver(post_save, sender=Certificate)
+def count_saved_certificate(sender, instance, created, raw=False, **kwargs):
+    """Aplica a los contadores del dashboard la variación del certificado"""
+    if raw:
+        return
+    current = {name: getattr(instance, name) for name in Certificate.COUNTED_FIELDS}
+    previous = getattr(instance, '_counted_values', None)
+
+    if created:
+        dashboard_counters.apply(dashboard_counters.certificate_deltas(**current))
+    elif previous is not None and len(previous) == len(current):
+        if previous != current:
+            deltas = dashboard_counters.certificate_deltas(**previous, sign=-1)
+            for name, delta in dashboard_counters.certificate_deltas(**current).items():
+                deltas[name] = deltas.get(name, 0) + delta
+            dashboard_counters.apply(deltas)
+    else:
+        # Sin los valores anteriores no se conoce la variación
+        dashboard_counters.invalidate()
+    instance._counted_values = current
+
+
+@receiver(post_delete, sender=Certificate)
+def count_deleted_certificate(sender, instance, **kwargs):
+    """Resta el certificado eliminado de los contadores del dashboard"""
+    dashboard_counters.apply(
+        dashboard_counters.certificate_deltas(instance.is_signed, instance.is_external, sign=-1)
+    )
+
+
+_COUNTER_NAMES = {Event: 'events', Participant: 'participants'}
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Participant)
+def count_created_record(sender, instance, created, raw=False, **kwargs):
+    """Suma eventos y participantes nuevos a los contadores del dashboard"""
+    if created and not raw:
+        dashboard_counters.apply({_COUNTER_NAMES[sender]: 1})
+
+
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Participant)
+def count_deleted_record(sender, instance, **kwargs):
+    """Resta eventos y participantes eliminados de los contadores del dashboard"""
+    dashboard_counters.apply({_COUNTER_NAMES[sender]: -1})
@@ -0,0 +1,168 @@
+"""
+Almacenamiento direccionado por contenido para los PDFs, imágenes QR y assets.
+
+Cada archivo se guarda una sola vez bajo el SHA-256 de su contenido
+(`cas/ab/cd/<sha256>.<ext>` dentro de MEDIA_ROOT); la ruta de upload_to se
+ignora. Guardar bytes que ya están almacenados (reimportaciones,
+regeneraciones) no escribe en disco y devuelve el nombre existente, por lo que
+varios campos pueden apuntar al mismo archivo.
+
+Como un archivo puede estar compartido, delete() no borra los archivos
+direccionados por contenido: el comando collect_orphan_media cuenta las
+referencias de la base de datos (StoredFile.ref_count) y elimina los archivos
+sin referencias.
+"""
+import hashlib
+import os
+import uuid as uuid_lib
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible(path="certificates.storage.ContentAddressedStorage")
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage que nombra los archivos por el SHA-256 de su contenido"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    @property
+    def prefix(self) -> str:
+        return getattr(settings, "CONTENT_ADDRESSED_STORAGE_PREFIX", "cas")
+
+    # ------------------------------------------------------------------
+    # Nombres
+    # ------------------------------------------------------------------
+
+    def name_for_digest(self, digest: str, name: str) -> str:
+        """Nombre del archivo con ese SHA-256 (conserva la extensión de name)"""
+        extension = os.path.splitext(name)[1].lower()
+        return f"{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+    def is_content_addressed(self, name: str) -> bool:
+        return bool(name) and name.startswith(f"{self.prefix}/")
+
+    def content_name(self, content, name: str) -> str:
+        """Nombre que tendría el contenido al guardarlo (sin escribirlo)"""
+        digest = hashlib.sha256()
+        for chunk in self._chunks(content):
+            digest.update(chunk)
+        return self.name_for_digest(digest.hexdigest(), name)
+
+    def get_available_name(self, name, max_length=None):
+        # El nombre definitivo depende del contenido y se calcula en _save()
+        return name
+
+    # ------------------------------------------------------------------
+    # Escritura y borrado
+    # ------------------------------------------------------------------
+
+    def _save(self, name, content):
+        """
+        Escribe el contenido en un temporal mientras calcula su SHA-256 y lo
+        mueve a su nombre definitivo; si ya existe, descarta el temporal
+        """
+        temp_name = f"{self.prefix}/tmp/{uuid_lib.uuid4().hex}.part"
+        temp_path = self.path(temp_name)
+        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
+
+        digest = hashlib.sha256()
+        try:
+            with open(temp_path, "wb") as temp_file:
+                for chunk in self._chunks(content):
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            final_name = self.name_for_digest(digest.hexdigest(), name)
+            final_path = self.path(final_name)
+            if os.path.exists(final_path):
+                os.remove(temp_path)
+                # Vuelve a usarse: collect_orphan_media no elimina archivos recientes
+                os.utime(final_path)
+                return final_name
+
+            if self.directory_permissions_mode is not None:
+                old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+                try:
+                    os.makedirs(os.path.dirname(final_path), self.directory_permissions_mode, exist_ok=True)
+                finally:
+                    os.umask(old_umask)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            # Mismo contenido: si otro proceso lo escribió antes, reemplazarlo es inocuo
+            os.replace(temp_path, final_path)
+            return final_name
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def delete(self, name):
+        """Los archivos direccionados por contenido pueden estar compartidos: los elimina collect_orphan_media"""
+        if self.is_content_addressed(name):
+            return
+        super().delete(name)
+
+    def _chunks(self, content):
+        if hasattr(content, "seek"):
+            content.seek(0)
+        if hasattr(content, "chunks"):
+            chunks = content.chunks(self.CHUNK_SIZE)
+        else:
+            chunks = iter(lambda: content.read(self.CHUNK_SIZE), b"")
+        for chunk in chunks:
+            if not chunk:
+                break
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def media_storage():
+    """
+    Storage de los archivos de certificados y assets
+
+    Se resuelve al importar los modelos: cambiar
+    CONTENT_ADDRESSED_STORAGE_ENABLED requiere reiniciar los procesos.
+    """
+    if getattr(settings, "CONTENT_ADDRESSED_STORAGE_ENABLED", True):
+        return content_addressed_storage
+    return default_storage
+
+
+@deconstructible(path="certificates.storage.AuditArchiveStorage")
+class AuditArchiveStorage(FileSystemStorage):
+    """
+    Archivos de auditoría fuera de MEDIA_ROOT (AUDIT_LOG_ARCHIVE_ROOT)
+
+    Contienen DNIs, nombres e IPs: nginx no sirve esa carpeta y solo se
+    descargan desde el navegador de archivos del admin.
+    """
+
+    @property
+    def base_location(self):
+        return str(getattr(
+            settings, "AUDIT_LOG_ARCHIVE_ROOT", os.path.join(settings.BASE_DIR, "logs", "audit_archive")
+        ))
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+    def url(self, name):
+        raise ValueError("Los archivos de auditoría no tienen URL pública")
+
+
+audit_archive_storage = AuditArchiveStorage()
+
+
+def has_same_content(field_file, content) -> bool:
+    """True si field_file ya guarda exactamente ese contenido"""
+    storage = field_file.storage if field_file else None
+    if not isinstance(storage, ContentAddressedStorage) or not storage.is_content_addressed(field_file.name):
+        return False
+    return storage.content_name(content, field_file.name) == field_file.name
@@ -0,0 +1,113 @@
+"""
+Servidor de firma local para tests (http.server en un hilo).
+
+Responde a cada POST con el PDF recibido más una marca de firma, o con el
+estado de error configurado. Registra las peticiones, la concurrencia
+máxima y las conexiones usadas (para verificar keep-alive).
+"""
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SIGNED_MARKER = b"\n%firmado-por-stub\n"
+
+
+class SignatureStubServer:
+    """Servicio de firma simulado en 127.0.0.1 con puerto libre"""
+
+    def __init__(self, delay=0.0, fail_status=None, fail_first=0):
+        """
+        Args:
+            delay: Segundos de espera por petición
+            fail_status: Estado HTTP con el que responder siempre (p. ej. 503)
+            fail_first: Número de peticiones iniciales que responden 503
+        """
+        self.delay = delay
+        self.fail_status = fail_status
+        self.fail_first = fail_first
+        self.requests = 0
+        self.max_concurrent = 0
+        self.connections = set()
+        self.authorization = set()
+        self._active = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/api/sign"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status = stub._enter(self.client_address, self.headers.get("Authorization"))
+                try:
+                    time.sleep(stub.delay)
+                    if status == 200:
+                        payload = stub._extract_pdf(self.headers.get("Content-Type", ""), body)
+                        payload += SIGNED_MARKER
+                    else:
+                        payload = b'{"error": "stub"}'
+                    self.send_response(status)
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    stub._leave()
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _enter(self, client_address, authorization):
+        with self._lock:
+            self.requests += 1
+            self.connections.add(client_address)
+            self.authorization.add(authorization)
+            self._active += 1
+            self.max_concurrent = max(self.max_concurrent, self._active)
+            if self.fail_status:
+                return self.fail_status
+            if self.requests <= self.fail_first:
+                return 503
+            return 200
+
+    def _leave(self):
+        with self._lock:
+            self._active -= 1
+
+    @staticmethod
+    def _extract_pdf(content_type, body):
+        """Contenido del campo 'file' del multipart"""
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        for part in message.iter_parts():
+            if part.get_param("name", header="content-disposition") == "file":
+                return part.get_payload(decode=True)
+        return body
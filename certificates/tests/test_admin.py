@@ -168,7 +168,7 @@ class AdminActionsTest(TestCase):
         )
 
     def test_generate_certificates_action(self):
-        """Debe generar certificados para un evento"""
+        """Debe encolar la generación y el worker debe generar los certificados"""
         from certificates.admin import EventAdmin
         from django.contrib.admin.sites import AdminSite
         from unittest.mock import Mock
@@ -185,7 +185,17 @@ class AdminActionsTest(TestCase):
         queryset = Event.objects.filter(id=self.event.id)
         event_admin.generate_certificates_action(request, queryset)
 
-        # Verificar que se generaron certificados
+        # La acción solo encola el trabajo
+        from certificates.models import CertificateJob
+        from certificates.services.job_queue import JobQueueService
+
+        job = CertificateJob.objects.get()
+        self.assertEqual(job.job_type, "GENERATE_CERTIFICATES")
+        self.assertEqual(job.payload["event_ids"], [self.event.id])
+        self.assertEqual(Certificate.objects.count(), 0)
+
+        # El worker genera los certificados
+        JobQueueService().process_next()
         self.assertEqual(Certificate.objects.count(), 2)
 
     def test_download_pdf_action_single(self):
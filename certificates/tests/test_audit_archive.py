@@ -0,0 +1,147 @@
+"""Tests para la retención y el archivado de AuditLog"""
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from certificates.models import AuditLog, AuditLogArchive, AuditLogCounter
+from certificates.services.audit_archive import AuditLogArchiver
+from certificates.services.audit_counters import audit_counters
+
+
+class AuditLogArchiverTest(TestCase):
+    """Tests para AuditLogArchiver y el comando archive_audit_logs"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.archive_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, AUDIT_LOG_ARCHIVE_ROOT=self.archive_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        now = timezone.now()
+        self.old = now - timedelta(days=400)
+        self.older = now - timedelta(days=430)
+        AuditLog.objects.create(action_type='QUERY', description='antigua 1', timestamp=self.old)
+        AuditLog.objects.create(
+            action_type='VERIFY', description='antigua 2', timestamp=self.old,
+            metadata={'dni': '12345678'},
+        )
+        AuditLog.objects.create(action_type='QUERY', description='más antigua', timestamp=self.older)
+        AuditLog.objects.create(action_type='QUERY', description='reciente')
+
+    def test_archive_moves_old_rows_to_monthly_files(self):
+        """Los registros antiguos pasan a un archivo por mes y salen de la tabla"""
+        archiver = AuditLogArchiver(batch_size=2)
+
+        archived = archiver.archive(archiver.cutoff(365))
+
+        self.assertEqual(sum(archived.values()), 3)
+        self.assertEqual(list(AuditLog.objects.values_list('description', flat=True)), ['reciente'])
+
+        archive = AuditLogArchive.objects.get(month=archiver.month_of(self.old))
+        records = list(archiver.iter_records(archive))
+        self.assertEqual(archive.row_count, len(records))
+        self.assertIn({'dni': '12345678'}, [record['metadata'] for record in records])
+        self.assertTrue(archive.file.name.endswith('.jsonl.gz'))
+        # Fuera de MEDIA_ROOT: nginx no lo sirve y no tiene URL pública
+        self.assertTrue(archive.file.path.startswith(self.archive_root))
+        self.assertEqual(os.listdir(self.media_root), [])
+        with self.assertRaises(ValueError):
+            archive.file.url
+        self.assertEqual(sum(AuditLogArchive.objects.values_list('row_count', flat=True)), 3)
+
+    def test_archive_appends_to_existing_month(self):
+        """Una segunda ejecución agrega al archivo del mes (varios miembros gzip)"""
+        archiver = AuditLogArchiver()
+        archiver.archive(archiver.cutoff(365))
+        AuditLog.objects.create(action_type='SIGN', description='tardía', timestamp=self.old)
+
+        archiver.archive(archiver.cutoff(365))
+
+        archive = AuditLogArchive.objects.get(month=archiver.month_of(self.old))
+        descriptions = [record['description'] for record in archiver.iter_records(archive)]
+        self.assertIn('tardía', descriptions)
+        self.assertEqual(archive.row_count, len(descriptions))
+
+    def test_counters_are_kept(self):
+        """El archivado no modifica los contadores del dashboard"""
+        archiver = AuditLogArchiver()
+        audit_counters.rollup(self.older)
+        before = audit_counters.total('QUERY')
+        self.assertEqual(before, 3)
+
+        archiver.archive(archiver.cutoff(365))
+
+        self.assertEqual(audit_counters.total('QUERY'), before)
+
+    def test_command_dry_run(self):
+        """--dry-run muestra los registros por mes sin archivar"""
+        out = StringIO()
+        call_command('archive_audit_logs', '--days', '365', '--dry-run', stdout=out)
+
+        self.assertIn('se archivarían 3 registros', out.getvalue())
+        self.assertEqual(AuditLog.objects.count(), 4)
+        self.assertFalse(AuditLogArchive.objects.exists())
+
+    def test_command_archives(self):
+        """El comando archiva con la retención indicada"""
+        out = StringIO()
+        call_command('archive_audit_logs', '--days', '365', stdout=out)
+
+        self.assertIn('Registros de auditoría archivados: 3', out.getvalue())
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    def test_backfill_skips_archived_days(self):
+        """backfill_audit_counters no recalcula días ya archivados"""
+        audit_counters.rollup(self.older)
+        call_command('archive_audit_logs', '--days', '365', stdout=StringIO())
+        since = (timezone.localdate() - timedelta(days=500)).isoformat()
+
+        out = StringIO()
+        call_command('backfill_audit_counters', '--since', since, stdout=out)
+
+        self.assertIn('están archivados', out.getvalue())
+        day, hour = audit_counters.bucket(self.older)
+        self.assertTrue(AuditLogCounter.objects.filter(date=day, hour=hour).exists())
+
+    def test_admin_streams_archive(self):
+        """El admin descarga el archivo comprimido o lo transmite como JSONL"""
+        call_command('archive_audit_logs', '--days', '365', stdout=StringIO())
+        archive = AuditLogArchive.objects.get(month=AuditLogArchiver.month_of(self.old))
+        User.objects.create_superuser('admin', 'admin@test.com', 'testpass123')
+        self.client.login(username='admin', password='testpass123')
+        url = reverse('admin:certificates_auditlogarchive_download', args=[archive.pk])
+
+        response = self.client.get(reverse('admin:certificates_auditlogarchive_changelist'))
+        self.assertContains(response, url)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        raw = gzip.decompress(b''.join(response.streaming_content))
+        self.assertEqual(len(raw.splitlines()), archive.row_count)
+
+        response = self.client.get(url, {'format': 'jsonl'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(json.loads(lines[0])['timestamp'][:4], str(timezone.localtime(self.old).year))
+
+
+class PartitionAuditLogCommandTest(TestCase):
+    """Tests para el comando partition_audit_log"""
+
+    def test_requires_postgresql(self):
+        """Con SQLite el particionado no está disponible"""
+        with self.assertRaises(CommandError):
+            call_command('partition_audit_log', '--convert', stdout=StringIO())
@@ -0,0 +1,151 @@
+"""Tests para los contadores agregados de auditoría"""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from certificates.models import AuditLog, AuditLogCounter
+from certificates.services.audit_counters import audit_counters
+from certificates.services.audit_writer import AuditLogWriter
+from certificates.services.dashboard_stats import DashboardStatsService
+
+
+class AuditCounterServiceTest(TestCase):
+    """Tests para AuditCounterService"""
+
+    def _counter(self, action_type, timestamp):
+        day, hour = audit_counters.bucket(timestamp)
+        return AuditLogCounter.objects.get(action_type=action_type, date=day, hour=hour).count
+
+    def test_create_does_not_write_counters(self):
+        """AuditLog.objects.create no escribe en la fila compartida de su hora"""
+        with self.assertNumQueries(1):
+            AuditLog.objects.create(action_type='VERIFY', description='a')
+
+        self.assertFalse(AuditLogCounter.objects.exists())
+
+    def test_rollup_counts_recent_hours(self):
+        """rollup recalcula las horas recientes sin tocar las anteriores"""
+        now = timezone.now()
+        yesterday = now - timedelta(days=1)
+        AuditLog.objects.create(action_type='VERIFY', description='a')
+        AuditLog.objects.create(action_type='VERIFY', description='b')
+        AuditLog.objects.create(action_type='VERIFY', description='c', timestamp=yesterday)
+        audit_counters.add({('VERIFY', *audit_counters.bucket(yesterday)): 5})
+
+        audit_counters.rollup(now - timedelta(hours=1))
+
+        self.assertEqual(self._counter('VERIFY', now), 2)
+        self.assertEqual(self._counter('VERIFY', yesterday), 5)
+
+    def test_writer_batches_increment_counters(self):
+        """Los lotes del escritor asíncrono también actualizan los contadores"""
+        writer = AuditLogWriter(mode='async')
+        writer._ensure_thread = lambda: None
+        for _ in range(3):
+            writer.record(action_type='QUERY', description='consulta', metadata={})
+
+        writer.flush()
+
+        self.assertEqual(audit_counters.total('QUERY'), 3)
+
+    def test_rebuild_matches_audit_log(self):
+        """Recalcular un rango reemplaza los contadores con los de AuditLog"""
+        now = timezone.now()
+        for days_back in (0, 0, 2):
+            AuditLog.objects.create(
+                action_type='SIGN', description='firma', timestamp=now - timedelta(days=days_back)
+            )
+        AuditLogCounter.objects.update(count=99)
+
+        audit_counters.rebuild(timezone.localdate() - timedelta(days=2), timezone.localdate())
+
+        self.assertEqual(audit_counters.total('SIGN'), 3)
+        self.assertEqual(self._counter('SIGN', now), 2)
+
+    def test_queries(self):
+        """Totales por acción, por día y por hora desde los contadores"""
+        now = timezone.now()
+        AuditLog.objects.create(action_type='VERIFY', description='v')
+        AuditLog.objects.create(action_type='IMPORT', description='i')
+        AuditLog.objects.create(
+            action_type='VERIFY', description='antigua', timestamp=now - timedelta(days=3)
+        )
+        audit_counters.rollup(now - timedelta(days=4))
+
+        self.assertEqual(
+            audit_counters.totals_by_action(since=now - timedelta(hours=24)),
+            {'VERIFY': 1, 'IMPORT': 1},
+        )
+        self.assertEqual(
+            audit_counters.by_day('VERIFY', timezone.localdate() - timedelta(days=7)),
+            {
+                timezone.localdate(now - timedelta(days=3)): 1,
+                timezone.localdate(now): 1,
+            },
+        )
+        self.assertEqual(
+            audit_counters.by_hour(since=now - timedelta(hours=24))[timezone.localtime(now).hour], 2
+        )
+
+
+class DashboardCounterStatsTest(TestCase):
+    """El dashboard lee los contadores, no la tabla AuditLog"""
+
+    def test_query_stats_use_counters(self):
+        """Las estadísticas de consultas salen de AuditLogCounter"""
+        today = timezone.localdate()
+        AuditLogCounter.objects.create(action_type='QUERY', date=today, hour=9, count=5)
+        AuditLogCounter.objects.create(
+            action_type='QUERY', date=today - timedelta(days=2), hour=15, count=7
+        )
+        AuditLogCounter.objects.create(action_type='VERIFY', date=today, hour=9, count=11)
+
+        with self.assertNumQueries(2):
+            stats = DashboardStatsService()._calculate_query_stats()
+
+        self.assertEqual(stats['total'], 12)
+        self.assertEqual(stats['today'], 5)
+        self.assertEqual([item['count'] for item in stats['by_day']], [7, 5])
+        self.assertFalse(AuditLog.objects.exists())
+
+
+class BackfillAuditCountersCommandTest(TestCase):
+    """Tests para el comando backfill_audit_counters"""
+
+    def test_backfill_rebuilds_history(self):
+        """Recalcula los contadores desde el registro más antiguo"""
+        old = timezone.now() - timedelta(days=40)
+        AuditLog.objects.create(action_type='GENERATE', description='g', timestamp=old)
+        AuditLog.objects.create(action_type='GENERATE', description='g')
+        AuditLogCounter.objects.all().delete()
+
+        out = StringIO()
+        call_command('backfill_audit_counters', '--chunk-days', '10', stdout=out)
+
+        self.assertEqual(audit_counters.total('GENERATE'), 2)
+        self.assertIn('Contadores recalculados', out.getvalue())
+
+    def test_backfill_last_days(self):
+        """--days solo recalcula los días más recientes"""
+        old = timezone.now() - timedelta(days=10)
+        AuditLog.objects.create(action_type='IMPORT', description='i', timestamp=old)
+        AuditLog.objects.create(action_type='IMPORT', description='i')
+        AuditLogCounter.objects.all().delete()
+
+        call_command('backfill_audit_counters', '--days', '2', stdout=StringIO())
+
+        self.assertEqual(audit_counters.total('IMPORT'), 1)
+
+    def test_backfill_last_hours(self):
+        """--hours concilia los registros creados uno a uno en las últimas horas"""
+        AuditLog.objects.create(action_type='QUERY', description='q')
+        AuditLog.objects.create(action_type='QUERY', description='q')
+
+        out = StringIO()
+        call_command('backfill_audit_counters', '--hours', '2', stdout=out)
+
+        self.assertEqual(audit_counters.total('QUERY'), 2)
+        self.assertIn('últimas 2 horas', out.getvalue())
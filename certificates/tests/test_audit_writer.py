@@ -0,0 +1,155 @@
+"""Tests para el escritor de registros de auditoría en lotes"""
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import TestCase
+from django.utils import timezone
+
+from certificates.models import AuditLog
+from certificates.services.audit_writer import AuditLogWriter
+
+
+class AuditLogWriterTest(TestCase):
+    """Tests para AuditLogWriter"""
+
+    def setUp(self):
+        cache.clear()
+        self.spool_path = os.path.join(tempfile.mkdtemp(), 'audit_spool.jsonl')
+
+    def _writer(self, **kwargs):
+        kwargs.setdefault('mode', 'async')
+        kwargs.setdefault('spool_path', self.spool_path)
+        writer = AuditLogWriter(**kwargs)
+        # Los tests escriben con flush() explícito, sin hilo en segundo plano
+        writer._ensure_thread = lambda: None
+        return writer
+
+    def _record(self, writer, **kwargs):
+        fields = {
+            'action_type': 'VERIFY',
+            'description': 'Verificación de certificado',
+            'metadata': {'certificate_uuid': 'abc'},
+            'ip_address': '127.0.0.1',
+        }
+        fields.update(kwargs)
+        writer.record(**fields)
+
+    def test_sync_mode_writes_immediately(self):
+        """En modo sync cada registro se inserta de inmediato"""
+        writer = self._writer(mode='sync')
+
+        with self.assertNumQueries(1):  # solo el registro; el contador lo recalcula el rollup
+            self._record(writer)
+
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertEqual(writer.pending, 0)
+
+    def test_async_mode_buffers_and_flushes_in_bulk(self):
+        """En modo async los registros se escriben con un solo INSERT"""
+        writer = self._writer()
+        occurred_at = timezone.now() - timedelta(minutes=5)
+
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                self._record(writer, timestamp=occurred_at)
+        self.assertEqual(writer.pending, 3)
+
+        # Un INSERT para el lote y uno para el contador, en una transacción
+        with self.assertNumQueries(4):
+            self.assertEqual(writer.flush(), 3)
+
+        self.assertEqual(writer.pending, 0)
+        self.assertEqual(AuditLog.objects.filter(timestamp=occurred_at).count(), 3)
+
+    def test_flush_size_wakes_writer(self):
+        """Alcanzar el tamaño de lote despierta al hilo de escritura"""
+        writer = self._writer(flush_size=2)
+
+        self._record(writer)
+        self.assertFalse(writer._wakeup.is_set())
+        self._record(writer)
+        self.assertTrue(writer._wakeup.is_set())
+
+    def test_full_buffer_spools_to_file(self):
+        """Con el buffer lleno los registros van al spool y luego se reinsertan"""
+        writer = self._writer(buffer_size=1)
+
+        self._record(writer, description='en buffer')
+        self._record(writer, description='en spool')
+
+        self.assertEqual(writer.pending, 1)
+        self.assertTrue(os.path.exists(self.spool_path))
+        self.assertEqual(writer.drain_spool(), 1)
+        self.assertFalse(os.path.exists(self.spool_path))
+        self.assertEqual(AuditLog.objects.get().description, 'en spool')
+
+    def test_database_error_spools_batch(self):
+        """Si la base de datos falla, el lote se guarda en el spool"""
+        writer = self._writer()
+        self._record(writer)
+
+        with patch.object(AuditLog.objects, 'bulk_create', side_effect=OperationalError('lenta')):
+            self.assertEqual(writer.flush(), 0)
+
+        self.assertEqual(AuditLog.objects.count(), 0)
+        # Mientras la base de datos está degradada, los lotes van directo al spool
+        self._record(writer)
+        self.assertEqual(writer.flush(), 0)
+
+        self.assertEqual(writer.drain_spool(), 2)
+        self.assertEqual(AuditLog.objects.count(), 2)
+
+    def test_slow_flush_degrades_to_spool(self):
+        """Una escritura más lenta que el umbral envía los siguientes lotes al spool"""
+        writer = self._writer(slow_flush_seconds=-1)
+        self._record(writer)
+        self.assertEqual(writer.flush(), 1)
+
+        self._record(writer)
+        self.assertEqual(writer.flush(), 0)
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertTrue(os.path.exists(self.spool_path))
+
+    def test_cache_spool(self):
+        """El spool puede guardarse en la cache compartida"""
+        writer = self._writer(buffer_size=0, spool='cache')
+
+        self._record(writer)
+        self._record(writer)
+
+        self.assertEqual(writer.drain_spool(), 2)
+        self.assertEqual(writer.drain_spool(), 0)
+        self.assertEqual(AuditLog.objects.count(), 2)
+
+    def test_cache_spool_skips_lost_batch_after_grace_period(self):
+        """Un lote que nunca llega a la cache no bloquea los siguientes para siempre"""
+        writer = self._writer(buffer_size=0, spool='cache')
+        self._record(writer)
+        cache.delete('audit_spool:batch:1')
+        self._record(writer)
+
+        self.assertEqual(writer.drain_spool(), 0)
+
+        first_seen = cache.get('audit_spool:gap:1')
+        cache.set('audit_spool:gap:1', first_seen - writer.SPOOL_GAP_SECONDS, None)
+        with self.assertLogs('certificates', level='ERROR') as logs:
+            self.assertEqual(writer.drain_spool(), 1)
+
+        self.assertIn('Lote 1 del spool de auditoría perdido', logs.output[0])
+        self.assertIsNone(cache.get('audit_spool:gap:1'))
+        self.assertEqual(writer.drain_spool(), 0)
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    def test_shutdown_flushes_pending_entries(self):
+        """Al terminar el proceso se escriben los registros pendientes"""
+        writer = self._writer()
+        self._record(writer)
+
+        writer.shutdown()
+
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertEqual(writer.pending, 0)
@@ -1,10 +1,15 @@
 """Tests para CertificateGeneratorService"""
-from django.test import TestCase
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import TestCase, override_settings
 from certificates.services.certificate_generator import CertificateGeneratorService
 from certificates.models import Event, Participant, CertificateTemplate
 from datetime import date
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class CertificateGeneratorServiceTest(TestCase):
     """Tests para el servicio de generación de certificados"""
 
@@ -42,6 +47,10 @@ class CertificateGeneratorServiceTest(TestCase):
             attendee_type="ASISTENTE",
         )
 
+    def tearDown(self):
+        """Elimina los PDFs generados durante el test"""
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
     def test_render_template_with_valid_data(self):
         """Debe renderizar correctamente una plantilla con datos válidos"""
         context_data = {
@@ -162,6 +171,24 @@ class CertificateGeneratorServiceTest(TestCase):
         self.assertIsNotNone(certificate.verification_url)
         self.assertFalse(certificate.is_signed)
 
+    def test_generate_certificate_defers_qr_png(self):
+        """Con QR vectorial, el PNG se genera solo al solicitarlo"""
+        from certificates.models import Certificate
+
+        certificate = self.service.generate_certificate(self.participant)
+
+        self.assertFalse(certificate.qr_code)
+        qr_code = certificate.ensure_qr_code()
+        self.assertTrue(qr_code.name)
+        self.assertEqual(Certificate.objects.get(pk=certificate.pk).qr_code.name, qr_code.name)
+
+    @override_settings(CERTIFICATE_QR_VECTOR=False)
+    def test_generate_certificate_with_png_qr(self):
+        """Sin QR vectorial, el PNG se guarda al generar"""
+        certificate = self.service.generate_certificate(self.participant)
+
+        self.assertTrue(certificate.qr_code.name)
+
     def test_generate_certificate_creates_audit_log(self):
         """Debe crear un registro de auditoría"""
         from certificates.models import AuditLog
@@ -256,3 +283,168 @@ class CertificateGeneratorServiceTest(TestCase):
 
         # Debe procesar todos aunque algunos ya existan
         self.assertGreaterEqual(result["success_count"], 1)
+
+    def _create_participants(self, count):
+        """Crea participantes adicionales para el evento de prueba"""
+        for i in range(count):
+            Participant.objects.create(
+                dni=f"7000{i:04d}",
+                full_name=f"Participante {i}",
+                event=self.event,
+                attendee_type="ASISTENTE",
+            )
+
+    def test_generate_bulk_certificates_in_batches(self):
+        """Debe guardar certificados y auditoría por lotes"""
+        from certificates.models import Certificate, AuditLog
+
+        self._create_participants(4)
+
+        result = self.service.generate_bulk_certificates(self.event, batch_size=2)
+
+        self.assertEqual(result["success_count"], 5)
+        self.assertEqual(result["error_count"], 0)
+        self.assertEqual(Certificate.objects.filter(participant__event=self.event).count(), 5)
+        self.assertEqual(AuditLog.objects.filter(action_type="GENERATE").count(), 5)
+        for certificate in result["certificates"]:
+            self.assertIsNotNone(certificate.pk)
+            self.assertTrue(certificate.pdf_file.name)
+            # El PNG del QR se genera bajo demanda
+            self.assertTrue(certificate.ensure_qr_code().name)
+
+    def test_generate_bulk_certificates_survives_post_commit_failures(self):
+        """Un fallo al sincronizar tras el commit no convierte los certificados guardados en errores"""
+        from unittest.mock import patch
+        from certificates.models import Certificate
+
+        self._create_participants(2)
+
+        with patch(
+            "certificates.services.certificate_generator.certificate_lookup.sync_instances",
+            side_effect=RuntimeError("lookup no disponible"),
+        ), patch(
+            "certificates.services.certificate_generator.dashboard_counters.invalidate"
+        ) as invalidate, self.assertLogs("certificates", level="ERROR"):
+            result = self.service.generate_bulk_certificates(self.event)
+
+        self.assertEqual(result["success_count"], 3)
+        self.assertEqual(result["error_count"], 0)
+        self.assertEqual(Certificate.objects.filter(participant__event=self.event).count(), 3)
+        # Las demás tareas se ejecutan aunque una falle
+        invalidate.assert_called()
+
+    def test_generate_bulk_certificates_with_workers(self):
+        """Debe generar certificados usando un pool de procesos"""
+        from certificates.models import Certificate
+
+        self._create_participants(3)
+
+        result = self.service.generate_bulk_certificates(self.event, workers=2, batch_size=2)
+
+        self.assertEqual(result["success_count"], 4)
+        self.assertEqual(result["error_count"], 0)
+        certificates = Certificate.objects.filter(participant__event=self.event)
+        self.assertEqual(certificates.count(), 4)
+        for certificate in certificates:
+            with certificate.pdf_file.open("rb") as pdf:
+                self.assertTrue(pdf.read().startswith(b"%PDF"))
+            self.assertIn(str(certificate.uuid), certificate.verification_url)
+
+    def test_generate_bulk_certificates_does_not_duplicate_existing(self):
+        """Los certificados existentes cuentan como éxito y no se regeneran"""
+        from certificates.models import Certificate
+
+        existing = self.service.generate_certificate(self.participant)
+        self._create_participants(1)
+
+        result = self.service.generate_bulk_certificates(self.event)
+
+        self.assertEqual(result["success_count"], 2)
+        self.assertIn(existing, result["certificates"])
+        self.assertEqual(Certificate.objects.filter(participant=self.participant).count(), 1)
+
+    def test_generate_bulk_certificates_isolates_render_errors(self):
+        """Un error de renderizado solo afecta a su participante"""
+        from unittest.mock import patch
+
+        self._create_participants(2)
+        original_create_pdf = self.service._create_pdf
+
+        def failing_create_pdf(context_data, template_obj, qr_buffer=None, qr_data=None):
+            if context_data["dni"] == self.participant.dni:
+                raise Exception("Fallo de renderizado")
+            return original_create_pdf(context_data, template_obj, qr_buffer, qr_data)
+
+        with patch.object(self.service, "_create_pdf", side_effect=failing_create_pdf):
+            result = self.service.generate_bulk_certificates(self.event)
+
+        self.assertEqual(result["success_count"], 2)
+        self.assertEqual(result["error_count"], 1)
+        self.assertIn(self.participant.dni, result["errors"][0])
+
+    def test_generate_bulk_certificates_without_template(self):
+        """Sin plantilla disponible, todos los participantes se reportan como error"""
+        self.template.delete()
+        self._create_participants(1)
+
+        result = self.service.generate_bulk_certificates(self.event, workers=2)
+
+        self.assertEqual(result["success_count"], 0)
+        self.assertEqual(result["error_count"], 2)
+        self.assertIn("No hay plantilla por defecto configurada", result["errors"][0])
+
+    def _make_visual_template(self):
+        """Agrega un elemento visual a la plantilla por defecto"""
+        from certificates.models import TemplateElement
+
+        TemplateElement.objects.create(
+            template=self.template,
+            element_type="TEXT",
+            name="Nombre",
+            position_x=10,
+            position_y=10,
+            width=300,
+            height=40,
+            content="{{participant_name}}",
+        )
+
+    def test_generate_bulk_certificates_renders_visual_templates_in_batches(self):
+        """Las plantillas visuales se renderizan como documentos de varias páginas"""
+        from unittest.mock import MagicMock
+        from django.test import override_settings
+
+        self._make_visual_template()
+        self._create_participants(4)
+        renderer = MagicMock()
+        renderer.render_batch_to_pdf.side_effect = lambda template_id, data: [
+            b"%PDF-" + item["participant_dni"].encode() for item in data
+        ]
+        self.service._visual_renderer = renderer
+
+        with override_settings(TEMPLATE_RENDER_BATCH_PAGES=2):
+            result = self.service.generate_bulk_certificates(self.event)
+
+        self.assertEqual(result["success_count"], 5)
+        self.assertEqual(result["error_count"], 0)
+        # 5 certificados en documentos de 2 páginas: 3 documentos
+        self.assertEqual(renderer.render_batch_to_pdf.call_count, 3)
+        renderer.render_template_to_pdf.assert_not_called()
+        for certificate in result["certificates"]:
+            with certificate.pdf_file.open("rb") as pdf:
+                self.assertEqual(pdf.read(), b"%PDF-" + certificate.participant.dni.encode())
+
+    def test_generate_bulk_certificates_visual_batch_falls_back_to_single(self):
+        """Si un documento por lotes falla, sus certificados se renderizan uno a uno"""
+        from unittest.mock import MagicMock
+
+        self._make_visual_template()
+        self._create_participants(1)
+        renderer = MagicMock()
+        renderer.render_batch_to_pdf.side_effect = Exception("Fallo de maquetación")
+        renderer.render_template_to_pdf.return_value = b"%PDF-individual"
+        self.service._visual_renderer = renderer
+
+        result = self.service.generate_bulk_certificates(self.event)
+
+        self.assertEqual(result["success_count"], 2)
+        self.assertEqual(renderer.render_template_to_pdf.call_count, 2)
@@ -0,0 +1,128 @@
+"""Tests para el modelo de lectura CertificateLookup"""
+from datetime import date
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from certificates.models import Certificate, CertificateLookup, Event, Participant
+from certificates.services.certificate_lookup import certificate_lookup
+
+
+class CertificateLookupTest(TestCase):
+    """Tests para la sincronización de CertificateLookup y su uso en las vistas"""
+
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.create(name='Evento Lookup', event_date=date(2024, 5, 10))
+        self.participant = Participant.objects.create(
+            dni='12345678', full_name='Ana Torres', event=self.event, attendee_type='PONENTE'
+        )
+        self.certificate = Certificate.objects.create(participant=self.participant)
+
+    def test_certificate_save_creates_row(self):
+        """Al guardar el certificado se copian sus datos públicos"""
+        lookup = CertificateLookup.objects.get(uuid=self.certificate.uuid)
+
+        self.assertEqual(lookup.certificate_id, self.certificate.pk)
+        self.assertEqual(lookup.dni, '12345678')
+        self.assertEqual(lookup.full_name, 'Ana Torres')
+        self.assertEqual(lookup.get_attendee_type_display(), 'Ponente')
+        self.assertEqual(lookup.event_name, 'Evento Lookup')
+        self.assertEqual(lookup.event_date, date(2024, 5, 10))
+        self.assertFalse(lookup.is_signed)
+
+        self.certificate.is_signed = True
+        self.certificate.save()
+        self.assertTrue(CertificateLookup.objects.get(uuid=self.certificate.uuid).is_signed)
+
+    def test_participant_and_event_changes_are_copied(self):
+        """Renombrar participante o evento actualiza la fila"""
+        self.participant.full_name = 'Ana María Torres'
+        self.participant.save()
+        self.event.name = 'Evento Renombrado'
+        self.event.save()
+
+        lookup = CertificateLookup.objects.get(uuid=self.certificate.uuid)
+        self.assertEqual(lookup.full_name, 'Ana María Torres')
+        self.assertEqual(lookup.event_name, 'Evento Renombrado')
+
+    def test_deleting_certificate_deletes_row(self):
+        """La fila se elimina en cascada con el certificado"""
+        self.certificate.delete()
+
+        self.assertFalse(CertificateLookup.objects.exists())
+
+    def test_sync_instances_skips_reading_loaded_certificates(self):
+        """Con participante y evento cargados solo se escribe la fila"""
+        certificate = Certificate.objects.select_related('participant__event').get(pk=self.certificate.pk)
+        certificate.processing_status = 'EXPORTED_FOR_SIGNING'
+        Certificate.objects.filter(pk=certificate.pk).update(processing_status='EXPORTED_FOR_SIGNING')
+
+        with self.assertNumQueries(1):
+            certificate_lookup.sync_instances([certificate])
+
+        self.assertEqual(
+            CertificateLookup.objects.get(uuid=certificate.uuid).processing_status,
+            'EXPORTED_FOR_SIGNING',
+        )
+
+    def test_missing_row_is_synced_on_read(self):
+        """Un certificado sin fila se sincroniza al consultarlo por UUID"""
+        CertificateLookup.objects.all().delete()
+
+        lookup = certificate_lookup.get(self.certificate.uuid)
+
+        self.assertEqual(lookup.certificate_id, self.certificate.pk)
+        self.assertTrue(CertificateLookup.objects.filter(uuid=self.certificate.uuid).exists())
+
+    def test_query_by_dni_reads_only_lookup(self):
+        """La consulta pública por DNI no une participantes ni eventos"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('certificates:query'), {'dni': '12345678'})
+
+        self.assertEqual(response.context['total_certificates'], 1)
+        self.assertContains(response, 'Ana Torres')
+        self.assertFalse([query for query in queries if Participant._meta.db_table in query['sql']])
+
+    def test_verification_reads_only_lookup(self):
+        """La verificación resuelve el certificado con una búsqueda por UUID en el modelo de lectura"""
+        self.certificate.verification_url = 'http://testserver/v/'
+        self.certificate.qr_code = 'qr_codes/existente.png'
+        self.certificate.save()
+        url = reverse('certificates:verify', kwargs={'uuid': self.certificate.uuid})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertContains(response, 'Evento Lookup')
+        lookup_queries = [
+            query['sql'] for query in queries if CertificateLookup._meta.db_table in query['sql']
+        ]
+        self.assertEqual(len(lookup_queries), 1)
+        self.assertFalse([query for query in queries if Participant._meta.db_table in query['sql']])
+
+    def test_rebuild_command_restores_rows(self):
+        """rebuild_certificate_lookup vuelve a copiar todos los certificados"""
+        CertificateLookup.objects.all().delete()
+        out = StringIO()
+
+        call_command('rebuild_certificate_lookup', batch_size=1, stdout=out)
+
+        self.assertIn('1 filas de consulta escritas', out.getvalue())
+        self.assertTrue(CertificateLookup.objects.filter(uuid=self.certificate.uuid).exists())
+
+    def test_benchmark_command_reports_percentiles(self):
+        """benchmark_public_lookup muestra p50 y p99 de cada modo"""
+        out = StringIO()
+
+        call_command('benchmark_public_lookup', samples=5, rounds=2, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('p99', output)
+        self.assertIn('DNI (lookup)', output)
+        self.assertIn('UUID (joins)', output)
@@ -0,0 +1,126 @@
+"""Tests para la cache de página de verificación y preview"""
+import shutil
+import tempfile
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from certificates.models import AuditLog, Certificate, Event, Participant
+from certificates.services.certificate_page_cache import certificate_page_cache
+
+
+class CertificatePageCacheTest(TestCase):
+    """Tests para certificate_page_cache en las vistas públicas"""
+
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.create(name='Evento Cache', event_date=date(2024, 5, 10))
+        self.participant = Participant.objects.create(
+            dni='12345678', full_name='Ana Torres', event=self.event, attendee_type='ASISTENTE'
+        )
+        self.certificate = Certificate.objects.create(
+            participant=self.participant, verification_url='http://testserver/v/'
+        )
+        self.url = reverse('certificates:verify', kwargs={'uuid': self.certificate.uuid})
+
+    def _certificate_queries(self, url, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **headers)
+        table = Certificate._meta.db_table
+        return response, [query['sql'] for query in queries if table in query['sql']]
+
+    def test_cached_page_skips_certificate_queries(self):
+        """La segunda verificación se sirve de cache y sigue auditada"""
+        first, queries = self._certificate_queries(self.url)
+        self.assertTrue(queries)
+
+        second, queries = self._certificate_queries(self.url)
+
+        self.assertEqual(queries, [])
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertIn('public', second['Cache-Control'])
+        self.assertEqual(
+            AuditLog.objects.filter(description=f'Verificación de certificado: {self.certificate.uuid}').count(),
+            2,
+        )
+
+    def test_matching_etag_returns_304(self):
+        """If-None-Match con el ETag vigente responde 304"""
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_signing_invalidates_page(self):
+        """Firmar el certificado invalida la página cacheada y la vuelve a renderizar"""
+        etag = self.client.get(self.url)['ETag']
+        self.assertIsNotNone(certificate_page_cache.get('verify', self.certificate.uuid))
+
+        self.certificate.is_signed = True
+        self.certificate.save()
+        self.assertIsNone(certificate_page_cache.get('verify', self.certificate.uuid))
+        response, queries = self._certificate_queries(self.url)
+
+        self.assertTrue(queries)
+        # verify.html no muestra el estado de firma y el QR se guarda por su
+        # contenido (mismo nombre): la página re-renderizada es idéntica y el
+        # ETag anterior sigue siendo válido
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_event_change_invalidates_page(self):
+        """Renombrar el evento invalida las páginas de sus certificados"""
+        self.client.get(self.url)
+
+        self.event.name = 'Evento Renombrado'
+        self.event.save()
+
+        self.assertContains(self.client.get(self.url), 'Evento Renombrado')
+
+    def test_authenticated_users_bypass_cache(self):
+        """Con sesión iniciada la página no se cachea ni se sirve de cache"""
+        User.objects.create_user('staff', 'staff@test.com', 'testpass123')
+        self.client.login(username='staff', password='testpass123')
+
+        self.client.get(self.url)
+        response, queries = self._certificate_queries(self.url)
+
+        self.assertTrue(queries)
+        self.assertNotIn('ETag', response)
+
+    def test_not_found_is_not_cached(self):
+        """Las respuestas de error no se cachean"""
+        url = reverse('certificates:verify', kwargs={'uuid': '00000000-0000-0000-0000-000000000000'})
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_preview_is_cached_until_invalidated(self):
+        """El preview firmado se cachea hasta que se invalida (p. ej. importación final)"""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.certificate.final_pdf.save('final.pdf', ContentFile(b'%PDF-1.4'), save=False)
+        self.certificate.processing_status = 'SIGNED_FINAL'
+        self.certificate.save()
+        url = reverse('certificates:certificate_preview', kwargs={'certificate_uuid': self.certificate.uuid})
+
+        self.client.get(url)
+        _, queries = self._certificate_queries(url)
+        self.assertEqual(queries, [])
+
+        certificate_page_cache.invalidate_many([self.certificate.uuid])
+        _, queries = self._certificate_queries(url)
+        self.assertTrue(queries)
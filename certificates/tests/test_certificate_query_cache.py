@@ -0,0 +1,124 @@
+"""Tests para la cache de la consulta pública de certificados por DNI"""
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from certificates.models import Certificate, Event, Participant
+from certificates.services.certificate_query_cache import (
+    CertificateQueryCache,
+    certificate_query_cache,
+)
+
+
+class CertificateQueryCacheTest(TestCase):
+    """Tests para CertificateQueryCache"""
+
+    def setUp(self):
+        cache.clear()
+        self.query_cache = CertificateQueryCache()
+        self.event = Event.objects.create(name='Evento Cache', event_date=date(2024, 5, 10))
+
+    def _create_certificates(self, dni, count):
+        certificates = []
+        for i in range(count):
+            event = Event.objects.create(name=f'Evento {i}', event_date=date(2024, 1, 1))
+            participant = Participant.objects.create(
+                dni=dni, full_name='Ana Torres', event=event, attendee_type='ASISTENTE'
+            )
+            certificates.append(Certificate.objects.create(participant=participant))
+        return certificates
+
+    def test_second_query_is_served_from_cache(self):
+        """La segunda consulta del mismo DNI no accede a la base de datos"""
+        certificate, = self._create_certificates('12345678', 1)
+
+        with self.assertNumQueries(1):
+            results, total, page_number, num_pages = self.query_cache.get_page('12345678')
+        with self.assertNumQueries(0):
+            cached_results, _, _, _ = self.query_cache.get_page('12345678')
+
+        self.assertEqual((total, page_number, num_pages), (1, 1, 1))
+        self.assertEqual(cached_results, results)
+        self.assertEqual(results[0].uuid, certificate.uuid)
+        self.assertEqual(results[0].participant.event.name, 'Evento 0')
+        self.assertEqual(results[0].download_url, f'/certificado/{certificate.uuid}/descargar/')
+        self.assertEqual(self.query_cache.stats(), {'hits': 1, 'misses': 1, 'hit_rate': 50.0})
+
+    def test_pagination_uses_window_total(self):
+        """Cada página trae como máximo PAGE_SIZE filas y el total del DNI"""
+        self._create_certificates('12345678', 12)
+
+        first_page, total, _, num_pages = self.query_cache.get_page('12345678', 1)
+        second_page, _, page_number, _ = self.query_cache.get_page('12345678', '2')
+
+        self.assertEqual((total, num_pages, page_number), (12, 2, 2))
+        self.assertEqual(len(first_page), 10)
+        self.assertEqual(len(second_page), 2)
+        self.assertFalse({r.uuid for r in first_page} & {r.uuid for r in second_page})
+
+    def test_out_of_range_page_returns_last_page(self):
+        """Una página inexistente muestra la última"""
+        self._create_certificates('12345678', 3)
+
+        results, total, page_number, num_pages = self.query_cache.get_page('12345678', 5)
+
+        self.assertEqual((len(results), total, page_number, num_pages), (3, 3, 1, 1))
+
+    def test_unknown_dni_returns_empty_page(self):
+        """Un DNI sin certificados retorna una página vacía"""
+        self.assertEqual(self.query_cache.get_page('99999999'), ([], 0, 1, 1))
+
+    def test_certificate_changes_invalidate_dni(self):
+        """Firmar o eliminar un certificado descarta los resultados cacheados"""
+        certificate, = self._create_certificates('12345678', 1)
+        certificate_query_cache.get_page('12345678')
+
+        certificate = Certificate.objects.get(pk=certificate.pk)
+        certificate.is_signed = True
+        certificate.save()
+        results, _, _, _ = certificate_query_cache.get_page('12345678')
+        self.assertTrue(results[0].is_signed)
+
+        certificate.delete()
+        self.assertEqual(certificate_query_cache.get_page('12345678')[1], 0)
+
+    def test_participant_and_event_changes_invalidate_dni(self):
+        """Los cambios del participante o del evento se reflejan en la consulta"""
+        certificate, = self._create_certificates('12345678', 1)
+        certificate_query_cache.get_page('12345678')
+
+        participant = certificate.participant
+        participant.full_name = 'Ana Torres Quispe'
+        participant.save()
+        results, _, _, _ = certificate_query_cache.get_page('12345678')
+        self.assertEqual(results[0].participant.full_name, 'Ana Torres Quispe')
+
+        event = participant.event
+        event.name = 'Evento Renombrado'
+        event.save()
+        results, _, _, _ = certificate_query_cache.get_page('12345678')
+        self.assertEqual(results[0].participant.event.name, 'Evento Renombrado')
+
+    def test_invalidate_many_only_affects_given_dnis(self):
+        """Invalidar un DNI no descarta la cache de los demás"""
+        self._create_certificates('11111111', 1)
+        self._create_certificates('22222222', 1)
+        self.query_cache.get_page('11111111')
+        self.query_cache.get_page('22222222')
+
+        self.query_cache.invalidate_many(['11111111'])
+
+        with self.assertNumQueries(1):
+            self.query_cache.get_page('11111111')
+        with self.assertNumQueries(0):
+            self.query_cache.get_page('22222222')
+
+    def test_disabled_cache_always_queries_database(self):
+        """Con la cache deshabilitada cada consulta va a la base de datos"""
+        self._create_certificates('12345678', 1)
+        query_cache = CertificateQueryCache(enabled=False)
+
+        query_cache.get_page('12345678')
+        with self.assertNumQueries(1):
+            query_cache.get_page('12345678')
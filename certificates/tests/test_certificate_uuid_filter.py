@@ -0,0 +1,133 @@
+"""Tests para el filtro de UUID de certificados"""
+import uuid as uuid_lib
+from datetime import date
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from certificates.models import AuditLog, Certificate, Event, Participant
+from certificates.services.audit_counters import audit_counters
+from certificates.services.certificate_uuid_filter import (
+    BloomFilter,
+    CertificateUUIDFilter,
+    certificate_uuid_filter,
+)
+
+
+class BloomFilterTest(TestCase):
+    """Tests para BloomFilter"""
+
+    def test_no_false_negatives_and_few_false_positives(self):
+        """Todos los valores agregados se encuentran y los ajenos casi nunca"""
+        bloom = BloomFilter(5000, 0.01)
+        added = [uuid_lib.uuid4() for _ in range(5000)]
+        for value in added:
+            bloom.add(value)
+
+        self.assertTrue(all(value in bloom for value in added))
+        false_positives = sum(uuid_lib.uuid4() in bloom for _ in range(5000))
+        self.assertLess(false_positives, 150)
+
+
+class CertificateUUIDFilterTest(TestCase):
+    """Tests para CertificateUUIDFilter"""
+
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.create(name='Evento Filtro', event_date=date(2024, 5, 10))
+        self.certificate = self._create_certificate('12345678')
+
+    def _create_certificate(self, dni):
+        participant = Participant.objects.create(
+            dni=dni, full_name='Ana Torres', event=self.event, attendee_type='ASISTENTE'
+        )
+        return Certificate.objects.create(participant=participant)
+
+    def test_load_contains_existing_certificates(self):
+        """El filtro cargado reconoce los certificados existentes"""
+        uuid_filter = CertificateUUIDFilter(enabled=True)
+
+        self.assertEqual(uuid_filter.load(), 1)
+        self.assertTrue(uuid_filter.might_exist(self.certificate.uuid))
+        self.assertFalse(uuid_filter.might_exist(uuid_lib.uuid4()))
+
+    def test_new_certificates_from_other_processes_are_loaded(self):
+        """Un certificado creado en otro proceso se carga al cambiar el token"""
+        uuid_filter = CertificateUUIDFilter(enabled=True)
+        uuid_filter.load()
+        # Otro proceso: el certificado se crea y, al confirmarse, publica un token nuevo
+        with self.captureOnCommitCallbacks(execute=True):
+            other = self._create_certificate('87654321')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(uuid_filter.might_exist(other.uuid))
+        self.assertEqual(len(queries), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(uuid_filter.might_exist(uuid_lib.uuid4()))
+        self.assertEqual(len(queries), 0)
+
+    def test_token_is_published_after_commit(self):
+        """Un certificado sin confirmar no cambia el token de los demás procesos"""
+        uuid_filter = CertificateUUIDFilter(enabled=True)
+        uuid_filter.load()
+        token = cache.get(CertificateUUIDFilter.CHANGES_KEY)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self._create_certificate('87654321')
+            self.assertEqual(cache.get(CertificateUUIDFilter.CHANGES_KEY), token)
+        for callback in callbacks:
+            callback()
+
+        self.assertNotEqual(cache.get(CertificateUUIDFilter.CHANGES_KEY), token)
+
+    def test_evicted_token_forces_refresh(self):
+        """Si la cache pierde el token, el proceso recarga en lugar de asumir que no hubo cambios"""
+        uuid_filter = CertificateUUIDFilter(enabled=True)
+        uuid_filter.load()
+        other = self._create_certificate('87654321')
+        cache.delete(CertificateUUIDFilter.CHANGES_KEY)
+
+        self.assertTrue(uuid_filter.might_exist(other.uuid))
+
+    def test_disabled_filter_allows_everything(self):
+        """Sin el filtro toda consulta va a la base de datos"""
+        uuid_filter = CertificateUUIDFilter(enabled=False)
+
+        self.assertTrue(uuid_filter.might_exist(uuid_lib.uuid4()))
+
+    def test_missing_uuid_skips_database_and_audit_rows(self):
+        """La verificación de un UUID inexistente no consulta certificados ni crea AuditLog"""
+        certificate_uuid_filter.load()
+        certificate_uuid_filter.flush_misses()
+        before = audit_counters.total('VERIFY')
+        url = reverse('certificates:verify', kwargs={'uuid': uuid_lib.uuid4()})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse([query for query in queries if Certificate._meta.db_table in query['sql']])
+        self.assertFalse(AuditLog.objects.filter(action_type='VERIFY').exists())
+
+        certificate_uuid_filter.flush_misses()
+        self.assertEqual(audit_counters.total('VERIFY'), before + 1)
+
+    @override_settings(CERTIFICATE_UUID_FILTER_MISS_FLUSH_SECONDS=3600)
+    def test_misses_are_aggregated(self):
+        """Varios intentos se escriben en una sola actualización del contador"""
+        uuid_filter = CertificateUUIDFilter(enabled=True)
+        uuid_filter.flush_misses()
+        before = audit_counters.total('VERIFY')
+
+        for _ in range(3):
+            uuid_filter.record_miss()
+
+        self.assertEqual(uuid_filter.pending_misses(), 3)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(uuid_filter.flush_misses(), 3)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(audit_counters.total('VERIFY'), before + 3)
@@ -0,0 +1,156 @@
+"""Tests para el almacenamiento por contenido y collect_orphan_media"""
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from certificates.models import Certificate, Event, Participant, QRProcessingConfig, StoredFile
+from certificates.services.media_garbage import MediaGarbageCollector
+from certificates.services.pdf_processing import PDFProcessingService
+from certificates.storage import content_addressed_storage
+
+
+class ContentAddressedStorageTest(TestCase):
+    """Tests para ContentAddressedStorage y collect_orphan_media"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.event = Event.objects.create(name='Evento', event_date=date(2024, 1, 15))
+
+    def _certificate(self, dni):
+        participant = Participant.objects.create(
+            dni=dni, full_name='Juan Pérez', event=self.event, attendee_type='ASISTENTE'
+        )
+        return Certificate.objects.create(participant=participant)
+
+    def _files_on_disk(self):
+        return sorted(name for name, _, _ in MediaGarbageCollector(self.media_root).scan())
+
+    def _age(self, name, hours=48):
+        path = os.path.join(self.media_root, name)
+        old = time.time() - hours * 3600
+        os.utime(path, (old, old))
+
+    def test_identical_content_is_stored_once(self):
+        """Dos campos con los mismos bytes comparten un solo archivo"""
+        first = self._certificate('11111111')
+        second = self._certificate('22222222')
+
+        first.final_pdf.save('a.pdf', ContentFile(b'%PDF-1.4 igual'))
+        second.final_pdf.save('b.pdf', ContentFile(b'%PDF-1.4 igual'))
+        first.qr_pdf.save('c.PDF', ContentFile(b'%PDF-1.4 distinto'))
+
+        self.assertEqual(first.final_pdf.name, second.final_pdf.name)
+        self.assertTrue(first.final_pdf.name.startswith('cas/'))
+        self.assertTrue(first.qr_pdf.name.endswith('.pdf'))
+        self.assertEqual(self._files_on_disk(), sorted([first.final_pdf.name, first.qr_pdf.name]))
+        with first.final_pdf.open('rb') as stored:
+            self.assertEqual(stored.read(), b'%PDF-1.4 igual')
+
+    def test_delete_keeps_shared_file(self):
+        """Eliminar un campo no borra el archivo que otro puede compartir"""
+        certificate = self._certificate('11111111')
+        certificate.final_pdf.save('a.pdf', ContentFile(b'%PDF-1.4'))
+        name = certificate.final_pdf.name
+
+        content_addressed_storage.delete(name)
+
+        self.assertTrue(content_addressed_storage.exists(name))
+
+    def test_reimport_of_identical_pdf_is_not_saved_again(self):
+        """Reimportar el mismo PDF no reescribe el archivo original"""
+        certificate = self._certificate('11111111')
+        participant = certificate.participant
+        service = PDFProcessingService()
+        config = QRProcessingConfig.get_active_config()
+
+        service._create_certificate_from_pdf(
+            SimpleUploadedFile('juan.pdf', b'%PDF-1.4 original'), participant, config
+        )
+        certificate.refresh_from_db()
+        name = certificate.original_pdf.name
+
+        with self.assertNumQueries(1):  # get_or_create encuentra el certificado
+            service._create_certificate_from_pdf(
+                SimpleUploadedFile('juan.pdf', b'%PDF-1.4 original'), participant, config
+            )
+
+        certificate.refresh_from_db()
+        self.assertEqual(certificate.original_pdf.name, name)
+        self.assertEqual(self._files_on_disk(), [name])
+
+    def test_collect_reports_and_deletes_orphans(self):
+        """collect_orphan_media reporta los huérfanos antiguos y los elimina con --delete"""
+        first = self._certificate('11111111')
+        second = self._certificate('22222222')
+        first.final_pdf.save('a.pdf', ContentFile(b'%PDF-1.4 compartido'))
+        second.final_pdf.save('b.pdf', ContentFile(b'%PDF-1.4 compartido'))
+        first.qr_pdf.save('viejo.pdf', ContentFile(b'%PDF-1.4 version anterior'))
+        orphan = first.qr_pdf.name
+        first.qr_pdf.save('nuevo.pdf', ContentFile(b'%PDF-1.4 version nueva'))
+        recent = content_addressed_storage.save('reciente.pdf', ContentFile(b'%PDF-1.4 en curso'))
+        for name in (orphan, first.final_pdf.name, first.qr_pdf.name):
+            self._age(name)
+
+        out = StringIO()
+        call_command('collect_orphan_media', stdout=out)
+
+        self.assertIn('Huérfanos: 1 (25 B)', out.getvalue())
+        self.assertIn('1 recientes conservados', out.getvalue())
+        self.assertTrue(content_addressed_storage.exists(orphan))
+        shared = StoredFile.objects.get(name=first.final_pdf.name)
+        self.assertEqual(shared.ref_count, 2)
+
+        out = StringIO()
+        call_command('collect_orphan_media', '--delete', stdout=out)
+
+        self.assertIn('Eliminados 1 archivos: 25 B recuperados', out.getvalue())
+        self.assertFalse(content_addressed_storage.exists(orphan))
+        self.assertTrue(content_addressed_storage.exists(recent))
+        self.assertTrue(content_addressed_storage.exists(first.final_pdf.name))
+        self.assertTrue(content_addressed_storage.exists(first.qr_pdf.name))
+
+    def test_reused_file_is_not_collected(self):
+        """Un archivo deduplicado que vuelve a guardarse cuenta como reciente"""
+        name = content_addressed_storage.save('a.pdf', ContentFile(b'%PDF-1.4'))
+        self._age(name)
+
+        content_addressed_storage.save('b.pdf', ContentFile(b'%PDF-1.4'))
+        report = MediaGarbageCollector(self.media_root).collect(delete=True)
+
+        self.assertEqual(report.deleted_files, 0)
+        self.assertTrue(content_addressed_storage.exists(name))
+
+    def test_template_asset_keeps_upload_name(self):
+        """El asset guardado por hash se exporta con el nombre con el que se subió"""
+        from certificates.models import TemplateAsset
+        from certificates.services.template_export import TemplateExportService
+
+        asset = TemplateAsset.objects.create(
+            name='Logo DRTC',
+            asset_type='LOGO',
+            file=SimpleUploadedFile('logo_drtc.png', b'\x89PNG logo'),
+        )
+
+        self.assertTrue(asset.file.name.startswith('cas/'))
+        self.assertEqual(asset.original_filename, 'logo_drtc.png')
+        data = TemplateExportService()._serialize_asset(asset)
+        self.assertEqual(data['original_filename'], 'logo_drtc.png')
+        self.assertEqual(data['filename'], f'{asset.id}_logo_drtc.png')
+
+        asset.original_filename = ''
+        self.assertEqual(
+            TemplateExportService()._serialize_asset(asset)['original_filename'], 'logo-drtc.png'
+        )
@@ -0,0 +1,117 @@
+"""Tests para CSVProcessorService"""
+from datetime import date
+from io import BytesIO
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from certificates.models import AuditLog, Event, Participant
+from certificates.services.csv_processor import CSVProcessorService
+
+
+class CSVProcessorServiceTest(TestCase):
+    """Tests para la importación de CSV por conjuntos"""
+
+    HEADER = "DNI,Nombres y Apellidos,Fecha del Evento,Tipo de Asistente,Nombre del Evento"
+
+    def setUp(self):
+        self.service = CSVProcessorService()
+
+    def _csv(self, rows):
+        """Helper para crear un archivo CSV en memoria"""
+        content = "\n".join([self.HEADER] + rows)
+        return BytesIO(content.encode("utf-8"))
+
+    def test_process_csv_creates_events_and_participants(self):
+        """Debe crear eventos y participantes"""
+        csv_file = self._csv([
+            "12345678,Juan Pérez,15/01/2024,ASISTENTE,Capacitación A",
+            "87654321,María López,15/01/2024,PONENTE,Capacitación A",
+            "11223344,Carlos Ruiz,20/02/2024,ORGANIZADOR,Capacitación B",
+        ])
+
+        result = self.service.process_csv(csv_file)
+
+        self.assertEqual(result["success_count"], 3)
+        self.assertEqual(result["error_count"], 0)
+        self.assertEqual(Event.objects.count(), 2)
+        self.assertEqual(Participant.objects.count(), 3)
+
+    def test_process_csv_updates_existing_participants(self):
+        """Debe actualizar participantes existentes sin duplicarlos"""
+        event = Event.objects.create(name="Capacitación A", event_date=date(2024, 1, 15))
+        Participant.objects.create(
+            dni="12345678", full_name="Juan Antiguo", event=event, attendee_type="ASISTENTE"
+        )
+
+        result = self.service.process_csv(self._csv([
+            "12345678,Juan Pérez,15/01/2024,PONENTE,Capacitación A",
+        ]))
+
+        self.assertEqual(result["success_count"], 1)
+        self.assertEqual(Event.objects.count(), 1)
+        participant = Participant.objects.get(dni="12345678", event=event)
+        self.assertEqual(participant.full_name, "Juan Pérez")
+        self.assertEqual(participant.attendee_type, "PONENTE")
+
+    def test_process_csv_duplicate_rows_last_wins(self):
+        """Filas repetidas del mismo participante: la última prevalece"""
+        result = self.service.process_csv(self._csv([
+            "12345678,Juan Pérez,15/01/2024,ASISTENTE,Capacitación A",
+            "12345678,Juan P. Pérez,15/01/2024,PONENTE,Capacitación A",
+        ]))
+
+        self.assertEqual(result["success_count"], 2)
+        participant = Participant.objects.get(dni="12345678")
+        self.assertEqual(participant.full_name, "Juan P. Pérez")
+        self.assertEqual(participant.attendee_type, "PONENTE")
+
+    def test_process_csv_query_count_is_independent_of_rows(self):
+        """El número de consultas no debe crecer con el número de filas"""
+        rows = [
+            f"{10000000 + i},Participante {i},15/01/2024,ASISTENTE,Campaña Regional"
+            for i in range(300)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            result = self.service.process_csv(self._csv(rows))
+
+        self.assertEqual(result["success_count"], 300)
+        self.assertEqual(Participant.objects.count(), 300)
+        self.assertLess(len(queries), 20)
+
+    def test_process_csv_writes_single_audit_log(self):
+        """Debe registrar una sola entrada de auditoría"""
+        self.service.process_csv(self._csv([
+            "12345678,Juan Pérez,15/01/2024,ASISTENTE,Capacitación A",
+            "87654321,María López,15/01/2024,PONENTE,Capacitación A",
+        ]))
+
+        logs = AuditLog.objects.filter(action_type="IMPORT")
+        self.assertEqual(logs.count(), 1)
+        self.assertEqual(logs.first().metadata["success_count"], 2)
+
+    def test_process_csv_invalid_rows_return_errors(self):
+        """Filas inválidas deben rechazar el archivo con errores por fila"""
+        result = self.service.process_csv(self._csv([
+            "12345678,Juan Pérez,15/01/2024,INVITADO,Capacitación A",
+        ]))
+
+        self.assertEqual(result["success_count"], 0)
+        self.assertIn("Fila 2", result["errors"][0])
+        self.assertEqual(Participant.objects.count(), 0)
+
+    def test_process_csv_falls_back_to_row_by_row(self):
+        """Si la importación masiva falla debe procesar fila por fila"""
+        with patch(
+            "certificates.services.bulk_import.ParticipantBulkImporter.import_rows",
+            side_effect=Exception("conflicto"),
+        ):
+            result = self.service.process_csv(self._csv([
+                "12345678,Juan Pérez,15/01/2024,ASISTENTE,Capacitación A",
+            ]))
+
+        self.assertEqual(result["success_count"], 1)
+        self.assertEqual(Participant.objects.count(), 1)
@@ -1,6 +1,7 @@
 """Tests para el dashboard de estadísticas"""
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
@@ -188,6 +189,8 @@ class DashboardChartsAPITest(TestCase):
     
     def setUp(self):
         """Configuración inicial para los tests"""
+        # Los datos de los gráficos se cachean entre peticiones
+        cache.clear()
         self.admin_user = User.objects.create_user(
             username='admin',
             password='testpass123',
@@ -453,6 +456,8 @@ class DashboardIntegrationTest(TestCase):
     
     def setUp(self):
         """Configuración inicial"""
+        # Los datos de los gráficos se cachean entre peticiones
+        cache.clear()
         self.admin_user = User.objects.create_user(
             username='admin',
             password='testpass123',
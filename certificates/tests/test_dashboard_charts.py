@@ -0,0 +1,159 @@
+"""Tests para los datos de gráficos del dashboard y su cache"""
+import time
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from certificates.models import Certificate, Event, Participant
+from certificates.services.dashboard_charts import DashboardChartService
+from certificates.services.stale_cache import StaleWhileRevalidateCache
+
+
+class DashboardChartServiceTest(TestCase):
+    """Tests para DashboardChartService"""
+
+    def setUp(self):
+        cache.clear()
+        self.service = DashboardChartService(background=False)
+        event = Event.objects.create(name='Evento', event_date=date(2024, 1, 1))
+        for i, attendee_type in enumerate(['ASISTENTE', 'ASISTENTE', 'PONENTE']):
+            participant = Participant.objects.create(
+                dni=f'1000000{i}', full_name=f'Participante {i}', event=event,
+                attendee_type=attendee_type,
+            )
+            Certificate.objects.create(participant=participant, is_signed=(i == 0))
+
+    def test_each_chart_uses_one_query(self):
+        """Cada gráfico se calcula con una sola consulta"""
+        for chart_type in DashboardChartService.CHART_TYPES:
+            with self.subTest(chart_type=chart_type), self.assertNumQueries(1):
+                getattr(self.service, chart_type)()
+
+    def test_certificates_by_month_fills_empty_months(self):
+        """Los meses sin certificados aparecen con 0"""
+        old = Certificate.objects.first()
+        Certificate.objects.filter(pk=old.pk).update(
+            generated_at=timezone.now() - timedelta(days=95)
+        )
+
+        data = self.service.certificates_by_month()
+
+        counts = data['datasets'][0]['data']
+        self.assertIn(len(data['labels']), (12, 13))
+        self.assertEqual(len(counts), len(data['labels']))
+        self.assertEqual(data['labels'][-1], timezone.localtime().strftime('%b %Y'))
+        self.assertEqual(counts[-1], 2)
+        self.assertEqual(sum(counts), 3)
+        self.assertEqual(data['datasets'][0]['label'], 'Certificados Generados')
+
+    def test_signature_status_and_attendee_types(self):
+        """Formato de los gráficos de dona"""
+        self.assertEqual(self.service.signature_status()['datasets'][0]['data'], [1, 2])
+
+        attendee_types = self.service.attendee_types()
+        self.assertEqual(attendee_types['labels'], ['Asistentes', 'Ponentes'])
+        self.assertEqual(attendee_types['datasets'][0]['data'], [2, 1])
+
+    def test_verifications_by_day_covers_31_days(self):
+        """Las verificaciones se muestran para los últimos 31 días"""
+        data = self.service.verifications_by_day()
+
+        self.assertEqual(len(data['labels']), 31)
+        self.assertEqual(data['labels'][-1], timezone.localdate().strftime('%d/%m'))
+
+    def test_get_chart_is_cached(self):
+        """La segunda lectura del gráfico no consulta la base de datos"""
+        first = self.service.get_chart('signature_status')
+        with self.assertNumQueries(0):
+            second = self.service.get_chart('signature_status')
+
+        self.assertEqual(first, second)
+        self.assertIsNone(self.service.get_chart('desconocido'))
+
+
+class StaleWhileRevalidateCacheTest(TestCase):
+    """Tests para StaleWhileRevalidateCache"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_stale_value_is_served_while_revalidating(self):
+        """Un valor vencido se retorna y se recalcula en segundo plano"""
+        swr = StaleWhileRevalidateCache('test_swr', fresh_ttl=0, stale_ttl=60)
+        swr.get_or_compute('k', lambda: 'viejo')
+
+        with patch('certificates.services.stale_cache.threading.Thread') as thread:
+            value = swr.get_or_compute('k', lambda: 'nuevo')
+
+        self.assertEqual(value, 'viejo')
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+    def test_single_revalidation_at_a_time(self):
+        """Solo una petición recalcula un valor vencido"""
+        swr = StaleWhileRevalidateCache('test_swr', fresh_ttl=0, stale_ttl=60)
+        swr.get_or_compute('k', lambda: 'viejo')
+        cache.add('test_swr:k:lock', 1, 60)
+        compute = Mock(return_value='nuevo')
+
+        with patch('certificates.services.stale_cache.threading.Thread') as thread:
+            self.assertEqual(swr.get_or_compute('k', compute), 'viejo')
+
+        thread.assert_not_called()
+        compute.assert_not_called()
+
+    def test_revalidate_stores_new_value(self):
+        """El recálculo guarda el valor nuevo y libera el permiso"""
+        swr = StaleWhileRevalidateCache('test_swr', fresh_ttl=60, stale_ttl=60)
+
+        with patch('certificates.services.stale_cache.connection'):
+            swr._revalidate('k', lambda: 'nuevo')
+
+        self.assertEqual(swr.get_or_compute('k', Mock()), 'nuevo')
+        self.assertIsNone(cache.get('test_swr:k:lock'))
+
+    def test_xfetch_refreshes_before_expiry(self):
+        """Un cálculo lento puede recalcularse antes de vencer (XFetch)"""
+        swr = StaleWhileRevalidateCache('test_swr', fresh_ttl=60, stale_ttl=60, background=False)
+        entry = {'value': 'viejo', 'fresh_until': time.time() + 5, 'delta': 10}
+
+        with patch('certificates.services.stale_cache.random.random', return_value=0.9):
+            self.assertTrue(swr._should_refresh(entry))
+        with patch('certificates.services.stale_cache.random.random', return_value=0.0):
+            self.assertFalse(swr._should_refresh(entry))
+
+        swr.beta = 0
+        with patch('certificates.services.stale_cache.random.random', return_value=0.9):
+            self.assertFalse(swr._should_refresh(entry))
+
+    def test_store_records_compute_duration(self):
+        """La duración del cálculo se guarda para XFetch"""
+        swr = StaleWhileRevalidateCache('test_swr', fresh_ttl=60, stale_ttl=60)
+
+        swr.get_or_compute('k', lambda: 'valor')
+
+        self.assertIn('delta', cache.get('test_swr:k'))
+        self.assertIsNone(cache.get('test_swr:k:lock'))
+
+    def test_missing_entry_waits_for_other_process(self):
+        """Sin entrada, quien no obtiene el permiso espera el valor del otro proceso"""
+        swr = StaleWhileRevalidateCache('test_swr', fresh_ttl=60, stale_ttl=60, miss_wait=5)
+        cache.add('test_swr:k:lock', 1, 60)
+        compute = Mock(return_value='propio')
+
+        def other_process_stores(seconds):
+            swr._store('k', 'del otro proceso')
+
+        with patch('certificates.services.stale_cache.time.sleep', side_effect=other_process_stores):
+            self.assertEqual(swr.get_or_compute('k', compute), 'del otro proceso')
+        compute.assert_not_called()
+
+    def test_missing_entry_computes_after_wait(self):
+        """Si el otro proceso no termina a tiempo, se calcula igual"""
+        swr = StaleWhileRevalidateCache('test_swr', fresh_ttl=60, stale_ttl=60, miss_wait=0.1)
+        cache.add('test_swr:k:lock', 1, 60)
+
+        self.assertEqual(swr.get_or_compute('k', lambda: 'propio'), 'propio')
@@ -0,0 +1,93 @@
+"""Tests para los contadores incrementales del dashboard"""
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from certificates.models import Certificate, Event, Participant
+from certificates.services.dashboard_counters import dashboard_counters
+from certificates.services.dashboard_stats import DashboardStatsService
+
+
+class DashboardCounterServiceTest(TestCase):
+    """Tests para DashboardCounterService y las señales que lo mantienen"""
+
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.create(name='Evento', event_date=date(2024, 1, 1))
+        self.participant = self._participant('10000000')
+
+    def _participant(self, dni):
+        return Participant.objects.create(
+            dni=dni, full_name=f'Participante {dni}', event=self.event, attendee_type='ASISTENTE'
+        )
+
+    def test_get_rebuilds_missing_counters(self):
+        """Sin contadores en cache se recalculan una vez y luego no consultan"""
+        Certificate.objects.create(participant=self.participant, is_external=True)
+
+        with self.assertNumQueries(3):
+            counters = dashboard_counters.get()
+        with self.assertNumQueries(0):
+            self.assertEqual(dashboard_counters.get(), counters)
+
+        self.assertEqual(counters['certificates_total'], 1)
+        self.assertEqual(counters['certificates_external'], 1)
+        self.assertEqual(counters['certificates_unsigned'], 1)
+        self.assertEqual(counters['events'], 1)
+        self.assertEqual(counters['participants'], 1)
+
+    def test_signals_apply_deltas(self):
+        """Crear, firmar y eliminar certificados ajusta los contadores"""
+        dashboard_counters.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            certificate = Certificate.objects.create(participant=self.participant)
+            self._participant('10000001')
+        certificate = Certificate.objects.get(pk=certificate.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            certificate.is_signed = True
+            certificate.save()
+
+        with self.assertNumQueries(0):
+            counters = dashboard_counters.get()
+        self.assertEqual(counters['certificates_total'], 1)
+        self.assertEqual(counters['certificates_signed'], 1)
+        self.assertEqual(counters['certificates_unsigned'], 0)
+        self.assertEqual(counters['participants'], 2)
+
+        # Eliminar el evento elimina en cascada participantes y certificados
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.delete()
+
+        self.assertEqual(
+            dashboard_counters.get(),
+            {name: 0 for name in dashboard_counters.NAMES},
+        )
+
+    def test_save_without_loaded_values_invalidates(self):
+        """Sin los valores cargados de la BD no hay variación: se recalcula"""
+        certificate = Certificate.objects.create(participant=self.participant)
+        dashboard_counters.get()
+
+        Certificate.objects.filter(pk=certificate.pk).update(is_signed=True)
+        unloaded = Certificate.objects.only('id', 'participant').get(pk=certificate.pk)
+        unloaded.save()
+
+        self.assertEqual(dashboard_counters.get()['certificates_signed'], 1)
+
+    def test_dashboard_stats_use_counters(self):
+        """Con cache caliente el dashboard no consulta y refleja los totales"""
+        service = DashboardStatsService(background=False)
+        service.get_dashboard_stats()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Certificate.objects.create(participant=self.participant, is_signed=True)
+
+        with self.assertNumQueries(0):
+            stats = service.get_dashboard_stats()
+
+        self.assertEqual(stats['certificates']['total'], 1)
+        self.assertEqual(stats['certificates']['signed'], 1)
+        self.assertEqual(stats['quick_stats']['participants_count'], 1)
+        self.assertEqual(stats['quick_stats']['avg_certificates_per_event'], 1.0)
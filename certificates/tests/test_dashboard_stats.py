@@ -6,6 +6,7 @@ from django.core.cache import cache
 from django.utils import timezone
 from datetime import timedelta
 
+from certificates.services.audit_counters import audit_counters
 from certificates.services.dashboard_stats import DashboardStatsService
 from certificates.models import (
     Certificate, AuditLog, CertificateTemplate, Event, Participant
@@ -134,6 +135,8 @@ class DashboardStatsServiceTest(TestCase):
             action_type='GENERATE',  # No es QUERY
             description='Generación de prueba'
         )
+        # Los registros síncronos llegan a los contadores con el rollup periódico
+        audit_counters.rollup(timezone.now())
         
         stats = self.service._calculate_query_stats()
         
@@ -168,15 +171,18 @@ class DashboardStatsServiceTest(TestCase):
         stats1 = self.service.get_dashboard_stats()
         
         # Crear nuevo certificado
-        Certificate.objects.create(
-            participant=self.participant,
-            is_signed=True
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Certificate.objects.create(
+                participant=self.participant,
+                is_signed=True
+            )
         
-        # Segunda llamada - debe usar caché (no reflejar el nuevo certificado)
+        # Segunda llamada - los totales vienen de los contadores incrementales;
+        # la parte pesada sigue en caché (no refleja el nuevo certificado)
         stats2 = self.service.get_dashboard_stats()
         
-        self.assertEqual(stats1['certificates']['total'], stats2['certificates']['total'])
+        self.assertEqual(stats2['certificates']['total'], stats1['certificates']['total'] + 1)
+        self.assertEqual(stats1['certificates']['by_month'], stats2['certificates']['by_month'])
         
         # Limpiar caché
         self.service.clear_cache()
@@ -184,7 +190,7 @@ class DashboardStatsServiceTest(TestCase):
         # Tercera llamada - debe recalcular
         stats3 = self.service.get_dashboard_stats()
         
-        self.assertNotEqual(stats1['certificates']['total'], stats3['certificates']['total'])
+        self.assertNotEqual(stats1['certificates']['by_month'], stats3['certificates']['by_month'])
     
     def test_get_certificates_by_month(self):
         """Verifica obtención de certificados por mes"""
@@ -6,6 +6,7 @@ from certificates.models import Event, Participant, Certificate, CertificateTemp
 from datetime import date
 from io import BytesIO
 import requests
+import time
 
 
 class DigitalSignatureServiceTest(TestCase):
@@ -43,7 +44,7 @@ class DigitalSignatureServiceTest(TestCase):
         SIGNATURE_SERVICE_URL="http://test-signature.com/sign",
         SIGNATURE_API_KEY="test-api-key",
     )
-    @patch("certificates.services.digital_signature.requests.post")
+    @patch("certificates.services.digital_signature.requests.Session.post")
     def test_send_to_signature_service_success(self, mock_post):
         """Debe enviar PDF al servicio y recibir PDF firmado"""
         # Reinicializar servicio con nuevos settings
@@ -73,7 +74,7 @@ class DigitalSignatureServiceTest(TestCase):
         # Verificar resultado
         self.assertEqual(result, signed_pdf)
 
-    @patch("certificates.services.digital_signature.requests.post")
+    @patch("certificates.services.digital_signature.requests.Session.post")
     def test_send_to_signature_service_http_error(self, mock_post):
         """Debe manejar errores HTTP del servicio"""
         # Mock de respuesta con error
@@ -87,7 +88,7 @@ class DigitalSignatureServiceTest(TestCase):
         with self.assertRaises(requests.exceptions.HTTPError):
             self.service._send_to_signature_service(self.certificate.pdf_file)
 
-    @patch("certificates.services.digital_signature.requests.post")
+    @patch("certificates.services.digital_signature.requests.Session.post")
     def test_send_to_signature_service_timeout(self, mock_post):
         """Debe manejar timeout del servicio"""
         # Mock de timeout
@@ -97,7 +98,7 @@ class DigitalSignatureServiceTest(TestCase):
         with self.assertRaises(requests.exceptions.Timeout):
             self.service._send_to_signature_service(self.certificate.pdf_file)
 
-    @patch("certificates.services.digital_signature.requests.post")
+    @patch("certificates.services.digital_signature.requests.Session.post")
     def test_send_to_signature_service_connection_error(self, mock_post):
         """Debe manejar errores de conexión"""
         # Mock de error de conexión
@@ -110,7 +111,7 @@ class DigitalSignatureServiceTest(TestCase):
             self.service._send_to_signature_service(self.certificate.pdf_file)
 
 
-    @patch("certificates.services.digital_signature.requests.post")
+    @patch("certificates.services.digital_signature.requests.Session.post")
     @patch("certificates.services.digital_signature.time.sleep")
     def test_sign_certificate_success_on_first_try(self, mock_sleep, mock_post):
         """Debe firmar certificado exitosamente en el primer intento"""
@@ -136,7 +137,7 @@ class DigitalSignatureServiceTest(TestCase):
             # Verificar que se actualizó el certificado
             mock_update.assert_called_once()
 
-    @patch("certificates.services.digital_signature.requests.post")
+    @patch("certificates.services.digital_signature.requests.Session.post")
     @patch("certificates.services.digital_signature.time.sleep")
     def test_sign_certificate_retries_on_timeout(self, mock_sleep, mock_post):
         """Debe reintentar cuando hay timeout"""
@@ -157,10 +158,13 @@ class DigitalSignatureServiceTest(TestCase):
             # Verificar que se intentó 2 veces
             self.assertEqual(mock_post.call_count, 2)
 
-            # Verificar que se durmió 1 vez (entre intentos)
-            mock_sleep.assert_called_once_with(2)
+            # Verificar que se durmió 1 vez (entre intentos), con backoff y jitter
+            mock_sleep.assert_called_once()
+            delay = mock_sleep.call_args[0][0]
+            self.assertGreaterEqual(delay, 1)
+            self.assertLessEqual(delay, 2)
 
-    @patch("certificates.services.digital_signature.requests.post")
+    @patch("certificates.services.digital_signature.requests.Session.post")
     @patch("certificates.services.digital_signature.time.sleep")
     def test_sign_certificate_fails_after_max_retries(self, mock_sleep, mock_post):
         """Debe fallar después de MAX_RETRIES intentos"""
@@ -242,7 +246,7 @@ class DigitalSignatureServiceTest(TestCase):
         self.assertEqual(new_content, signed_pdf)
 
 
-    @patch("certificates.services.digital_signature.requests.post")
+    @patch("certificates.services.digital_signature.requests.Session.post")
     def test_sign_bulk_certificates_success(self, mock_post):
         """Debe firmar múltiples certificados exitosamente"""
         # Crear más certificados
@@ -274,7 +278,7 @@ class DigitalSignatureServiceTest(TestCase):
         self.assertEqual(result["error_count"], 0)
         self.assertEqual(len(result["errors"]), 0)
 
-    @patch("certificates.services.digital_signature.requests.post")
+    @patch("certificates.services.digital_signature.requests.Session.post")
     def test_sign_bulk_certificates_with_errors(self, mock_post):
         """Debe manejar errores individuales sin detener el proceso"""
         # Crear más certificados
@@ -303,8 +307,9 @@ class DigitalSignatureServiceTest(TestCase):
             mock_response,
         ]
 
+        # Secuencial: las respuestas simuladas siguen el orden de los certificados
         certificates = [self.certificate, cert2]
-        result = self.service.sign_bulk_certificates(certificates)
+        result = self.service.sign_bulk_certificates(certificates, concurrency=1)
 
         # Verificar que procesó ambos
         self.assertEqual(result["success_count"], 1)
@@ -333,3 +338,174 @@ class DigitalSignatureServiceTest(TestCase):
 
         self.assertEqual(result["success_count"], 0)
         self.assertEqual(result["error_count"], 0)
+
+
+@override_settings(
+    SIGNATURE_API_KEY="stub-key",
+    SIGNATURE_RETRY_DELAY=0.01,
+    SIGNATURE_RETRY_MAX_DELAY=0.05,
+)
+class ConcurrentSigningTest(TestCase):
+    """Firma masiva contra un servicio de firma local (SignatureStubServer)"""
+
+    def setUp(self):
+        self.event = Event.objects.create(name="Evento Firma", event_date=date(2024, 1, 1))
+        self.certificates = []
+        for index in range(12):
+            participant = Participant.objects.create(
+                dni=f"700000{index:02d}",
+                full_name=f"Participante {index}",
+                event=self.event,
+                attendee_type="ASISTENTE",
+            )
+            certificate = Certificate.objects.create(
+                participant=participant, verification_url=f"http://test.com/verify/{index}"
+            )
+            certificate.pdf_file.save(
+                f"firma_{index}.pdf", BytesIO(f"%PDF-1.4 certificado {index}".encode()), save=True
+            )
+            self.certificates.append(certificate)
+
+    def _service(self, stub, **kwargs):
+        with override_settings(SIGNATURE_SERVICE_URL=stub.url, **kwargs):
+            return DigitalSignatureService()
+
+    def test_signs_concurrently_with_keep_alive(self):
+        """Firma en paralelo reutilizando conexiones y guarda cada resultado"""
+        from certificates.models import AuditLog
+        from certificates.tests.signature_stub import SIGNED_MARKER, SignatureStubServer
+
+        progress = []
+        with SignatureStubServer(delay=0.05) as stub:
+            service = self._service(stub, SIGNATURE_CONCURRENCY=4)
+            result = service.sign_bulk_certificates(
+                self.certificates, progress_callback=lambda done, total: progress.append(done)
+            )
+
+        self.assertEqual(result["success_count"], 12, result["errors"])
+        self.assertFalse(result["aborted"])
+        self.assertGreater(stub.max_concurrent, 1)
+        self.assertLessEqual(stub.max_concurrent, 4)
+        self.assertLessEqual(len(stub.connections), 4)
+        self.assertEqual(stub.authorization, {"Bearer stub-key"})
+        self.assertEqual(progress, list(range(1, 13)))
+
+        certificate = Certificate.objects.get(pk=self.certificates[3].pk)
+        self.assertTrue(certificate.is_signed)
+        with certificate.pdf_file.open("rb") as pdf_file:
+            self.assertEqual(pdf_file.read(), b"%PDF-1.4 certificado 3" + SIGNED_MARKER)
+        self.assertEqual(AuditLog.objects.filter(action_type="SIGN").count(), 12)
+
+    def test_retries_transient_errors(self):
+        """Las respuestas 503 se reintentan con backoff"""
+        from certificates.tests.signature_stub import SignatureStubServer
+
+        with SignatureStubServer(fail_first=2) as stub:
+            service = self._service(stub, SIGNATURE_CONCURRENCY=1)
+            result = service.sign_bulk_certificates(self.certificates[:3])
+
+        self.assertEqual(result["success_count"], 3, result["errors"])
+        self.assertEqual(stub.requests, 5)
+
+    def test_circuit_breaker_stops_batch(self):
+        """Con el servicio caído el lote se detiene y el resto queda sin firmar"""
+        from certificates.tests.signature_stub import SignatureStubServer
+
+        with SignatureStubServer(fail_status=503) as stub:
+            service = self._service(
+                stub,
+                SIGNATURE_CONCURRENCY=2,
+                SIGNATURE_MAX_RETRIES=2,
+                SIGNATURE_CIRCUIT_FAILURE_THRESHOLD=3,
+            )
+            result = service.sign_bulk_certificates(self.certificates)
+
+        self.assertTrue(result["aborted"])
+        self.assertEqual(result["success_count"], 0)
+        self.assertEqual(result["error_count"], 12)
+        self.assertIn("detenida", result["errors"][-1])
+        # Sin circuit breaker serían 12 × 2 peticiones
+        self.assertLessEqual(stub.requests, 5)
+        self.assertFalse(Certificate.objects.filter(is_signed=True).exists())
+
+    def test_client_errors_are_not_retried(self):
+        """Un 4xx no se reintenta ni abre el circuito"""
+        from certificates.tests.signature_stub import SignatureStubServer
+
+        with SignatureStubServer(fail_status=400) as stub:
+            service = self._service(stub, SIGNATURE_CONCURRENCY=2)
+            result = service.sign_bulk_certificates(self.certificates[:4])
+
+        self.assertEqual(result["error_count"], 4)
+        self.assertFalse(result["aborted"])
+        self.assertEqual(stub.requests, 4)
+
+
+class CircuitBreakerTest(TestCase):
+    """Tests para CircuitBreaker"""
+
+    def test_opens_and_half_opens(self):
+        """Se abre tras los fallos consecutivos y admite una prueba al vencer el plazo"""
+        from certificates.services.digital_signature import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        with patch("certificates.services.digital_signature.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertTrue(breaker.allow_request())
+            self.assertFalse(breaker.allow_request())
+            breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    @patch("certificates.services.digital_signature.requests.Session.post")
+    def test_client_error_during_half_open_closes_circuit(self, mock_post):
+        """Un 4xx en la prueba half-open cierra el circuito en lugar de bloquearlo"""
+        from certificates.services.digital_signature import CircuitBreaker
+
+        event = Event.objects.create(name="Evento Circuito", event_date=date(2024, 1, 1))
+        participant = Participant.objects.create(
+            dni="11223344", full_name="Ana Ruiz", event=event, attendee_type="ASISTENTE"
+        )
+        certificate = Certificate.objects.create(participant=participant)
+        certificate.pdf_file.save("circuito.pdf", BytesIO(b"%PDF-1.4 test"), save=True)
+
+        response = Mock(status_code=400)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            "400 Client Error", response=response
+        )
+        mock_post.return_value = response
+
+        service = DigitalSignatureService()
+        breaker = service.circuit_breaker
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        with patch("certificates.services.digital_signature.time.monotonic", return_value=time.monotonic() + breaker.reset_timeout + 1):
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            with self.assertRaises(Exception):
+                service._request_signature(certificate)
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+    def test_local_error_during_half_open_releases_probe(self):
+        """Un error ajeno al servicio no deja tomada la prueba half-open"""
+        from certificates.services.digital_signature import CircuitBreaker
+
+        service = DigitalSignatureService()
+        breaker = service.circuit_breaker
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        certificate = Mock(uuid="sin-pdf")
+
+        with patch("certificates.services.digital_signature.time.monotonic", return_value=time.monotonic() + breaker.reset_timeout + 1):
+            with patch.object(service, "_send_to_signature_service", side_effect=ValueError("PDF ilegible")):
+                with self.assertRaises(ValueError):
+                    service._request_signature(certificate)
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertTrue(breaker.allow_request())
@@ -1,5 +1,5 @@
 """Tests para ExcelProcessorService"""
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from openpyxl import Workbook
 from io import BytesIO
 from datetime import datetime
@@ -351,3 +351,97 @@ class ExcelProcessorServiceTest(TestCase):
         log = AuditLog.objects.latest('timestamp')
         self.assertEqual(log.action_type, 'IMPORT')
         self.assertIn('success_count', log.metadata)
+    
+    def _create_data_excel(self, rows):
+        """Helper para crear un Excel con encabezados y filas de datos"""
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['DNI', 'Nombres y Apellidos', 'Fecha del Evento', 'Tipo de Asistente', 'Nombre del Evento'])
+        for row in rows:
+            sheet.append(row)
+        
+        excel_file = BytesIO()
+        workbook.save(excel_file)
+        excel_file.seek(0)
+        return excel_file
+    
+    def test_process_excel_returns_metrics(self):
+        """Debe reportar filas procesadas, tiempo y memoria pico"""
+        excel_file = self._create_data_excel([
+            ['12345678', 'Juan Pérez', '15/01/2024', 'ASISTENTE', 'Capacitación A'],
+            ['87654321', 'María López', '15/01/2024', 'PONENTE', 'Capacitación A'],
+        ])
+        
+        result = self.service.process_excel(excel_file)
+        
+        self.assertEqual(result['success_count'], 2)
+        self.assertEqual(result['metrics']['rows_processed'], 2)
+        self.assertIn('rows_per_second', result['metrics'])
+        self.assertIn('peak_memory_mb', result['metrics'])
+    
+    def test_process_excel_returns_partial_metrics_on_error(self):
+        """Si el archivo falla a mitad de la lectura devuelve las métricas parciales"""
+        from unittest.mock import patch
+        
+        excel_file = self._create_data_excel([
+            ['12345678', 'Juan Pérez', '15/01/2024', 'ASISTENTE', 'Capacitación A'],
+            ['87654321', 'María López', '15/01/2024', 'PONENTE', 'Capacitación A'],
+        ])
+        
+        with patch.object(self.service, '_import_chunk', side_effect=RuntimeError('disco lleno')):
+            result = self.service.process_excel(excel_file)
+        
+        self.assertEqual(result['error_count'], 1)
+        self.assertIn('disco lleno', result['errors'][0])
+        self.assertEqual(result['metrics']['rows_processed'], 2)
+        self.assertGreater(result['metrics']['elapsed_seconds'], 0)
+    
+    def test_memory_tracking_is_opt_in(self):
+        """Sin IMPORT_TRACK_MEMORY la importación no activa tracemalloc"""
+        import tracemalloc
+        from certificates.services.bulk_import import ImportMetrics
+        
+        with ImportMetrics() as metrics:
+            self.assertFalse(tracemalloc.is_tracing())
+        self.assertIsNone(metrics.as_dict()['peak_memory_mb'])
+        
+        with override_settings(IMPORT_TRACK_MEMORY=True):
+            with ImportMetrics() as metrics:
+                self.assertTrue(tracemalloc.is_tracing())
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertIsNotNone(metrics.as_dict()['peak_memory_mb'])
+    
+    def test_process_excel_imports_in_chunks(self):
+        """Debe importar varios bloques sin perder filas y omitir filas vacías"""
+        from certificates.models import Participant
+        
+        self.service.CHUNK_SIZE = 2
+        rows = [
+            [f'{10000000 + i}', f'Participante {i}', '15/01/2024', 'ASISTENTE', 'Campaña Regional']
+            for i in range(5)
+        ]
+        rows.insert(2, [None, None, None, None, None])
+        
+        result = self.service.process_excel(self._create_data_excel(rows))
+        
+        self.assertEqual(result['success_count'], 5)
+        self.assertEqual(result['error_count'], 0)
+        self.assertEqual(Participant.objects.count(), 5)
+    
+    def test_process_excel_chunk_falls_back_to_row_by_row(self):
+        """Si la importación masiva de un bloque falla debe procesar fila por fila"""
+        from unittest.mock import patch
+        from certificates.models import Participant
+        
+        excel_file = self._create_data_excel([
+            ['12345678', 'Juan Pérez', '15/01/2024', 'ASISTENTE', 'Capacitación A'],
+        ])
+        
+        with patch(
+            'certificates.services.excel_processor.ParticipantBulkImporter.import_rows',
+            side_effect=Exception('conflicto'),
+        ):
+            result = self.service.process_excel(excel_file)
+        
+        self.assertEqual(result['success_count'], 1)
+        self.assertEqual(Participant.objects.count(), 1)
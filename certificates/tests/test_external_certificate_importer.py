@@ -0,0 +1,114 @@
+"""Tests para ExternalCertificateImporter"""
+import tempfile
+from datetime import date
+from io import BytesIO
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from openpyxl import Workbook
+
+from certificates.models import Certificate, Event, Participant
+from certificates.services.external_certificate_importer import ExternalCertificateImporter
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExternalCertificateImporterTest(TestCase):
+    """Tests para la importación de certificados externos"""
+
+    HEADERS = [
+        'DNI',
+        'Nombres y Apellidos',
+        'Fecha del Evento',
+        'Tipo de Asistente',
+        'Nombre del Evento',
+        'URL del Certificado',
+        'Sistema Externo',
+    ]
+
+    def _excel(self, rows, headers=None):
+        """Helper para crear un archivo Excel en memoria"""
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(headers or self.HEADERS)
+        for row in rows:
+            sheet.append(row)
+
+        excel_file = BytesIO()
+        workbook.save(excel_file)
+        excel_file.seek(0)
+        return excel_file
+
+    def _row(self, dni, name='Juan Pérez', url='https://externo.gob.pe/cert/1'):
+        return [dni, name, '15/01/2024', 'ASISTENTE', 'Capacitación Externa', url, 'SIGE']
+
+    def test_import_creates_external_certificates(self):
+        """Debe crear eventos, participantes y certificados externos con QR"""
+        result = ExternalCertificateImporter().import_from_file(self._excel([
+            self._row('12345678'),
+            self._row('87654321', name='María López', url='https://externo.gob.pe/cert/2'),
+        ]))
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['success_count'], 2)
+        self.assertEqual(result['updated_count'], 0)
+        self.assertEqual(result['metrics']['rows_processed'], 2)
+        self.assertEqual(Event.objects.count(), 1)
+
+        certificate = Certificate.objects.get(participant__dni='12345678')
+        self.assertTrue(certificate.is_external)
+        self.assertEqual(certificate.external_url, 'https://externo.gob.pe/cert/1')
+        self.assertEqual(certificate.external_system, 'SIGE')
+        self.assertTrue(certificate.qr_code.name)
+
+    def test_import_updates_existing_certificate(self):
+        """Debe actualizar el certificado existente del participante"""
+        event = Event.objects.create(name='Capacitación Externa', event_date=date(2024, 1, 15))
+        participant = Participant.objects.create(
+            dni='12345678', full_name='Juan Antiguo', event=event, attendee_type='ASISTENTE'
+        )
+        Certificate.objects.create(participant=participant, verification_url='https://local/verify')
+
+        result = ExternalCertificateImporter().import_from_file(self._excel([
+            self._row('12345678', url='https://externo.gob.pe/cert/nuevo'),
+        ]))
+
+        self.assertEqual(result['success_count'], 0)
+        self.assertEqual(result['updated_count'], 1)
+        certificate = Certificate.objects.get(participant=participant)
+        self.assertTrue(certificate.is_external)
+        self.assertEqual(certificate.external_url, 'https://externo.gob.pe/cert/nuevo')
+        participant.refresh_from_db()
+        self.assertEqual(participant.full_name, 'Juan Pérez')
+
+    def test_import_reports_invalid_rows(self):
+        """Filas inválidas se reportan sin detener la importación"""
+        result = ExternalCertificateImporter().import_from_file(self._excel([
+            self._row('12345678'),
+            self._row('87654321', url='ftp://externo.gob.pe/cert/2'),
+        ]))
+
+        self.assertEqual(result['success_count'], 1)
+        self.assertEqual(result['error_count'], 1)
+        self.assertIn('Fila 3', result['errors'][0])
+
+    def test_import_missing_columns(self):
+        """Debe rechazar archivos sin las columnas requeridas"""
+        result = ExternalCertificateImporter().import_from_file(
+            self._excel([], headers=['DNI', 'Nombres y Apellidos'])
+        )
+
+        self.assertFalse(result['success'])
+        self.assertEqual(Certificate.objects.count(), 0)
+
+    def test_import_chunk_falls_back_to_row_by_row(self):
+        """Si el bloque falla debe procesar fila por fila"""
+        with patch(
+            'certificates.services.external_certificate_importer.ParticipantBulkImporter.import_rows',
+            side_effect=Exception('conflicto'),
+        ):
+            result = ExternalCertificateImporter().import_from_file(self._excel([
+                self._row('12345678'),
+            ]))
+
+        self.assertEqual(result['success_count'], 1)
+        self.assertEqual(Certificate.objects.filter(is_external=True).count(), 1)
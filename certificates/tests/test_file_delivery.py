@@ -0,0 +1,127 @@
+"""Tests para la entrega de PDFs protegidos (descarga y preview)"""
+import os
+import shutil
+import tempfile
+from datetime import date
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from certificates.models import Certificate, Event, Participant
+from certificates.services.file_delivery import ProtectedFileDelivery
+
+
+PDF_CONTENT = b'%PDF-1.4\n' + bytes(range(256)) * 8
+
+
+class ProtectedFileDeliveryTest(TestCase):
+    """Tests para ProtectedFileDelivery y las vistas que la usan"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        event = Event.objects.create(name='Evento', event_date=date(2024, 1, 15))
+        participant = Participant.objects.create(
+            dni='12345678', full_name='Juan Pérez', event=event, attendee_type='ASISTENTE'
+        )
+        self.certificate = Certificate.objects.create(participant=participant, verification_url='http://testserver/v/')
+        self.certificate.pdf_file.save('certificado.pdf', ContentFile(PDF_CONTENT))
+        self.url = reverse('certificates:download', kwargs={'uuid': self.certificate.uuid})
+
+    def get_download(self, **headers):
+        return self.client.get(self.url, **headers)
+
+    def test_django_backend_streams_file_with_validators(self):
+        """Por defecto Django transmite el archivo con ETag y Last-Modified"""
+        response = self.get_download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), PDF_CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+    def test_conditional_request_returns_304(self):
+        """If-None-Match con el ETag actual responde 304 sin cuerpo"""
+        etag = self.get_download()['ETag']
+
+        response = self.get_download(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_range_request_returns_partial_content(self):
+        """Un rango de bytes devuelve 206 con Content-Range"""
+        response = self.get_download(HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), PDF_CONTENT[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(PDF_CONTENT)}')
+        self.assertEqual(response['Content-Length'], '10')
+
+        response = self.get_download(HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), PDF_CONTENT[-5:])
+
+    def test_unsatisfiable_range_returns_416(self):
+        """Un rango fuera del archivo devuelve 416"""
+        response = self.get_download(HTTP_RANGE=f'bytes={len(PDF_CONTENT)}-')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(PDF_CONTENT)}')
+
+    def test_stale_if_range_returns_full_file(self):
+        """Si If-Range no coincide, se envía el archivo completo"""
+        response = self.get_download(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"otro"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), PDF_CONTENT)
+
+    @override_settings(PROTECTED_FILE_DELIVERY='nginx', PROTECTED_FILE_INTERNAL_PREFIX='/protected/')
+    def test_nginx_backend_uses_x_accel_redirect(self):
+        """Con nginx la respuesta no lleva cuerpo y apunta a la location interna"""
+        response = self.get_download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{self.certificate.pdf_file.name}')
+        self.assertEqual(response.content, b'')
+        self.assertIn(self.certificate.participant.dni, response['Content-Disposition'])
+
+    def test_sendfile_backend_uses_absolute_path(self):
+        """Con sendfile la respuesta indica la ruta absoluta del archivo"""
+        response = ProtectedFileDelivery(backend='sendfile').serve(
+            self.client.get(self.url).wsgi_request, self.certificate.pdf_file
+        )
+
+        self.assertEqual(response['X-Sendfile'], self.certificate.pdf_file.path)
+
+    def test_missing_file_returns_404(self):
+        """Si el archivo ya no está en el storage se responde 404"""
+        os.remove(self.certificate.pdf_file.path)
+
+        self.assertEqual(self.get_download().status_code, 404)
+
+    def test_preview_pdf_requires_final_signature(self):
+        """El PDF del preview solo se entrega con el certificado firmado final"""
+        url = reverse('certificates:certificate_preview_pdf', kwargs={'certificate_uuid': self.certificate.uuid})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.certificate.final_pdf.save('final.pdf', ContentFile(PDF_CONTENT), save=False)
+        self.certificate.processing_status = 'SIGNED_FINAL'
+        self.certificate.save()
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('inline', response['Content-Disposition'])
+        self.assertIn('attachment', self.client.get(url, {'download': '1'})['Content-Disposition'])
+
+    def test_certificate_url_goes_through_download_view(self):
+        """El enlace del certificado (admin) usa la vista, no la URL de /media/"""
+        self.assertEqual(self.certificate.get_certificate_url(), self.url)
@@ -130,7 +130,7 @@ class FullWorkflowIntegrationTest(TestCase):
         self.assertEqual(generate_logs.count(), 3)
 
         # ===== PASO 3: FIRMAR CERTIFICADOS =====
-        with patch('requests.post') as mock_post:
+        with patch('certificates.services.digital_signature.requests.Session.post') as mock_post:
             # Simular respuesta exitosa del servicio de firma
             mock_response = MagicMock()
             mock_response.status_code = 200
@@ -187,7 +187,7 @@ class FullWorkflowIntegrationTest(TestCase):
         # Verificar verificación exitosa
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'certificates/verify.html')
-        self.assertEqual(response.context['certificate'], certificate)
+        self.assertEqual(response.context['certificate'].uuid, certificate.uuid)
         
         # Verificar que muestra estado de firma
         self.assertContains(response, 'FIRMADO DIGITALMENTE')
@@ -551,8 +551,8 @@ class CertificateGenerationIntegrationTest(TestCase):
             self.assertGreater(len(pdf_content), 0)
             self.assertTrue(pdf_content.startswith(b'%PDF'))
             
-            # Verificar que el QR existe
-            self.assertTrue(certificate.qr_code.name)
+            # Verificar que el QR existe (el PNG se genera bajo demanda)
+            self.assertTrue(certificate.ensure_qr_code().name)
             certificate.qr_code.open('rb')
             qr_content = certificate.qr_code.read()
             certificate.qr_code.close()
@@ -889,10 +889,10 @@ class QRVerificationIntegrationTest(TestCase):
         
         self.assertEqual(response.status_code, 404)
         
-        # Verificar que se creó log de auditoría del intento fallido
-        log = AuditLog.objects.filter(action_type='VERIFY').latest('timestamp')
-        self.assertEqual(log.metadata['certificate_uuid'], str(invalid_uuid))
-        self.assertEqual(log.metadata['status'], 'not_found')
+        # El intento fallido se cuenta por hora, sin un log por intento
+        self.assertFalse(
+            AuditLog.objects.filter(metadata__certificate_uuid=str(invalid_uuid)).exists()
+        )
 
     def test_verify_malformed_uuid(self):
         """Test de verificación con UUID mal formado"""
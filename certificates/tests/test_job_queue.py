@@ -0,0 +1,268 @@
+"""Tests para la cola de trabajos en segundo plano"""
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from certificates.models import (
+    Certificate,
+    CertificateJob,
+    CertificateTemplate,
+    Event,
+    Participant,
+)
+from certificates.services.job_queue import JobQueueService, JOB_HANDLERS
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class JobQueueServiceTest(TestCase):
+    """Tests para JobQueueService"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="operador", password="test123")
+        self.queue = JobQueueService(worker_id="test-worker")
+
+        CertificateTemplate.objects.create(
+            name="Plantilla por defecto", html_template="<html></html>", is_default=True
+        )
+        self.event = Event.objects.create(name="Evento Test", event_date=date(2024, 1, 1))
+        for i in range(3):
+            Participant.objects.create(
+                dni=f"1000{i:04d}",
+                full_name=f"Participante {i}",
+                event=self.event,
+                attendee_type="ASISTENTE",
+            )
+
+    def tearDown(self):
+        """Elimina los archivos generados durante el test"""
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def test_enqueue_creates_pending_job(self):
+        """Debe crear el trabajo en estado PENDING"""
+        job = self.queue.enqueue(
+            "GENERATE_CERTIFICATES", {"event_ids": [self.event.id]}, user=self.user
+        )
+
+        self.assertEqual(job.status, "PENDING")
+        self.assertEqual(job.created_by, self.user)
+        self.assertEqual(job.attempts, 0)
+
+    def test_enqueue_rejects_unknown_job_type(self):
+        """Debe rechazar tipos de trabajo sin manejador"""
+        with self.assertRaises(ValueError):
+            self.queue.enqueue("UNKNOWN", {})
+
+    def test_claim_next_job_only_once(self):
+        """Un trabajo solo puede ser reclamado por un worker"""
+        job = self.queue.enqueue("GENERATE_CERTIFICATES", {"event_ids": [self.event.id]})
+
+        claimed = self.queue.claim_next_job()
+        other = JobQueueService(worker_id="otro-worker").claim_next_job()
+
+        self.assertEqual(claimed.id, job.id)
+        self.assertEqual(claimed.status, "RUNNING")
+        self.assertEqual(claimed.locked_by, "test-worker")
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(other)
+
+    def test_claim_skips_jobs_scheduled_in_future(self):
+        """No debe reclamar trabajos con run_after en el futuro"""
+        job = self.queue.enqueue("GENERATE_CERTIFICATES", {"event_ids": [self.event.id]})
+        CertificateJob.objects.filter(id=job.id).update(
+            run_after=timezone.now() + timedelta(minutes=5)
+        )
+
+        self.assertIsNone(self.queue.claim_next_job())
+
+    def test_process_next_generates_certificates(self):
+        """Debe ejecutar la generación y registrar progreso y resultado"""
+        self.queue.enqueue("GENERATE_CERTIFICATES", {"event_ids": [self.event.id]}, user=self.user)
+
+        job = self.queue.process_next()
+
+        self.assertEqual(job.status, "COMPLETED")
+        self.assertEqual(job.result["success_count"], 3)
+        self.assertEqual(job.progress_current, 3)
+        self.assertEqual(job.progress_total, 3)
+        self.assertEqual(job.progress_percent, 100)
+        self.assertEqual(Certificate.objects.count(), 3)
+
+    def test_failed_job_is_rescheduled_with_backoff(self):
+        """Un error con intentos restantes debe reprogramar el trabajo"""
+        job = self.queue.enqueue("GENERATE_CERTIFICATES", {"event_ids": [self.event.id]})
+
+        with patch.dict(JOB_HANDLERS, {"GENERATE_CERTIFICATES": self._failing_handler}):
+            self.queue.process_next()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "PENDING")
+        self.assertEqual(job.error_message, "Servicio caído")
+        self.assertGreater(job.run_after, timezone.now())
+
+    def test_failed_job_exhausts_attempts(self):
+        """Al agotar los intentos el trabajo debe quedar FAILED"""
+        job = self.queue.enqueue(
+            "GENERATE_CERTIFICATES", {"event_ids": [self.event.id]}, max_attempts=1
+        )
+
+        with patch.dict(JOB_HANDLERS, {"GENERATE_CERTIFICATES": self._failing_handler}):
+            self.queue.process_next()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "FAILED")
+        self.assertIsNotNone(job.finished_at)
+
+    def test_release_stale_jobs(self):
+        """Trabajos sin actividad deben volver a la cola"""
+        job = self.queue.enqueue("GENERATE_CERTIFICATES", {"event_ids": [self.event.id]})
+        self.queue.claim_next_job()
+        CertificateJob.objects.filter(id=job.id).update(
+            locked_at=timezone.now() - timedelta(seconds=self.queue.lock_timeout + 60)
+        )
+
+        released = self.queue.release_stale_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(released, 1)
+        self.assertEqual(job.status, "PENDING")
+
+    def test_export_job_stores_zip(self):
+        """La exportación debe guardar el ZIP como archivo del trabajo"""
+        participant = Participant.objects.first()
+        certificate = Certificate.objects.create(
+            participant=participant,
+            verification_url="http://testserver/verificar/x/",
+            processing_status="QR_INSERTED",
+        )
+        certificate.qr_pdf.save("qr.pdf", ContentFile(b"%PDF-1.4 test"), save=True)
+
+        self.queue.enqueue("EXPORT_FOR_SIGNING", {"certificate_ids": [certificate.id]})
+        job = self.queue.process_next()
+
+        self.assertEqual(job.status, "COMPLETED")
+        self.assertTrue(job.result_file)
+        self.assertTrue(job.result["filename"].endswith(".zip"))
+        certificate.refresh_from_db()
+        self.assertEqual(certificate.processing_status, "EXPORTED_FOR_SIGNING")
+
+    @staticmethod
+    def _failing_handler(job, queue):
+        raise Exception("Servicio caído")
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class RunCertificateWorkerCommandTest(TestCase):
+    """Tests para el comando run_certificate_worker"""
+
+    def setUp(self):
+        CertificateTemplate.objects.create(
+            name="Plantilla por defecto", html_template="<html></html>", is_default=True
+        )
+        self.event = Event.objects.create(name="Evento Test", event_date=date(2024, 1, 1))
+        Participant.objects.create(
+            dni="12345678", full_name="Juan Pérez", event=self.event, attendee_type="ASISTENTE"
+        )
+
+    def tearDown(self):
+        """Elimina los archivos generados durante el test"""
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def test_once_drains_queue(self):
+        """Con --once debe procesar la cola y terminar"""
+        queue = JobQueueService()
+        queue.enqueue("GENERATE_CERTIFICATES", {"event_ids": [self.event.id]})
+        queue.enqueue("GENERATE_CERTIFICATES", {"event_ids": [self.event.id]})
+
+        out = StringIO()
+        call_command("run_certificate_worker", "--once", stdout=out)
+
+        self.assertIn("Trabajos procesados: 2", out.getvalue())
+        self.assertFalse(CertificateJob.objects.exclude(status="COMPLETED").exists())
+        self.assertEqual(Certificate.objects.count(), 1)
+
+    def test_max_jobs(self):
+        """Con --max-jobs debe detenerse tras N trabajos"""
+        queue = JobQueueService()
+        queue.enqueue("GENERATE_CERTIFICATES", {"event_ids": [self.event.id]})
+        queue.enqueue("GENERATE_CERTIFICATES", {"event_ids": [self.event.id]})
+
+        out = StringIO()
+        call_command("run_certificate_worker", "--once", "--max-jobs", "1", stdout=out)
+
+        self.assertIn("Trabajos procesados: 1", out.getvalue())
+        self.assertEqual(CertificateJob.objects.filter(status="PENDING").count(), 1)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class JobStatusViewTest(TestCase):
+    """Tests para el seguimiento de trabajos desde el admin"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username="admin", email="admin@test.com", password="admin123"
+        )
+        self.client = Client()
+        self.client.login(username="admin", password="admin123")
+        self.job = CertificateJob.objects.create(
+            job_type="PROCESS_QR",
+            payload={"certificate_ids": [1, 2]},
+            progress_current=1,
+            progress_total=2,
+        )
+
+    def tearDown(self):
+        """Elimina los archivos generados durante el test"""
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def test_job_status_json(self):
+        """Debe retornar el progreso del trabajo en JSON"""
+        response = self.client.get(reverse("certificates:job_status", args=[self.job.id]))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["status"], "PENDING")
+        self.assertEqual(data["progress_percent"], 50)
+
+    def test_job_status_list_filters_ids(self):
+        """Debe filtrar la lista por IDs"""
+        CertificateJob.objects.create(job_type="PROCESS_QR", payload={})
+
+        response = self.client.get(
+            reverse("certificates:job_status_list"), {"ids": str(self.job.id)}
+        )
+
+        self.assertEqual([job["id"] for job in response.json()["jobs"]], [self.job.id])
+
+    def test_processing_status_lists_jobs(self):
+        """El panel de estado debe mostrar los trabajos"""
+        response = self.client.get(reverse("certificates:processing_status"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Procesamiento de QR")
+
+    def test_download_requires_completed_job(self):
+        """No debe descargar archivos de trabajos no completados"""
+        response = self.client.get(reverse("certificates:job_download", args=[self.job.id]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_download_completed_job_file(self):
+        """Debe descargar el archivo de un trabajo completado"""
+        self.job.status = "COMPLETED"
+        self.job.result = {"filename": "export.zip"}
+        self.job.result_file.save("export.zip", ContentFile(b"PK"), save=True)
+
+        response = self.client.get(reverse("certificates:job_download", args=[self.job.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("export.zip", response["Content-Disposition"])
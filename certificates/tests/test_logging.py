@@ -222,7 +222,7 @@ class LoggingTestCase(TestCase):
         )
 
     @patch('certificates.services.digital_signature.logger')
-    @patch('certificates.services.digital_signature.requests.post')
+    @patch('certificates.services.digital_signature.requests.Session.post')
     def test_digital_signature_logs_info(self, mock_post, mock_logger):
         """Verifica que DigitalSignatureService registra logs de info"""
         # Crear certificado
@@ -250,7 +250,7 @@ class LoggingTestCase(TestCase):
         )
 
     @patch('certificates.services.digital_signature.logger')
-    @patch('certificates.services.digital_signature.requests.post')
+    @patch('certificates.services.digital_signature.requests.Session.post')
     def test_digital_signature_logs_debug(self, mock_post, mock_logger):
         """Verifica que DigitalSignatureService registra logs de debug"""
         # Crear certificado
@@ -271,7 +271,7 @@ class LoggingTestCase(TestCase):
         self.assertTrue(mock_logger.debug.called)
 
     @patch('certificates.services.digital_signature.logger')
-    @patch('certificates.services.digital_signature.requests.post')
+    @patch('certificates.services.digital_signature.requests.Session.post')
     def test_digital_signature_logs_errors(self, mock_post, mock_logger):
         """Verifica que DigitalSignatureService registra logs de errores"""
         # Crear certificado
@@ -297,7 +297,7 @@ class LoggingTestCase(TestCase):
         )
 
     @patch('certificates.services.digital_signature.logger')
-    @patch('certificates.services.digital_signature.requests.post')
+    @patch('certificates.services.digital_signature.requests.Session.post')
     def test_digital_signature_logs_warnings(self, mock_post, mock_logger):
         """Verifica que DigitalSignatureService registra logs de warnings"""
         # Crear certificado
@@ -330,7 +330,7 @@ class LoggingTestCase(TestCase):
         )
 
     @patch('certificates.services.digital_signature.logger')
-    @patch('certificates.services.digital_signature.requests.post')
+    @patch('certificates.services.digital_signature.requests.Session.post')
     def test_digital_signature_bulk_logs(self, mock_post, mock_logger):
         """Verifica que sign_bulk_certificates registra logs"""
         # Crear certificados
@@ -252,6 +252,66 @@ class GenerateCertificatesCommandTest(TestCase):
         self.assertEqual(Certificate.objects.count(), first_count)
 
 
+class BenchmarkRenderingCommandTest(TestCase):
+    """Tests for benchmark_rendering command"""
+    
+    def test_invalid_sizes(self):
+        """Test that command rejects invalid batch sizes"""
+        with self.assertRaises(CommandError):
+            call_command('benchmark_rendering', '--sizes', '1,abc')
+        
+        with self.assertRaises(CommandError):
+            call_command('benchmark_rendering', '--sizes', '0,50')
+    
+    def test_without_visual_templates(self):
+        """Test that command requires a template with visual elements"""
+        CertificateTemplate.objects.create(name='Simple', html_template='<html></html>')
+        
+        with self.assertRaises(CommandError) as context:
+            call_command('benchmark_rendering')
+        
+        self.assertIn('No hay plantillas con elementos visuales', str(context.exception))
+    
+    def test_nonexistent_template(self):
+        """Test that command fails with a nonexistent template"""
+        with self.assertRaises(CommandError) as context:
+            call_command('benchmark_rendering', '--template-id', 9999)
+        
+        self.assertIn('no existe', str(context.exception))
+
+
+class BenchmarkQRCommandTest(TestCase):
+    """Tests for benchmark_qr command"""
+    
+    def test_reports_both_modes(self):
+        """Test that command reports single and batch throughput"""
+        out = StringIO()
+        call_command('benchmark_qr', '--count', '3', stdout=out)
+        
+        output = out.getvalue()
+        self.assertIn('individual', output)
+        self.assertIn('lote', output)
+        self.assertIn('aceleración', output)
+    
+    def test_invalid_count(self):
+        """Test that command rejects a non-positive count"""
+        with self.assertRaises(CommandError):
+            call_command('benchmark_qr', '--count', '0')
+
+
+class DrainAuditSpoolCommandTest(TestCase):
+    """Tests for drain_audit_spool command"""
+    
+    def test_reports_reinserted_entries(self):
+        """Test that command reports how many spooled entries were inserted"""
+        out = StringIO()
+        with patch('certificates.management.commands.drain_audit_spool.audit_writer') as writer:
+            writer.drain_spool.return_value = 4
+            call_command('drain_audit_spool', stdout=out)
+        
+        self.assertIn('Registros de auditoría reinsertados: 4', out.getvalue())
+
+
 class SignCertificatesCommandTest(TestCase):
     """Tests for sign_certificates management command"""
     
@@ -307,7 +367,7 @@ class SignCertificatesCommandTest(TestCase):
         self.assertIn('No hay certificados generados', output)
         self.assertIn('generate_certificates', output)
     
-    @patch('certificates.services.digital_signature.requests.post')
+    @patch('certificates.services.digital_signature.requests.Session.post')
     def test_sign_certificates_success(self, mock_post):
         """Test that command signs certificates successfully"""
         # Mock successful signature service response
@@ -329,7 +389,7 @@ class SignCertificatesCommandTest(TestCase):
         output = out.getvalue()
         self.assertIn('Certificados firmados exitosamente: 1', output)
     
-    @patch('certificates.services.digital_signature.requests.post')
+    @patch('certificates.services.digital_signature.requests.Session.post')
     def test_sign_certificates_skips_already_signed(self, mock_post):
         """Test that command skips already signed certificates"""
         # Mock successful signature service response
@@ -349,7 +409,7 @@ class SignCertificatesCommandTest(TestCase):
         output = out.getvalue()
         self.assertIn('ya están firmados', output)
     
-    @patch('certificates.services.digital_signature.requests.post')
+    @patch('certificates.services.digital_signature.requests.Session.post')
     def test_sign_certificates_with_all_flag(self, mock_post):
         """Test that --all flag signs even already signed certificates"""
         # Mock successful signature service response
@@ -372,7 +432,7 @@ class SignCertificatesCommandTest(TestCase):
         # The command passes all certificates, service decides what to do
         self.assertTrue(True)  # Command executed without error
     
-    @patch('certificates.services.digital_signature.requests.post')
+    @patch('certificates.services.digital_signature.requests.Session.post')
     def test_sign_certificates_handles_errors(self, mock_post):
         """Test that command handles signature errors gracefully"""
         # Mock failed signature service response
@@ -0,0 +1,126 @@
+"""Tests para la actualización incremental de PDFs"""
+import re
+from io import BytesIO
+
+import pydyf
+from django.test import TestCase
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import ContentStream
+from reportlab.pdfgen import canvas
+
+from certificates.services.pdf_incremental import build_stamp_update
+from certificates.services.pdf_processing import _qr_form_xobject
+from certificates.services.qr_service import QRCodeService
+
+
+def _reportlab_pdf(pages=2, lines=1) -> bytes:
+    buffer = BytesIO()
+    pdf_canvas = canvas.Canvas(buffer, pageCompression=0)
+    for number in range(pages):
+        for line in range(lines):
+            pdf_canvas.drawString(100, 750 - line % 700, f"Página {number + 1}, línea {line}")
+        pdf_canvas.showPage()
+    pdf_canvas.save()
+    return buffer.getvalue()
+
+
+def _xref_stream_pdf() -> bytes:
+    """PDF 1.7 con flujo de referencias cruzadas y objetos comprimidos"""
+    document = pydyf.PDF()
+    content = pydyf.Stream()
+    content.push_state()
+    content.pop_state()
+    document.add_object(content)
+    document.add_page(pydyf.Dictionary({
+        'Type': '/Page',
+        'Parent': document.pages.reference,
+        'MediaBox': pydyf.Array([0, 0, 612, 792]),
+        'Contents': content.reference,
+    }))
+    buffer = BytesIO()
+    document.write(buffer, version=b'1.7', compress=True)
+    return buffer.getvalue()
+
+
+class BuildStampUpdateTest(TestCase):
+    """Tests para build_stamp_update"""
+
+    def setUp(self):
+        qr_service = QRCodeService()
+        self.form = _qr_form_xobject(qr_service, qr_service.build_matrix("https://example.com/qr"))
+
+    def _stamp(self, data, **kwargs):
+        update = build_stamp_update(data, self.form, 450, 50, 100, **kwargs)
+        self.assertIsNotNone(update)
+        return data + update
+
+    def _assert_valid(self, data):
+        """Cada entrada de las referencias cruzadas apunta a su objeto"""
+        reader = PdfReader(BytesIO(data), strict=True)
+        for generation, entries in reader.xref.items():
+            for number, position in entries.items():
+                if reader.xref_free_entry.get(generation, {}).get(number):
+                    continue
+                header = rb'\s*%d\s+%d\s+obj' % (number, generation)
+                self.assertRegex(data[position:position + 20], re.compile(header))
+        return reader
+
+    def _stamped(self, reader, page):
+        return b"/QRCode Do" in ContentStream(page.get_contents(), reader).get_data()
+
+    def test_appends_without_rewriting(self):
+        """El original queda intacto y todas las páginas reciben el QR"""
+        original = _reportlab_pdf()
+
+        data = self._stamp(original)
+
+        self.assertTrue(data.startswith(original))
+        reader = self._assert_valid(data)
+        self.assertTrue(all(self._stamped(reader, page) for page in reader.pages))
+
+    def test_first_page_only(self):
+        """Con first_page_only solo se actualiza la primera página"""
+        reader = self._assert_valid(self._stamp(_reportlab_pdf(), first_page_only=True))
+
+        self.assertTrue(self._stamped(reader, reader.pages[0]))
+        self.assertFalse(self._stamped(reader, reader.pages[1]))
+
+    def test_update_size_does_not_depend_on_document(self):
+        """El tamaño de la actualización depende del QR, no del documento"""
+        small = _reportlab_pdf(1)
+        large = _reportlab_pdf(1, lines=5000)
+        self.assertGreater(len(large), len(small) * 50)
+
+        small_update = build_stamp_update(small, self.form, 450, 50, 100)
+        large_update = build_stamp_update(large, self.form, 450, 50, 100)
+
+        # Solo varían los números de posición y el /ID del trailer
+        self.assertLess(abs(len(large_update) - len(small_update)), 100)
+
+    def test_second_update_keeps_names_unique(self):
+        """Estampar dos veces agrega otro XObject sin pisar el anterior"""
+        reader = self._assert_valid(self._stamp(self._stamp(_reportlab_pdf(1))))
+
+        self.assertEqual(
+            sorted(reader.pages[0]["/Resources"]["/XObject"].keys()), ["/QRCode", "/QRCode1"]
+        )
+
+    def test_xref_stream_document(self):
+        """Con referencias cruzadas en flujo la actualización usa un flujo XRef"""
+        original = _xref_stream_pdf()
+
+        data = self._stamp(original)
+
+        self.assertIn(b"/Type /XRef", data[len(original):])
+        reader = self._assert_valid(data)
+        self.assertTrue(self._stamped(reader, reader.pages[0]))
+
+    def test_encrypted_document_is_not_supported(self):
+        """Los PDFs cifrados requieren reescribir el documento"""
+        writer = PdfWriter()
+        writer.add_blank_page(width=612, height=792)
+        writer.encrypt("clave")
+        buffer = BytesIO()
+        writer.write(buffer)
+
+        self.assertIsNone(build_stamp_update(buffer.getvalue(), self.form, 450, 50, 100))
@@ -0,0 +1,281 @@
+"""Tests para el procesamiento de QR de PDFProcessingService"""
+import tempfile
+import zipfile
+from datetime import date
+from io import BytesIO
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from PyPDF2 import PdfReader
+from PyPDF2.generic import ContentStream
+from reportlab.pdfgen import canvas
+
+from certificates.models import Certificate, CertificateLookup, Event, Participant, QRProcessingConfig
+from certificates.services.pdf_processing import PDFProcessingService
+
+
+def _blank_pdf() -> bytes:
+    buffer = BytesIO()
+    pdf_canvas = canvas.Canvas(buffer)
+    pdf_canvas.drawString(100, 750, "Certificado importado")
+    pdf_canvas.save()
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class QRProcessingTest(TestCase):
+    """Tests para process_qr_for_certificate y process_qr_batch"""
+
+    def setUp(self):
+        self.service = PDFProcessingService()
+        self.config = QRProcessingConfig.get_active_config()
+        self.event = Event.objects.create(name="Evento QR", event_date=date(2024, 1, 1))
+
+    def _create_certificate(self, dni):
+        participant = Participant.objects.create(
+            dni=dni, full_name=f"Participante {dni}", event=self.event, attendee_type="ASISTENTE"
+        )
+        certificate = Certificate(participant=participant, processing_status="IMPORTED")
+        certificate.original_pdf.save(f"original_{dni}.pdf", ContentFile(_blank_pdf()), save=False)
+        certificate.save()
+        return certificate
+
+    def test_process_qr_encodes_preview_url(self):
+        """El QR debe codificar la URL de preview con la configuración activa"""
+        certificate = self._create_certificate("11111111")
+        expected_url = self.config.get_qr_preview_url(certificate.uuid)
+
+        with patch.object(
+            self.service.qr_service, "generate_qr_batch",
+            wraps=self.service.qr_service.generate_qr_batch,
+        ) as generate_qr_batch:
+            result = self.service.process_qr_for_certificate(certificate, self.config)
+
+        self.assertTrue(result["success"], result["error"])
+        args, kwargs = generate_qr_batch.call_args
+        self.assertEqual(list(args[0]), [expected_url])
+        self.assertEqual(kwargs["error_correction"], self.config.qr_error_correction)
+        self.assertEqual(kwargs["box_size"], self.config.qr_box_size)
+        self.assertEqual(kwargs["border"], self.config.qr_border)
+
+        certificate.refresh_from_db()
+        self.assertEqual(certificate.processing_status, "QR_INSERTED")
+        self.assertTrue(certificate.qr_image.name)
+        with certificate.qr_pdf.open("rb") as qr_pdf:
+            self.assertEqual(len(PdfReader(qr_pdf).pages), 1)
+
+    def test_process_qr_batch(self):
+        """Debe procesar varios certificados y reportar los errores"""
+        certificates = [self._create_certificate(f"2222222{i}") for i in range(3)]
+        Certificate.objects.filter(pk=certificates[2].pk).update(processing_status="SIGNED_FINAL")
+        certificates[2].refresh_from_db()
+        progress = []
+
+        result = self.service.process_qr_batch(
+            certificates, self.config, progress_callback=progress.append
+        )
+
+        self.assertEqual(result["success_count"], 2)
+        self.assertEqual(result["error_count"], 1)
+        self.assertIn("Participante 22222222", result["errors"][0])
+        self.assertEqual(progress, [1, 2, 3])
+        self.assertEqual(
+            Certificate.objects.filter(processing_status="QR_INSERTED").count(), 2
+        )
+        self.assertIn("seconds_per_certificate", result)
+
+    def test_process_qr_batch_with_workers(self):
+        """Con varios procesos se combinan los PDFs en el pool y se guardan por lotes"""
+        certificates = [self._create_certificate(f"3333333{i}") for i in range(4)]
+
+        result = self.service.process_qr_batch(
+            certificates, self.config, workers=2, batch_size=3
+        )
+
+        self.assertEqual(result["success_count"], 4, result["errors"])
+        for certificate in Certificate.objects.filter(pk__in=[c.pk for c in certificates]):
+            self.assertEqual(certificate.processing_status, "QR_INSERTED")
+            self.assertEqual(certificate.qr_size, self.config.default_qr_size)
+            self.assertTrue(certificate.qr_image.name)
+
+    def test_batch_overlay_swaps_qr_per_certificate(self):
+        """La superposición se reutiliza y cada PDF recibe el QR de su certificado"""
+        certificates = [self._create_certificate(f"4444444{i}") for i in range(2)]
+
+        self.service.process_qr_batch(certificates, self.config)
+
+        forms = []
+        for certificate in certificates:
+            certificate.refresh_from_db()
+            with certificate.qr_pdf.open("rb") as qr_pdf:
+                reader = PdfReader(qr_pdf)
+                page = reader.pages[0]
+                xobjects = page["/Resources"]["/XObject"]
+                forms.append(xobjects["/QRCode"].get_object().get_data())
+                contents = ContentStream(page.get_contents(), reader).get_data()
+                self.assertIn(b"/QRCode Do", contents)
+        self.assertNotEqual(forms[0], forms[1])
+
+    def test_process_qr_appends_incremental_update(self):
+        """El PDF con QR conserva intactos los bytes del original"""
+        certificate = self._create_certificate("66666666")
+        with certificate.original_pdf.open("rb") as original:
+            original_bytes = original.read()
+
+        result = self.service.process_qr_batch([certificate], self.config)
+
+        self.assertEqual(result["success_count"], 1, result["errors"])
+        certificate.refresh_from_db()
+        with certificate.qr_pdf.open("rb") as qr_pdf:
+            data = qr_pdf.read()
+        self.assertTrue(data.startswith(original_bytes))
+        self.assertIn(b"/Prev", data[len(original_bytes):])
+
+    @override_settings(QR_PDF_INCREMENTAL_UPDATE=False)
+    def test_process_qr_full_rewrite(self):
+        """Sin modo incremental el documento se reescribe completo"""
+        certificate = self._create_certificate("77777777")
+
+        result = self.service.process_qr_for_certificate(certificate, self.config)
+
+        self.assertTrue(result["success"], result["error"])
+        with certificate.qr_pdf.open("rb") as qr_pdf:
+            data = qr_pdf.read()
+        self.assertNotIn(b"/Prev", data)
+        self.assertIn("/QRCode", PdfReader(BytesIO(data)).pages[0]["/Resources"]["/XObject"])
+
+    def test_process_qr_batch_missing_original(self):
+        """Un PDF original ilegible marca el certificado con error sin detener el lote"""
+        certificates = [self._create_certificate(f"5555555{i}") for i in range(2)]
+        certificates[0].original_pdf.delete(save=False)
+        certificates[0].original_pdf.name = "certificates/original/no_existe.pdf"
+
+        result = self.service.process_qr_batch(certificates, self.config)
+
+        self.assertEqual(result["success_count"], 1)
+        self.assertEqual(result["error_count"], 1)
+        certificates[0].refresh_from_db()
+        self.assertEqual(certificates[0].processing_status, "ERROR")
+        self.assertTrue(certificates[0].processing_errors)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExportZipTest(TestCase):
+    """Tests para stream_export_zip"""
+
+    def test_stream_export_zip(self):
+        """El ZIP incluye los PDFs y metadatos y marca los certificados al escribirlos"""
+        event = Event.objects.create(name="Evento Export", event_date=date(2024, 1, 1))
+        participant = Participant.objects.create(
+            dni="22222222", full_name="Participante", event=event, attendee_type="ASISTENTE"
+        )
+        certificate = Certificate(participant=participant, processing_status="QR_INSERTED")
+        certificate.qr_pdf.save("qr.pdf", ContentFile(b"%PDF-1.4 export"), save=False)
+        certificate.save()
+
+        zip_stream, filename = PDFProcessingService().stream_export_zip([certificate])
+        certificate.refresh_from_db()
+        self.assertEqual(certificate.processing_status, "QR_INSERTED")
+
+        archive = zipfile.ZipFile(BytesIO(b"".join(zip_stream)))
+
+        self.assertTrue(filename.endswith(".zip"))
+        self.assertEqual(archive.read(f"{certificate.uuid}_22222222.pdf"), b"%PDF-1.4 export")
+        self.assertIn("metadata.csv", archive.namelist())
+        certificate.refresh_from_db()
+        self.assertEqual(certificate.processing_status, "EXPORTED_FOR_SIGNING")
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BulkTransitionsTest(TestCase):
+    """Exportación e importación final de 1.000 certificados con consultas acotadas"""
+
+    COUNT = 1000
+
+    def setUp(self):
+        event = Event.objects.create(name="Evento Masivo", event_date=date(2024, 1, 1))
+        participants = Participant.objects.bulk_create([
+            Participant(
+                dni=f"{index:08d}", full_name=f"Participante {index}", event=event,
+                attendee_type="ASISTENTE",
+            )
+            for index in range(self.COUNT)
+        ])
+        certificate = Certificate(participant=participants[0])
+        certificate.qr_pdf.save("shared_qr.pdf", ContentFile(b"%PDF-1.4 qr"), save=False)
+        Certificate.objects.bulk_create([
+            Certificate(
+                participant=participant, processing_status="QR_INSERTED",
+                qr_pdf=certificate.qr_pdf.name,
+            )
+            for participant in participants
+        ])
+
+    @staticmethod
+    def lookup_upserts(rows):
+        """INSERT ... ON CONFLICT que necesita CertificateLookup para copiar esas filas"""
+        fields = CertificateLookup._meta.concrete_fields
+        return -(-rows // connection.ops.bulk_batch_size(fields, [None] * rows))
+
+    def test_export_queries(self):
+        """Una consulta para cargar, y un UPDATE y su copia en CertificateLookup por lote"""
+        service = PDFProcessingService()
+        batches = -(-self.COUNT // service.EXPORT_BATCH_SIZE)
+        upserts = batches * self.lookup_upserts(service.EXPORT_BATCH_SIZE)
+
+        with self.assertNumQueries(1 + batches + upserts):
+            certificates = list(
+                Certificate.objects.select_related("participant", "participant__event")
+            )
+            zip_stream, _ = service.stream_export_zip(certificates)
+            data = b"".join(zip_stream)
+
+        self.assertEqual(len(zipfile.ZipFile(BytesIO(data)).namelist()), self.COUNT + 1)
+        self.assertEqual(
+            Certificate.objects.filter(processing_status="EXPORTED_FOR_SIGNING").count(),
+            self.COUNT,
+        )
+
+    def test_import_final_queries(self):
+        """Una consulta por UUID para todos los archivos y bulk_update por lotes"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        Certificate.objects.update(processing_status="EXPORTED_FOR_SIGNING")
+        uuids = list(Certificate.objects.values_list("uuid", flat=True))
+        pdf_files = [
+            SimpleUploadedFile(f"{uuid}_firmado.pdf", b"%PDF-1.4 firmado") for uuid in uuids
+        ]
+        pdf_files.append(SimpleUploadedFile("sin_uuid.pdf", b"%PDF-1.4"))
+        service = PDFProcessingService()
+        # bulk_update limita el lote según los parámetros que admite la base
+        fields = [Certificate._meta.get_field(name) for name in service.FINAL_IMPORT_FIELDS]
+        batch_size = min(
+            service.EXPORT_BATCH_SIZE,
+            connection.ops.bulk_batch_size(["pk", "pk"] + fields, pdf_files),
+        )
+        batches = -(-self.COUNT // batch_size)
+
+        with self.assertNumQueries(1 + batches + self.lookup_upserts(self.COUNT)):
+            result = service.import_final_certificates(pdf_files)
+
+        self.assertEqual(result["success_count"], self.COUNT)
+        self.assertEqual(result["error_count"], 1)
+        certificate = Certificate.objects.get(uuid=uuids[0])
+        self.assertEqual(certificate.processing_status, "SIGNED_FINAL")
+        self.assertTrue(certificate.is_signed)
+        self.assertTrue(CertificateLookup.objects.get(uuid=uuids[0]).is_signed)
+        self.assertTrue(certificate.final_pdf.name.endswith(".pdf"))
+
+    def test_import_rejects_wrong_state(self):
+        """Los certificados que no fueron exportados no se importan"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        certificate = Certificate.objects.first()
+        result = PDFProcessingService().import_final_certificates(
+            [SimpleUploadedFile(f"{certificate.uuid}.pdf", b"%PDF-1.4")]
+        )
+
+        self.assertEqual(result["success_count"], 0)
+        self.assertIn("no está en estado válido", result["errors"][0])
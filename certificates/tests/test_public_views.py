@@ -1,5 +1,5 @@
 """Tests para vistas públicas"""
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 from datetime import date
@@ -8,6 +8,8 @@ import uuid as uuid_lib
 from certificates.models import (
     Event, Participant, Certificate, CertificateTemplate, AuditLog
 )
+from certificates.services.audit_counters import audit_counters
+from certificates.services.certificate_uuid_filter import certificate_uuid_filter
 
 
 class CertificateQueryViewTest(TestCase):
@@ -335,7 +337,7 @@ class CertificateVerificationViewTest(TestCase):
         
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'certificates/verify.html')
-        self.assertEqual(response.context['certificate'], self.certificate)
+        self.assertEqual(response.context['certificate'].uuid, self.certificate.uuid)
         
         # Verificar que se muestran los datos
         self.assertContains(response, self.participant.dni)
@@ -386,10 +388,12 @@ class CertificateVerificationViewTest(TestCase):
         self.assertEqual(log.metadata['is_signed'], False)
         self.assertIsNotNone(log.ip_address)
 
-    def test_verify_invalid_certificate_creates_audit_log(self):
-        """Test que intento de verificación fallido crea log"""
+    def test_verify_invalid_certificate_is_counted(self):
+        """Test que intento con UUID inexistente se cuenta sin crear un log por intento"""
         invalid_uuid = uuid_lib.uuid4()
         initial_count = AuditLog.objects.filter(action_type='VERIFY').count()
+        certificate_uuid_filter.flush_misses()
+        initial_counter = audit_counters.total('VERIFY')
         
         response = self.client.get(
             reverse('certificates:verify', kwargs={'uuid': invalid_uuid})
@@ -398,15 +402,29 @@ class CertificateVerificationViewTest(TestCase):
         self.assertEqual(response.status_code, 404)
         
         final_count = AuditLog.objects.filter(action_type='VERIFY').count()
-        self.assertEqual(final_count, initial_count + 1)
+        self.assertEqual(final_count, initial_count)
+        
+        certificate_uuid_filter.flush_misses()
+        self.assertEqual(audit_counters.total('VERIFY'), initial_counter + 1)
+    
+    @override_settings(CERTIFICATE_UUID_FILTER_ENABLED=False)
+    def test_verify_invalid_certificate_creates_audit_log_without_filter(self):
+        """Test que sin el filtro de UUID el intento fallido crea log"""
+        invalid_uuid = uuid_lib.uuid4()
         
-        # Verificar contenido del log
+        response = self.client.get(
+            reverse('certificates:verify', kwargs={'uuid': invalid_uuid})
+        )
+        
+        self.assertEqual(response.status_code, 404)
         log = AuditLog.objects.filter(action_type='VERIFY').latest('timestamp')
         self.assertEqual(log.metadata['certificate_uuid'], str(invalid_uuid))
         self.assertEqual(log.metadata['status'], 'not_found')
 
     def test_verify_uses_select_related(self):
         """Test que la verificación usa select_related para optimizar queries"""
+        # El filtro de UUID se carga al iniciar el worker, no en la petición
+        certificate_uuid_filter.load()
         with self.assertNumQueries(2):  # 1 para certificado + 1 para audit log
             response = self.client.get(
                 reverse('certificates:verify', kwargs={'uuid': self.certificate.uuid})
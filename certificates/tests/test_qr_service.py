@@ -1,6 +1,6 @@
 """Tests para QRCodeService"""
 from django.test import TestCase, override_settings
-from certificates.services.qr_service import QRCodeService
+from certificates.services.qr_service import ERROR_CORRECTION_LEVELS, QRCodeService
 from PIL import Image
 import uuid
 
@@ -70,3 +70,82 @@ class QRCodeServiceTest(TestCase):
         content2 = qr2.read()
 
         self.assertNotEqual(content1, content2)
+
+    def test_build_matrix_matches_png_modules(self):
+        """La matriz de módulos corresponde a la imagen PNG"""
+        data = self.service.get_verification_url(self.test_uuid)
+
+        matrix = self.service.build_matrix(data)
+        img = Image.open(self.service.render_qr_png(data)).convert("L")
+
+        modules = len(matrix)
+        self.assertTrue(all(len(row) == modules for row in matrix))
+        # Margen blanco alrededor del código
+        self.assertFalse(any(matrix[0]))
+        module_px = img.size[0] / modules
+        for row in range(modules):
+            for col in range(modules):
+                pixel = img.getpixel(
+                    (int((col + 0.5) * module_px), int((row + 0.5) * module_px))
+                )
+                self.assertEqual(matrix[row][col], pixel < 128)
+
+    def test_render_qr_svg(self):
+        """Debe generar un SVG vectorial con los módulos oscuros"""
+        data = self.service.get_verification_url(self.test_uuid)
+        modules = len(self.service.build_matrix(data))
+
+        svg = self.service.render_qr_svg(data)
+
+        self.assertTrue(svg.startswith("<svg"))
+        self.assertIn(f'viewBox="0 0 {modules} {modules}"', svg)
+        self.assertIn("<path", svg)
+
+    def test_draw_qr_on_canvas_without_images(self):
+        """El QR vectorial no embebe imágenes en el PDF"""
+        from io import BytesIO
+        from PyPDF2 import PdfReader
+        from reportlab.pdfgen import canvas
+
+        output = BytesIO()
+        pdf_canvas = canvas.Canvas(output)
+        self.service.draw_qr(pdf_canvas, "https://example.com", 50, 50, 100)
+        pdf_canvas.save()
+
+        page = PdfReader(BytesIO(output.getvalue())).pages[0]
+        self.assertNotIn("/XObject", page["/Resources"])
+        self.assertIn(b" re", page.get_contents().get_data())
+
+    def test_generate_qr_batch_matches_single_generation(self):
+        """El lote produce las mismas imágenes que render_qr_png"""
+        from PIL import ImageChops
+
+        urls = [self.service.get_verification_url(str(uuid.uuid4())) for _ in range(3)]
+
+        buffers = list(self.service.generate_qr_batch(urls, size=self.service.qr_size))
+
+        self.assertEqual(len(buffers), 3)
+        for url, buffer in zip(urls, buffers):
+            single = Image.open(self.service.render_qr_png(url)).convert("L")
+            batch = Image.open(buffer).convert("L")
+            self.assertIsNone(ImageChops.difference(single, batch).getbbox())
+
+    def test_generate_qr_batch_accepts_config_settings(self):
+        """Acepta los parámetros de QRProcessingConfig.get_qr_settings()"""
+        from certificates.models import QRProcessingConfig
+
+        qr_settings = QRProcessingConfig(qr_error_correction="H", qr_box_size=5, qr_border=2).get_qr_settings()
+        url = "https://example.com/certificado/abc/preview/"
+
+        buffer = next(self.service.generate_qr_batch([url], **dict(qr_settings, size=None)))
+
+        modules = len(self.service._matrices[(url, ERROR_CORRECTION_LEVELS["H"], 2)])
+        self.assertEqual(Image.open(buffer).size, (modules * 5, modules * 5))
+
+    def test_generate_qr_batch_reuses_version_per_length(self):
+        """La versión QR se calcula una vez por longitud de contenido"""
+        urls = [self.service.get_verification_url(str(uuid.uuid4())) for _ in range(5)]
+
+        list(self.service.generate_qr_batch(urls))
+
+        self.assertEqual(len(self.service._versions), 1)
@@ -0,0 +1,162 @@
+"""Tests para la cache de planes de renderizado de plantillas visuales"""
+import tempfile
+from unittest.mock import Mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from certificates.models import CertificateTemplate, TemplateAsset, TemplateElement
+from certificates.services.render_plan_cache import RenderPlanCache, render_plan_cache
+
+
+class RenderPlanCacheTest(TestCase):
+    """Tests para RenderPlanCache"""
+
+    def setUp(self):
+        self.template = CertificateTemplate.objects.create(
+            name='Plantilla Visual',
+            html_template='<html></html>',
+        )
+        self.plan_cache = RenderPlanCache(max_size=2, use_shared_cache=False)
+
+    def test_get_or_build_compiles_once_per_version(self):
+        """El plan se compila una sola vez mientras la plantilla no cambie"""
+        builder = Mock(return_value={'elements': []})
+
+        first = self.plan_cache.get_or_build(self.template.id, builder)
+        second = self.plan_cache.get_or_build(self.template.id, builder)
+
+        self.assertIs(first, second)
+        builder.assert_called_once_with(self.template.id)
+
+    def test_template_change_compiles_new_plan(self):
+        """Guardar la plantilla cambia su versión y obliga a recompilar"""
+        builder = Mock(side_effect=[{'version': 1}, {'version': 2}])
+
+        self.plan_cache.get_or_build(self.template.id, builder)
+        self.template.name = 'Plantilla Renombrada'
+        self.template.save()
+        plan = self.plan_cache.get_or_build(self.template.id, builder)
+
+        self.assertEqual(plan, {'version': 2})
+        self.assertEqual(builder.call_count, 2)
+        # Solo se conserva la versión más reciente de cada plantilla
+        self.assertEqual(len(self.plan_cache), 1)
+
+    def test_lru_evicts_least_recently_used(self):
+        """Debe descartar la plantilla usada hace más tiempo"""
+        self.plan_cache.set(1, 'v1', {'id': 1})
+        self.plan_cache.set(2, 'v1', {'id': 2})
+        self.plan_cache.get(1, 'v1')
+        self.plan_cache.set(3, 'v1', {'id': 3})
+
+        self.assertIsNotNone(self.plan_cache.get(1, 'v1'))
+        self.assertIsNone(self.plan_cache.get(2, 'v1'))
+        self.assertIsNotNone(self.plan_cache.get(3, 'v1'))
+
+    def test_missing_template_raises(self):
+        """Una plantilla inexistente no debe compilarse"""
+        builder = Mock()
+
+        with self.assertRaises(CertificateTemplate.DoesNotExist):
+            self.plan_cache.get_or_build(999999, builder)
+
+        builder.assert_not_called()
+
+    def test_shared_cache_backing(self):
+        """Con cache compartida, otro proceso reutiliza el plan compilado"""
+        cache.clear()
+        writer = RenderPlanCache(use_shared_cache=True)
+        reader = RenderPlanCache(use_shared_cache=True)
+        writer.get_or_build(self.template.id, Mock(return_value={'shared': True}))
+
+        builder = Mock()
+        plan = reader.get_or_build(self.template.id, builder)
+
+        self.assertEqual(plan, {'shared': True})
+        builder.assert_not_called()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class RenderPlanInvalidationTest(TestCase):
+    """Tests para la invalidación de planes mediante señales"""
+
+    def setUp(self):
+        self.template = CertificateTemplate.objects.create(
+            name='Plantilla Visual',
+            html_template='<html></html>',
+        )
+        self.user = User.objects.create_user(username='editor', password='test')
+
+    def _version(self):
+        return RenderPlanCache.get_version(self.template.id)
+
+    def _create_element(self, **kwargs):
+        defaults = {
+            'template': self.template,
+            'element_type': 'TEXT',
+            'name': 'Nombre',
+            'position_x': 10,
+            'position_y': 10,
+            'width': 200,
+            'height': 40,
+            'content': '{{participant_name}}',
+        }
+        defaults.update(kwargs)
+        return TemplateElement.objects.create(**defaults)
+
+    def _create_asset(self):
+        image = SimpleUploadedFile(
+            'logo.gif',
+            b'GIF89a\x01\x00\x01\x00\x00\x00\x00!\xf9\x04\x01\x00\x00\x00\x00'
+            b',\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02\x04\x01\x00;',
+            content_type='image/gif',
+        )
+        return TemplateAsset.objects.create(
+            name='Logo', asset_type='LOGO', file=image, created_by=self.user
+        )
+
+    def test_element_save_changes_template_version(self):
+        """Guardar o eliminar un elemento cambia la versión de la plantilla"""
+        before = self._version()
+        element = self._create_element()
+        after_create = self._version()
+        element.delete()
+
+        self.assertNotEqual(before, after_create)
+        self.assertNotEqual(after_create, self._version())
+
+    def test_element_save_discards_local_plan(self):
+        """El plan local de la plantilla se descarta al modificar un elemento"""
+        render_plan_cache.set(self.template.id, self._version(), {'stale': True})
+
+        self._create_element()
+
+        self.assertIsNone(render_plan_cache.get(self.template.id, self._version()))
+        self.assertEqual(
+            [key for key in render_plan_cache._plans if key[0] == self.template.id], []
+        )
+
+    def test_asset_update_changes_versions_of_templates_using_it(self):
+        """Actualizar un asset usado por una plantilla cambia su versión"""
+        asset = self._create_asset()
+        self._create_element(element_type='IMAGE', content='', asset=asset)
+        before = self._version()
+
+        asset.name = 'Logo actualizado'
+        asset.save()
+
+        self.assertNotEqual(before, self._version())
+
+    def test_asset_delete_changes_background_template_version(self):
+        """Eliminar el asset de fondo cambia la versión de la plantilla"""
+        asset = self._create_asset()
+        self.template.background_asset = asset
+        self.template.save()
+        before = self._version()
+
+        asset.delete()
+
+        self.assertNotEqual(before, self._version())
@@ -0,0 +1,101 @@
+"""Tests para el renderizador del certificado simple (ReportLab)"""
+from io import BytesIO
+
+from django.test import TestCase
+from PyPDF2 import PdfReader
+
+from certificates.services.qr_service import QRCodeService
+from certificates.services.simple_certificate_pdf import SimpleCertificatePDFRenderer
+
+
+class SimpleCertificatePDFRendererTest(TestCase):
+    """Tests para SimpleCertificatePDFRenderer"""
+
+    def setUp(self):
+        self.renderer = SimpleCertificatePDFRenderer()
+        self.context_data = {
+            'full_name': 'Juan Pérez García',
+            'dni': '12345678',
+            'event_name': 'Capacitación en Seguridad Laboral',
+            'event_date': '15/01/2024',
+            'attendee_type': 'PONENTE',
+        }
+
+    def _text(self, pdf_bytes, page=0):
+        return PdfReader(BytesIO(pdf_bytes)).pages[page].extract_text()
+
+    def test_render_contains_static_and_participant_text(self):
+        """El PDF debe incluir los textos fijos y los datos del participante"""
+        pdf_bytes = self.renderer.render(self.context_data)
+
+        self.assertTrue(pdf_bytes.startswith(b'%PDF'))
+        text = self._text(pdf_bytes)
+        for expected in (
+            'CERTIFICADO',
+            'Se otorga el presente certificado a:',
+            'Puno - Perú',
+            'Juan Pérez García',
+            'DNI: 12345678',
+            'Ponente',
+            'Capacitación en Seguridad Laboral',
+            'Realizado el 15/01/2024',
+        ):
+            self.assertIn(expected, text)
+
+    def test_static_layer_is_compiled_once(self):
+        """La capa estática se reutiliza entre certificados"""
+        self.assertIs(
+            SimpleCertificatePDFRenderer.static_layer(),
+            SimpleCertificatePDFRenderer.static_layer(),
+        )
+
+    def test_render_embeds_qr_in_grayscale(self):
+        """El QR de 1 bit se embebe en escala de grises"""
+        qr_buffer = QRCodeService().render_qr_png('https://example.com/verificar/abc')
+
+        pdf_bytes = self.renderer.render(self.context_data, qr_buffer)
+
+        page = PdfReader(BytesIO(pdf_bytes)).pages[0]
+        images = [
+            obj.get_object()
+            for obj in page['/Resources']['/XObject'].values()
+            if obj.get_object()['/Subtype'] == '/Image'
+        ]
+        self.assertEqual(len(images), 1)
+        self.assertEqual(images[0]['/ColorSpace'], '/DeviceGray')
+        self.assertIn('Escanea para verificar', self._text(pdf_bytes))
+
+    def test_render_draws_vector_qr(self):
+        """Con el contenido del QR, se dibuja como vector y no como imagen"""
+        pdf_bytes = self.renderer.render(
+            self.context_data, qr_data='https://example.com/verificar/abc'
+        )
+
+        page = PdfReader(BytesIO(pdf_bytes)).pages[0]
+        self.assertNotIn('/XObject', page['/Resources'])
+        self.assertIn('Escanea para verificar', self._text(pdf_bytes))
+
+    def test_render_many_writes_one_page_per_certificate(self):
+        """El PDF combinado tiene una página por certificado"""
+        items = [
+            (dict(self.context_data, full_name=f'Participante {i}'), None)
+            for i in range(3)
+        ]
+        output = BytesIO()
+
+        pages = self.renderer.render_many(items, output)
+
+        reader = PdfReader(BytesIO(output.getvalue()))
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(reader.pages), 3)
+        self.assertIn('Participante 2', reader.pages[2].extract_text())
+        self.assertIn('CERTIFICADO', reader.pages[2].extract_text())
+
+    def test_iter_render_yields_each_certificate(self):
+        """iter_render genera un PDF por certificado en orden"""
+        items = [(dict(self.context_data, dni=f'0000000{i}'), None) for i in range(2)]
+
+        results = list(self.renderer.iter_render(items))
+
+        self.assertEqual(len(results), 2)
+        self.assertIn('DNI: 00000001', self._text(results[1]))
@@ -489,4 +489,18 @@ class PerformanceIntegrationTest(TemplateIntegrationTestCase):
         # Verificar que todas tienen elementos
         for template in templates:
             template.refresh_from_db()
-            self.assertGreater(template.elements.count(), 0)
\ No newline at end of file
+            self.assertGreater(template.elements.count(), 0)
+
+class PDFWriteOptionsTest(TestCase):
+    """Tests para las opciones con las que se escribe el PDF"""
+
+    def test_write_pdf_optimizes_images(self):
+        """optimize_images se pasa a write_pdf, que es donde WeasyPrint lo aplica"""
+        service = TemplateRenderingService()
+        document = MagicMock()
+        document.write_pdf.return_value = b'%PDF-1.4'
+
+        with patch.object(service, '_layout_document', return_value=document):
+            self.assertEqual(service._write_pdf('<html></html>', ''), b'%PDF-1.4')
+
+        document.write_pdf.assert_called_once_with(optimize_images=True)
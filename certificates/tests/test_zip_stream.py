@@ -0,0 +1,65 @@
+"""Tests para la generación de ZIP en streaming"""
+import io
+import zipfile
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db.models.fields.files import FieldFile
+from django.test import SimpleTestCase
+
+from certificates.models import Certificate
+from certificates.services.zip_stream import stream_zip
+
+
+class StreamZipTest(SimpleTestCase):
+    """Tests para stream_zip"""
+
+    def test_archive_is_valid_and_stored(self):
+        """El ZIP generado es válido y guarda los archivos sin comprimir"""
+        pdf = bytes(range(256)) * 1000
+        data = b''.join(stream_zip([
+            ('certificado.pdf', ContentFile(pdf, name='certificado.pdf')),
+            ('metadata.csv', 'UUID,DNI\n'),
+        ]))
+
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.read('certificado.pdf'), pdf)
+        self.assertEqual(archive.read('metadata.csv'), b'UUID,DNI\n')
+        self.assertEqual(
+            {info.compress_type for info in archive.infolist()}, {zipfile.ZIP_STORED}
+        )
+
+    def test_output_is_chunked(self):
+        """Los archivos se emiten en bloques del tamaño indicado, no completos"""
+        pdf = b'x' * 100_000
+        chunks = list(stream_zip([('a.pdf', ContentFile(pdf, name='a.pdf'))], chunk_size=8192))
+
+        self.assertGreater(len(chunks), 10)
+        self.assertLess(max(len(chunk) for chunk in chunks), 8192 + 512)
+
+    def test_unreadable_file_is_skipped(self):
+        """Un archivo que no existe en el storage se omite"""
+        missing = FieldFile(
+            Certificate(), Certificate._meta.get_field('pdf_file'), 'no/existe.pdf'
+        )
+        missing.storage = FileSystemStorage(location='/nonexistent')
+
+        data = b''.join(stream_zip([('falta.pdf', missing), ('ok.txt', b'ok')]))
+
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        self.assertEqual(archive.namelist(), ['ok.txt'])
+
+    def test_read_error_after_first_chunk_interrupts_stream(self):
+        """Un error a mitad de un archivo ya iniciado interrumpe la descarga"""
+        source = ContentFile(b'x' * 100_000, name='a.pdf')
+
+        def failing_chunks(chunk_size=None):
+            yield b'x' * 8192
+            raise OSError('disco no disponible')
+
+        with patch.object(source, 'chunks', failing_chunks):
+            with self.assertLogs('certificates', level='ERROR'):
+                with self.assertRaises(OSError):
+                    b''.join(stream_zip([('a.pdf', source), ('ok.txt', b'ok')], chunk_size=8192))
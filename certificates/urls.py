@@ -12,16 +12,20 @@ from certificates.views.admin_views import (
     ExportForSigningView,
     FinalImportView,
     ProcessingStatusView,
+    JobStatusView,
+    JobResultDownloadView,
 )
 from certificates.views.public_views import (
     CertificateQueryView,
     CertificateDownloadView,
     CertificateVerificationView,
     CertificatePreviewView,
+    CertificatePreviewPDFView,
 )
 from certificates.views.dashboard_views import (
     dashboard_view,
-    dashboard_refresh
+    dashboard_refresh,
+    DashboardChartsAPIView,
 )
 from certificates.views.template_editor_views import (
     TemplateEditorView,
@@ -92,6 +96,8 @@ urlpatterns = [
     # Dashboard de estadísticas
     path('admin/dashboard/', dashboard_view, name='admin_dashboard'),
     path('admin/dashboard/refresh/', dashboard_refresh, name='dashboard_refresh'),
+    # Datos de los gráficos (consultados por el JS de admin/certificates/dashboard.html)
+    path('admin/certificates/dashboard/charts/', DashboardChartsAPIView.as_view(), name='dashboard_charts'),
     
     # Editor de plantillas visual
     path('admin/template-editor/', TemplateEditorCreateView.as_view(), name='template_editor_create'),
@@ -107,6 +113,9 @@ urlpatterns = [
     path('admin/export-signing/', ExportForSigningView.as_view(), name='export_signing'),
     path('admin/final-import/', FinalImportView.as_view(), name='final_import'),
     path('admin/processing-status/', ProcessingStatusView.as_view(), name='processing_status'),
+    path('admin/jobs/status/', JobStatusView.as_view(), name='job_status_list'),
+    path('admin/jobs/<int:job_id>/status/', JobStatusView.as_view(), name='job_status'),
+    path('admin/jobs/<int:job_id>/download/', JobResultDownloadView.as_view(), name='job_download'),
     
     # Rutas públicas
     path('consulta/', CertificateQueryView.as_view(), name='query'),
@@ -115,4 +124,5 @@ urlpatterns = [
     
     # Preview público de certificados con QR
     path('certificado/<uuid:certificate_uuid>/preview/', CertificatePreviewView.as_view(), name='certificate_preview'),
+    path('certificado/<uuid:certificate_uuid>/preview/pdf/', CertificatePreviewPDFView.as_view(), name='certificate_preview_pdf'),
 ]
@@ -345,9 +345,9 @@ class DownloadExternalCertificatesTemplateView(View):
 
 from django.views import View
 from django.shortcuts import render, redirect
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, FileResponse, Http404, StreamingHttpResponse
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from certificates.models import Certificate, Event, QRProcessingConfig
+from certificates.models import Certificate, CertificateJob, Event, QRProcessingConfig
 from certificates.services.pdf_processing import PDFProcessingService
 
 
@@ -438,34 +438,32 @@ class QRProcessingView(StaffRequiredMixin, View):
         # Obtener configuración
         config = QRProcessingConfig.get_active_config()
         
-        # Procesar cada certificado
-        service = PDFProcessingService()
-        success_count = 0
-        error_count = 0
-        errors = []
+        try:
+            certificates = list(
+                Certificate.objects.filter(id__in=certificate_ids).select_related('participant')
+            )
+        except (ValueError, TypeError):
+            messages.error(request, '❌ IDs de certificados inválidos')
+            return redirect('admin:certificates_certificate_changelist')
+        
+        # Procesar los certificados (imágenes QR generadas en lote)
+        result = PDFProcessingService().process_qr_batch(certificates, config)
+        success_count = result['success_count']
+        error_count = result['error_count']
+        errors = result['errors']
         
+        found_ids = {str(certificate.id) for certificate in certificates}
         for cert_id in certificate_ids:
-            try:
-                certificate = Certificate.objects.get(id=cert_id)
-                result = service.process_qr_for_certificate(certificate, config)
-                
-                if result['success']:
-                    success_count += 1
-                else:
-                    error_count += 1
-                    errors.append(f"{certificate.participant.full_name}: {result['error']}")
-            except Certificate.DoesNotExist:
+            if cert_id not in found_ids:
                 error_count += 1
                 errors.append(f"Certificado ID {cert_id} no encontrado")
-            except Exception as e:
-                error_count += 1
-                errors.append(f"Error en certificado ID {cert_id}: {str(e)}")
         
         # Mostrar resultados
         if success_count > 0:
             messages.success(
                 request,
-                f"✓ Se procesaron {success_count} certificados exitosamente"
+                f"✓ Se procesaron {success_count} certificados exitosamente "
+                f"({result['seconds_per_certificate']}s por certificado)"
             )
         
         if error_count > 0:
@@ -495,7 +493,7 @@ class ExportForSigningView(StaffRequiredMixin, View):
         certificates = Certificate.objects.filter(
             id__in=certificate_ids,
             processing_status='QR_INSERTED'
-        )
+        ).select_related('participant', 'participant__event')
         
         if not certificates.exists():
             messages.error(
@@ -507,18 +505,19 @@ class ExportForSigningView(StaffRequiredMixin, View):
         # Crear ZIP
         service = PDFProcessingService()
         try:
-            zip_bytes, zip_filename = service.create_export_zip(
+            export_count = certificates.count()
+            zip_stream, zip_filename = service.stream_export_zip(
                 certificates=list(certificates),
                 include_metadata=True
             )
             
-            # Retornar ZIP como descarga
-            response = HttpResponse(zip_bytes, content_type='application/zip')
+            # Retornar ZIP como descarga (se genera mientras se envía)
+            response = StreamingHttpResponse(zip_stream, content_type='application/zip')
             response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
             
             messages.success(
                 request,
-                f"✓ Se exportaron {certificates.count()} certificados"
+                f"✓ Se exportaron {export_count} certificados"
             )
             
             return response
@@ -584,7 +583,7 @@ class ProcessingStatusView(StaffRequiredMixin, View):
         # Obtener certificados
         certificates = Certificate.objects.select_related(
             'participant', 'participant__event'
-        ).order_by('-processed_at', '-created_at')
+        ).order_by('-processed_at', '-generated_at')
         
         # Filtrar por estado si se especifica
         if status_filter != 'all':
@@ -605,6 +604,57 @@ class ProcessingStatusView(StaffRequiredMixin, View):
             'certificates': certificates[:100],  # Limitar a 100 para performance
             'stats': stats,
             'current_filter': status_filter,
+            'jobs': CertificateJob.objects.select_related('created_by')[:20],
         }
         
         return render(request, self.template_name, context)
+
+
+@method_decorator(staff_member_required, name="dispatch")
+class JobStatusView(StaffRequiredMixin, View):
+    """Estado de trabajos en segundo plano en JSON (para el panel de seguimiento)"""
+    
+    def get(self, request, job_id=None):
+        """
+        Retorna el estado de un trabajo o de los trabajos recientes
+        
+        Parámetros GET:
+            ids: Lista separada por comas de IDs de trabajos a consultar
+        """
+        if job_id is not None:
+            try:
+                job = CertificateJob.objects.get(pk=job_id)
+            except CertificateJob.DoesNotExist:
+                return JsonResponse({'error': 'Trabajo no encontrado'}, status=404)
+            return JsonResponse(job.to_status_dict())
+        
+        jobs = CertificateJob.objects.all()
+        ids = [value for value in request.GET.get('ids', '').split(',') if value.isdigit()]
+        if ids:
+            jobs = jobs.filter(pk__in=ids)
+        
+        return JsonResponse({
+            'jobs': [job.to_status_dict() for job in jobs[:20]],
+        })
+
+
+@method_decorator(staff_member_required, name="dispatch")
+class JobResultDownloadView(StaffRequiredMixin, View):
+    """Descarga el archivo generado por un trabajo (p. ej. ZIP de exportación)"""
+    
+    def get(self, request, job_id):
+        """Retorna el archivo resultado del trabajo"""
+        try:
+            job = CertificateJob.objects.get(pk=job_id, status='COMPLETED')
+        except CertificateJob.DoesNotExist:
+            raise Http404("Trabajo no encontrado o no completado")
+        
+        if not job.result_file:
+            raise Http404("El trabajo no generó ningún archivo")
+        
+        filename = job.result.get('filename') or job.result_file.name.rsplit('/', 1)[-1]
+        return FileResponse(
+            job.result_file.open('rb'),
+            as_attachment=True,
+            filename=filename,
+        )
@@ -9,6 +9,7 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.utils.safestring import mark_safe
 
+from certificates.services.dashboard_charts import dashboard_charts
 from certificates.services.dashboard_stats import DashboardStatsService
 from certificates.models import Certificate
 
@@ -62,6 +63,7 @@ def dashboard_refresh(request):
     try:
         service = DashboardStatsService()
         service.clear_cache()
+        dashboard_charts.clear_cache()
         
         # Recalcular estadísticas
         service.get_dashboard_stats()
@@ -83,186 +85,26 @@ def dashboard_refresh(request):
 
 from django.views.generic import TemplateView
 from django.utils.decorators import method_decorator
-from django.db.models import Count, Q
+from django.db.models import Count
 from django.utils import timezone
 from datetime import datetime, timedelta
 
-from certificates.models import Event, Participant, Certificate, AuditLog
+from certificates.models import Event, Certificate
+from certificates.services.audit_counters import audit_counters
 
 
 @method_decorator(staff_member_required, name="dispatch")
 class DashboardChartsAPIView(TemplateView):
-    """API para datos de gráficos del dashboard"""
+    """API para datos de gráficos del dashboard (ver DashboardChartService)"""
     
     def get(self, request, *args, **kwargs):
         chart_type = request.GET.get('chart', 'certificates_by_month')
         
-        if chart_type == 'certificates_by_month':
-            return self.certificates_by_month()
-        elif chart_type == 'events_by_month':
-            return self.events_by_month()
-        elif chart_type == 'verifications_by_day':
-            return self.verifications_by_day()
-        elif chart_type == 'attendee_types':
-            return self.attendee_types_distribution()
-        elif chart_type == 'signature_status':
-            return self.signature_status()
+        data = dashboard_charts.get_chart(chart_type)
+        if data is None:
+            return JsonResponse({'error': 'Chart type not found'}, status=404)
         
-        return JsonResponse({'error': 'Chart type not found'}, status=404)
-    
-    def certificates_by_month(self):
-        """Certificados generados por mes (últimos 12 meses)"""
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=365)
-        
-        # Generar datos por mes
-        months = []
-        certificates_data = []
-        
-        current_date = start_date.replace(day=1)
-        while current_date <= end_date:
-            next_month = (current_date.replace(day=28) + timedelta(days=4)).replace(day=1)
-            
-            count = Certificate.objects.filter(
-                generated_at__gte=current_date,
-                generated_at__lt=next_month
-            ).count()
-            
-            months.append(current_date.strftime('%b %Y'))
-            certificates_data.append(count)
-            
-            current_date = next_month
-        
-        return JsonResponse({
-            'labels': months,
-            'datasets': [{
-                'label': 'Certificados Generados',
-                'data': certificates_data,
-                'backgroundColor': 'rgba(54, 162, 235, 0.2)',
-                'borderColor': 'rgba(54, 162, 235, 1)',
-                'borderWidth': 2,
-                'fill': True
-            }]
-        })
-    
-    def events_by_month(self):
-        """Eventos creados por mes (últimos 12 meses)"""
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=365)
-        
-        months = []
-        events_data = []
-        
-        current_date = start_date.replace(day=1)
-        while current_date <= end_date:
-            next_month = (current_date.replace(day=28) + timedelta(days=4)).replace(day=1)
-            
-            count = Event.objects.filter(
-                created_at__gte=current_date,
-                created_at__lt=next_month
-            ).count()
-            
-            months.append(current_date.strftime('%b %Y'))
-            events_data.append(count)
-            
-            current_date = next_month
-        
-        return JsonResponse({
-            'labels': months,
-            'datasets': [{
-                'label': 'Eventos Creados',
-                'data': events_data,
-                'backgroundColor': 'rgba(255, 99, 132, 0.2)',
-                'borderColor': 'rgba(255, 99, 132, 1)',
-                'borderWidth': 2,
-                'fill': True
-            }]
-        })
-    
-    def verifications_by_day(self):
-        """Verificaciones de certificados por día (últimos 30 días)"""
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=30)
-        
-        days = []
-        verifications_data = []
-        
-        current_date = start_date
-        while current_date <= end_date:
-            next_date = current_date + timedelta(days=1)
-            
-            count = AuditLog.objects.filter(
-                action_type='VERIFY',
-                timestamp__date=current_date
-            ).count()
-            
-            days.append(current_date.strftime('%d/%m'))
-            verifications_data.append(count)
-            
-            current_date = next_date
-        
-        return JsonResponse({
-            'labels': days,
-            'datasets': [{
-                'label': 'Verificaciones',
-                'data': verifications_data,
-                'backgroundColor': 'rgba(75, 192, 192, 0.2)',
-                'borderColor': 'rgba(75, 192, 192, 1)',
-                'borderWidth': 2,
-                'fill': True
-            }]
-        })
-    
-    def attendee_types_distribution(self):
-        """Distribución por tipo de asistente"""
-        stats = Participant.objects.values('attendee_type').annotate(
-            count=Count('id')
-        ).order_by('-count')
-        
-        labels = []
-        data = []
-        colors = [
-            'rgba(255, 99, 132, 0.8)',
-            'rgba(54, 162, 235, 0.8)',
-            'rgba(255, 205, 86, 0.8)',
-            'rgba(75, 192, 192, 0.8)',
-        ]
-        
-        for i, stat in enumerate(stats):
-            type_display = {
-                'ASISTENTE': 'Asistentes',
-                'PONENTE': 'Ponentes',
-                'ORGANIZADOR': 'Organizadores'
-            }.get(stat['attendee_type'], stat['attendee_type'])
-            
-            labels.append(type_display)
-            data.append(stat['count'])
-        
-        return JsonResponse({
-            'labels': labels,
-            'datasets': [{
-                'data': data,
-                'backgroundColor': colors[:len(data)],
-                'borderWidth': 2
-            }]
-        })
-    
-    def signature_status(self):
-        """Estado de firma de certificados"""
-        signed = Certificate.objects.filter(is_signed=True).count()
-        unsigned = Certificate.objects.filter(is_signed=False).count()
-        
-        return JsonResponse({
-            'labels': ['Firmados Digitalmente', 'Sin Firma'],
-            'datasets': [{
-                'data': [signed, unsigned],
-                'backgroundColor': [
-                    'rgba(40, 167, 69, 0.8)',
-                    'rgba(220, 53, 69, 0.8)'
-                ],
-                'borderWidth': 2
-            }]
-        })
+        return JsonResponse(data)
 
 
 @method_decorator(staff_member_required, name="dispatch")
@@ -319,24 +161,13 @@ class DashboardStatsAPIView(TemplateView):
         now = timezone.now()
         last_24h = now - timedelta(hours=24)
         
-        # Actividad en las últimas 24 horas
+        # Actividad en las últimas 24 horas (contadores por hora)
+        activity = audit_counters.totals_by_action(since=last_24h)
         recent_activity = {
-            'imports': AuditLog.objects.filter(
-                action_type='IMPORT',
-                timestamp__gte=last_24h
-            ).count(),
-            'generations': AuditLog.objects.filter(
-                action_type='GENERATE',
-                timestamp__gte=last_24h
-            ).count(),
-            'signatures': AuditLog.objects.filter(
-                action_type='SIGN',
-                timestamp__gte=last_24h
-            ).count(),
-            'verifications': AuditLog.objects.filter(
-                action_type='VERIFY',
-                timestamp__gte=last_24h
-            ).count(),
+            'imports': activity.get('IMPORT', 0),
+            'generations': activity.get('GENERATE', 0),
+            'signatures': activity.get('SIGN', 0),
+            'verifications': activity.get('VERIFY', 0),
         }
         
         # Eventos más populares (por número de participantes)
@@ -361,12 +192,8 @@ class DashboardStatsAPIView(TemplateView):
         # Actividad por hora en los últimos 7 días
         last_week = timezone.now() - timedelta(days=7)
         
-        hourly_activity = {}
-        for hour in range(24):
-            hourly_activity[hour] = AuditLog.objects.filter(
-                timestamp__gte=last_week,
-                timestamp__hour=hour
-            ).count()
+        activity = audit_counters.by_hour(since=last_week)
+        hourly_activity = {hour: activity.get(hour, 0) for hour in range(24)}
         
         return JsonResponse({
             'hourly_activity': hourly_activity,
@@ -8,6 +8,8 @@ from django.views.decorators.http import require_GET
 from django.views.decorators.cache import never_cache
 import logging
 
+from certificates.services.certificate_query_cache import certificate_query_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -137,7 +139,8 @@ def cache_check(request):
         if retrieved_value == test_value:
             return JsonResponse({
                 'status': 'ok',
-                'cache': 'redis'
+                'cache': 'redis',
+                'public_query': certificate_query_cache.stats()
             })
         else:
             return JsonResponse({
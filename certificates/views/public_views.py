@@ -1,14 +1,21 @@
 """Vistas públicas para consulta y verificación de certificados"""
 from django.views.generic import TemplateView, DetailView
 from django.shortcuts import get_object_or_404, render
-from django.http import FileResponse, Http404
+from django.http import Http404
+from django.urls import reverse
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django_ratelimit.decorators import ratelimit
 from django_ratelimit.exceptions import Ratelimited
 
-from certificates.models import Certificate, AuditLog
+from certificates.models import Certificate, CertificateLookup
 from certificates.forms import DNIQueryForm
+from certificates.services.audit_writer import audit_writer
+from certificates.services.certificate_lookup import certificate_lookup
+from certificates.services.certificate_page_cache import certificate_page_cache
+from certificates.services.certificate_query_cache import certificate_query_cache
+from certificates.services.certificate_uuid_filter import certificate_uuid_filter
+from certificates.services.file_delivery import file_delivery
 
 
 def get_client_ip(request):
@@ -46,32 +53,24 @@ class CertificateQueryView(TemplateView):
 
     def post(self, request, *args, **kwargs):
         """Procesa la búsqueda de certificados por DNI"""
-        from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-        
         form = DNIQueryForm(request.POST)
         
         if form.is_valid():
             dni = form.cleaned_data['dni']
             
-            # Buscar certificados por DNI con optimización de queries
-            certificates = Certificate.objects.filter(
-                participant__dni=dni
-            ).select_related(
-                'participant',
-                'participant__event'
-            ).order_by('-generated_at')  # Más reciente primero
-            
-            # Convertir a lista para evitar queries adicionales
-            certificates_list = list(certificates)
+            # Página de resultados desde la cache (o con LIMIT/OFFSET en la BD)
+            certificates, total, page_number, num_pages = certificate_query_cache.get_page(
+                dni, request.POST.get('page', 1)
+            )
             
             # Registrar consulta en AuditLog
-            AuditLog.objects.create(
+            audit_writer.record(
                 action_type='QUERY',
                 user=request.user if request.user.is_authenticated else None,
                 description=f'Consulta de certificados por DNI: {dni}',
                 metadata={
                     'dni': dni,
-                    'results_count': len(certificates_list)
+                    'results_count': total
                 },
                 ip_address=get_client_ip(request)
             )
@@ -79,25 +78,12 @@ class CertificateQueryView(TemplateView):
             context = self.get_context_data(**kwargs)
             context['form'] = form
             context['dni'] = dni
-            context['total_certificates'] = len(certificates_list)
-            
-            # Si hay más de 10 certificados, usar paginación
-            if len(certificates_list) > 10:
-                paginator = Paginator(certificates_list, 10)  # 10 por página
-                page = request.POST.get('page', 1)
-                
-                try:
-                    certificates_page = paginator.page(page)
-                except PageNotAnInteger:
-                    certificates_page = paginator.page(1)
-                except EmptyPage:
-                    certificates_page = paginator.page(paginator.num_pages)
-                
-                context['certificates'] = certificates_page
-                context['use_pagination'] = True
-            else:
-                context['certificates'] = certificates_list
-                context['use_pagination'] = False
+            context['total_certificates'] = total
+            context['certificates'] = certificates
+            # Más de 10 certificados: se muestran por páginas
+            context['use_pagination'] = num_pages > 1
+            context['page_number'] = page_number
+            context['num_pages'] = num_pages
             
             return self.render_to_response(context)
         
@@ -120,7 +106,7 @@ class CertificateDownloadView(TemplateView):
         # Si es un certificado externo, redirigir a la URL externa
         if certificate.is_external and certificate.external_url:
             # Registrar acceso en AuditLog
-            AuditLog.objects.create(
+            audit_writer.record(
                 action_type='QUERY',
                 user=request.user if request.user.is_authenticated else None,
                 description=f'Acceso a certificado externo: {certificate.participant.full_name}',
@@ -137,58 +123,60 @@ class CertificateDownloadView(TemplateView):
         if not certificate.pdf_file:
             raise Http404("El certificado no tiene un archivo PDF asociado")
         
-        # Retornar archivo como descarga
-        response = FileResponse(
-            certificate.pdf_file.open('rb'),
-            content_type='application/pdf'
-        )
-        
-        # Configurar header para descarga
+        # Retornar archivo como descarga (nginx o Django, según PROTECTED_FILE_DELIVERY)
         filename = f"certificado_{certificate.participant.dni}_{certificate.uuid}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        return response
+        return file_delivery.serve(request, certificate.pdf_file, filename=filename)
 
 
 @method_decorator(ratelimit(key='ip', rate='20/m', method='GET', block=True), name='get')
 class CertificateVerificationView(DetailView):
     """Vista pública para verificar certificado mediante QR"""
-    model = Certificate
+    model = CertificateLookup
     template_name = 'certificates/verify.html'
     context_object_name = 'certificate'
     slug_field = 'uuid'
     slug_url_kwarg = 'uuid'
     
+    def get(self, request, *args, **kwargs):
+        """Sirve la página cacheada del certificado o la renderiza y la guarda"""
+        uuid = self.kwargs.get('uuid')
+        if not certificate_page_cache.is_cacheable(request):
+            return super().get(request, *args, **kwargs)
+        
+        entry = certificate_page_cache.get('verify', uuid)
+        if entry is None:
+            response = super().get(request, *args, **kwargs)
+            entry = certificate_page_cache.store('verify', uuid, response, self.audit_metadata)
+            if entry is None:
+                return response
+        else:
+            self.record_verification(uuid, entry.metadata)
+        return certificate_page_cache.respond(request, entry)
+    
+    def record_verification(self, uuid, metadata):
+        """Registra la verificación en AuditLog"""
+        audit_writer.record(
+            action_type='VERIFY',
+            user=self.request.user if self.request.user.is_authenticated else None,
+            description=f'Verificación de certificado: {uuid}',
+            metadata=metadata,
+            ip_address=get_client_ip(self.request)
+        )
+    
     def get_object(self, queryset=None):
         """Busca el certificado por UUID"""
         uuid = self.kwargs.get('uuid')
         
-        try:
-            certificate = Certificate.objects.select_related(
-                'participant',
-                'participant__event'
-            ).get(uuid=uuid)
-            
-            # Registrar verificación en AuditLog
-            AuditLog.objects.create(
-                action_type='VERIFY',
-                user=self.request.user if self.request.user.is_authenticated else None,
-                description=f'Verificación de certificado: {uuid}',
-                metadata={
-                    'certificate_uuid': str(uuid),
-                    'participant_dni': certificate.participant.dni,
-                    'participant_name': certificate.participant.full_name,
-                    'event_name': certificate.participant.event.name,
-                    'is_signed': certificate.is_signed
-                },
-                ip_address=get_client_ip(self.request)
-            )
-            
-            return certificate
-            
-        except Certificate.DoesNotExist:
+        # UUID que seguro no existe: sin consulta ni AuditLog, solo el contador
+        if not certificate_uuid_filter.might_exist(uuid):
+            certificate_uuid_filter.record_miss()
+            raise Http404("Certificado no encontrado")
+        
+        # Una sola búsqueda por UUID en el modelo de lectura (sin joins)
+        certificate = certificate_lookup.get(uuid)
+        if certificate is None:
             # Registrar intento de verificación fallido
-            AuditLog.objects.create(
+            audit_writer.record(
                 action_type='VERIFY',
                 user=self.request.user if self.request.user.is_authenticated else None,
                 description=f'Intento de verificación de certificado inexistente: {uuid}',
@@ -199,6 +187,24 @@ class CertificateVerificationView(DetailView):
                 ip_address=get_client_ip(self.request)
             )
             raise Http404("Certificado no encontrado")
+        
+        # Registrar verificación en AuditLog
+        self.audit_metadata = {
+            'certificate_uuid': str(uuid),
+            'participant_dni': certificate.dni,
+            'participant_name': certificate.full_name,
+            'event_name': certificate.event_name,
+            'is_signed': certificate.is_signed
+        }
+        self.record_verification(uuid, self.audit_metadata)
+        
+        # El PNG del QR se genera la primera vez que se muestra
+        if not certificate.qr_code and not certificate.is_external:
+            certificate.qr_code = Certificate.objects.get(
+                pk=certificate.certificate_id
+            ).ensure_qr_code().name
+        
+        return certificate
 
 
 
@@ -224,9 +230,16 @@ class CertificatePreviewView(TemplateView):
         """
         try:
             # Buscar certificado
-            certificate = Certificate.objects.select_related(
-                'participant', 'participant__event'
-            ).get(uuid=certificate_uuid)
+            cacheable = certificate_page_cache.is_cacheable(request)
+            entry = certificate_page_cache.get('preview', certificate_uuid) if cacheable else None
+            if entry is not None:
+                self.record_preview(certificate_uuid, entry.metadata)
+                return certificate_page_cache.respond(request, entry)
+            
+            # Una sola búsqueda por UUID en el modelo de lectura (sin joins)
+            certificate = certificate_lookup.get(certificate_uuid)
+            if certificate is None:
+                return self.render_not_found(request, certificate_uuid)
             
             # Verificar que esté listo para preview
             if not certificate.is_ready_for_preview():
@@ -241,45 +254,39 @@ class CertificatePreviewView(TemplateView):
                 )
             
             # Registrar acceso en auditoría
-            AuditLog.objects.create(
-                action_type='VERIFY',
-                description=f'Preview accedido para certificado {certificate_uuid}',
-                metadata={
-                    'certificate_uuid': str(certificate_uuid),
-                    'participant_name': certificate.participant.full_name,
-                    'participant_dni': certificate.participant.dni,
-                },
-                ip_address=get_client_ip(request)
-            )
+            metadata = {
+                'certificate_uuid': str(certificate_uuid),
+                'participant_name': certificate.full_name,
+                'participant_dni': certificate.dni,
+            }
+            self.record_preview(certificate_uuid, metadata)
             
             # Preparar contexto
             context = {
                 'certificate': certificate,
-                'pdf_url': certificate.final_pdf.url if certificate.final_pdf else None,
+                'pdf_url': reverse(
+                    'certificates:certificate_preview_pdf',
+                    kwargs={'certificate_uuid': certificate.uuid},
+                ),
                 'verification_info': {
-                    'participant_name': certificate.participant.full_name,
-                    'dni': certificate.participant.dni,
-                    'event_name': certificate.participant.event.name,
-                    'event_date': certificate.participant.event.event_date,
-                    'attendee_type': certificate.participant.get_attendee_type_display(),
+                    'participant_name': certificate.full_name,
+                    'dni': certificate.dni,
+                    'event_name': certificate.event_name,
+                    'event_date': certificate.event_date,
+                    'attendee_type': certificate.get_attendee_type_display(),
                     'issue_date': certificate.generated_at,
                     'signed_date': certificate.signed_at,
                 },
                 'qr_code_url': certificate.qr_image.url if certificate.qr_image else None,
             }
             
-            return render(request, self.template_name, context)
+            response = render(request, self.template_name, context)
+            if cacheable:
+                entry = certificate_page_cache.store('preview', certificate_uuid, response, metadata)
+                if entry is not None:
+                    return certificate_page_cache.respond(request, entry)
+            return response
             
-        except Certificate.DoesNotExist:
-            return render(
-                request,
-                'certificates/preview_not_found.html',
-                {
-                    'uuid': certificate_uuid,
-                    'message': 'El certificado solicitado no existe o no está disponible.'
-                },
-                status=404
-            )
         except Exception as e:
             return render(
                 request,
@@ -290,3 +297,50 @@ class CertificatePreviewView(TemplateView):
                 },
                 status=500
             )
+
+    
+    def render_not_found(self, request, certificate_uuid):
+        """Página 404 del preview"""
+        return render(
+            request,
+            'certificates/preview_not_found.html',
+            {
+                'uuid': certificate_uuid,
+                'message': 'El certificado solicitado no existe o no está disponible.'
+            },
+            status=404
+        )
+    
+    def record_preview(self, certificate_uuid, metadata):
+        """Registra el acceso al preview en AuditLog"""
+        audit_writer.record(
+            action_type='VERIFY',
+            description=f'Preview accedido para certificado {certificate_uuid}',
+            metadata=metadata,
+            ip_address=get_client_ip(self.request)
+        )
+
+
+class CertificatePreviewPDFView(TemplateView):
+    """PDF final del preview público (visor embebido y botón de descarga)"""
+    
+    @method_decorator(ratelimit(key='ip', rate='60/m', method='GET'))
+    def dispatch(self, *args, **kwargs):
+        return super().dispatch(*args, **kwargs)
+    
+    def get(self, request, certificate_uuid):
+        """Entrega el PDF firmado final; el acceso se audita en la página de preview"""
+        certificate = get_object_or_404(
+            Certificate.objects.select_related('participant'),
+            uuid=certificate_uuid,
+        )
+        if not certificate.is_ready_for_preview():
+            raise Http404("El certificado no está disponible para visualización pública")
+        
+        filename = f"certificado_{certificate.participant.dni}_{certificate.uuid}.pdf"
+        return file_delivery.serve(
+            request,
+            certificate.final_pdf,
+            filename=filename,
+            as_attachment=request.GET.get('download') == '1',
+        )
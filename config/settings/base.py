@@ -147,6 +147,104 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 SIGNATURE_SERVICE_URL = env('SIGNATURE_SERVICE_URL', default='')
 SIGNATURE_API_KEY = env('SIGNATURE_API_KEY', default='')
 SIGNATURE_TIMEOUT = env.int('SIGNATURE_TIMEOUT', default=30)
+# Reintentos con backoff exponencial (segundos base y tope), firmas simultáneas
+# en la firma masiva y circuit breaker (fallos consecutivos y segundos abierto)
+SIGNATURE_MAX_RETRIES = env.int('SIGNATURE_MAX_RETRIES', default=3)
+SIGNATURE_RETRY_DELAY = env.float('SIGNATURE_RETRY_DELAY', default=2.0)
+SIGNATURE_RETRY_MAX_DELAY = env.float('SIGNATURE_RETRY_MAX_DELAY', default=30.0)
+SIGNATURE_CONCURRENCY = env.int('SIGNATURE_CONCURRENCY', default=4)
+SIGNATURE_CIRCUIT_FAILURE_THRESHOLD = env.int('SIGNATURE_CIRCUIT_FAILURE_THRESHOLD', default=5)
+SIGNATURE_CIRCUIT_RESET_TIMEOUT = env.float('SIGNATURE_CIRCUIT_RESET_TIMEOUT', default=60.0)
+
+# Generación masiva de certificados
+CERTIFICATE_GENERATION_WORKERS = env.int('CERTIFICATE_GENERATION_WORKERS', default=1)
+CERTIFICATE_GENERATION_BATCH_SIZE = env.int('CERTIFICATE_GENERATION_BATCH_SIZE', default=100)
+# QR vectorial en los PDF; la imagen PNG (qr_code) se genera solo cuando se solicita
+CERTIFICATE_QR_VECTOR = env.bool('CERTIFICATE_QR_VECTOR', default=True)
+
+# Inserción de QR por lotes (procesos en paralelo y certificados por bulk_update)
+QR_PROCESSING_WORKERS = env.int('QR_PROCESSING_WORKERS', default=1)
+QR_PROCESSING_BATCH_SIZE = env.int('QR_PROCESSING_BATCH_SIZE', default=100)
+# QR agregado como actualización incremental del PDF original y solo en la primera página
+QR_PDF_INCREMENTAL_UPDATE = env.bool('QR_PDF_INCREMENTAL_UPDATE', default=True)
+QR_PDF_FIRST_PAGE_ONLY = env.bool('QR_PDF_FIRST_PAGE_ONLY', default=False)
+
+# Cola de trabajos en segundo plano (comando run_certificate_worker)
+CERTIFICATE_JOB_MAX_ATTEMPTS = env.int('CERTIFICATE_JOB_MAX_ATTEMPTS', default=3)
+CERTIFICATE_JOB_RETRY_DELAY = env.int('CERTIFICATE_JOB_RETRY_DELAY', default=30)
+CERTIFICATE_JOB_LOCK_TIMEOUT = env.int('CERTIFICATE_JOB_LOCK_TIMEOUT', default=1800)
+
+# Importaciones de Excel: medir memoria pico con tracemalloc (solo para
+# pruebas de rendimiento: ralentiza todo el proceso mientras mide)
+IMPORT_TRACK_MEMORY = env.bool('IMPORT_TRACK_MEMORY', default=False)
+
+# Planes de renderizado de plantillas visuales (LRU por proceso + cache compartida opcional)
+TEMPLATE_RENDER_PLAN_CACHE_SIZE = env.int('TEMPLATE_RENDER_PLAN_CACHE_SIZE', default=32)
+TEMPLATE_RENDER_PLAN_SHARED_CACHE = env.bool('TEMPLATE_RENDER_PLAN_SHARED_CACHE', default=False)
+TEMPLATE_RENDER_PLAN_CACHE_TIMEOUT = env.int('TEMPLATE_RENDER_PLAN_CACHE_TIMEOUT', default=3600)
+# Certificados (páginas) por documento de WeasyPrint en la generación masiva
+TEMPLATE_RENDER_BATCH_PAGES = env.int('TEMPLATE_RENDER_BATCH_PAGES', default=50)
+
+# Gráficos del dashboard: segundos vigentes y segundos extra en que se sirve
+# el valor anterior mientras se recalcula en segundo plano
+DASHBOARD_CHART_CACHE_TTL = env.int('DASHBOARD_CHART_CACHE_TTL', default=60)
+DASHBOARD_CHART_STALE_TTL = env.int('DASHBOARD_CHART_STALE_TTL', default=600)
+
+# Estadísticas del dashboard: segundos sirviendo el valor vencido mientras se
+# recalcula, espera máxima cuando otro proceso calcula una caché vacía y
+# vigencia de los totales incrementales (luego se recalculan desde la BD)
+DASHBOARD_STATS_STALE_TTL = env.int('DASHBOARD_STATS_STALE_TTL', default=3600)
+DASHBOARD_STATS_MISS_WAIT = env.float('DASHBOARD_STATS_MISS_WAIT', default=10.0)
+DASHBOARD_COUNTERS_TIMEOUT = env.int('DASHBOARD_COUNTERS_TIMEOUT', default=3600)
+
+# Consulta pública por DNI: cache de resultados por página (invalidada por señales)
+PUBLIC_QUERY_CACHE_ENABLED = env.bool('PUBLIC_QUERY_CACHE_ENABLED', default=True)
+PUBLIC_QUERY_CACHE_TIMEOUT = env.int('PUBLIC_QUERY_CACHE_TIMEOUT', default=3600)
+
+# Verificación por QR y preview: cache de página completa por certificado
+# (invalidada por señales) y max-age para el cache de nginx (0: revalidar siempre)
+PUBLIC_PAGE_CACHE_ENABLED = env.bool('PUBLIC_PAGE_CACHE_ENABLED', default=True)
+PUBLIC_PAGE_CACHE_TIMEOUT = env.int('PUBLIC_PAGE_CACHE_TIMEOUT', default=3600)
+PUBLIC_PAGE_CACHE_MAX_AGE = env.int('PUBLIC_PAGE_CACHE_MAX_AGE', default=0)
+
+# Verificación por QR: filtro Bloom en memoria de los UUID existentes
+# (tasa de falsos positivos, segundos entre reconstrucciones completas y
+# segundos entre escrituras del contador de UUID inexistentes)
+CERTIFICATE_UUID_FILTER_ENABLED = env.bool('CERTIFICATE_UUID_FILTER_ENABLED', default=True)
+CERTIFICATE_UUID_FILTER_ERROR_RATE = env.float('CERTIFICATE_UUID_FILTER_ERROR_RATE', default=0.001)
+CERTIFICATE_UUID_FILTER_REBUILD_SECONDS = env.int('CERTIFICATE_UUID_FILTER_REBUILD_SECONDS', default=3600)
+CERTIFICATE_UUID_FILTER_MISS_FLUSH_SECONDS = env.float('CERTIFICATE_UUID_FILTER_MISS_FLUSH_SECONDS', default=60.0)
+
+# Modelo de lectura de las vistas públicas (CertificateLookup): certificados
+# copiados por lote en la sincronización masiva y en rebuild_certificate_lookup
+CERTIFICATE_LOOKUP_BATCH_SIZE = env.int('CERTIFICATE_LOOKUP_BATCH_SIZE', default=1000)
+
+# PDFs, imágenes QR y assets guardados una sola vez por contenido (SHA-256)
+# bajo MEDIA_ROOT/<prefijo>/; collect_orphan_media elimina los huérfanos
+CONTENT_ADDRESSED_STORAGE_ENABLED = env.bool('CONTENT_ADDRESSED_STORAGE_ENABLED', default=True)
+CONTENT_ADDRESSED_STORAGE_PREFIX = env('CONTENT_ADDRESSED_STORAGE_PREFIX', default='cas')
+
+# Auditoría de las vistas públicas: "sync" (INSERT por petición) o "async"
+# (buffer por proceso escrito en lotes; spool "file", "cache" o "none")
+AUDIT_LOG_MODE = env('AUDIT_LOG_MODE', default='sync')
+AUDIT_LOG_FLUSH_SIZE = env.int('AUDIT_LOG_FLUSH_SIZE', default=100)
+AUDIT_LOG_FLUSH_INTERVAL = env.float('AUDIT_LOG_FLUSH_INTERVAL', default=2.0)
+AUDIT_LOG_BUFFER_SIZE = env.int('AUDIT_LOG_BUFFER_SIZE', default=5000)
+AUDIT_LOG_SLOW_FLUSH_SECONDS = env.float('AUDIT_LOG_SLOW_FLUSH_SECONDS', default=1.0)
+AUDIT_LOG_SPOOL = env('AUDIT_LOG_SPOOL', default='file')
+AUDIT_LOG_SPOOL_PATH = env('AUDIT_LOG_SPOOL_PATH', default=str(BASE_DIR / 'logs' / 'audit_spool.jsonl'))
+
+# Retención de auditoría: días conservados en la tabla antes de que
+# archive_audit_logs los mueva a AUDIT_LOG_ARCHIVE_ROOT (fuera de MEDIA_ROOT:
+# contienen datos personales y nginx no debe servirlos)
+AUDIT_LOG_ARCHIVE_ROOT = env('AUDIT_LOG_ARCHIVE_ROOT', default=str(BASE_DIR / 'logs' / 'audit_archive'))
+AUDIT_LOG_RETENTION_DAYS = env.int('AUDIT_LOG_RETENTION_DAYS', default=365)
+AUDIT_LOG_ARCHIVE_BATCH_SIZE = env.int('AUDIT_LOG_ARCHIVE_BATCH_SIZE', default=5000)
+
+# Descarga de PDFs: "django" (transmitido por Django, con Range), "nginx"
+# (X-Accel-Redirect a la location interna con alias de MEDIA_ROOT) o "sendfile"
+PROTECTED_FILE_DELIVERY = env('PROTECTED_FILE_DELIVERY', default='django')
+PROTECTED_FILE_INTERNAL_PREFIX = env('PROTECTED_FILE_INTERNAL_PREFIX', default='/protected/')
 
 # Logging Configuration - Solo consola para evitar problemas de permisos en Docker
 LOGGING = {
@@ -0,0 +1,26 @@
+"""
+Hooks de Gunicorn (se carga automáticamente desde el directorio de trabajo).
+
+Las opciones de arranque se siguen pasando por línea de comandos
+(Dockerfile y certificates-drtc.service).
+"""
+
+
+def post_worker_init(worker):
+    """Carga el filtro de UUID de certificados antes de atender peticiones"""
+    from certificates.services.certificate_uuid_filter import certificate_uuid_filter
+
+    if certificate_uuid_filter.enabled:
+        try:
+            certificate_uuid_filter.load()
+        except Exception as e:
+            worker.log.warning(f"No se pudo cargar el filtro de UUID de certificados: {e}")
+
+
+def worker_exit(server, worker):
+    """Escribe los registros de auditoría pendientes antes de terminar el worker"""
+    from certificates.services.audit_writer import audit_writer
+    from certificates.services.certificate_uuid_filter import certificate_uuid_filter
+
+    audit_writer.shutdown()
+    certificate_uuid_filter.flush_misses()